@@ -1,10 +1,15 @@
-from fastapi import APIRouter, Depends
+from datetime import date, datetime, timedelta, timezone
+from fastapi import APIRouter, Depends, Query
 from sqlalchemy.orm import Session
 from app.dependencies.db import get_db
 from app.dependencies.require_admin import require_admin
 from app.dependencies.auth import get_current_user
-from core.services.admin_stats_service import get_admin_stats
-from app.api.v1.schemas.admin import AdminStatsResponse, AdminVerifyResponse
+from core.services.admin_stats_service import get_admin_stats, get_analysis_stage_percentiles
+from app.api.v1.schemas.admin import (
+    AdminStatsResponse,
+    AdminVerifyResponse,
+    AnalysisStagePercentilesResponse,
+)
 from core.services.user_service import is_admin
 
 router = APIRouter()
@@ -27,6 +32,25 @@ def get_stats(
     return AdminStatsResponse.from_domain(stats)
 
 
+@router.get("/analysis-timings/", response_model=list[AnalysisStagePercentilesResponse])
+def get_analysis_timings(
+    start: date | None = Query(None, description="First day (UTC) to include; default 7 days before end"),
+    end: date | None = Query(None, description="Last day (UTC) to include; default today"),
+    db: Session = Depends(get_db),
+    current_user: dict = Depends(require_admin),
+):
+    """
+    Where analysis time goes: p50/p95/p99 milliseconds per pipeline stage and
+    model version, over analyses completed in [start, end].
+
+    Requires admin privileges.
+    """
+    end = end or datetime.now(timezone.utc).date()
+    start = start or end - timedelta(days=7)
+    rows = get_analysis_stage_percentiles(start, end, db)
+    return [AnalysisStagePercentilesResponse.from_domain(row) for row in rows]
+
+
 @router.get("/verify/", response_model=AdminVerifyResponse)
 def verify_admin(
     current_user: dict = Depends(get_current_user),
@@ -1,10 +1,14 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Request
+from fastapi.concurrency import run_in_threadpool
 from uuid import UUID
 from datetime import timedelta
 from app.dependencies.db import get_db
 from app.dependencies.auth import get_current_user
 from app.dependencies.entitlement import require_premium
 from sqlalchemy.orm import Session
+from core.services.user_service import is_admin
+from core.services.exceptions import ForbiddenException
+from core.config import PUBLIC_API_BASE_URL
 
 
 from app.api.v1.schemas.analysis import (
@@ -13,10 +17,15 @@ from app.api.v1.schemas.analysis import (
     GetAnalysis,
     GetAnalysisIssue,
     IssueSwingTimelineItem,
+    InitiateMultipartUploadRequest,
+    MultipartUploadResponse,
+    SignUploadPartsRequest,
+    UploadPartUrl,
+    CompleteMultipartUploadRequest,
 )
 from core.services.analysis_service import (
     create_analysis as service_create_analysis,
-    run_analysis as service_run_analysis,
+    enqueue_analysis as service_enqueue_analysis,
     get_analysis_by_id as service_get_analysis_by_id,
     get_analyses_by_user_id as service_get_analyses_by_user_id,
     get_issue_swing_timeline as service_get_issue_swing_timeline,
@@ -24,9 +33,22 @@ from core.services.analysis_service import (
     get_analysis_issues as service_get_analysis_issues,
     delete_analysis_issue as service_delete_analysis_issue,
 )
+from core.services.direct_upload_service import (
+    begin_direct_upload as service_begin_direct_upload,
+    write_direct_upload as service_write_direct_upload,
+    abort_direct_upload as service_abort_direct_upload,
+    complete_direct_upload as service_complete_direct_upload,
+)
+from core.services.multipart_upload_service import (
+    initiate_multipart_upload as service_initiate_multipart_upload,
+    sign_upload_parts as service_sign_upload_parts,
+    complete_multipart_upload as service_complete_multipart_upload,
+    abort_multipart_upload as service_abort_multipart_upload,
+)
 from core.services.dtos.analysis_service_dto import (
     CreateAnalysisDTO,
     RunAnalysisDTO,
+    CompleteMultipartUploadDTO,
 )
 from core.services.video import (
     get_video_read_url_by_analysis,
@@ -53,11 +75,17 @@ def get_analysis(
 @router.post("/", response_model=CreateAnalysisResponse, status_code=201)
 def create_analysis(
     request: CreateAnalysisRequest,
+    http_request: Request,
     db: Session = Depends(get_db),
     current_user: dict = Depends(require_premium)
     ):
     """
-    Create an analysis and return a signed upload URL.
+    Create an analysis and return where to PUT the video.
+
+    upload_mode "presigned" (default): a signed R2 URL; confirm with PATCH
+    /analyses/{analysis_id}/ once the PUT is done.
+    upload_mode "direct": this API's PUT /analyses/{analysis_id}/video/, which
+    takes the streamed body and starts the analysis itself (no PATCH).
     """
     user_id = UUID(current_user["user_id"])
     
@@ -69,27 +97,145 @@ def create_analysis(
         prompt_height=request.prompt_height,
         prompt_misses=request.prompt_misses,
         prompt_extra=request.prompt_extra,
+        upload_mode=request.upload_mode,
+        auto_trim=request.auto_trim,
     )
 
     result = service_create_analysis(dto=dto, db_session=db)
+    # Behind the TLS proxy the request itself is http, so the direct upload URL
+    # is built on the public base URL (iOS refuses plain-http PUTs)
+    upload_url = result["upload_url"] or PUBLIC_API_BASE_URL.rstrip("/") + http_request.app.url_path_for(
+        "upload_analysis_video", analysis_id=result["analysis_id"]
+    )
 
     return CreateAnalysisResponse(
         success=True,
         analysis_id=result["analysis_id"],
-        upload_url=result["upload_url"],
+        upload_url=upload_url,
+        upload_mode=result["upload_mode"],
+    )
+
+
+@router.put("/{analysis_id}/video/", response_model=GetAnalysis, status_code=202)
+async def upload_analysis_video(
+    analysis_id: UUID,
+    request: Request,
+    current_user: dict = Depends(require_premium)
+):
+    """
+    Direct upload: stream the video as the raw request body.
+
+    The body is written to local scratch and R2 as it arrives; once it is
+    complete the analysis is queued for the workers, which take the scratch
+    copy over instead of downloading it when they share this host. Returned
+    in 'processing' state; poll GET /analyses/{analysis_id}/ for the result.
+    """
+    user_id = UUID(current_user["user_id"])
+    upload = await run_in_threadpool(service_begin_direct_upload, analysis_id, user_id)
+    try:
+        async for chunk in request.stream():
+            await run_in_threadpool(service_write_direct_upload, upload, chunk)
+    except BaseException:
+        await run_in_threadpool(service_abort_direct_upload, upload)
+        raise
+
+    result = await run_in_threadpool(
+        service_complete_direct_upload,
+        RunAnalysisDTO(user_id=user_id, analysis_id=analysis_id),
+        upload,
+    )
+
+    return GetAnalysis.from_domain(result)
+
+
+@router.post("/{analysis_id}/multipart/", response_model=MultipartUploadResponse, status_code=201)
+def initiate_multipart_upload(
+    analysis_id: UUID,
+    request: InitiateMultipartUploadRequest,
+    db: Session = Depends(get_db),
+    current_user: dict = Depends(require_premium)
+):
+    """
+    Start a multipart upload of the analysis video, as an alternative to the
+    single upload URL from POST /analyses/. Returns a presigned URL per part;
+    PUT each part (in parallel) and keep the ETag header of each response, then
+    call POST /analyses/{analysis_id}/multipart/complete/.
+    """
+    result = service_initiate_multipart_upload(
+        analysis_id, UUID(current_user["user_id"]), request.size_bytes, db_session=db
+    )
+    return MultipartUploadResponse.from_domain(result)
+
+
+@router.post("/{analysis_id}/multipart/parts/", response_model=list[UploadPartUrl])
+def sign_multipart_upload_parts(
+    analysis_id: UUID,
+    request: SignUploadPartsRequest,
+    db: Session = Depends(get_db),
+    current_user: dict = Depends(require_premium)
+):
+    """
+    Fresh URLs for some parts of the open multipart upload, to retry parts
+    whose URLs expired. Parts already uploaded don't need to be sent again.
+    """
+    urls = service_sign_upload_parts(
+        analysis_id, UUID(current_user["user_id"]), request.part_numbers, db_session=db
+    )
+    return [UploadPartUrl(part_number=u.part_number, url=u.url) for u in urls]
+
+
+@router.post("/{analysis_id}/multipart/complete/", response_model=GetAnalysis, status_code=202)
+def complete_multipart_upload(
+    analysis_id: UUID,
+    request: CompleteMultipartUploadRequest,
+    db: Session = Depends(get_db),
+    current_user: dict = Depends(require_premium)
+):
+    """
+    Assemble the uploaded parts and verify the video's size. On
+    success the analysis is queued, as PATCH /analyses/{analysis_id}/ does for
+    a single-PUT upload; poll GET /analyses/{analysis_id}/ for the result.
+    """
+    dto = CompleteMultipartUploadDTO(
+        user_id=UUID(current_user["user_id"]),
+        analysis_id=analysis_id,
+        parts=[(part.part_number, part.etag) for part in request.parts],
     )
+    result = service_complete_multipart_upload(dto, db_session=db)
+
+    return GetAnalysis.from_domain(result)
+
+
+@router.delete("/{analysis_id}/multipart/", status_code=204)
+def abort_multipart_upload(
+    analysis_id: UUID,
+    db: Session = Depends(get_db),
+    current_user: dict = Depends(require_premium)
+):
+    """
+    Abandon the open multipart upload and discard the parts uploaded so far.
+    """
+    service_abort_multipart_upload(analysis_id, UUID(current_user["user_id"]), db_session=db)
 
 
-@router.patch("/{analysis_id}/", response_model=GetAnalysis, status_code=200)
+@router.patch("/{analysis_id}/", response_model=GetAnalysis, status_code=202)
 def run_analysis(
     analysis_id: UUID,
+    bypass_cache: bool = False,
     db: Session = Depends(get_db),
     current_user: dict = Depends(require_premium)
 ):
     """
     Confirm that the video upload has completed.
-    Now the analysis processing can be triggered.
+    The analysis is queued for a worker and returned in 'processing' state;
+    poll GET /analyses/{analysis_id}/ for the result.
+
+    Admins can pass ?bypass_cache=true to have the model called even when an
+    identical earlier analysis is in the result cache.
     """
+    if bypass_cache and not is_admin(current_user["user_id"], db):
+        raise ForbiddenException("Admin privileges required to bypass the result cache")
+
     # Note: user_id would typically come from authentication
     # For now, we get it from the analysis
     analysis = service_get_analysis_by_id(analysis_id, db_session=db)
@@ -97,9 +243,10 @@ def run_analysis(
     dto = RunAnalysisDTO(
         user_id=analysis.user_id,
         analysis_id=analysis_id,
+        bypass_result_cache=bypass_cache,
     )
 
-    result = service_run_analysis(dto, db_session=db)
+    result = service_enqueue_analysis(dto, db_session=db)
 
     return GetAnalysis.from_domain(result)
 
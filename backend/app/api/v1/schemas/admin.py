@@ -1,5 +1,5 @@
 from pydantic import BaseModel, ConfigDict
-from core.services.dtos.admin_stats_dto import AdminStatsDTO
+from core.services.dtos.admin_stats_dto import AdminStatsDTO, AnalysisStagePercentilesDTO
 
 
 class AdminStatsResponse(BaseModel):
@@ -13,6 +13,13 @@ class AdminStatsResponse(BaseModel):
     issuesWithNoDrills: int
     newUsersLast7Days: int
     newUsersLast30Days: int
+    resultCacheEntries: int = 0
+    resultCacheHits: int = 0
+    resultCacheHitRate: float = 0.0
+    readUrlCacheHitRate: float = 0.0
+    readUrlSigningMsPerCall: float = 0.0
+    preflightRejectedLast30Days: int = 0
+    preflightRejectRateLast30Days: float = 0.0
 
     model_config = ConfigDict(from_attributes=True)
 
@@ -28,7 +35,36 @@ class AdminStatsResponse(BaseModel):
             issuesWithNoDrills=dto.issues_with_no_drills,
             newUsersLast7Days=dto.new_users_last_7_days,
             newUsersLast30Days=dto.new_users_last_30_days,
+            resultCacheEntries=dto.result_cache_entries,
+            resultCacheHits=dto.result_cache_hits,
+            resultCacheHitRate=dto.result_cache_hit_rate,
+            readUrlCacheHitRate=dto.read_url_cache_hit_rate,
+            readUrlSigningMsPerCall=dto.read_url_signing_ms_per_call,
+            preflightRejectedLast30Days=dto.preflight_rejected_last_30_days,
+            preflightRejectRateLast30Days=dto.preflight_reject_rate_last_30_days,
         )
 
 class AdminVerifyResponse(BaseModel):
-    is_admin: bool
\ No newline at end of file
+    is_admin: bool
+
+
+class AnalysisStagePercentilesResponse(BaseModel):
+    """Duration percentiles (ms) of one analysis pipeline stage for one model."""
+
+    modelVersion: str
+    stage: str
+    count: int
+    p50Ms: float
+    p95Ms: float
+    p99Ms: float
+
+    @classmethod
+    def from_domain(cls, dto: AnalysisStagePercentilesDTO) -> "AnalysisStagePercentilesResponse":
+        return cls(
+            modelVersion=dto.model_version,
+            stage=dto.stage,
+            count=dto.count,
+            p50Ms=dto.p50_ms,
+            p95Ms=dto.p95_ms,
+            p99Ms=dto.p99_ms,
+        )
@@ -1,6 +1,7 @@
 from pydantic import BaseModel, ConfigDict
 from uuid import UUID
 from datetime import datetime, timedelta
+from typing import Literal
 
 
 class CreateAnalysisRequest(BaseModel):
@@ -10,12 +11,15 @@ class CreateAnalysisRequest(BaseModel):
     prompt_height: str | None = None
     prompt_misses: str | None = None
     prompt_extra: str | None = None
+    upload_mode: Literal["presigned", "direct"] = "presigned"
+    auto_trim: bool = True          # False keeps exactly start_time..end_time (no swing detection)
 
 
 class CreateAnalysisResponse(BaseModel):
     success: bool
     analysis_id: UUID
-    upload_url: str
+    upload_url: str                 # presigned: PUT to R2; direct: PUT the body here (the API)
+    upload_mode: str = "presigned"
 
 
 class GetAnalysis(BaseModel):
@@ -98,4 +102,45 @@ class IssueSwingTimelineItem(BaseModel):
             confidence=dto.confidence,
             detected=dto.detected,
             thumbnail_url=thumbnail_url,
-        )
\ No newline at end of file
+        )
+
+
+class InitiateMultipartUploadRequest(BaseModel):
+    size_bytes: int                 # Exact size of the video file to be uploaded
+
+
+class UploadPartUrl(BaseModel):
+    part_number: int
+    url: str
+
+
+class MultipartUploadResponse(BaseModel):
+    analysis_id: UUID
+    upload_id: str
+    part_size: int                  # Bytes; every part but the last is exactly this size
+    part_urls: list[UploadPartUrl]
+    expires_in: int
+
+    @classmethod
+    def from_domain(cls, dto) -> "MultipartUploadResponse":
+        return cls(
+            analysis_id=dto.analysis_id,
+            upload_id=dto.upload_id,
+            part_size=dto.part_size,
+            part_urls=[UploadPartUrl(part_number=p.part_number, url=p.url) for p in dto.part_urls],
+            expires_in=dto.expires_in,
+        )
+
+
+class SignUploadPartsRequest(BaseModel):
+    part_numbers: list[int]
+
+
+class CompletedUploadPart(BaseModel):
+    part_number: int
+    etag: str                       # The ETag header R2 returned for the part's PUT
+
+
+class CompleteMultipartUploadRequest(BaseModel):
+    parts: list[CompletedUploadPart]
+
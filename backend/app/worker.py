@@ -0,0 +1,39 @@
+"""
+Analysis worker: runs queued analyses outside the API process.
+
+PATCH /api/v1/analyses/{id}/ only enqueues the analysis and returns 202; this
+process claims the job and does the slow part (R2 download, trim, re-upload,
+model call, thumbnail). Run as many as you like, on as many hosts as you like —
+they coordinate through the `analysis_jobs` table only.
+
+Run standalone from the backend/ directory:
+
+    python -m app.worker
+
+SIGTERM / SIGINT finish the job in hand, then exit. Tuning knobs
+(ANALYSIS_JOB_*) live in core/config.py.
+"""
+import signal
+
+
+def _main() -> None:
+    from dotenv import load_dotenv
+
+    load_dotenv()
+    from core.services.analysis_worker import AnalysisWorker
+
+    worker = AnalysisWorker()
+
+    def _shutdown(signum, frame):
+        print(f"Analysis worker {worker.worker_id} stopping after current job")
+        worker.stop()
+
+    signal.signal(signal.SIGTERM, _shutdown)
+    signal.signal(signal.SIGINT, _shutdown)
+
+    print(f"Analysis worker {worker.worker_id} started")
+    worker.run_forever()
+
+
+if __name__ == "__main__":
+    _main()
@@ -13,9 +13,129 @@ R2_SECRET_KEY = os.environ["CLOUDFLARE_R2_SECRET_ACCESS_KEY"]
 
 R2_BUCKET = "trueswing-videos"
 
+# Videos are moved between R2 and local disk with boto3's managed transfer, which
+# streams them in chunks (multipart above the threshold) instead of holding whole
+# files in memory. Peak memory per transfer is roughly CHUNK_MB * CONCURRENCY.
+R2_TRANSFER_MULTIPART_THRESHOLD_MB = int(os.getenv("R2_TRANSFER_MULTIPART_THRESHOLD_MB", "16"))
+R2_TRANSFER_CHUNK_MB = int(os.getenv("R2_TRANSFER_CHUNK_MB", "8"))
+R2_TRANSFER_CONCURRENCY = int(os.getenv("R2_TRANSFER_CONCURRENCY", "4"))
+
+# The async R2 interface (async endpoints, bulk operations such as deleting a
+# user's media) runs calls on ASYNC_WORKERS threads per process over the one boto3
+# client, whose pool holds MAX_POOL_CONNECTIONS connections: keep it at least
+# ASYNC_WORKERS plus a couple of transfers' CONCURRENCY, or calls queue for a
+# connection (botocore's default is 10).
+R2_ASYNC_WORKERS = int(os.getenv("R2_ASYNC_WORKERS", "16"))
+R2_MAX_POOL_CONNECTIONS = int(os.getenv("R2_MAX_POOL_CONNECTIONS", "32"))
+
+# Downloaded objects (videos) are kept in a local-disk LRU cache shared by every
+# process on the machine, keyed by key + ETag, so retries, re-analyses and
+# backfills read local disk instead of R2. Deleting a user evicts their videos,
+# so the API and the workers must share MEDIA_CACHE_DIR. MEDIA_CACHE_MAX_MB=0
+# turns it off.
+MEDIA_CACHE_DIR = os.getenv("MEDIA_CACHE_DIR", "cache/media")
+MEDIA_CACHE_MAX_MB = int(os.getenv("MEDIA_CACHE_MAX_MB", "4096"))
+
+# Direct upload (PUT /analyses/{id}/video/): instead of PUTting to a presigned R2
+# URL, the client streams the video to the API, which writes it to local scratch
+# and R2 at once and queues the analysis as soon as the body ends. A worker that
+# shares SCRATCH_DIR (same host, shared volume) takes the scratch copy over
+# instead of downloading from R2. Scratch copies no worker took over are removed
+# after SCRATCH_TTL_SECONDS. Chosen per analysis (upload_mode="direct");
+# presigned stays the default. The upload URL handed to clients is built on
+# PUBLIC_API_BASE_URL (the API sits behind a TLS-terminating proxy, so the
+# request's own scheme is http).
+DIRECT_UPLOAD_MAX_MB = int(os.getenv("DIRECT_UPLOAD_MAX_MB", "512"))
+DIRECT_UPLOAD_SCRATCH_DIR = os.getenv("DIRECT_UPLOAD_SCRATCH_DIR", "uploads/direct")
+DIRECT_UPLOAD_SCRATCH_TTL_SECONDS = int(os.getenv("DIRECT_UPLOAD_SCRATCH_TTL_SECONDS", "3600"))
+PUBLIC_API_BASE_URL = os.getenv("PUBLIC_API_BASE_URL", "https://api.trueswing.se")
+
+# Multipart upload (POST /analyses/{id}/multipart/): the client PUTs the video to
+# R2 in PART_MB parts, in parallel, each to its own presigned URL valid for
+# URL_EXPIRY_SECONDS. Part size grows if needed to stay within R2's 10,000 parts.
+MULTIPART_UPLOAD_PART_MB = int(os.getenv("MULTIPART_UPLOAD_PART_MB", "8"))
+MULTIPART_UPLOAD_URL_EXPIRY_SECONDS = int(os.getenv("MULTIPART_UPLOAD_URL_EXPIRY_SECONDS", "3600"))
+MULTIPART_UPLOAD_MAX_MB = int(os.getenv("MULTIPART_UPLOAD_MAX_MB", "2048"))
+
+# Read URLs (thumbnails, video playback) are valid for EXPIRY_SECONDS. Each process
+# hands out the same URL for a key until it is CACHE_TTL_SECONDS old, so it always
+# has at least EXPIRY - TTL seconds left; misses are signed in one batch per call.
+R2_READ_URL_EXPIRY_SECONDS = int(os.getenv("R2_READ_URL_EXPIRY_SECONDS", "3600"))
+R2_READ_URL_CACHE_TTL_SECONDS = int(os.getenv("R2_READ_URL_CACHE_TTL_SECONDS", "2700"))
+R2_READ_URL_CACHE_MAX_ENTRIES = int(os.getenv("R2_READ_URL_CACHE_MAX_ENTRIES", "50000"))
+
+# Thumbnails are immutable, content-addressed objects (thumbnails/{video_id}/{sha256}.jpg)
+# stored with IMMUTABLE_CACHE_CONTROL. Their URLs are signed as of the start of a
+# WINDOW_SECONDS window, so every API process hands out the identical URL for the
+# whole window and client HTTP caches hit; they stay valid EXPIRY - WINDOW seconds
+# at least (SigV4 allows 7 days at most).
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+THUMBNAIL_URL_EXPIRY_SECONDS = int(os.getenv("THUMBNAIL_URL_EXPIRY_SECONDS", str(7 * 24 * 3600)))
+THUMBNAIL_URL_WINDOW_SECONDS = int(os.getenv("THUMBNAIL_URL_WINDOW_SECONDS", str(24 * 3600)))
+
 FFMPEG_DEFAULT_TIMESTAMP = 1.5
 THUMBNAIL_BASE_PREFIX = "golf-thumbnails"
 THUMBNAIL_FILENAME = "thumbnail.jpg"
+# The thumbnail upload runs on this many background threads (per process) while
+# the model call is in flight, instead of before it.
+THUMBNAIL_UPLOAD_WORKERS = int(os.getenv("THUMBNAIL_UPLOAD_WORKERS", "4"))
+
+# The model gets a proxy rendition, not the archive copy: long edge capped at
+# MAX_SIDE px, fps capped at MAX_FPS, no audio, x264 at CRF. Produced in the same
+# ffmpeg pass as the trim and thumbnail. MAX_SIDE=0 sends the archive copy itself.
+ANALYSIS_PROXY_MAX_SIDE = int(os.getenv("ANALYSIS_PROXY_MAX_SIDE", "720"))
+ANALYSIS_PROXY_MAX_FPS = float(os.getenv("ANALYSIS_PROXY_MAX_FPS", "30"))
+ANALYSIS_PROXY_CRF = int(os.getenv("ANALYSIS_PROXY_CRF", "28"))
+
+# Trimming: "auto" stream-copies (-c copy, no encode) when the requested start is
+# within KEYFRAME_TOLERANCE of a keyframe and re-encodes otherwise; "copy" and
+# "reencode" force a mode. The profile picks x264 settings for re-encodes
+# (balanced / fast / compact, see MediaPipeline.ENCODER_PROFILES).
+VIDEO_TRIM_MODE = os.getenv("VIDEO_TRIM_MODE", "auto")
+VIDEO_ENCODER_PROFILE = os.getenv("VIDEO_ENCODER_PROFILE", "balanced")
+VIDEO_TRIM_KEYFRAME_TOLERANCE_SECONDS = float(os.getenv("VIDEO_TRIM_KEYFRAME_TOLERANCE_SECONDS", "0.1"))
+
+# Swing localization: before trimming, a 160px grayscale decode of the requested
+# window is scanned for the burst of motion that is the swing, and the trim is
+# tightened to it plus PAD_BEFORE / PAD_AFTER seconds, so setup and walk-away are
+# not sent to the model. Skipped for windows over MAX_SECONDS, and the tighter
+# window is only used when it saves at least MIN_SAVING_SECONDS. Analyses can opt
+# out (auto_trim=false); SWING_LOCALIZER_ENABLED=FALSE turns it off everywhere.
+SWING_LOCALIZER_ENABLED = os.getenv("SWING_LOCALIZER_ENABLED", "TRUE") == "TRUE"
+SWING_LOCALIZER_MAX_SECONDS = float(os.getenv("SWING_LOCALIZER_MAX_SECONDS", "60"))
+SWING_LOCALIZER_MIN_SAVING_SECONDS = float(os.getenv("SWING_LOCALIZER_MIN_SAVING_SECONDS", "0.5"))
+SWING_LOCALIZER_PAD_BEFORE_SECONDS = float(os.getenv("SWING_LOCALIZER_PAD_BEFORE_SECONDS", "1.0"))
+SWING_LOCALIZER_PAD_AFTER_SECONDS = float(os.getenv("SWING_LOCALIZER_PAD_AFTER_SECONDS", "0.75"))
+
+# Pre-flight quality gate, run on the processed clip before it is sent to the
+# model: duration and resolution from the probe, blur (median Laplacian variance)
+# and exposure (median mean luma, 0-255) from SAMPLE_FRAMES frames scored at
+# SAMPLE_WIDTH px. A clip that fails is rejected with the reasons instead of
+# paying for inference. PREFLIGHT_ENABLED=FALSE turns it off.
+PREFLIGHT_ENABLED = os.getenv("PREFLIGHT_ENABLED", "TRUE") == "TRUE"
+PREFLIGHT_MIN_DURATION_SECONDS = float(os.getenv("PREFLIGHT_MIN_DURATION_SECONDS", "1.0"))
+PREFLIGHT_MAX_DURATION_SECONDS = float(os.getenv("PREFLIGHT_MAX_DURATION_SECONDS", "60"))
+PREFLIGHT_MIN_SIDE = int(os.getenv("PREFLIGHT_MIN_SIDE", "300"))
+PREFLIGHT_MIN_SHARPNESS = float(os.getenv("PREFLIGHT_MIN_SHARPNESS", "20"))
+PREFLIGHT_MIN_BRIGHTNESS = float(os.getenv("PREFLIGHT_MIN_BRIGHTNESS", "30"))
+PREFLIGHT_MAX_BRIGHTNESS = float(os.getenv("PREFLIGHT_MAX_BRIGHTNESS", "230"))
+PREFLIGHT_SAMPLE_FRAMES = int(os.getenv("PREFLIGHT_SAMPLE_FRAMES", "8"))
+PREFLIGHT_SAMPLE_WIDTH = int(os.getenv("PREFLIGHT_SAMPLE_WIDTH", "320"))
+
+# Decoded frames (quality checks, keyframes, face blur) are held in memory in
+# one ring buffer per clip, capped at this size; frames past the cap evict the
+# oldest ones rather than growing the buffer.
+FRAME_BUFFER_MAX_MB = int(os.getenv("FRAME_BUFFER_MAX_MB", "256"))
+
+# Faces are pixelated in the clip sent to the model provider (our own archive
+# copy in R2 is left as uploaded). The detector runs on every
+# DETECT_EVERY_N_FRAMES-th frame at DETECT_WIDTH px, with boxes interpolated in
+# between; PIXEL_SIZE is the block edge in px. FACE_ANONYMIZE_ENABLED=FALSE
+# sends the clip as is.
+FACE_ANONYMIZE_ENABLED = os.getenv("FACE_ANONYMIZE_ENABLED", "TRUE") == "TRUE"
+FACE_ANONYMIZE_DETECT_EVERY_N_FRAMES = int(os.getenv("FACE_ANONYMIZE_DETECT_EVERY_N_FRAMES", "5"))
+FACE_ANONYMIZE_DETECT_WIDTH = int(os.getenv("FACE_ANONYMIZE_DETECT_WIDTH", "480"))
+FACE_ANONYMIZE_PIXEL_SIZE = int(os.getenv("FACE_ANONYMIZE_PIXEL_SIZE", "16"))
 
 
 # AI CONFIGURATION
@@ -26,6 +146,70 @@ GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
 # never directly, so a future admin-board / DB-backed selector is a one-function swap.
 ANALYSIS_MODEL = os.getenv("ANALYSIS_MODEL", "gemini-3.1-pro-preview")
 
+# Models to fall back to, in order, when the analysis model is failing (comma
+# separated). The model an analysis was created with is always tried first.
+ANALYSIS_FALLBACK_MODELS = [
+    m.strip() for m in os.getenv("ANALYSIS_FALLBACK_MODELS", "gemini-2.5-pro").split(",") if m.strip()
+]
+
+# Guard rails around every analysis model call (see AI/resilience.py). All are
+# per process: with N workers the provider sees up to N times these limits.
+# RATE_LIMIT is a token bucket (calls per second, BURST calls at once), MAX_IN_FLIGHT
+# caps concurrent calls, and DEADLINE bounds a call including waits and fallbacks.
+# A model's circuit opens when at least BREAKER_MIN_CALLS of its last
+# BREAKER_WINDOW calls ran and BREAKER_ERROR_RATE of them failed; after
+# BREAKER_COOLDOWN seconds one probe call decides whether it closes again.
+AI_RATE_LIMIT_PER_SECOND = float(os.getenv("AI_RATE_LIMIT_PER_SECOND", "2"))
+AI_RATE_LIMIT_BURST = int(os.getenv("AI_RATE_LIMIT_BURST", "5"))
+AI_MAX_IN_FLIGHT = int(os.getenv("AI_MAX_IN_FLIGHT", "8"))
+AI_CALL_DEADLINE_SECONDS = float(os.getenv("AI_CALL_DEADLINE_SECONDS", "240"))
+AI_BREAKER_WINDOW = int(os.getenv("AI_BREAKER_WINDOW", "20"))
+AI_BREAKER_MIN_CALLS = int(os.getenv("AI_BREAKER_MIN_CALLS", "5"))
+AI_BREAKER_ERROR_RATE = float(os.getenv("AI_BREAKER_ERROR_RATE", "0.5"))
+AI_BREAKER_COOLDOWN_SECONDS = float(os.getenv("AI_BREAKER_COOLDOWN_SECONDS", "30"))
+
+# HTTP connection pool of the shared Gemini client (see AI/selector.py): one
+# client per process, its keep-alive connections reused across analyses.
+AI_HTTP_MAX_CONNECTIONS = int(os.getenv("AI_HTTP_MAX_CONNECTIONS", "20"))
+AI_HTTP_MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("AI_HTTP_MAX_KEEPALIVE_CONNECTIONS", "10"))
+AI_HTTP_KEEPALIVE_EXPIRY_SECONDS = float(os.getenv("AI_HTTP_KEEPALIVE_EXPIRY_SECONDS", "90"))
+
+# Lifetime of the Gemini cached content holding the analysis system instruction
+# + issue catalog (one per model and catalog version). 0 = always send inline.
+GEMINI_CONTEXT_CACHE_TTL_SECONDS = int(os.getenv("GEMINI_CONTEXT_CACHE_TTL_SECONDS", "3600"))
+
+# Clips up to INLINE_VIDEO_MAX_MB go to Gemini as inline bytes inside the request
+# (Gemini caps a whole request at 20 MB and inline bytes travel base64-encoded,
+# a third larger, next to the prompt); larger ones go through the Files
+# API, which is polled with exponential backoff from POLL_INITIAL up to POLL_MAX
+# seconds between checks until the file is ACTIVE or POLL_TIMEOUT passes.
+GEMINI_INLINE_VIDEO_MAX_MB = float(os.getenv("GEMINI_INLINE_VIDEO_MAX_MB", "12"))
+GEMINI_FILE_POLL_INITIAL_SECONDS = float(os.getenv("GEMINI_FILE_POLL_INITIAL_SECONDS", "0.1"))
+GEMINI_FILE_POLL_MAX_SECONDS = float(os.getenv("GEMINI_FILE_POLL_MAX_SECONDS", "3.0"))
+GEMINI_FILE_POLL_TIMEOUT_SECONDS = float(os.getenv("GEMINI_FILE_POLL_TIMEOUT_SECONDS", "300"))
+
+# Narrow the issue catalog sent with each analysis to issues whose miss/goal tags
+# match the user's reported miss and wanted shape (falls back to the full catalog
+# when the prompt gives too little to go on, or fewer than MIN issues match).
+ANALYSIS_CANDIDATE_PREFILTER = os.getenv("ANALYSIS_CANDIDATE_PREFILTER", "TRUE") == "TRUE"
+ANALYSIS_CANDIDATE_MIN = int(os.getenv("ANALYSIS_CANDIDATE_MIN", "8"))
+
+# Reuse a stored model result when the same clip comes back with the same prompt
+# fields, model and issue catalog (see core/services/analysis_result_cache.py).
+# Entries expire after TTL seconds; 0 turns the cache off.
+ANALYSIS_RESULT_CACHE_TTL_SECONDS = int(os.getenv("ANALYSIS_RESULT_CACHE_TTL_SECONDS", str(7 * 24 * 3600)))
+
+# ANALYSIS JOB QUEUE
+# PATCH /analyses/{id}/ only enqueues; `python -m app.worker` does the work.
+# A worker holds a lease on the job it is running and renews it every heartbeat;
+# a job whose lease runs out (worker crashed / was killed) is reclaimed by
+# another worker. Failed attempts are retried with backoff up to MAX_ATTEMPTS.
+ANALYSIS_JOB_MAX_ATTEMPTS = int(os.getenv("ANALYSIS_JOB_MAX_ATTEMPTS", "3"))
+ANALYSIS_JOB_LEASE_SECONDS = int(os.getenv("ANALYSIS_JOB_LEASE_SECONDS", "120"))
+ANALYSIS_JOB_HEARTBEAT_SECONDS = int(os.getenv("ANALYSIS_JOB_HEARTBEAT_SECONDS", "30"))
+ANALYSIS_JOB_POLL_SECONDS = float(os.getenv("ANALYSIS_JOB_POLL_SECONDS", "1.0"))
+ANALYSIS_JOB_RETRY_BASE_SECONDS = int(os.getenv("ANALYSIS_JOB_RETRY_BASE_SECONDS", "10"))
+
 # DATABASE CONFIGURATION
 
 
@@ -0,0 +1,12 @@
+class ProviderError(Exception):
+    """Base class for failures talking to an AI provider."""
+
+
+class TransientProviderError(ProviderError):
+    """The provider failed in a way another attempt (or another model) may not:
+    timeout, connection error, rate limited, 5xx. Counts against the circuit breaker."""
+
+
+class ProviderUnavailableError(ProviderError):
+    """No model could take the call: every circuit is open, the deadline ran out
+    waiting for capacity, or every model in the fallback chain failed."""
@@ -1,18 +1,36 @@
 import os
+import threading
 from typing import Optional
+import httpx
 from dotenv import load_dotenv
 from google import genai
+from google.genai import types
+from google.genai import errors as genai_errors
 
 from ..ports import AnalysisAI
+from ..exceptions import TransientProviderError
 from . import videoAnalyzer
 from . import feedbackStructurer
 from uuid import UUID
+from core.config import (
+    AI_HTTP_MAX_CONNECTIONS,
+    AI_HTTP_MAX_KEEPALIVE_CONNECTIONS,
+    AI_HTTP_KEEPALIVE_EXPIRY_SECONDS,
+)
 
 
 
 
+# HTTP statuses worth retrying, possibly on another model
+_TRANSIENT_STATUS_CODES = {408, 429, 500, 502, 503, 504}
+
+
 class GoogleAnalysisClient(AnalysisAI):
-    """Google Gemini-based video analysis client."""
+    """Google Gemini-based video analysis client.
+
+    Build it through AI.selector.get_provider("google"): one instance per process,
+    whose httpx connection pool keeps connections to Gemini alive between calls.
+    """
     
     def __init__(self):
         """Initialize the Gemini client with API key from environment."""
@@ -21,8 +39,45 @@ class GoogleAnalysisClient(AnalysisAI):
         
         if not api_key:
             raise EnvironmentError("GEMINI_API_KEY environment variable not set.")
-        
-        self.client = genai.Client(api_key=api_key)
+
+        self._requests = 0
+        self._requests_lock = threading.Lock()
+        self.client = genai.Client(
+            api_key=api_key,
+            http_options=types.HttpOptions(
+                client_args={
+                    "limits": httpx.Limits(
+                        max_connections=AI_HTTP_MAX_CONNECTIONS,
+                        max_keepalive_connections=AI_HTTP_MAX_KEEPALIVE_CONNECTIONS,
+                        keepalive_expiry=AI_HTTP_KEEPALIVE_EXPIRY_SECONDS,
+                    ),
+                    "event_hooks": {"request": [self._count_request]},
+                },
+            ),
+        )
+
+    def _count_request(self, request: httpx.Request) -> None:
+        with self._requests_lock:
+            self._requests += 1
+
+    def pool_stats(self) -> dict:
+        """Requests sent through this client and the state of its connection pool."""
+        stats = {
+            "requests": self._requests,
+            "max_connections": AI_HTTP_MAX_CONNECTIONS,
+            "max_keepalive_connections": AI_HTTP_MAX_KEEPALIVE_CONNECTIONS,
+        }
+        # httpx doesn't expose its pool publicly; report it when the internals are where we expect
+        http_client = getattr(getattr(self.client, "_api_client", None), "_httpx_client", None)
+        pool = getattr(getattr(http_client, "_transport", None), "_pool", None)
+        connections = getattr(pool, "connections", None)
+        if connections is not None:
+            stats["open_connections"] = len(connections)
+            stats["idle_connections"] = sum(1 for c in connections if c.is_idle())
+        return stats
+
+    def close(self) -> None:
+        self.client.close()
     
     def analyze_video(
         self,
@@ -33,7 +88,11 @@ class GoogleAnalysisClient(AnalysisAI):
         misses: Optional[str] = None,
         extra: Optional[str] = None,
         model: str = None,
-        db_session: Optional[object] = None
+        db_session: Optional[object] = None,
+        issue_list: Optional[list[dict]] = None,
+        issues_block: Optional[str] = None,
+        catalog_version: Optional[int] = None,
+        timeout_seconds: Optional[float] = None,
     ) -> dict:
         """
         Analyze a golf swing video.
@@ -46,21 +105,38 @@ class GoogleAnalysisClient(AnalysisAI):
             extra: Additional user notes (optional)
             model: Model identifier to run with. Required — there is no default;
                 callers resolve it via model_selection.get_active_analysis_model().
+            issue_list / issues_block / catalog_version: see videoAnalyzer.analyze_video
+            timeout_seconds: Time budget for the Gemini requests of this call.
 
         Returns:
             dict: Analysis results
+
+        Raises:
+            TransientProviderError: Timeout, connection failure, rate limiting or
+                a server error — worth another attempt or another model.
         """
-        return videoAnalyzer.analyze_video(
-            client=self.client,
-            video_path=video_path,
-            user_id=user_id,
-            shape=shape,
-            height=height,
-            misses=misses,
-            extra=extra,
-            model=model,
-            db_session=db_session
-        )
+        try:
+            return videoAnalyzer.analyze_video(
+                client=self.client,
+                video_path=video_path,
+                user_id=user_id,
+                shape=shape,
+                height=height,
+                misses=misses,
+                extra=extra,
+                model=model,
+                db_session=db_session,
+                issue_list=issue_list,
+                issues_block=issues_block,
+                catalog_version=catalog_version,
+                timeout_seconds=timeout_seconds,
+            )
+        except (httpx.TimeoutException, httpx.TransportError, TimeoutError) as e:
+            raise TransientProviderError(f"Gemini request failed: {e}") from e
+        except genai_errors.APIError as e:
+            if e.code in _TRANSIENT_STATUS_CODES:
+                raise TransientProviderError(f"Gemini returned {e.code}: {e.message}") from e
+            raise
 
     def structure_coach_feedback(
         self,
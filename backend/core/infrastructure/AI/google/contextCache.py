@@ -0,0 +1,122 @@
+"""Gemini context caching for the analysis prompt's fixed prefix.
+
+The system instruction and the issue catalog are identical for every analysis
+until an issue changes, so they are registered once per (model, catalog
+version) as cached content. Each request then sends only the per-user notes
+and the video, and references the cache by name.
+
+Handles are kept in-process and refreshed shortly before their TTL runs out.
+If a cache cannot be created (feature unavailable for the model, prefix below
+the provider's minimum size, quota...), callers get None and send the prompt
+inline as before.
+"""
+
+import threading
+import time
+from concurrent.futures import Future
+
+from google import genai
+from google.genai import types
+
+from .prompts import VIDEO_SYSTEM_INSTRUCTIONS2, format_issue_catalog
+
+# Don't hand out a handle this close to expiry — the request could outlive it.
+_EXPIRY_MARGIN_SECONDS = 60
+# After a failed create, send the prompt inline for this long before trying again
+_FAILURE_BACKOFF_SECONDS = 300
+
+_caches: dict[tuple[str, int], tuple[str, float]] = {}   # (model, catalog_version) -> (name, expires_at)
+_creating: dict[tuple[str, int], Future] = {}              # Creates in flight; the result is the name or None
+_failed_until: dict[tuple[str, int], float] = {}
+_lock = threading.Lock()
+
+
+def get_catalog_cache(
+    client: genai.Client,
+    model: str,
+    catalog_version: int,
+    issues_block: str,
+    ttl_seconds: int,
+) -> str | None:
+    """Name of a live cached content holding instructions + catalog, or None.
+
+    The create call runs outside the lock: one caller per (model, version)
+    makes it and concurrent callers for that key wait for its result, while
+    lookups for other keys go ahead. A failure is remembered for
+    _FAILURE_BACKOFF_SECONDS so a provider that refuses the cache is not asked
+    again on every analysis.
+    """
+    key = (model, catalog_version)
+
+    with _lock:
+        now = time.monotonic()
+        cached = _caches.get(key)
+        if cached and cached[1] - _EXPIRY_MARGIN_SECONDS > now:
+            return cached[0]
+        if _failed_until.get(key, 0.0) > now:
+            return None
+        creating = _creating.get(key)
+        if creating is None:
+            creating = _creating[key] = Future()
+            owner = True
+        else:
+            owner = False
+
+    if not owner:
+        return creating.result()
+
+    name = None
+    try:
+        name = _create(client, model, catalog_version, issues_block, ttl_seconds)
+    finally:
+        with _lock:
+            del _creating[key]
+            stale = []
+            if name is None:
+                _failed_until[key] = time.monotonic() + _FAILURE_BACKOFF_SECONDS
+            else:
+                _failed_until.pop(key, None)
+                # Older catalog versions for this model are dead weight now
+                stale = [_caches.pop(k)[0] for k in list(_caches) if k[0] == model and k[1] != catalog_version]
+                _caches[key] = (name, now + ttl_seconds)
+        creating.set_result(name)
+
+    for stale_name in stale:
+        _delete_quietly(client, stale_name)
+    return name
+
+
+def invalidate_catalog_cache(model: str, catalog_version: int) -> None:
+    """Forget a handle, e.g. after the provider rejected it; the next call recreates it."""
+    with _lock:
+        _caches.pop((model, catalog_version), None)
+
+
+def _create(client: genai.Client, model: str, catalog_version: int, issues_block: str, ttl_seconds: int) -> str | None:
+    try:
+        cache = client.caches.create(
+            model=model,
+            config=types.CreateCachedContentConfig(
+                display_name=f"issue-catalog-v{catalog_version}",
+                system_instruction=VIDEO_SYSTEM_INSTRUCTIONS2,
+                contents=[
+                    types.Content(
+                        role="user",
+                        parts=[types.Part(text=format_issue_catalog(issues_block))],
+                    )
+                ],
+                ttl=f"{ttl_seconds}s",
+            ),
+        )
+    except Exception as e:
+        print(f"Warning: Could not create Gemini context cache for {model}: {str(e)}")
+        return None
+    print(f"Created Gemini context cache {cache.name} (catalog v{catalog_version}, {model})")
+    return cache.name
+
+
+def _delete_quietly(client: genai.Client, name: str) -> None:
+    try:
+        client.caches.delete(name=name)
+    except Exception as e:
+        print(f"Warning: Failed to delete Gemini context cache {name}: {str(e)}")
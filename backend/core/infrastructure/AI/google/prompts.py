@@ -70,18 +70,48 @@ Failure to follow any rule is an error.
 
 import json
 
+
+def serialize_issue_catalog(issue_list: list[dict] | None) -> str:
+    """The issue list as compact JSON — the form it takes in the prompt."""
+    return json.dumps(issue_list or [], separators=(",", ":"), ensure_ascii=False)
+
+
+def format_issue_catalog(issues_block: str) -> str:
+    return f"""
+        --------------------------------
+        ALLOWED SWING ISSUES (STRICT LIST)
+        --------------------------------
+        You may ONLY select issues from the list below.
+        Do NOT invent, rename, or merge issues.
+
+        {issues_block}
+    """
+
+
 def format_content(
     shape: str = None,
     height: str = None,
     misses: str = None,
     extra: str = None,
-    issue_list: list[dict] = None
+    issue_list: list[dict] = None,
+    issues_block: str = None,
+    catalog_in_context: bool = False,
 ) -> str:
-    issues_block = (
-        json.dumps(issue_list, indent=2)
-        if issue_list
-        else "[]"
-    )
+    """
+    The per-request prompt. The issue catalog is included inline (issues_block,
+    or issue_list serialized here) unless `catalog_in_context` — it was already
+    given to the model through cached content, and is only referred to.
+    """
+    if catalog_in_context:
+        catalog_section = """
+        The ALLOWED SWING ISSUES (STRICT LIST) were provided above.
+        You may ONLY select issues from that list.
+        Do NOT invent, rename, or merge issues.
+    """
+    else:
+        catalog_section = format_issue_catalog(
+            issues_block if issues_block is not None else serialize_issue_catalog(issue_list)
+        )
 
     final_prompt = f"""
         Here are the user’s personal notes about their swing.
@@ -97,15 +127,7 @@ def format_content(
 
         Extra notes:
         {extra or "None"}
-
-        --------------------------------
-        ALLOWED SWING ISSUES (STRICT LIST)
-        --------------------------------
-        You may ONLY select issues from the list below.
-        Do NOT invent, rename, or merge issues.
-
-        {issues_block}
-
+        {catalog_section}
         Use this list to:
         - Select applicable swing issues
         - Rank them by importance
@@ -114,4 +136,3 @@ def format_content(
         Do not prioritize user assumptions over video evidence.
     """
     return final_prompt
-
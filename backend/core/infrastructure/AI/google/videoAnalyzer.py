@@ -1,4 +1,7 @@
 import json
+import mimetypes
+import os
+import threading
 import time
 from typing import Optional
 from google import genai
@@ -6,8 +9,17 @@ from google.genai import types
 from pydantic import BaseModel, Field
 from uuid import UUID
 
-from .prompts import VIDEO_SYSTEM_INSTRUCTIONS2, format_content
+from .prompts import VIDEO_SYSTEM_INSTRUCTIONS2, format_content, serialize_issue_catalog
+from .contextCache import get_catalog_cache, invalidate_catalog_cache
+from core.config import (
+    GEMINI_CONTEXT_CACHE_TTL_SECONDS,
+    GEMINI_INLINE_VIDEO_MAX_MB,
+    GEMINI_FILE_POLL_INITIAL_SECONDS,
+    GEMINI_FILE_POLL_MAX_SECONDS,
+    GEMINI_FILE_POLL_TIMEOUT_SECONDS,
+)
 
+from core.infrastructure import telemetry
 from core.infrastructure.db.repositories import issues as issue_repo
 from core.infrastructure.db import models
 
@@ -21,52 +33,132 @@ class AnalysisResponse(BaseModel):
     success: bool = Field(..., description="Indicates if the analysis was successful")
 
 
-def _upload_and_wait(client: genai.Client, video_path: str) -> types.File:
-    """Upload video to Gemini and wait for processing to complete."""
+def build_issue_catalog(issues: list[models.Issue]) -> list[dict]:
+    """The issue list as the model sees it in the prompt."""
+    return [ {
+        "issue_id": str(issue.id), 
+        "name": issue.title, 
+        "current motion that causes the issue": issue.current_motion, 
+        "desired motion that fixes the issue": issue.expected_motion,
+        "description of the issue": issue.description
+    } for issue in issues ] if issues else []
+
+
+# How the video reached the model: "inline" bytes in the request, or "files_api"
+VIDEO_TRANSFER_PATHS = ("inline", "files_api")
+
+_MB = 1024 * 1024
+
+_transfer_stats = {path: {"count": 0, "bytes": 0, "prepare_seconds": 0.0, "generate_seconds": 0.0} for path in VIDEO_TRANSFER_PATHS}
+_transfer_stats_lock = threading.Lock()
+
+
+def choose_video_transfer(video_bytes: int, inline_max_bytes: float = GEMINI_INLINE_VIDEO_MAX_MB * _MB) -> str:
+    """Inline for clips up to the threshold, the Files API above it."""
+    return "inline" if video_bytes <= inline_max_bytes else "files_api"
+
+
+def _inline_video_part(video_path: str) -> dict:
+    """The clip as an inline data part: no upload, no polling, nothing to delete."""
+    mime_type = mimetypes.guess_type(video_path)[0] or "video/mp4"
+    with open(video_path, "rb") as f:
+        return {"inlineData": {"mimeType": mime_type, "data": f.read()}}
+
+
+def _upload_and_wait(
+    client: genai.Client,
+    video_path: str,
+    poll_initial_seconds: float = GEMINI_FILE_POLL_INITIAL_SECONDS,
+    poll_max_seconds: float = GEMINI_FILE_POLL_MAX_SECONDS,
+    timeout_seconds: float = GEMINI_FILE_POLL_TIMEOUT_SECONDS,
+) -> types.File:
+    """Upload video to Gemini and wait for processing to complete.
+
+    Polls with exponential backoff: short clips are usually ACTIVE within the
+    first few checks, long ones don't get hammered.
+    """
     print(f"Uploading video: {video_path}")
-    video_file = client.files.upload(file=video_path)
-    
-    # Poll until file is ACTIVE
-    while True:
-        file_status = client.files.get(name=video_file.name)
-        if file_status.state == "ACTIVE":
-            print(f"Video processing complete: {video_file.name}")
-            break
-        elif file_status.state == "FAILED":
-            raise Exception(f"Video processing failed: {file_status.error_message if hasattr(file_status, 'error_message') else 'Unknown error'}")
-        time.sleep(0.5)
-    
+    with telemetry.stage("provider_upload"):
+        video_file = client.files.upload(file=video_path)
+
+    delay = poll_initial_seconds
+    deadline = time.monotonic() + timeout_seconds
+    with telemetry.stage("provider_processing_wait"):
+        # Poll until file is ACTIVE
+        while True:
+            file_status = client.files.get(name=video_file.name)
+            if file_status.state == "ACTIVE":
+                print(f"Video processing complete: {video_file.name}")
+                break
+            elif file_status.state == "FAILED":
+                raise Exception(f"Video processing failed: {file_status.error_message if hasattr(file_status, 'error_message') else 'Unknown error'}")
+            if time.monotonic() + delay > deadline:
+                raise TimeoutError(f"Video processing did not finish within {timeout_seconds}s: {video_file.name}")
+            time.sleep(delay)
+            delay = min(delay * 2, poll_max_seconds)
+
     return video_file
 
 
-def _build_content_payload(video_file: types.File, user_prompt: str) -> list:
+def _build_content_payload(video_part: dict, user_prompt: str) -> list:
     """Build the content payload for the API request."""
     return [{
         "role": "user",
         "parts": [
             {"text": user_prompt},
-            {"fileData": {"fileUri": video_file.uri}}
+            video_part,
         ]
     }]
 
 
+def _record_transfer(path: str, video_bytes: int, prepare_seconds: float, generate_seconds: float) -> None:
+    with _transfer_stats_lock:
+        stats = _transfer_stats[path]
+        stats["count"] += 1
+        stats["bytes"] += video_bytes
+        stats["prepare_seconds"] += prepare_seconds
+        stats["generate_seconds"] += generate_seconds
+    print(
+        f"Gemini video transfer: path={path} bytes={video_bytes} "
+        f"prepare={prepare_seconds:.2f}s generate={generate_seconds:.2f}s"
+    )
+
+
+def get_video_transfer_stats() -> dict:
+    """Per transfer path in this process: calls, bytes and mean latency of getting
+    the video to the model (prepare) and of the generate call, for tuning
+    GEMINI_INLINE_VIDEO_MAX_MB."""
+    with _transfer_stats_lock:
+        snapshot = {path: dict(stats) for path, stats in _transfer_stats.items()}
+    for stats in snapshot.values():
+        count = stats["count"] or 1
+        stats["mean_prepare_seconds"] = stats["prepare_seconds"] / count
+        stats["mean_generate_seconds"] = stats["generate_seconds"] / count
+    return snapshot
+
+
 def _call_gemini_api(
     client: genai.Client,
     contents: list,
-    model: str
+    model: str,
+    cached_content: Optional[str] = None,
+    timeout_seconds: Optional[float] = None,
 ) -> types.GenerateContentResponse:
-    """Call Gemini API with the prepared content."""
-    print(f"Calling Gemini API with model: {model}")
+    """Call Gemini API with the prepared content. With `cached_content`, the system
+    instruction comes from the cache and must not be sent again."""
+    print(f"Calling Gemini API with model: {model}" + (f" (cached context {cached_content})" if cached_content else ""))
     
     response = client.models.generate_content(
         model=model,
         config=types.GenerateContentConfig(
-            system_instruction=[{"text": VIDEO_SYSTEM_INSTRUCTIONS2}],
+            system_instruction=None if cached_content else [{"text": VIDEO_SYSTEM_INSTRUCTIONS2}],
+            cached_content=cached_content,
             temperature=0.0,
             top_p=0.1,
             top_k=1,
             response_mime_type="application/json",
-            response_json_schema=AnalysisResponse.model_json_schema()
+            response_json_schema=AnalysisResponse.model_json_schema(),
+            http_options=types.HttpOptions(timeout=int(timeout_seconds * 1000)) if timeout_seconds else None,
         ),
         contents=contents
     )
@@ -102,7 +194,11 @@ def analyze_video(
     misses: Optional[str] = None,
     extra: Optional[str] = None,
     model: str = None,
-    db_session = None
+    db_session = None,
+    issue_list: Optional[list[dict]] = None,
+    issues_block: Optional[str] = None,
+    catalog_version: Optional[int] = None,
+    timeout_seconds: Optional[float] = None,
 ) -> dict:
     """
     Analyze a golf swing video using Google Gemini.
@@ -116,6 +212,18 @@ def analyze_video(
         extra: Additional user notes (optional)
         model: Model identifier to run with. Required — there is no default;
             callers resolve it via model_selection.get_active_analysis_model().
+        db_session: Session to read the issue catalog with, when issue_list is
+            not given.
+        issue_list: The issue catalog, already built with build_issue_catalog().
+            Pass it to keep this call (which waits on the upload and the model)
+            from touching the database at all.
+        issues_block: issue_list already serialized for the prompt (optional).
+        catalog_version: Version stamp of issue_list/issues_block. When given,
+            the system instruction + catalog are sent as Gemini cached content
+            (one per model and version) instead of inline on every request.
+        timeout_seconds: Budget for this call. Bounds the wait for an uploaded
+            file to become ACTIVE and the generate request, which gets whatever
+            is left of it.
 
     Returns:
         dict: Parsed analysis results
@@ -128,44 +236,97 @@ def analyze_video(
         raise ValueError("analyze_video requires an explicit model; none was provided")
 
     video_file = None
+    deadline = time.monotonic() + timeout_seconds if timeout_seconds else None
+    video_bytes = os.path.getsize(video_path)
+    transfer = choose_video_transfer(video_bytes)
 
     try:
-        # Upload video and wait for processing
-        video_file: types.File = _upload_and_wait(client, video_path)
-        
-        # Get list of all issues in database
-        if not db_session:
-            raise ValueError("Database session is required to retrieve issues")
-    
-        issues: list[models.Issue] = issue_repo.get_all_issues(session=db_session)
-        print(f"Retrieved {len(issues)} issues from database for user_id: {user_id}")
-        print(f"Issue names: {[str(issue.title) for issue in issues]}")
-        
-        issues = [ {
-            "issue_id": str(issue.id), 
-            "name": issue.title, 
-            "current motion that causes the issue": issue.current_motion, 
-            "desired motion that fixes the issue": issue.expected_motion,
-            "description of the issue": issue.description
-        } for issue in issues ] if issues else []
+        # Small clips ride inside the request; larger ones are uploaded and polled until ready
+        started = time.perf_counter()
+        if transfer == "inline":
+            with telemetry.stage("provider_upload"):
+                video_part = _inline_video_part(video_path)
+        else:
+            video_file: types.File = (
+                _upload_and_wait(client, video_path, timeout_seconds=min(timeout_seconds, GEMINI_FILE_POLL_TIMEOUT_SECONDS))
+                if timeout_seconds else _upload_and_wait(client, video_path)
+            )
+            video_part = {"fileData": {"fileUri": video_file.uri}}
+        prepare_seconds = time.perf_counter() - started
         
+        # Get list of all issues in database, unless the caller already did
+        if issue_list is not None:
+            issues = issue_list
+        else:
+            if not db_session:
+                raise ValueError("Database session is required to retrieve issues")
+
+            db_issues: list[models.Issue] = issue_repo.get_all_issues(session=db_session)
+            print(f"Retrieved {len(db_issues)} issues from database for user_id: {user_id}")
+            issues = build_issue_catalog(db_issues)
+
+        # Instructions + catalog as cached content when we know which catalog this is
+        cached_content = None
+        if catalog_version is not None and GEMINI_CONTEXT_CACHE_TTL_SECONDS > 0:
+            cached_content = get_catalog_cache(
+                client,
+                model=model,
+                catalog_version=catalog_version,
+                issues_block=issues_block if issues_block is not None else serialize_issue_catalog(issues),
+                ttl_seconds=GEMINI_CONTEXT_CACHE_TTL_SECONDS,
+            )
+
         # Format user prompt
-        user_prompt = format_content(shape=shape, height=height, misses=misses, extra=extra, issue_list=issues)
+        user_prompt = format_content(
+            shape=shape,
+            height=height,
+            misses=misses,
+            extra=extra,
+            issue_list=issues,
+            issues_block=issues_block,
+            catalog_in_context=cached_content is not None,
+        )
         
         # Build content payload
-        contents = _build_content_payload(video_file, user_prompt)
+        contents = _build_content_payload(video_part, user_prompt)
         
         # Call Gemini API
-        response = _call_gemini_api(client, contents, model)
+        try:
+            generate_started = time.perf_counter()
+            with telemetry.stage("generate_content"):
+                response = _call_gemini_api(
+                    client,
+                    contents,
+                    model,
+                    cached_content=cached_content,
+                    timeout_seconds=max(1.0, deadline - time.monotonic()) if deadline else None,
+                )
+            _record_transfer(transfer, video_bytes, prepare_seconds, time.perf_counter() - generate_started)
+        except Exception:
+            if cached_content:
+                # It may be the cache that was rejected (expired or deleted early); start fresh next attempt
+                invalidate_catalog_cache(model, catalog_version)
+            raise
         print(f"Received response from Gemini API: {response.text[:500]}")  # Log first 500 chars of response
+        usage = getattr(response, "usage_metadata", None)
+        if usage is not None:
+            print(
+                f"Gemini usage: prompt_tokens={usage.prompt_token_count} "
+                f"cached_tokens={usage.cached_content_token_count} "
+                f"issues_in_prompt={len(issues)}"
+            )
+            telemetry.record("input_tokens", usage.prompt_token_count)
+            telemetry.record("output_tokens", usage.candidates_token_count)
+            telemetry.record("cached_tokens", usage.cached_content_token_count)
         
         # Parse response
-        result = _parse_response(response)
+        with telemetry.stage("response_parse"):
+            result = _parse_response(response)
         
         return result
         
     finally:
-        # Cleanup: Delete uploaded file from Gemini
+        # Cleanup: Delete uploaded file from Gemini (inline clips left nothing behind)
         if video_file:
             try:
                 client.files.delete(name=video_file.name)
@@ -19,3 +19,11 @@ from core import config
 def get_active_analysis_model() -> str:
     """Return the model identifier to run new analyses with."""
     return config.ANALYSIS_MODEL
+
+
+def get_analysis_model_chain(primary: str | None = None) -> list[str]:
+    """Models to try for an analysis, in order: `primary` (the model the analysis
+    was created with; the active model when not given), then the configured
+    fallbacks. No model appears twice."""
+    chain = [primary or get_active_analysis_model(), *config.ANALYSIS_FALLBACK_MODELS]
+    return list(dict.fromkeys(chain))
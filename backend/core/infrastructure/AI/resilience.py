@@ -0,0 +1,239 @@
+"""Guard rails around analysis model calls.
+
+Every call goes through one ResilientAnalysisAI per process, which wraps the
+provider behind the AnalysisAI port with:
+
+- a token-bucket rate limiter and a cap on calls in flight, so a burst of users
+  queues here instead of tripping the provider's quota;
+- a deadline per call, covering the waits below and the provider call itself
+  (the provider gets the remaining budget as `timeout_seconds`);
+- a circuit breaker per model that fails fast once a model's recent error rate
+  crosses a threshold, instead of letting a brownout stall every worker;
+- an ordered fallback chain of models (model_selection.get_analysis_model_chain).
+
+Only TransientProviderError counts as the model failing. Anything else (bad
+input, a response we could not parse) is raised to the caller unchanged.
+"""
+
+import threading
+import time
+from collections import deque
+from typing import Callable
+
+from core.config import (
+    AI_RATE_LIMIT_PER_SECOND,
+    AI_RATE_LIMIT_BURST,
+    AI_MAX_IN_FLIGHT,
+    AI_CALL_DEADLINE_SECONDS,
+    AI_BREAKER_WINDOW,
+    AI_BREAKER_MIN_CALLS,
+    AI_BREAKER_ERROR_RATE,
+    AI_BREAKER_COOLDOWN_SECONDS,
+)
+from .exceptions import TransientProviderError, ProviderUnavailableError
+from .model_selection import get_analysis_model_chain
+from .ports import AnalysisAI
+from .selector import get_provider
+
+
+class TokenBucket:
+    """`rate` tokens per second, at most `burst` banked."""
+
+    def __init__(self, rate: float, burst: int, clock: Callable[[], float] = time.monotonic):
+        self.rate = rate
+        self.burst = burst
+        self.clock = clock
+        self._tokens = float(burst)
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def acquire(self, timeout: float) -> bool:
+        """Take a token, waiting up to `timeout` seconds for one. False if none came."""
+        deadline = self.clock() + timeout
+        while True:
+            with self._lock:
+                now = self.clock()
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return True
+                wait = (1 - self._tokens) / self.rate if self.rate > 0 else timeout
+            if now + wait > deadline:
+                return False
+            time.sleep(wait)
+
+
+class CircuitBreaker:
+    """Closed -> open when the error rate over the last `window` calls reaches
+    `error_rate` (once `min_calls` have been seen); open -> half-open after
+    `cooldown_seconds`, letting one probe call through; the probe's outcome
+    closes or re-opens it."""
+
+    CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+    def __init__(
+        self,
+        window: int = AI_BREAKER_WINDOW,
+        min_calls: int = AI_BREAKER_MIN_CALLS,
+        error_rate: float = AI_BREAKER_ERROR_RATE,
+        cooldown_seconds: float = AI_BREAKER_COOLDOWN_SECONDS,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.min_calls = min_calls
+        self.error_rate = error_rate
+        self.cooldown_seconds = cooldown_seconds
+        self.clock = clock
+        self._outcomes: deque[bool] = deque(maxlen=window)   # True = failed
+        self._state = self.CLOSED
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._state == self.OPEN and self.clock() - self._opened_at >= self.cooldown_seconds:
+                return self.HALF_OPEN
+            return self._state
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self._state == self.CLOSED:
+                return True
+            if self._state == self.OPEN:
+                if self.clock() - self._opened_at < self.cooldown_seconds:
+                    return False
+                self._state = self.HALF_OPEN
+            # Half-open: a single probe at a time
+            if self._probe_in_flight:
+                return False
+            self._probe_in_flight = True
+            return True
+
+    def record(self, failed: bool) -> None:
+        with self._lock:
+            if self._state == self.HALF_OPEN:
+                self._probe_in_flight = False
+                if failed:
+                    self._trip()
+                else:
+                    self._state = self.CLOSED
+                    self._outcomes.clear()
+                return
+
+            self._outcomes.append(failed)
+            failures = sum(self._outcomes)
+            if len(self._outcomes) >= self.min_calls and failures / len(self._outcomes) >= self.error_rate:
+                self._trip()
+
+    def release(self) -> None:
+        """The allowed call ended without telling us anything about the model
+        (ran out of time before it started, bad input...): free the probe slot
+        without changing state."""
+        with self._lock:
+            self._probe_in_flight = False
+
+    def _trip(self) -> None:
+        self._state = self.OPEN
+        self._opened_at = self.clock()
+        self._outcomes.clear()
+
+
+class ResilientAnalysisAI:
+    def __init__(
+        self,
+        provider: AnalysisAI,
+        model_chain: Callable[[str | None], list[str]] = get_analysis_model_chain,
+        rate_limiter: TokenBucket | None = None,
+        max_in_flight: int = AI_MAX_IN_FLIGHT,
+        deadline_seconds: float = AI_CALL_DEADLINE_SECONDS,
+        breaker_factory: Callable[[], CircuitBreaker] = CircuitBreaker,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.provider = provider
+        self.model_chain = model_chain
+        self.rate_limiter = rate_limiter or TokenBucket(AI_RATE_LIMIT_PER_SECOND, AI_RATE_LIMIT_BURST, clock=clock)
+        self.deadline_seconds = deadline_seconds
+        self.breaker_factory = breaker_factory
+        self.clock = clock
+        self._in_flight = threading.BoundedSemaphore(max_in_flight)
+        self._breakers: dict[str, CircuitBreaker] = {}
+        self._breakers_lock = threading.Lock()
+
+    def breaker(self, model: str) -> CircuitBreaker:
+        with self._breakers_lock:
+            if model not in self._breakers:
+                self._breakers[model] = self.breaker_factory()
+            return self._breakers[model]
+
+    def breaker_states(self) -> dict[str, str]:
+        with self._breakers_lock:
+            breakers = dict(self._breakers)
+        return {model: breaker.state for model, breaker in breakers.items()}
+
+    def analyze_video(self, video_path: str, model: str | None = None, **kwargs) -> dict:
+        """Run the analysis on the first model in the chain that is up and answers.
+
+        The result carries the model that produced it under "model".
+
+        Raises:
+            ProviderUnavailableError: Nothing answered within the deadline.
+        """
+        deadline = self.clock() + self.deadline_seconds
+        last_error: Exception | None = None
+
+        for candidate in self.model_chain(model):
+            breaker = self.breaker(candidate)
+            if not breaker.allow():
+                last_error = ProviderUnavailableError(f"Circuit open for model {candidate}")
+                continue
+
+            try:
+                result = self._call(candidate, deadline, video_path, kwargs)
+            except TransientProviderError as e:
+                breaker.record(failed=True)
+                print(f"Warning: model {candidate} failed ({e}); trying the next model")
+                last_error = e
+                continue
+            except BaseException:
+                # Out of time / capacity, or a non-transient error: says nothing about the model's health
+                breaker.release()
+                raise
+
+            breaker.record(failed=False)
+            return {**result, "model": candidate}
+
+        raise ProviderUnavailableError(f"No analysis model available: {last_error}") from last_error
+
+    def _call(self, model: str, deadline: float, video_path: str, kwargs: dict) -> dict:
+        if not self.rate_limiter.acquire(timeout=max(0.0, deadline - self.clock())):
+            raise ProviderUnavailableError("Rate limit: no call slot before the deadline")
+        if not self._in_flight.acquire(timeout=max(0.0, deadline - self.clock())):
+            raise ProviderUnavailableError("Too many analysis calls in flight")
+        try:
+            remaining = deadline - self.clock()
+            if remaining <= 0:
+                raise ProviderUnavailableError("Deadline passed before the call started")
+            return self.provider.analyze_video(video_path=video_path, model=model, timeout_seconds=remaining, **kwargs)
+        finally:
+            self._in_flight.release()
+
+
+_analysis_ai: ResilientAnalysisAI | None = None
+_analysis_ai_lock = threading.Lock()
+
+
+def get_analysis_ai() -> ResilientAnalysisAI:
+    """The process-wide guarded analysis provider (limits and breakers are shared)."""
+    global _analysis_ai
+    with _analysis_ai_lock:
+        if _analysis_ai is None:
+            _analysis_ai = ResilientAnalysisAI(get_provider("google"))
+        return _analysis_ai
+
+
+def analyze_video(**kwargs) -> dict:
+    """Analyze a video through the guarded provider. Same arguments as
+    AnalysisAI.analyze_video."""
+    return get_analysis_ai().analyze_video(**kwargs)
@@ -1,19 +1,97 @@
 # core/infrastructure/ai/selector.py
+"""Process-wide registry of AI provider clients.
+
+Each provider is built the first time it is asked for and then reused by every
+caller in the process — API threadpool and analysis workers alike — so client
+setup and the TLS handshakes behind its keep-alive connection pool happen once,
+not once per analysis. Construction is lazy, so importing this module (or
+running without a provider's API key) never builds a client nobody uses.
+"""
+
+import threading
+import time
+from typing import Callable
+
 from .ports import AnalysisAI
-from .openAI.client import OpenAIAnalysisClient
-from .local.client import AnthropicAnalysisClient
-from .google.client import GoogleAnalysisClient
+
+
+def _google() -> AnalysisAI:
+    from .google.client import GoogleAnalysisClient
+    return GoogleAnalysisClient()
+
+
+def _openai() -> AnalysisAI:
+    from .openAI.client import OpenAIAnalysisClient
+    return OpenAIAnalysisClient()
+
+
+def _local() -> AnalysisAI:
+    from .local.client import LocalAnalysisClient
+    return LocalAnalysisClient()
+
+
+DEFAULT_PROVIDER_FACTORIES: dict[str, Callable[[], AnalysisAI]] = {
+    "google": _google,
+    "openai": _openai,
+    "local": _local,
+}
+
 
 class AIProviderSelector:
-    def __init__(self):
-        self.providers: dict[str, AnalysisAI] = {
-            "openai": OpenAIAnalysisClient(),
-            "local": AnthropicAnalysisClient(),
-            "google": GoogleAnalysisClient(),
-        }
+    def __init__(self, factories: dict[str, Callable[[], AnalysisAI]] | None = None):
+        self.factories = dict(factories or DEFAULT_PROVIDER_FACTORIES)
+        self.providers: dict[str, AnalysisAI] = {}
+        self._stats: dict[str, dict] = {}
+        self._lock = threading.Lock()
 
     def get(self, provider: str) -> AnalysisAI:
-        try:
-            return self.providers[provider]
-        except KeyError:
+        if provider not in self.factories:
             raise ValueError(f"Unknown AI provider: {provider}")
+
+        # Held only for a dict lookup once the client exists; concurrent first
+        # callers wait for the one build instead of each making their own
+        with self._lock:
+            client = self.providers.get(provider)
+            if client is None:
+                started = time.perf_counter()
+                client = self.factories[provider]()
+                self.providers[provider] = client
+                self._stats[provider] = {
+                    "init_seconds": time.perf_counter() - started,
+                    "created_at": time.time(),
+                    "gets": 0,
+                }
+            self._stats[provider]["gets"] += 1
+        return client
+
+    def stats(self) -> dict:
+        """Per built provider: how long it took to build, how often it was handed
+        out, and its HTTP pool figures when it reports them (pool_stats())."""
+        with self._lock:
+            built = dict(self.providers)
+            stats = {name: dict(self._stats[name]) for name in built}
+        for name, client in built.items():
+            pool_stats = getattr(client, "pool_stats", None)
+            if callable(pool_stats):
+                stats[name]["pool"] = pool_stats()
+        return stats
+
+    def reset(self, provider: str | None = None) -> None:
+        """Drop (and close) built clients, so the next get() builds afresh."""
+        with self._lock:
+            names = [provider] if provider else list(self.providers)
+            closing = [self.providers.pop(name) for name in names if name in self.providers]
+            for name in names:
+                self._stats.pop(name, None)
+        for client in closing:
+            close = getattr(client, "close", None)
+            if callable(close):
+                close()
+
+
+provider_registry = AIProviderSelector()
+
+
+def get_provider(provider: str = "google") -> AnalysisAI:
+    """The shared client for `provider`, built on first use."""
+    return provider_registry.get(provider)
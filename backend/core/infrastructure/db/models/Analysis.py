@@ -8,8 +8,11 @@ from sqlalchemy import (
     Boolean,
     JSON,
     ForeignKey,
+    BigInteger,
+    Integer,
+    Float,
 )
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.dialects.postgresql import UUID, JSONB
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship, Mapped, mapped_column
 
@@ -60,6 +63,26 @@ class Analysis(Base):
     started_at: Mapped[DateTime | None] = mapped_column(DateTime(timezone=True))
     completed_at: Mapped[DateTime | None] = mapped_column(DateTime(timezone=True))
 
+    # What was actually sent to the model: the proxy settings used (NULL = the
+    # archive copy itself was sent), and bytes uploaded vs. the archive copy.
+    model_input_params: Mapped[dict | None] = mapped_column(JSONB)
+    model_input_bytes: Mapped[int | None] = mapped_column(BigInteger)
+    archive_bytes: Mapped[int | None] = mapped_column(BigInteger)
+
+    # Where the time went: milliseconds per pipeline stage (see infrastructure/telemetry.py),
+    # the model's token usage and the length of the clip it was shown
+    stage_timings: Mapped[dict | None] = mapped_column(JSONB)
+    input_tokens: Mapped[int | None] = mapped_column(Integer)
+    output_tokens: Mapped[int | None] = mapped_column(Integer)
+    cached_tokens: Mapped[int | None] = mapped_column(Integer)
+    video_duration_seconds: Mapped[float | None] = mapped_column(Float)
+
+    # Swing localization: whether the clip may be tightened to the detected swing
+    # (per analysis, opt-out), and the window that was detected (start, end,
+    # peak in seconds of the uploaded file; NULL when none was found or it was off)
+    auto_trim: Mapped[bool] = mapped_column(Boolean, nullable=False, default=True, server_default="true")
+    swing_window: Mapped[dict | None] = mapped_column(JSONB)
+
     video = relationship("Video", back_populates="analyses")
     issues = relationship(
         "AnalysisIssue",
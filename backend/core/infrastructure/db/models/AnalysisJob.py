@@ -0,0 +1,78 @@
+from ..base import Base
+import uuid
+from sqlalchemy import (
+    Text,
+    DateTime,
+    Integer,
+    Boolean,
+    CheckConstraint,
+    ForeignKey,
+    Index,
+)
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.sql import func
+from sqlalchemy.orm import Mapped, mapped_column
+
+
+class AnalysisJob(Base):
+    """A queued run of an analysis, claimed by a worker with FOR UPDATE SKIP LOCKED.
+
+    One row per analysis. `locked_by` / `lease_expires_at` are only meaningful while
+    status is 'running'; a running job whose lease has expired is up for grabs.
+    """
+
+    __tablename__ = "analysis_jobs"
+
+    id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True),
+        primary_key=True,
+        default=uuid.uuid4,
+    )
+
+    analysis_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True),
+        ForeignKey("analysis.id", ondelete="CASCADE"),
+        nullable=False,
+        unique=True,
+    )
+
+    status: Mapped[str] = mapped_column(
+        Text,
+        CheckConstraint("status IN ('queued','running','succeeded','failed')"),
+        nullable=False,
+        server_default="queued",
+    )
+
+    attempts: Mapped[int] = mapped_column(Integer, nullable=False, server_default="0")
+    max_attempts: Mapped[int] = mapped_column(Integer, nullable=False, server_default="3")
+
+    run_after: Mapped[DateTime] = mapped_column(
+        DateTime(timezone=True),
+        nullable=False,
+        server_default=func.now(),
+    )
+
+    locked_by: Mapped[str | None] = mapped_column(Text)
+    lease_expires_at: Mapped[DateTime | None] = mapped_column(DateTime(timezone=True))
+    heartbeat_at: Mapped[DateTime | None] = mapped_column(DateTime(timezone=True))
+
+    last_error: Mapped[str | None] = mapped_column(Text)
+
+    # Admin re-run: skip the result cache lookup (the fresh result is still stored)
+    bypass_result_cache: Mapped[bool] = mapped_column(Boolean, nullable=False, server_default="false")
+
+    # Direct upload: the scratch copy of the video on the API host that received
+    # it. A worker that can see the file takes it over instead of downloading
+    # from R2; any other worker (or a retry, once it has been taken) downloads.
+    local_video_path: Mapped[str | None] = mapped_column(Text)
+
+    created_at: Mapped[DateTime] = mapped_column(
+        DateTime(timezone=True),
+        nullable=False,
+        server_default=func.now(),
+    )
+    finished_at: Mapped[DateTime | None] = mapped_column(DateTime(timezone=True))
+
+    __table_args__ = (
+        Index("idx_analysis_jobs_status_run_after", "status", "run_after"),
+    )
@@ -0,0 +1,48 @@
+from ..base import Base
+import uuid
+from sqlalchemy import (
+    Text,
+    DateTime,
+    Integer,
+    ForeignKey,
+    Index,
+)
+from sqlalchemy.dialects.postgresql import UUID, JSONB
+from sqlalchemy.sql import func
+from sqlalchemy.orm import Mapped, mapped_column
+
+
+class AnalysisResultCache(Base):
+    """A model result, keyed by everything that went into producing it.
+
+    `cache_key` hashes the clip the model saw, the prompt fields, the model
+    version and the issue catalog, so an entry can be reused verbatim by any
+    analysis with the same key. Entries past `expires_at` are treated as absent.
+    """
+
+    __tablename__ = "analysis_result_cache"
+
+    cache_key: Mapped[str] = mapped_column(Text, primary_key=True)
+
+    issues: Mapped[list] = mapped_column(JSONB, nullable=False, server_default="[]")
+    club_type: Mapped[str | None] = mapped_column(Text)
+    camera_view: Mapped[str | None] = mapped_column(Text)
+
+    source_analysis_id: Mapped[uuid.UUID | None] = mapped_column(
+        UUID(as_uuid=True),
+        ForeignKey("analysis.id", ondelete="SET NULL"),
+    )
+
+    hit_count: Mapped[int] = mapped_column(Integer, nullable=False, server_default="0")
+    last_hit_at: Mapped[DateTime | None] = mapped_column(DateTime(timezone=True))
+
+    created_at: Mapped[DateTime] = mapped_column(
+        DateTime(timezone=True),
+        nullable=False,
+        server_default=func.now(),
+    )
+    expires_at: Mapped[DateTime] = mapped_column(DateTime(timezone=True), nullable=False)
+
+    __table_args__ = (
+        Index("idx_analysis_result_cache_expires_at", "expires_at"),
+    )
@@ -0,0 +1,34 @@
+from ..base import Base
+from sqlalchemy import (
+    BigInteger,
+    DateTime,
+    Integer,
+    CheckConstraint,
+)
+from sqlalchemy.sql import func
+from sqlalchemy.orm import Mapped, mapped_column
+
+
+class IssueCatalogVersion(Base):
+    """Single-row counter bumped whenever an issue is created, edited or deleted.
+
+    Lets every process (API and analysis workers alike) tell with one cheap read
+    whether its cached copy of the issue catalog is still current.
+    """
+
+    __tablename__ = "issue_catalog_version"
+
+    id: Mapped[int] = mapped_column(
+        Integer,
+        CheckConstraint("id = 1"),
+        primary_key=True,
+        default=1,
+    )
+
+    version: Mapped[int] = mapped_column(BigInteger, nullable=False, server_default="1")
+
+    updated_at: Mapped[DateTime] = mapped_column(
+        DateTime(timezone=True),
+        nullable=False,
+        server_default=func.now(),
+    )
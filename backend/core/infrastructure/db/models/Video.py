@@ -3,7 +3,10 @@ import uuid
 from sqlalchemy import (
     Text,
     DateTime,
+    Float,
+    Integer,
     Interval,
+    BigInteger,
     CheckConstraint,
     Index,
 )
@@ -29,6 +32,23 @@ class Video(Base):
 
     video_key: Mapped[str | None] = mapped_column(Text, nullable=True)
     thumbnail_key: Mapped[str | None] = mapped_column(Text, nullable=True)
+    # Trimmed copy of the video, once an analysis has succeeded on it. video_key
+    # stays the original upload, so a retry or re-analysis trims from the source
+    archive_key: Mapped[str | None] = mapped_column(Text, nullable=True)
+
+    # Open R2 multipart upload of the video, and the size the client declared for it
+    multipart_upload_id: Mapped[str | None] = mapped_column(Text, nullable=True)
+    upload_size_bytes: Mapped[int | None] = mapped_column(BigInteger, nullable=True)
+
+    # Probe of the archived video, written when it is processed, so nothing
+    # later has to fetch and open the file for these
+    duration_seconds: Mapped[float | None] = mapped_column(Float, nullable=True)
+    fps: Mapped[float | None] = mapped_column(Float, nullable=True)
+    width: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    height: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    rotation: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    video_codec: Mapped[str | None] = mapped_column(Text, nullable=True)
+    size_bytes: Mapped[int | None] = mapped_column(BigInteger, nullable=True)
 
     start_time: Mapped[timedelta | None] = mapped_column(Interval, nullable=True)
     end_time: Mapped[timedelta | None] = mapped_column(Interval, nullable=True)
@@ -7,7 +7,10 @@ from .Profile import Profile
 from .Video import Video
 from .Drill import Drill
 from .Issue import Issue
+from .IssueCatalogVersion import IssueCatalogVersion
 from .Analysis import Analysis
+from .AnalysisJob import AnalysisJob
+from .AnalysisResultCache import AnalysisResultCache
 from .Role import Role
 from .BillingCustomer import BillingCustomer
 from .BillingSubscription import BillingSubscription
@@ -37,7 +40,10 @@ __all__ = [
     "Video",
     "Drill",
     "Issue",
+    "IssueCatalogVersion",
     "Analysis",
+    "AnalysisJob",
+    "AnalysisResultCache",
     "Role",
     "BillingCustomer",
     "BillingSubscription",
@@ -1,4 +1,4 @@
-from sqlalchemy import select, text, func
+from sqlalchemy import select, text, func, cast, Float
 from sqlalchemy.orm import Session
 from uuid import UUID
 from datetime import datetime, date
@@ -43,6 +43,54 @@ def get_completed_analyses_in_range(
     return session.scalars(stmt).all()
 
 
+def get_stage_percentiles(start_utc: datetime, end_utc: datetime, session: Session) -> list:
+    """
+    p50/p95/p99 of each pipeline stage's duration (ms), per model_version, over
+    analyses completed in the half-open UTC range [start_utc, end_utc). One row
+    per (model_version, stage): model_version, stage, count, p50, p95, p99.
+    """
+    stage = func.jsonb_each_text(Analysis.stage_timings).table_valued(
+        "key", "value", joins_implicitly=True
+    ).alias("stage")
+    duration_ms = cast(stage.c.value, Float)
+    stmt = (
+        select(
+            Analysis.model_version,
+            stage.c.key.label("stage"),
+            func.count().label("count"),
+            func.percentile_cont(0.5).within_group(duration_ms).label("p50"),
+            func.percentile_cont(0.95).within_group(duration_ms).label("p95"),
+            func.percentile_cont(0.99).within_group(duration_ms).label("p99"),
+        )
+        .select_from(Analysis)
+        .where(Analysis.status == "completed")
+        .where(Analysis.stage_timings.isnot(None))
+        .where(Analysis.completed_at >= start_utc)
+        .where(Analysis.completed_at < end_utc)
+        .group_by(Analysis.model_version, stage.c.key)
+        .order_by(Analysis.model_version, stage.c.key)
+    )
+    return session.execute(stmt).all()
+
+
+def get_rejection_counts(error_prefix: str, since_utc: datetime, session: Session) -> tuple[int, int]:
+    """
+    (failed with an error_message starting with `error_prefix`, finished) over
+    analyses created since `since_utc`; finished = completed or failed.
+    """
+    rejected = func.count().filter(
+        Analysis.status == "failed", Analysis.error_message.startswith(error_prefix, autoescape=True)
+    )
+    stmt = (
+        select(rejected, func.count())
+        .select_from(Analysis)
+        .where(Analysis.status.in_(("completed", "failed")))
+        .where(Analysis.created_at >= since_utc)
+    )
+    row = session.execute(stmt).one()
+    return row[0] or 0, row[1] or 0
+
+
 def get_analysis_by_id(analysis_id: str, session: Session) -> Analysis:
     return session.get(Analysis, analysis_id)
 
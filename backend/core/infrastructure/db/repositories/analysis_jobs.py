@@ -0,0 +1,153 @@
+from sqlalchemy import select, update, and_, or_, func
+from sqlalchemy.orm import Session
+from uuid import UUID
+from datetime import datetime, timedelta, timezone
+from ..models.AnalysisJob import AnalysisJob
+
+
+# ------------ GET ------------
+
+
+def get_job_by_analysis_id(analysis_id: UUID, session: Session) -> AnalysisJob | None:
+    stmt = select(AnalysisJob).where(AnalysisJob.analysis_id == analysis_id)
+    return session.scalars(stmt).first()
+
+
+# ------------ CREATE ------------
+
+
+def enqueue_job(
+    analysis_id: UUID,
+    max_attempts: int,
+    session: Session,
+    bypass_result_cache: bool = False,
+    local_video_path: str | None = None,
+) -> AnalysisJob:
+    job = AnalysisJob(
+        analysis_id=analysis_id,
+        status="queued",
+        attempts=0,
+        max_attempts=max_attempts,
+        bypass_result_cache=bypass_result_cache,
+        local_video_path=local_video_path,
+    )
+    session.add(job)
+    session.flush()
+    return job
+
+
+# ------------ CLAIM / LEASE ------------
+
+
+def claim_next_job(worker_id: str, lease_seconds: int, session: Session) -> AnalysisJob | None:
+    """
+    Claim one runnable job for `worker_id` and start its lease.
+
+    Runnable = queued and due, or running with an expired lease (its worker died).
+    FOR UPDATE SKIP LOCKED lets any number of workers poll concurrently without
+    blocking on, or double-claiming, a row another worker is mid-claim on. The
+    caller must commit promptly so the row lock is released and the new
+    status/lease are visible to other workers.
+    """
+    now = func.now()
+    stmt = (
+        select(AnalysisJob)
+        .where(
+            or_(
+                and_(AnalysisJob.status == "queued", AnalysisJob.run_after <= now),
+                and_(AnalysisJob.status == "running", AnalysisJob.lease_expires_at < now),
+            )
+        )
+        .order_by(AnalysisJob.run_after, AnalysisJob.created_at)
+        .limit(1)
+        .with_for_update(skip_locked=True)
+    )
+    job = session.scalars(stmt).first()
+    if job is None:
+        return None
+
+    claimed_at = datetime.now(timezone.utc)
+    job.status = "running"
+    job.attempts = job.attempts + 1
+    job.locked_by = worker_id
+    job.heartbeat_at = claimed_at
+    job.lease_expires_at = claimed_at + timedelta(seconds=lease_seconds)
+    session.flush()
+    return job
+
+
+def extend_lease(job_id: UUID, worker_id: str, lease_seconds: int, session: Session) -> bool:
+    """
+    Heartbeat: push the lease forward if `worker_id` still owns the job.
+
+    Returns False when the lease was lost (reclaimed by another worker after it
+    expired), in which case the caller's result must not be trusted to land.
+    """
+    heartbeat_at = datetime.now(timezone.utc)
+    stmt = (
+        update(AnalysisJob)
+        .where(AnalysisJob.id == job_id)
+        .where(AnalysisJob.status == "running")
+        .where(AnalysisJob.locked_by == worker_id)
+        .values(
+            heartbeat_at=heartbeat_at,
+            lease_expires_at=heartbeat_at + timedelta(seconds=lease_seconds),
+        )
+    )
+    result = session.execute(stmt)
+    return result.rowcount == 1
+
+
+# ------------ FINISH ------------
+
+
+def mark_job_succeeded(job: AnalysisJob, session: Session) -> AnalysisJob:
+    job.status = "succeeded"
+    job.locked_by = None
+    job.lease_expires_at = None
+    job.last_error = None
+    job.finished_at = datetime.now(timezone.utc)
+    session.flush()
+    return job
+
+
+def schedule_job_retry(job_id: UUID, worker_id: str, error: str, delay_seconds: float, session: Session) -> bool:
+    """
+    Requeue a failed attempt, if `worker_id` still owns the job. Returns False
+    when the lease was lost: the job belongs to whoever reclaimed it.
+    """
+    stmt = (
+        update(AnalysisJob)
+        .where(AnalysisJob.id == job_id)
+        .where(AnalysisJob.status == "running")
+        .where(AnalysisJob.locked_by == worker_id)
+        .values(
+            status="queued",
+            locked_by=None,
+            lease_expires_at=None,
+            last_error=error,
+            run_after=datetime.now(timezone.utc) + timedelta(seconds=delay_seconds),
+        )
+    )
+    return session.execute(stmt).rowcount == 1
+
+
+def mark_job_failed(job_id: UUID, worker_id: str, error: str, session: Session) -> bool:
+    """
+    Fail the job for good, if `worker_id` still owns it. Returns False when the
+    lease was lost (or the job is gone), in which case nothing was written.
+    """
+    stmt = (
+        update(AnalysisJob)
+        .where(AnalysisJob.id == job_id)
+        .where(AnalysisJob.status == "running")
+        .where(AnalysisJob.locked_by == worker_id)
+        .values(
+            status="failed",
+            locked_by=None,
+            lease_expires_at=None,
+            last_error=error,
+            finished_at=datetime.now(timezone.utc),
+        )
+    )
+    return session.execute(stmt).rowcount == 1
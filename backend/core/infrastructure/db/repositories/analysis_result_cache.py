@@ -0,0 +1,86 @@
+from sqlalchemy import select, update, func
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+from uuid import UUID
+from datetime import datetime, timedelta, timezone
+from ..models.AnalysisResultCache import AnalysisResultCache
+
+
+# ------------ GET ------------
+
+
+def get_live_entry(cache_key: str, session: Session) -> AnalysisResultCache | None:
+    """The entry for `cache_key`, unless it has expired."""
+    stmt = select(AnalysisResultCache).where(
+        AnalysisResultCache.cache_key == cache_key,
+        AnalysisResultCache.expires_at > func.now(),
+    )
+    return session.scalars(stmt).first()
+
+
+# ------------ COUNT ------------
+
+
+def get_entry_count(session: Session) -> int:
+    """Count of entries that have not expired."""
+    stmt = select(func.count()).select_from(AnalysisResultCache).where(
+        AnalysisResultCache.expires_at > func.now()
+    )
+    return session.scalar(stmt) or 0
+
+
+def get_total_hits(session: Session) -> int:
+    """Sum of hits over all stored entries."""
+    stmt = select(func.coalesce(func.sum(AnalysisResultCache.hit_count), 0))
+    return session.scalar(stmt) or 0
+
+
+# ------------ CREATE / UPDATE ------------
+
+
+def store_entry(
+    cache_key: str,
+    issues: list[dict],
+    club_type: str | None,
+    camera_view: str | None,
+    source_analysis_id: UUID | None,
+    ttl_seconds: int,
+    session: Session,
+) -> None:
+    """Insert or replace the entry for `cache_key` with a fresh TTL."""
+    values = {
+        "issues": issues,
+        "club_type": club_type,
+        "camera_view": camera_view,
+        "source_analysis_id": source_analysis_id,
+        "hit_count": 0,
+        "last_hit_at": None,
+        "created_at": func.now(),
+        "expires_at": datetime.now(timezone.utc) + timedelta(seconds=ttl_seconds),
+    }
+    stmt = (
+        insert(AnalysisResultCache)
+        .values(cache_key=cache_key, **values)
+        .on_conflict_do_update(index_elements=[AnalysisResultCache.cache_key], set_=values)
+    )
+    session.execute(stmt)
+
+
+def record_hit(cache_key: str, session: Session) -> None:
+    stmt = (
+        update(AnalysisResultCache)
+        .where(AnalysisResultCache.cache_key == cache_key)
+        .values(hit_count=AnalysisResultCache.hit_count + 1, last_hit_at=func.now())
+    )
+    session.execute(stmt)
+
+
+# ------------ DELETE ------------
+
+
+def delete_expired_entries(session: Session) -> int:
+    """Drop entries past their TTL. Returns how many were removed."""
+    result = session.execute(
+        AnalysisResultCache.__table__.delete().where(AnalysisResultCache.expires_at <= func.now())
+    )
+    return result.rowcount or 0
@@ -0,0 +1,29 @@
+from sqlalchemy import select, func
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+from ..models.IssueCatalogVersion import IssueCatalogVersion
+
+
+# ------------ GET ------------
+
+
+def get_catalog_version(session: Session) -> int:
+    version = session.scalar(select(IssueCatalogVersion.version).where(IssueCatalogVersion.id == 1))
+    return version or 0
+
+
+# ------------ UPDATE ------------
+
+
+def bump_catalog_version(session: Session) -> int:
+    """Increment the catalog version. Call in the same transaction as the issue change."""
+    stmt = (
+        insert(IssueCatalogVersion)
+        .values(id=1, version=1)
+        .on_conflict_do_update(
+            index_elements=[IssueCatalogVersion.id],
+            set_={"version": IssueCatalogVersion.version + 1, "updated_at": func.now()},
+        )
+        .returning(IssueCatalogVersion.version)
+    )
+    return session.execute(stmt).scalar_one()
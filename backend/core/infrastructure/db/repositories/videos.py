@@ -74,6 +74,25 @@ def update_video_thumbnail_key(video_id: UUID, thumbnail_key: str, session: Sess
     return video
 
 
+def update_video_archive_key(video_id: UUID, archive_key: str, session: Session) -> Video:
+    """Point a video at its trimmed archive copy."""
+    video = session.get(Video, video_id)
+    if video:
+        video.archive_key = archive_key
+        session.flush()
+    return video
+
+
+def update_video_metadata(video_id: UUID, metadata: dict, session: Session) -> Video:
+    """Set the probed media columns (duration_seconds, fps, width, ...) of a video."""
+    video = session.get(Video, video_id)
+    if video:
+        for column, value in metadata.items():
+            setattr(video, column, value)
+        session.flush()
+    return video
+
+
 # ------------ DELETE ------------
 
 
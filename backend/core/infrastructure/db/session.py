@@ -1,4 +1,27 @@
-from sqlalchemy.orm import sessionmaker
+from contextlib import contextmanager
+from typing import Callable, Iterator
+
+from sqlalchemy.orm import Session, sessionmaker
 from .engine import engine
 
-SessionLocal = sessionmaker(bind=engine)
\ No newline at end of file
+SessionLocal = sessionmaker(bind=engine)
+
+
+@contextmanager
+def session_scope(session_factory: Callable[[], Session] = SessionLocal) -> Iterator[Session]:
+    """
+    One short unit of work outside a request: commit on success, roll back on
+    error, and always hand the pooled connection back on exit.
+
+    Use this around each DB phase of long-running work so no connection is held
+    while waiting on storage, ffmpeg or an AI provider.
+    """
+    session = session_factory()
+    try:
+        yield session
+        session.commit()
+    except Exception:
+        session.rollback()
+        raise
+    finally:
+        session.close()
@@ -0,0 +1,279 @@
+import shutil
+import subprocess
+import threading
+import time
+from dataclasses import dataclass
+from typing import BinaryIO, Iterable, Iterator
+
+import cv2
+import numpy as np
+
+
+@dataclass(frozen=True)
+class AnonymizerSettings:
+    detect_every: int = 5           # Run the detector on every Nth frame; boxes are interpolated in between
+    detect_width: int = 480         # Detection runs on a grayscale copy at most this wide
+    pixel_size: int = 16            # Block edge of the pixelation, px of the output
+    margin: float = 0.25            # Boxes grow by this fraction per side, covering motion between detections
+    min_face: int = 20              # Smallest face the detector looks for, px at detection scale
+    crf: int = 23
+    preset: str = "veryfast"
+
+
+@dataclass(frozen=True)
+class AnonymizeStats:
+    frames: int
+    detections: int                 # Frames the detector actually ran on
+    boxes: int                      # Face boxes pixelated, summed over all frames
+    seconds: float
+
+    @property
+    def fps(self) -> float:
+        return self.frames / self.seconds if self.seconds else 0.0
+
+    def as_dict(self) -> dict:
+        return {
+            "frames": self.frames,
+            "detections": self.detections,
+            "boxes": self.boxes,
+            "seconds": round(self.seconds, 3),
+            "fps": round(self.fps, 1),
+        }
+
+
+_detectors = threading.local()
+
+
+def face_detector() -> cv2.CascadeClassifier:
+    """The Haar face detector, loaded once per thread (the XML parse is the
+    expensive part; detectMultiScale on one instance is not thread safe)."""
+    detector = getattr(_detectors, "face", None)
+    if detector is None:
+        detector = cv2.CascadeClassifier(cv2.data.haarcascades + "haarcascade_frontalface_default.xml")
+        _detectors.face = detector
+    return detector
+
+
+def detect_faces(frame: np.ndarray, settings: AnonymizerSettings = AnonymizerSettings()) -> np.ndarray:
+    """(k, 4) int boxes (x, y, w, h) of the faces in a BGR frame, in frame
+    pixels, grown by the margin and clamped to the frame."""
+    h, w = frame.shape[:2]
+    gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+    scale = 1.0
+    if w > settings.detect_width:
+        scale = settings.detect_width / w
+        gray = cv2.resize(gray, (settings.detect_width, max(1, round(h * scale))), interpolation=cv2.INTER_AREA)
+
+    faces = face_detector().detectMultiScale(
+        gray, scaleFactor=1.1, minNeighbors=5, minSize=(settings.min_face, settings.min_face)
+    )
+    if len(faces) == 0:
+        return np.zeros((0, 4), dtype=np.int32)
+
+    boxes = np.asarray(faces, dtype=np.float32) / scale
+    grow = boxes[:, 2:] * settings.margin
+    boxes[:, :2] -= grow
+    boxes[:, 2:] += 2 * grow
+    return clamp_boxes(boxes, w, h)
+
+
+def clamp_boxes(boxes: np.ndarray, width: int, height: int) -> np.ndarray:
+    boxes = np.round(np.asarray(boxes, dtype=np.float32)).astype(np.int32).reshape(-1, 4)
+    x0 = np.clip(boxes[:, 0], 0, width)
+    y0 = np.clip(boxes[:, 1], 0, height)
+    x1 = np.clip(boxes[:, 0] + boxes[:, 2], 0, width)
+    y1 = np.clip(boxes[:, 1] + boxes[:, 3], 0, height)
+    return np.stack([x0, y0, x1 - x0, y1 - y0], axis=1)
+
+
+def interpolate_boxes(before: np.ndarray, after: np.ndarray, t: float) -> np.ndarray:
+    """
+    Boxes at fraction `t` between two detections. Each box of `before` is
+    paired with the nearest unpaired box of `after` whose centre is within
+    one box size; pairs move linearly. Unpaired boxes (a face found on only
+    one side) are kept as they are, so a missed detection never unmasks a
+    face for the frames around it.
+    """
+    if not len(before) or not len(after):
+        return np.concatenate([before, after]).reshape(-1, 4)
+
+    before_c = before[:, :2] + before[:, 2:] / 2
+    after_c = after[:, :2] + after[:, 2:] / 2
+    distance = np.linalg.norm(before_c[:, None, :] - after_c[None, :, :], axis=2)
+    reach = np.maximum(before[:, None, 2:].max(axis=2), after[None, :, 2:].max(axis=2))
+
+    boxes = []
+    paired_after = set()
+    for i in np.argsort(distance.min(axis=1)):
+        candidates = [j for j in np.argsort(distance[i]) if j not in paired_after and distance[i, j] <= reach[i, j]]
+        if candidates:
+            j = candidates[0]
+            paired_after.add(j)
+            boxes.append(before[i] + (after[j] - before[i]) * t)
+        else:
+            boxes.append(before[i])
+    boxes += [after[j] for j in range(len(after)) if j not in paired_after]
+    return np.round(np.asarray(boxes, dtype=np.float32)).astype(np.int32)
+
+
+def pixelate_boxes(frame: np.ndarray, boxes: np.ndarray, pixel_size: int = 16) -> np.ndarray:
+    """
+    Pixelate `boxes` of `frame` in place; returns `frame`. Each box is
+    snapped outward to whole blocks (shifted back inside at the frame edge)
+    and every block is replaced by its mean, as one reshape/mean/broadcast.
+    """
+    height, width = frame.shape[:2]
+    for x, y, w, h in np.asarray(boxes, dtype=np.int64).reshape(-1, 4):
+        if w <= 0 or h <= 0:
+            continue
+        x0, x1, bw = _blocks(x, w, width, pixel_size)
+        y0, y1, bh = _blocks(y, h, height, pixel_size)
+        region = frame[y0:y1, x0:x1]
+        grid = region.reshape((y1 - y0) // bh, bh, (x1 - x0) // bw, bw, -1)
+        means = grid.mean(axis=(1, 3), keepdims=True).astype(frame.dtype)
+        region[...] = np.broadcast_to(means, grid.shape).reshape(region.shape)
+    return frame
+
+
+def _blocks(start: int, size: int, limit: int, pixel_size: int) -> tuple[int, int, int]:
+    """[start, end) covering [start, start + size) in whole blocks, inside [0, limit)."""
+    block = max(1, min(pixel_size, limit))
+    count = min(-(-size // block), limit // block)
+    end = min(limit, start + count * block)
+    return end - count * block, end, block
+
+
+def anonymize_frames(
+    frames: Iterable[np.ndarray],
+    settings: AnonymizerSettings = AnonymizerSettings(),
+    counts: dict | None = None,
+) -> Iterator[np.ndarray]:
+    """
+    Pixelate the faces of a stream of BGR frames, yielding them in order.
+    The detector runs on every `detect_every`-th frame and on the last one;
+    frames in between wait (at most detect_every - 1 of them) for the next
+    detection and get boxes interpolated between the two. `counts` collects
+    frames / detections / boxes.
+    """
+    counts = counts if counts is not None else {}
+    counts.update(frames=0, detections=0, boxes=0)
+    every = max(1, settings.detect_every)
+
+    def detect(frame):
+        counts["detections"] += 1
+        return detect_faces(frame, settings)
+
+    def emit(frame, boxes):
+        counts["frames"] += 1
+        counts["boxes"] += len(boxes)
+        return pixelate_boxes(frame, boxes, settings.pixel_size)
+
+    previous: np.ndarray | None = None       # Boxes of the last detected frame
+    pending: list[np.ndarray] = []
+    for i, frame in enumerate(frames):
+        if i % every:
+            pending.append(frame)
+            continue
+        boxes = detect(frame)
+        for k, waiting in enumerate(pending, start=1):
+            yield emit(waiting, interpolate_boxes(previous, boxes, k / every))
+        pending = []
+        yield emit(frame, boxes)
+        previous = boxes
+
+    if pending:
+        # Close the last gap with a detection on its final frame
+        last = pending.pop()
+        boxes = detect(last)
+        gap = len(pending) + 1
+        for k, waiting in enumerate(pending, start=1):
+            yield emit(waiting, interpolate_boxes(previous, boxes, k / gap))
+        yield emit(last, boxes)
+
+
+def read_raw_frames(stream: BinaryIO, width: int, height: int) -> Iterator[np.ndarray]:
+    """bgr24 frames from a rawvideo pipe, until it ends."""
+    frame_bytes = width * height * 3
+    while True:
+        data = stream.read(frame_bytes)
+        if len(data) < frame_bytes:
+            return
+        yield np.frombuffer(data, dtype=np.uint8).reshape(height, width, 3).copy()
+
+
+def anonymize_video(
+    path: str,
+    out_path: str,
+    width: int,
+    height: int,
+    fps: float,
+    rotation: int = 0,
+    settings: AnonymizerSettings = AnonymizerSettings(),
+) -> AnonymizeStats:
+    """
+    Write `path` to `out_path` (H.264, audio copied) with every face
+    pixelated. Frames go ffmpeg -> rawvideo pipe -> NumPy -> rawvideo pipe ->
+    ffmpeg; nothing is written to disk in between and at most detect_every
+    frames are held in memory. `width`, `height` and `rotation` are the
+    probed (stored) picture; ffmpeg auto-rotates, so they are swapped for 90
+    and 270 degrees.
+    """
+    if shutil.which("ffmpeg") is None:
+        raise RuntimeError("ffmpeg not found on PATH")
+    if rotation in (90, 270):
+        width, height = height, width
+    fps = fps or 30.0
+
+    decode_cmd = [
+        "ffmpeg", "-hide_banner", "-v", "error",
+        "-i", path,
+        "-an", "-vf", f"fps={fps}",
+        "-f", "rawvideo", "-pix_fmt", "bgr24",
+        "pipe:1",
+    ]
+    encode_cmd = [
+        "ffmpeg", "-hide_banner", "-v", "error", "-y",
+        "-f", "rawvideo", "-pix_fmt", "bgr24", "-s", f"{width}x{height}", "-r", str(fps),
+        "-i", "pipe:0",
+        "-i", path,
+        "-map", "0:v:0", "-map", "1:a?",
+        "-vf", "pad=ceil(iw/2)*2:ceil(ih/2)*2",     # yuv420p needs even sides
+        "-c:v", "libx264", "-preset", settings.preset, "-crf", str(settings.crf),
+        "-pix_fmt", "yuv420p",
+        "-c:a", "copy",
+        "-shortest",
+        "-movflags", "+faststart",
+        out_path,
+    ]
+
+    started = time.perf_counter()
+    counts: dict = {}
+    decoder = subprocess.Popen(decode_cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    encoder = subprocess.Popen(encode_cmd, stdin=subprocess.PIPE, stderr=subprocess.PIPE)
+    try:
+        try:
+            for frame in anonymize_frames(read_raw_frames(decoder.stdout, width, height), settings, counts):
+                encoder.stdin.write(frame.data)
+        except BrokenPipeError:
+            pass        # The encoder died; its stderr says why
+        encoder.stdin.close()
+        encoder_error = encoder.stderr.read()
+        decoder_error = decoder.stderr.read()
+        if decoder.wait() != 0:
+            raise RuntimeError(f"ffmpeg decode failed: {decoder_error.decode('utf-8', errors='ignore')}")
+        if encoder.wait() != 0:
+            raise RuntimeError(f"ffmpeg encode failed: {encoder_error.decode('utf-8', errors='ignore')}")
+    finally:
+        for process in (decoder, encoder):
+            if process.poll() is None:
+                process.kill()
+                process.wait()
+
+    if not counts.get("frames"):
+        raise RuntimeError(f"No frames decoded from {path}")
+    return AnonymizeStats(
+        frames=counts["frames"],
+        detections=counts["detections"],
+        boxes=counts["boxes"],
+        seconds=time.perf_counter() - started,
+    )
@@ -1,13 +1,31 @@
 from abc import ABC, abstractmethod
 import os
-from typing import Any
+import shutil
+from typing import Any, BinaryIO
 from datetime import datetime
 import uuid
 import filetype
 
+# filetype only needs the first few hundred bytes to recognise a container
+_SNIFF_BYTES = 8192
+_COPY_CHUNK_BYTES = 1024 * 1024
+
+
 class File(ABC):
-    def __init__(self, file_blob: bytes):
-        self._path = self.saveFile(file_blob)
+    def __init__(self, file_blob: bytes | str | os.PathLike | BinaryIO):
+        """
+        Save `file_blob` into this type's folder.
+
+        Accepts raw bytes, a path to a file already on disk (which is moved in and
+        owned from then on), or a binary stream (copied in chunks). Prefer a path
+        or stream for large files so they never have to sit whole in memory.
+        """
+        if isinstance(file_blob, (bytes, bytearray)):
+            self._path = self.saveFile(file_blob)
+        elif isinstance(file_blob, (str, os.PathLike)):
+            self._path = self.adoptFile(os.fspath(file_blob))
+        else:
+            self._path = self.saveStream(file_blob)
 
     @property
     @abstractmethod
@@ -20,20 +38,39 @@ class File(ABC):
         ...
 
     def saveFile(self, file_blob: bytes) -> str:
-        file_extension = self._detect_file_extension(file_blob) 
-        filename = self._generate_unique_filename(f"video.{file_extension}")
-        if not self.allowed_file(filename):
-            raise ValueError(f"Invalid file type: .{file_extension} not allowed")
-        
-        os.makedirs(self.folder, exist_ok=True)
-        file_path = os.path.join(self.folder, filename)
-        
+        file_path = self._new_file_path(self._detect_file_extension(file_blob))
+
         with open(file_path, 'wb') as f:
             f.write(file_blob)
             
         return file_path
 
-    
+    def saveStream(self, stream: BinaryIO) -> str:
+        head = stream.read(_SNIFF_BYTES)
+        file_path = self._new_file_path(self._detect_file_extension(head))
+
+        with open(file_path, 'wb') as f:
+            f.write(head)
+            shutil.copyfileobj(stream, f, _COPY_CHUNK_BYTES)
+
+        return file_path
+
+    def adoptFile(self, source_path: str) -> str:
+        """Move an existing file into the folder under a fresh, correctly-suffixed name."""
+        with open(source_path, 'rb') as f:
+            head = f.read(_SNIFF_BYTES)
+        file_path = self._new_file_path(self._detect_file_extension(head))
+        shutil.move(source_path, file_path)
+        return file_path
+
+    def _new_file_path(self, file_extension: str) -> str:
+        filename = self._generate_unique_filename(f"video.{file_extension}")
+        if not self.allowed_file(filename):
+            raise ValueError(f"Invalid file type: .{file_extension} not allowed")
+
+        os.makedirs(self.folder, exist_ok=True)
+        return os.path.join(self.folder, filename)
+
     def path(self) -> str:
         if self._path is None:
             raise ValueError("File has not been saved yet.")
@@ -1,4 +1,5 @@
 from .File import File
+from ..anonymizer.FaceAnonymizer import AnonymizerSettings, detect_faces, pixelate_boxes
 from openai import OpenAI
 from werkzeug.datastructures import FileStorage
 from PIL import Image
@@ -9,7 +10,10 @@ import cv2
 
 class Image_file(File):
     def __init__(self, f: FileStorage | np.ndarray, filename: str | None = ""):
+        self._array: np.ndarray | None = None
         if isinstance(f, np.ndarray):
+            # Kept in memory, so checks and face blur never re-read the JPEG
+            self._array = f
             self._path = self._saveNpDarray(f, filename or "keyframe.jpg")
         else:
             # f is FileStorage, convert to bytes
@@ -31,7 +35,20 @@ class Image_file(File):
         cv2.imwrite(save_path, f)
         return save_path
 
+    def array(self) -> np.ndarray:
+        """BGR pixels: the in-memory frame, or the file decoded once."""
+        if self._array is None:
+            self._array = cv2.imread(self.path())
+        return self._array
+
     def metrics(self) -> dict[str, Any]:
+        if self._array is not None:
+            return {
+                "width": self._array.shape[1],
+                "height": self._array.shape[0],
+                "format": "JPEG",
+                "filename": self.path(),
+            }
         with Image.open(self.path()) as img:
             return {
                 "width": img.width, 
@@ -49,33 +66,14 @@ class Image_file(File):
             return result.id
     
     def pixelate_face(self, pixel_size: int = 20) -> None:
-        # Load image
-        img = cv2.imread(self.path())
-
-        # Load face detector (bundled with cv2)
-        face_cascade = cv2.CascadeClassifier(
-            cv2.data.haarcascades + "haarcascade_frontalface_default.xml"
-        )
-
-        # Convert to grayscale for detection
-        gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
-
-        # Detect faces
-        faces = face_cascade.detectMultiScale(gray, scaleFactor=1.1, minNeighbors=5)
-
-        pixel_size = 20  # Increase for bigger blocks
-
-        # Pixelate each detected face
-        for (x, y, w, h) in faces:
-            face = img[y:y+h, x:x+w]
-
-            # shrink then expand to create pixelation
-            small = cv2.resize(face, (w // pixel_size, h // pixel_size))
-            pixelated = cv2.resize(small, (w, h), interpolation=cv2.INTER_NEAREST)
-
-            img[y:y+h, x:x+w] = pixelated
+        img = pixelate_faces(self.array().copy(), pixel_size)
+        self._array = img
 
         # Save output
         cv2.imwrite(self.path(), img)
 
 
+def pixelate_faces(img: np.ndarray, pixel_size: int = 20) -> np.ndarray:
+    """Pixelate every detected face of a BGR frame, in place; returns `img`."""
+    settings = AnonymizerSettings(pixel_size=pixel_size)
+    return pixelate_boxes(img, detect_faces(img, settings), settings.pixel_size)
@@ -1,9 +1,18 @@
 from .File import File
 from ..keyframes.Keyframes import Keyframes
-from .Image_file import Image_file
-from typing import List, Dict, Any 
+from ..media_pipeline.MediaPipeline import (
+    MediaPipeline,
+    MediaPipelineResult,
+    MediaProbe,
+    probe_media,
+    ProxySettings,
+    plan_trim,
+    archive_codec_args,
+)
+from ..frames.FrameBuffer import FrameBuffer, decode_frames, DEFAULT_MAX_BYTES
+from .Image_file import Image_file, pixelate_faces
+from typing import List, Dict, Any, BinaryIO
 from openai import OpenAI
-import cv2
 from datetime import datetime
 import os
 from werkzeug.datastructures import FileStorage
@@ -14,8 +23,10 @@ import shutil
 import traceback
 
 class Video_file(File):
-    def __init__(self, f: bytes):
+    def __init__(self, f: bytes | str | os.PathLike | BinaryIO):
         super().__init__(f)
+        self._probe: tuple[str, MediaProbe] | None = None     # (path probed, result)
+        self._frames: tuple[str, FrameBuffer] | None = None   # (path decoded, frames)
 
     @property
     def allowed_extensions(self) -> set:
@@ -25,51 +36,65 @@ class Video_file(File):
     def folder(self) -> str:
         return "uploads/video"  
 
-    def keyframes(self, num_keyframes: int) -> Keyframes:
+    def frames(self, indices: List[int], max_bytes: int = DEFAULT_MAX_BYTES) -> FrameBuffer:
+        """
+        Full-resolution BGR frames at `indices`, decoded in one forward pass into
+        a shared buffer of at most `max_bytes`. Sparse-frame consumers of this
+        file (keyframes with their face blur, the quality checks when there is
+        no proxy) that ask for frames already held reuse the buffer instead of
+        decoding again; ask for the union up front to share one pass. Whole-clip
+        decodes (the clip anonymizer) and checks on another rendition (the
+        proxy) read their own frames.
+        """
+        file_path = self.path()
+        if self._frames is not None and self._frames[0] == file_path and all(i in self._frames[1] for i in indices):
+            return self._frames[1]
+        buffer = decode_frames(file_path, indices, max_bytes=max_bytes)
+        self._frames = (file_path, buffer)
+        return buffer
+
+    def keyframe_indices(self, num_keyframes: int) -> List[int]:
+        total_frames = self.metrics()["total_frames"]
+
+        # Calculate frame intervals for keyframes
+        # Skip first and last 25% to avoid black frames
+        start_frame = int(total_frames * 0.25)
+        end_frame = int(total_frames * 0.75)
+        usable_frames = end_frame - start_frame
+
+        if usable_frames <= 0:
+            raise ValueError(f"Not enough usable frames in video file: {self.path()}")
+
+        # Extract keyframes at even intervals
+        frame_interval = usable_frames // num_keyframes
+        return [start_frame + i * frame_interval for i in range(num_keyframes)]
+
+    def keyframes(self, num_keyframes: int, max_bytes: int = DEFAULT_MAX_BYTES) -> Keyframes:
         """
         Extract keyframes from video file
         
         Args:
-            file_path: Path to the video file
             num_keyframes: Number of keyframes to extract
+            max_bytes: Memory cap of the decoded frames
             
         Returns:
-            Keyframes: List of keyframe file paths
+            Keyframes: Face-blurred keyframe images, each written to disk once
         """
         file_path = self.path()
         print("Extracting keyframes from:", file_path)
         try:
-            cap = cv2.VideoCapture(file_path)
-            if not cap.isOpened():
-                raise ValueError(f"Could not open video file: {file_path}")
-            
-            total_frames = self.metrics()["total_frames"]
-            
-            # Calculate frame intervals for keyframes
-            # Skip first and last 25% to avoid black frames
-            start_frame = int(total_frames * 0.25)
-            end_frame = int(total_frames * 0.75)
-            usable_frames = end_frame - start_frame
-            
-            if usable_frames <= 0:
-                cap.release()
-                raise ValueError(f"Not enough usable frames in video file: {file_path}")
-            
-            # Extract keyframes at even intervals
-            frame_interval = usable_frames // num_keyframes
-            keyframe_indices = [start_frame + i * frame_interval for i in range(num_keyframes)]
-            
+            keyframe_indices = self.keyframe_indices(num_keyframes)
+            buffer = self.frames(keyframe_indices, max_bytes=max_bytes)
+            if len(buffer) < len(set(keyframe_indices)):
+                print(f"Keyframes: {len(buffer)} of {len(set(keyframe_indices))} frames held ({buffer.stats()})")
+
             # Return list
             keyframe_images = []
             for idx, frame_number in enumerate(keyframe_indices):
-                cap.set(cv2.CAP_PROP_POS_FRAMES, frame_number)
-                ret, frame = cap.read()
-                if ret:
-                    img_obj = Image_file(frame, filename=f"keyframe_{idx}.jpg")
-                    img_obj.pixelate_face()
-                    keyframe_images.append(img_obj)
-            
-            cap.release()
+                if frame_number in buffer:
+                    # Blur a copy: the buffer keeps the raw frame for other consumers
+                    frame = pixelate_faces(buffer.get(frame_number).copy())
+                    keyframe_images.append(Image_file(frame, filename=f"keyframe_{idx}.jpg"))
             
             # Create keyframes object from list of images
             kf = Keyframes()
@@ -80,8 +105,17 @@ class Video_file(File):
             self.remove()
             traceback.print_exc()
             raise RuntimeError(f"Error extracting keyframes: {str(e)}")
-        
 
+    def probe(self) -> MediaProbe:
+        """
+        Container/stream metadata (ffprobe, headers only). Probed once per file:
+        every later call (metrics, quality checks, keyframes) reuses the result
+        until the file is replaced by a trim.
+        """
+        file_path = self.path()
+        if self._probe is None or self._probe[0] != file_path:
+            self._probe = (file_path, probe_media(file_path))
+        return self._probe[1]
 
     def metrics(self) -> Dict[str, Any]:
         """
@@ -93,28 +127,18 @@ class Video_file(File):
         file_path = self.path()
 
         try:
-            cap = cv2.VideoCapture(file_path)
-            if not cap.isOpened():
-                raise ValueError(f"Could not open video file: {file_path}")
-            
-            # Get video properties
-            total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
-            fps = cap.get(cv2.CAP_PROP_FPS)
-            width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
-            height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
-            duration = total_frames / fps if fps > 0 else 0
-            
-            cap.release()
-            
+            probe = self.probe()
             return {
                 "filename": os.path.basename(file_path),
-                "duration": round(duration, 2),
-                "resolution": f"{width}x{height}",
-                "fps": round(fps, 2),
-                "total_frames": total_frames,
-                "file_size": os.path.getsize(file_path),
-                "width": width,
-                "height": height,
+                "duration": round(probe.duration, 2),
+                "resolution": f"{probe.width}x{probe.height}",
+                "fps": round(probe.fps, 2),
+                "total_frames": round(probe.duration * probe.fps),
+                "file_size": probe.file_size,
+                "width": probe.width,
+                "height": probe.height,
+                "rotation": probe.rotation,
+                "video_codec": probe.video_codec,
                 "creation_time": datetime.fromtimestamp(os.path.getctime(file_path)).isoformat(),
                 "modification_time": datetime.fromtimestamp(os.path.getmtime(file_path)).isoformat(),
                 "format": os.path.splitext(file_path)[1].lower().replace('.', '')
@@ -130,6 +154,8 @@ class Video_file(File):
                 "file_size": 0,
                 "width": 0,
                 "height": 0,
+                "rotation": 0,
+                "video_codec": None,
                 "creation_time": None,
                 "modification_time": None,
                 "format": None,
@@ -143,14 +169,26 @@ class Video_file(File):
 
 
 
-    def trim(self, start_seconds: float, end_seconds: float) -> "Video_file":
+    def trim(
+        self,
+        start_seconds: float,
+        end_seconds: float,
+        mode: str = "auto",
+        encoder_profile: str = "balanced",
+        keyframe_tolerance: float = 0.1,
+    ) -> "Video_file":
         """
-        Trim the video accurately between start_seconds and end_seconds.
-        Always re-encodes for guaranteed audio/video sync.
+        Trim the video between start_seconds and end_seconds.
+        Stream-copies when the start lands on (or within a few frames of) a
+        keyframe, otherwise re-encodes for frame-accurate audio/video sync.
 
         Args:
             start_seconds (float): start time in seconds
             end_seconds (float): end time in seconds
+            mode (str): "auto", "copy" or "reencode"
+            encoder_profile (str): key of ENCODER_PROFILES, used when re-encoding
+            keyframe_tolerance (float): seconds the last keyframe before the start
+                may lie behind it for "auto" to stream-copy, as in process()
 
         Returns:
             Video_file: self with updated internal path
@@ -168,11 +206,9 @@ class Video_file(File):
         except Exception:
             raise ValueError("start and end must be numeric")
 
-        if end <= start:
-            raise ValueError("end must be greater than start")
+        plan = plan_trim(self.path(), start, end, mode=mode, keyframe_tolerance=keyframe_tolerance)
 
         # --- setup paths ---
-        duration = end - start
         input_path = self.path()
 
         base, ext = os.path.splitext(os.path.basename(input_path))
@@ -180,18 +216,14 @@ class Video_file(File):
         os.makedirs(self.folder, exist_ok=True)
         out_path = os.path.join(self.folder, out_name)
 
-        # --- ffmpeg command (re-encode for sync) ---
+        # --- ffmpeg command (stream copy, or re-encode for sync) ---
         cmd = [
             "ffmpeg", "-hide_banner", "-y",
-            "-ss", str(start),
+            "-ss", str(plan.start),
             "-i", input_path,
-            "-t", str(duration),
-            "-fflags", "+genpts",            # regenerate timestamps
-            "-c:v", "libx264",
-            "-preset", "veryfast",
-            "-crf", "20",
-            "-pix_fmt", "yuv420p",
-            "-c:a", "aac", "-b:a", "192k",
+            "-t", str(plan.duration),
+            "-map", "0:v:0", "-map", "0:a?",
+            *archive_codec_args(plan.mode, encoder_profile),
             "-movflags", "+faststart",
             out_path,
         ]
@@ -209,6 +241,37 @@ class Video_file(File):
         return self
     
     
+    def process(
+        self,
+        start_seconds: float | None = None,
+        end_seconds: float | None = None,
+        thumbnail_timestamp: float = 1.5,
+        proxy: ProxySettings | None = None,
+        trim_mode: str = "auto",
+        encoder_profile: str = "balanced",
+        keyframe_tolerance: float = 0.1,
+    ) -> MediaPipelineResult:
+        """
+        Trim, grab the thumbnail and (optionally) make the model proxy in a single
+        ffmpeg decode. Like trim(), a trimmed result replaces this file; the
+        thumbnail and proxy are left next to it for the caller to upload and remove.
+        """
+        result = MediaPipeline(self.path(), self.folder).run(
+            start_seconds=start_seconds,
+            end_seconds=end_seconds,
+            thumbnail_timestamp=thumbnail_timestamp,
+            proxy=proxy,
+            trim_mode=trim_mode,
+            encoder_profile=encoder_profile,
+            keyframe_tolerance=keyframe_tolerance,
+        )
+        if result.trimmed:
+            self.remove()
+            self._path = result.archive_path
+        # The pipeline already probed what is now this file
+        self._probe = (self._path, result.probe)
+        return result
+
     def read(self) -> bytes:
         """Read video file content as bytes."""
         with open(self.path(), "rb") as f:
@@ -0,0 +1,143 @@
+from typing import Callable, Iterable
+
+import cv2
+import numpy as np
+
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+
+class FrameBuffer:
+    """
+    Decoded frames of one clip, held in a single preallocated uint8 array of at
+    most `max_bytes`. Frames are written in decode order into a ring of slots:
+    when more frames are put than fit, the oldest are overwritten, so the cap
+    holds however many frames a caller asks for. Consumers read views into the
+    array (get / stack); nothing goes through disk.
+    """
+
+    def __init__(self, frame_shape: tuple[int, ...], capacity: int):
+        self.frames = np.empty((capacity, *frame_shape), dtype=np.uint8)
+        self._slots: dict[int, int] = {}            # frame index -> slot
+        self._slot_index = [-1] * capacity          # slot -> frame index
+        self._next = 0
+        self.evicted = 0
+
+    @classmethod
+    def for_frames(cls, frame_shape: tuple[int, ...], count: int, max_bytes: int = DEFAULT_MAX_BYTES) -> "FrameBuffer":
+        """Room for `count` frames, or as many as fit in `max_bytes` (always at least one)."""
+        frame_bytes = int(np.prod(frame_shape))
+        return cls(frame_shape, max(1, min(count, max_bytes // max(frame_bytes, 1))))
+
+    @classmethod
+    def empty(cls) -> "FrameBuffer":
+        return cls((0, 0), 0)
+
+    @property
+    def capacity(self) -> int:
+        return len(self.frames)
+
+    @property
+    def nbytes(self) -> int:
+        return self.frames.nbytes
+
+    @property
+    def indices(self) -> list[int]:
+        """Frame indices currently held, ascending."""
+        return sorted(self._slots)
+
+    def __len__(self) -> int:
+        return len(self._slots)
+
+    def __contains__(self, index: int) -> bool:
+        return index in self._slots
+
+    def put(self, index: int, frame: np.ndarray) -> np.ndarray:
+        """Copy `frame` into the next slot (evicting its oldest frame) and return the view."""
+        if not self.capacity:
+            raise ValueError("FrameBuffer has no capacity")
+        slot = self._next % self.capacity
+        old = self._slot_index[slot]
+        if old >= 0:
+            del self._slots[old]
+            self.evicted += 1
+        self.frames[slot] = frame
+        self._slots[index] = slot
+        self._slot_index[slot] = index
+        self._next += 1
+        return self.frames[slot]
+
+    def get(self, index: int) -> np.ndarray:
+        """Read-only view of a held frame; KeyError if it was never decoded or was evicted."""
+        view = self.frames[self._slots[index]]
+        view.flags.writeable = False
+        return view
+
+    def stack(self, indices: Iterable[int] | None = None) -> np.ndarray:
+        """(n, ...) copy of the given (default: all held) frames, in index order."""
+        wanted = self.indices if indices is None else [i for i in indices if i in self._slots]
+        if not wanted:
+            return np.zeros((0, *self.frames.shape[1:]), dtype=np.uint8)
+        return self.frames[[self._slots[i] for i in wanted]]
+
+    def stats(self) -> dict:
+        return {
+            "frames": len(self),
+            "capacity": self.capacity,
+            "evicted": self.evicted,
+            "bytes": self.nbytes,
+        }
+
+
+def decode_frames(
+    path: str,
+    indices: Iterable[int],
+    max_bytes: int = DEFAULT_MAX_BYTES,
+    width: int | None = None,
+    gray: bool = False,
+    on_frame: Callable[[int, np.ndarray], None] | None = None,
+) -> FrameBuffer:
+    """
+    Decode the frames at `indices` in one forward pass over `path`: frames in
+    between are only grabbed (demuxed and decoded, never converted or copied),
+    and there are no seeks. Wanted frames are optionally converted to grayscale
+    and downscaled to `width`, then put in a FrameBuffer sized for them within
+    `max_bytes`. `on_frame(index, view)` sees every wanted frame as it lands,
+    for callers that stream more frames than the cap holds.
+
+    Indices past the end of the stream are skipped; an unreadable file gives an
+    empty buffer.
+    """
+    wanted = sorted({int(i) for i in indices if i >= 0})
+    buffer: FrameBuffer | None = None
+    cap = cv2.VideoCapture(path)
+    try:
+        if not cap.isOpened():
+            return FrameBuffer.empty()
+        position = 0
+        for index in wanted:
+            while position < index and cap.grab():
+                position += 1
+            if position < index:
+                break
+            ok, frame = cap.read()
+            position += 1
+            if not ok:
+                break
+            frame = _prepare(frame, width, gray)
+            if buffer is None:
+                buffer = FrameBuffer.for_frames(frame.shape, len(wanted), max_bytes)
+            view = buffer.put(index, frame)
+            if on_frame is not None:
+                on_frame(index, view)
+    finally:
+        cap.release()
+    return buffer if buffer is not None else FrameBuffer.empty()
+
+
+def _prepare(frame: np.ndarray, width: int | None, gray: bool) -> np.ndarray:
+    if gray:
+        frame = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+    h, w = frame.shape[:2]
+    if width is not None and w > width:
+        frame = cv2.resize(frame, (width, max(1, round(h * width / w))), interpolation=cv2.INTER_AREA)
+    return frame
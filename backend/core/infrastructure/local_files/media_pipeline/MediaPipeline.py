@@ -0,0 +1,309 @@
+import json
+import os
+import shutil
+import subprocess
+from dataclasses import dataclass
+
+# x264 settings for a re-encoded trim. "balanced" is what trim always used.
+ENCODER_PROFILES: dict[str, list[str]] = {
+    "balanced": ["-preset", "veryfast", "-crf", "20"],
+    "fast": ["-preset", "ultrafast", "-crf", "23"],
+    "compact": ["-preset", "medium", "-crf", "24"],
+}
+
+TRIM_MODES = ("auto", "copy", "reencode")
+
+
+@dataclass(frozen=True)
+class MediaProbe:
+    duration: float
+    width: int
+    height: int
+    fps: float
+    video_codec: str | None
+    audio_codec: str | None
+    file_size: int
+    format: str | None
+    rotation: int = 0            # Clockwise degrees the player rotates the picture by (phone clips)
+
+
+@dataclass(frozen=True)
+class ProxySettings:
+    """The model-input rendition: picture only, small, low fps."""
+    max_side: int = 720          # Longest edge in px; never upscaled
+    max_fps: float = 30          # Only ever lowered, never raised
+    crf: int = 28
+
+    def as_dict(self) -> dict:
+        return {"max_side": self.max_side, "max_fps": self.max_fps, "crf": self.crf}
+
+
+@dataclass(frozen=True)
+class TrimPlan:
+    mode: str            # "copy" or "reencode"
+    start: float         # For copy: the keyframe the cut actually starts on
+    duration: float
+
+
+@dataclass(frozen=True)
+class MediaPipelineResult:
+    archive_path: str                # Trimmed copy, or the untouched input when no trim was asked for
+    trimmed: bool
+    thumbnail_path: str | None       # None if the clip had no frame to grab
+    proxy_path: str | None           # Model-input rendition, if requested
+    probe: MediaProbe                # Metadata of the archive copy
+    trim_mode: str | None = None     # "copy" / "reencode" when trimmed
+
+
+def probe_media(path: str) -> MediaProbe:
+    """Container/stream metadata via ffprobe. Reads headers only, decodes nothing."""
+    if shutil.which("ffprobe") is None:
+        raise RuntimeError("ffprobe not found on PATH")
+
+    cmd = [
+        "ffprobe", "-v", "error",
+        "-print_format", "json",
+        "-show_format", "-show_streams",
+        path,
+    ]
+    result = subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    if result.returncode != 0:
+        raise RuntimeError(f"ffprobe failed: {result.stderr.decode('utf-8', errors='ignore')}")
+
+    info = json.loads(result.stdout or b"{}")
+    streams = info.get("streams", [])
+    video = next((s for s in streams if s.get("codec_type") == "video"), {})
+    audio = next((s for s in streams if s.get("codec_type") == "audio"), {})
+    fmt = info.get("format", {})
+
+    return MediaProbe(
+        duration=float(fmt.get("duration") or video.get("duration") or 0),
+        width=int(video.get("width") or 0),
+        height=int(video.get("height") or 0),
+        fps=_parse_rate(video.get("avg_frame_rate") or video.get("r_frame_rate")),
+        video_codec=video.get("codec_name"),
+        audio_codec=audio.get("codec_name"),
+        file_size=int(fmt.get("size") or os.path.getsize(path)),
+        format=fmt.get("format_name"),
+        rotation=_rotation(video),
+    )
+
+
+def keyframe_times(path: str, around: float, window: float = 5.0) -> list[float]:
+    """Keyframe timestamps of the first video stream within `window` seconds of
+    `around`. Reads packet flags only (demux, no decode), so it is cheap."""
+    cmd = [
+        "ffprobe", "-v", "error",
+        "-select_streams", "v:0",
+        "-read_intervals", f"{max(0.0, around - window)}%{around + window}",
+        "-show_entries", "packet=pts_time,flags",
+        "-of", "csv=p=0",
+        path,
+    ]
+    result = subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    if result.returncode != 0:
+        raise RuntimeError(f"ffprobe failed: {result.stderr.decode('utf-8', errors='ignore')}")
+
+    times = []
+    for line in result.stdout.decode("utf-8", errors="ignore").splitlines():
+        pts_time, _, flags = line.partition(",")
+        if "K" in flags:
+            try:
+                times.append(float(pts_time))
+            except ValueError:
+                continue
+    return sorted(times)
+
+
+def plan_trim(path: str, start: float, end: float, mode: str = "auto", keyframe_tolerance: float = 0.1) -> TrimPlan:
+    """
+    Decide how to cut [start, end).
+
+    A stream copy (-c copy) can only start on a keyframe, so "auto" copies when
+    the last keyframe at or before `start` is within `keyframe_tolerance` — true
+    for any clip with dense keyframes, and for most cuts near the start of a
+    normal one — and re-encodes otherwise. "copy" / "reencode" force the mode.
+    """
+    if mode not in TRIM_MODES:
+        raise ValueError(f"Unknown trim mode '{mode}', expected one of {TRIM_MODES}")
+    if end <= start:
+        raise ValueError("end must be greater than start")
+
+    if mode == "reencode":
+        return TrimPlan(mode="reencode", start=start, duration=end - start)
+
+    previous = [t for t in keyframe_times(path, around=start) if t <= start + 1e-3]
+    keyframe = previous[-1] if previous else None
+
+    if mode == "copy" or (keyframe is not None and start - keyframe <= keyframe_tolerance):
+        cut_start = keyframe if keyframe is not None else start
+        return TrimPlan(mode="copy", start=cut_start, duration=end - cut_start)
+    return TrimPlan(mode="reencode", start=start, duration=end - start)
+
+
+def archive_codec_args(mode: str, encoder_profile: str = "balanced") -> list[str]:
+    """Codec arguments for the archive (trimmed) output."""
+    if mode == "copy":
+        return ["-c", "copy", "-avoid_negative_ts", "make_zero"]
+    if encoder_profile not in ENCODER_PROFILES:
+        raise ValueError(f"Unknown encoder profile '{encoder_profile}', expected one of {tuple(ENCODER_PROFILES)}")
+    return [
+        "-fflags", "+genpts",            # regenerate timestamps
+        "-c:v", "libx264", *ENCODER_PROFILES[encoder_profile],
+        "-pix_fmt", "yuv420p",
+        "-c:a", "aac", "-b:a", "192k",
+    ]
+
+
+class MediaPipeline:
+    """
+    Every derived file an analysis needs, from ONE ffmpeg decode of the source.
+
+    The decoded video is split inside the filter graph and fed to up to three
+    encoders at once: the trimmed archive copy, the JPEG thumbnail, and
+    optionally a downscaled proxy for the model. Previously each of those — plus
+    the cv2 metrics read — opened and decoded the file on its own. When the cut
+    allows it (see plan_trim) the archive copy is a stream copy and skips the
+    encoder entirely.
+    """
+
+    def __init__(self, input_path: str, output_dir: str):
+        self.input_path = input_path
+        self.output_dir = output_dir
+
+    def run(
+        self,
+        start_seconds: float | None = None,
+        end_seconds: float | None = None,
+        thumbnail_timestamp: float = 1.5,
+        proxy: ProxySettings | None = None,
+        trim_mode: str = "auto",
+        encoder_profile: str = "balanced",
+        keyframe_tolerance: float = 0.1,
+    ) -> MediaPipelineResult:
+        if shutil.which("ffmpeg") is None:
+            raise RuntimeError("ffmpeg not found on PATH")
+
+        trimmed = start_seconds is not None and end_seconds is not None
+        plan = None
+        if trimmed:
+            start, end = float(start_seconds), float(end_seconds)
+            plan = plan_trim(self.input_path, start, end, mode=trim_mode, keyframe_tolerance=keyframe_tolerance)
+
+        # Header-only probe of the source: tells us the duration (so the
+        # thumbnail timestamp lands inside the clip) without a decode.
+        source = probe_media(self.input_path)
+        duration = plan.duration if trimmed else source.duration
+        if duration and thumbnail_timestamp >= duration:
+            thumbnail_timestamp = duration / 2
+
+        os.makedirs(self.output_dir, exist_ok=True)
+        base, ext = os.path.splitext(os.path.basename(self.input_path))
+        archive_path = (
+            os.path.join(self.output_dir, f"{base}_trim_{int(start)}_{int(end)}{ext or '.mp4'}")
+            if trimmed else self.input_path
+        )
+        thumbnail_path = os.path.join(self.output_dir, f"{base}_thumbnail.jpg")
+        proxy_path = os.path.join(self.output_dir, f"{base}_proxy.mp4") if proxy else None
+
+        # --- input (seek + limit on the input side so every output shares the window) ---
+        cmd = ["ffmpeg", "-hide_banner", "-y"]
+        if trimmed:
+            cmd += ["-ss", str(plan.start), "-t", str(plan.duration)]
+        cmd += ["-i", self.input_path]
+
+        # --- one decode, split to each encoder ---
+        # A stream-copied archive maps the input packets directly, not the graph.
+        encode_archive = trimmed and plan.mode == "reencode"
+        branches = ["thumb"] + (["archive"] if encode_archive else []) + (["proxy"] if proxy else [])
+        graph = [f"[0:v]split={len(branches)}" + "".join(f"[{b}_in]" for b in branches)]
+        graph.append(f"[thumb_in]select='gte(t,{thumbnail_timestamp})'[thumb]")
+        if encode_archive:
+            graph.append("[archive_in]null[archive]")
+        if proxy:
+            graph.append(f"[proxy_in]{_proxy_filters(proxy, source)}[proxy]")
+        cmd += ["-filter_complex", ";".join(graph)]
+
+        # JPEG (mjpeg) thumbnail, decoded natively on every client; -q:v 3 is
+        # high quality but tiny for a single frame
+        cmd += ["-map", "[thumb]", "-frames:v", "1", "-q:v", "3", "-update", "1", thumbnail_path]
+
+        if trimmed:
+            cmd += [
+                "-map", "[archive]" if encode_archive else "0:v:0", "-map", "0:a?",
+                *archive_codec_args(plan.mode, encoder_profile),
+                "-movflags", "+faststart",
+                archive_path,
+            ]
+
+        if proxy:
+            # No audio: the model only looks at the picture.
+            cmd += [
+                "-map", "[proxy]", "-an",
+                "-c:v", "libx264", "-preset", "veryfast", "-crf", str(proxy.crf),
+                "-pix_fmt", "yuv420p",
+                "-movflags", "+faststart",
+                proxy_path,
+            ]
+
+        result = subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        if result.returncode != 0:
+            raise RuntimeError(
+                f"ffmpeg media pipeline failed: {result.stderr.decode('utf-8', errors='ignore')}"
+            )
+
+        return MediaPipelineResult(
+            archive_path=archive_path,
+            trimmed=trimmed,
+            thumbnail_path=thumbnail_path if _non_empty(thumbnail_path) else None,
+            proxy_path=proxy_path,
+            probe=probe_media(archive_path) if trimmed else source,
+            trim_mode=plan.mode if trimmed else None,
+        )
+
+
+def _proxy_filters(proxy: ProxySettings, source: MediaProbe) -> str:
+    filters = []
+    # ffmpeg autorotates before the filter graph, so a portrait phone clip
+    # stored as landscape reaches the scale filter with its sides swapped
+    width, height = source.width, source.height
+    if source.rotation in (90, 270):
+        width, height = height, width
+    if max(width, height) > proxy.max_side:
+        # Cap the long edge, keep aspect; -2 keeps the other edge even for yuv420p
+        if width >= height:
+            filters.append(f"scale={proxy.max_side}:-2")
+        else:
+            filters.append(f"scale=-2:{proxy.max_side}")
+    if not source.fps or source.fps > proxy.max_fps:
+        filters.append(f"fps={proxy.max_fps}")
+    return ",".join(filters) or "null"
+
+
+def _parse_rate(rate: str | None) -> float:
+    # ffprobe reports frame rates as fractions, e.g. "30000/1001"
+    if not rate:
+        return 0.0
+    num, _, den = rate.partition("/")
+    try:
+        return round(float(num) / float(den or 1), 2)
+    except (ValueError, ZeroDivisionError):
+        return 0.0
+
+
+def _rotation(video_stream: dict) -> int:
+    # Newer ffmpeg reports a display matrix (counter-clockwise degrees), older a rotate tag (clockwise)
+    for side_data in video_stream.get("side_data_list", []):
+        if "rotation" in side_data:
+            try:
+                return round(-float(side_data["rotation"])) % 360
+            except (TypeError, ValueError):
+                return 0
+    try:
+        return int(video_stream.get("tags", {}).get("rotate", 0)) % 360
+    except (TypeError, ValueError):
+        return 0
+
+
+def _non_empty(path: str) -> bool:
+    return os.path.exists(path) and os.path.getsize(path) > 0
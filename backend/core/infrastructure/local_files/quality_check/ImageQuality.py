@@ -1,4 +1,4 @@
-from Quality import Quality
+from .Quality import Quality
 import cv2
 from ..file_types.Image_file import Image_file
 
@@ -26,7 +26,7 @@ class ImageQuality(Quality):
 
     # Makes sure the image is not to blurry
     def is_not_blurry(self, threshold: int = 100.0) -> bool:
-        image = cv2.imread(self.file.path())
+        image = self.file.array()
         gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
         laplacian_var = cv2.Laplacian(gray, cv2.CV_64F).var()
 
@@ -21,5 +21,5 @@ class Quality(ABC):
             "file": str(self.file.path()),
             "valid": self.validate(),
             "issues": self.issues(),
-            "metrics": self.metrics(),
+            "metrics": self.file.metrics(),
         }
\ No newline at end of file
@@ -1,36 +1,155 @@
+from dataclasses import dataclass
+
+import cv2
+import numpy as np
+
 from ..quality_check.Quality import Quality
 from ..file_types.Video_file import Video_file
+from ..frames.FrameBuffer import decode_frames, DEFAULT_MAX_BYTES
+
+
+@dataclass(frozen=True)
+class VideoQualityThresholds:
+    min_duration: float = 1.0           # Seconds
+    max_duration: float = 60.0
+    min_side: int = 300                 # Px, shorter edge
+    min_sharpness: float = 20.0         # Median Laplacian variance of the sampled frames
+    min_brightness: float = 30.0        # Median mean luma (0-255) of the sampled frames
+    max_brightness: float = 230.0
+    sample_frames: int = 8
+    sample_width: int = 320             # Frames are scored downscaled to this width
+
+
+def laplacian_variance(frames: np.ndarray) -> np.ndarray:
+    """Sharpness of each frame of an (n, h, w) grayscale stack: variance of the
+    4-neighbour Laplacian, for all frames in one vectorized pass."""
+    f = frames.astype(np.float32)
+    laplacian = (
+        f[:, :-2, 1:-1] + f[:, 2:, 1:-1] + f[:, 1:-1, :-2] + f[:, 1:-1, 2:]
+        - 4 * f[:, 1:-1, 1:-1]
+    )
+    return laplacian.reshape(len(frames), -1).var(axis=1)
+
+
+def mean_brightness(frames: np.ndarray) -> np.ndarray:
+    return frames.reshape(len(frames), -1).mean(axis=1)
+
+
+def sample_positions(total_frames: int, count: int) -> list[int]:
+    """`count` frame indices spread over the clip (10%..90%); the first `count`
+    frames when the length is unknown."""
+    if total_frames <= 0:
+        return list(range(count))
+    return sorted({int(p) for p in np.linspace(total_frames * 0.1, total_frames * 0.9, num=count)})
+
+
+def to_gray(frames: np.ndarray, width: int) -> np.ndarray:
+    """(n, h, w, 3) BGR stack as (n, h', width) grayscale, downscaled only."""
+    gray = [cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY) for frame in frames]
+    gray = [
+        cv2.resize(g, (width, max(1, round(g.shape[0] * width / g.shape[1]))), interpolation=cv2.INTER_AREA)
+        if g.shape[1] > width else g
+        for g in gray
+    ]
+    return np.stack(gray) if gray else np.zeros((0, 0, 0), dtype=np.uint8)
+
+
+def sample_gray_frames(path: str, count: int, width: int, max_bytes: int = DEFAULT_MAX_BYTES) -> np.ndarray:
+    """`count` frames spread over the clip, grayscale, downscaled to `width`,
+    from one forward decode pass. (0, 0, 0) if nothing could be decoded."""
+    cap = cv2.VideoCapture(path)
+    total = int(cap.get(cv2.CAP_PROP_FRAME_COUNT)) if cap.isOpened() else 0
+    cap.release()
+    buffer = decode_frames(path, sample_positions(total, count), max_bytes=max_bytes, width=width, gray=True)
+    if not len(buffer):
+        return np.zeros((0, 0, 0), dtype=np.uint8)
+    return buffer.stack()
+
 
 class VideoQuality(Quality):
-    def __init__(self, file: Video_file):
+    """
+    Pre-flight checks run before a clip is sent to the model: duration and
+    resolution from the (memoised) probe, blur and exposure from a handful of
+    frames sampled once. `frames_path` lets the frames come from a smaller
+    rendition of the same clip (the model proxy) to keep decoding cheap.
+    """
+
+    def __init__(
+        self,
+        file: Video_file,
+        thresholds: VideoQualityThresholds = VideoQualityThresholds(),
+        frames_path: str | None = None,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+    ):
         super().__init__(file)
+        self.thresholds = thresholds
+        self.frames_path = frames_path
+        self.max_bytes = max_bytes
+        self._frames: np.ndarray | None = None
 
     def validate(self) -> bool:
-        return self.correct_size() and self.correct_duration()
+        return not self.issues()
 
     def issues(self) -> list[str]:
         return_list: list[str] = []
         # Dictionary for methods to test and error messages if not true
         checks = {
-            self.correct_size: "Video file is too small",
-            self.correct_duration: "Video file is too short or too long"
+            self.correct_size: "Video resolution is too low",
+            self.correct_duration: "Video is too short or too long",
+            self.decodable: "Video frames could not be decoded",
+            self.is_not_blurry: "Video is too blurry",
+            self.well_exposed: "Video is too dark or too bright",
         }
 
         for check, message in checks.items():
             if not check():
                 return_list.append(message)
+                if check == self.decodable:
+                    break       # The frame checks below have nothing to score
 
         return return_list
 
     def correct_size(self) -> bool:
-        metrics = self.file.metrics()
-        return metrics["width"] >= 300 and metrics["height"] >= 300     # TODO add more precise measurements
-    
+        probe = self.file.probe()
+        return min(probe.width, probe.height) >= self.thresholds.min_side
+
     def correct_duration(self) -> bool:
-        metrics = self.file.metrics()
-        duration = metrics["duration"]
-        # longer than 1 second, shorter than 5 seconds
-        return duration > 1 and duration < 5
-    
-    # Add more methods to test aspects bellow
-    # Also add these mehtods in self.issues dict as well self.validate 
\ No newline at end of file
+        duration = self.file.probe().duration
+        return self.thresholds.min_duration < duration < self.thresholds.max_duration
+
+    def decodable(self) -> bool:
+        return len(self.frames()) > 0
+
+    def is_not_blurry(self) -> bool:
+        return float(np.median(laplacian_variance(self.frames()))) >= self.thresholds.min_sharpness
+
+    def well_exposed(self) -> bool:
+        brightness = float(np.median(mean_brightness(self.frames())))
+        return self.thresholds.min_brightness <= brightness <= self.thresholds.max_brightness
+
+    def frames(self) -> np.ndarray:
+        """The sampled grayscale frames, decoded on first use only."""
+        if self._frames is None:
+            if self.frames_path:
+                self._frames = sample_gray_frames(
+                    self.frames_path,
+                    count=self.thresholds.sample_frames,
+                    width=self.thresholds.sample_width,
+                    max_bytes=self.max_bytes,
+                )
+            else:
+                probe = self.file.probe()
+                positions = sample_positions(round(probe.duration * probe.fps), self.thresholds.sample_frames)
+                buffer = self.file.frames(positions, max_bytes=self.max_bytes)
+                self._frames = to_gray(buffer.stack(positions), self.thresholds.sample_width)
+        return self._frames
+
+    def scores(self) -> dict:
+        frames = self.frames()
+        if not len(frames):
+            return {"frames": 0}
+        return {
+            "frames": len(frames),
+            "sharpness": round(float(np.median(laplacian_variance(frames))), 1),
+            "brightness": round(float(np.median(mean_brightness(frames))), 1),
+        }
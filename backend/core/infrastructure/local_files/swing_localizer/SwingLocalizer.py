@@ -0,0 +1,155 @@
+import shutil
+import subprocess
+from dataclasses import dataclass
+
+import numpy as np
+
+
+@dataclass(frozen=True)
+class SwingWindow:
+    start: float            # Seconds into the clip, padding included
+    end: float
+    peak: float             # Time of the highest motion energy
+    prominence: float       # Peak energy over the clip's baseline (median)
+
+    def as_dict(self) -> dict:
+        return {
+            "start": round(self.start, 3),
+            "end": round(self.end, 3),
+            "peak": round(self.peak, 3),
+            "prominence": round(self.prominence, 2),
+        }
+
+
+@dataclass(frozen=True)
+class LocalizerSettings:
+    width: int = 160                # Analysis stream: grayscale, this wide ...
+    fps: float = 30                 # ... at this frame rate
+    smooth_seconds: float = 0.1     # Moving average over the energy curve
+    threshold: float = 0.2          # Active = above baseline + threshold * (peak - baseline)
+    max_gap_seconds: float = 0.3    # Quieter stretches this short stay inside the swing (top of backswing)
+    min_prominence: float = 3.0     # Peak must be this many times the baseline to count as a swing
+    pad_before: float = 1.0         # Takeaway starts slowly, below the threshold
+    pad_after: float = 0.75         # Finish / hold
+    min_seconds: float = 1.5        # Never tighten to less than this
+
+
+def decode_gray_stream(
+    path: str,
+    width: int,
+    height: int,
+    fps: float,
+    start: float | None = None,
+    duration: float | None = None,
+) -> np.ndarray:
+    """(n, height, width) uint8 grayscale frames at `fps`, from one low-res ffmpeg decode."""
+    if shutil.which("ffmpeg") is None:
+        raise RuntimeError("ffmpeg not found on PATH")
+
+    cmd = ["ffmpeg", "-hide_banner", "-v", "error"]
+    if start is not None:
+        cmd += ["-ss", str(start)]
+    if duration is not None:
+        cmd += ["-t", str(duration)]
+    cmd += [
+        "-i", path,
+        "-an",
+        "-vf", f"fps={fps},scale={width}:{height},format=gray",
+        "-f", "rawvideo", "-pix_fmt", "gray",
+        "pipe:1",
+    ]
+    result = subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    if result.returncode != 0:
+        raise RuntimeError(f"ffmpeg decode failed: {result.stderr.decode('utf-8', errors='ignore')}")
+
+    frame_bytes = width * height
+    n = len(result.stdout) // frame_bytes
+    return np.frombuffer(result.stdout[: n * frame_bytes], dtype=np.uint8).reshape(n, height, width)
+
+
+def motion_energy(frames: np.ndarray) -> np.ndarray:
+    """Mean absolute difference between consecutive frames: energy[i] is the
+    motion from frame i to i + 1. One vectorized pass over the whole stack."""
+    if len(frames) < 2:
+        return np.zeros(0, dtype=np.float32)
+    diffs = np.abs(np.diff(frames.astype(np.int16), axis=0))
+    return diffs.reshape(len(diffs), -1).mean(axis=1).astype(np.float32)
+
+
+def find_swing_window(energy: np.ndarray, fps: float, settings: LocalizerSettings = LocalizerSettings()) -> SwingWindow | None:
+    """
+    The backswing-to-finish window in a motion energy curve, or None when no
+    single burst of motion stands out from the rest of the clip.
+
+    The swing is the active stretch (short quiet gaps bridged) with the most
+    motion in it; it is padded and clamped to the clip.
+    """
+    if len(energy) < 3:
+        return None
+
+    kernel = max(1, int(round(settings.smooth_seconds * fps)))
+    smooth = np.convolve(energy, np.ones(kernel) / kernel, mode="same")
+
+    baseline = float(np.median(smooth))
+    peak = float(smooth.max())
+    prominence = peak / max(baseline, 0.01)     # A still clip has a zero baseline
+    if prominence < settings.min_prominence:
+        return None
+
+    # Active stretches, merged across gaps of up to max_gap frames; the swing is
+    # the one carrying the most motion (not just the single highest frame, which
+    # may be someone walking through the shot)
+    active = np.flatnonzero(smooth > baseline + settings.threshold * (peak - baseline))
+    max_gap = int(round(settings.max_gap_seconds * fps))
+    segments = np.split(active, np.flatnonzero(np.diff(active) > max_gap + 1) + 1)
+    swing = max(segments, key=lambda segment: float(smooth[segment].sum()))
+    first, last = int(swing[0]), int(swing[-1])
+    peak_index = int(swing[np.argmax(smooth[swing])])
+
+    clip_end = (len(energy) + 1) / fps       # n frames give n - 1 differences
+    start = max(0.0, first / fps - settings.pad_before)
+    end = min(clip_end, (last + 1) / fps + settings.pad_after)
+    if end - start < settings.min_seconds:
+        centre = (start + end) / 2
+        start = max(0.0, centre - settings.min_seconds / 2)
+        end = min(clip_end, start + settings.min_seconds)
+
+    return SwingWindow(start=start, end=end, peak=peak_index / fps, prominence=prominence)
+
+
+def localize_swing(
+    path: str,
+    source_width: int,
+    source_height: int,
+    rotation: int = 0,
+    start: float | None = None,
+    end: float | None = None,
+    settings: LocalizerSettings = LocalizerSettings(),
+) -> SwingWindow | None:
+    """
+    Find the swing in `path` (within [start, end) when given). The returned
+    window is in seconds of the whole file, ready to trim with.
+    """
+    # ffmpeg auto-rotates, so a portrait phone clip decodes with its sides swapped
+    if rotation in (90, 270):
+        source_width, source_height = source_height, source_width
+    height = max(2, int(round(settings.width * source_height / max(source_width, 1) / 2)) * 2)
+
+    offset = start or 0.0
+    frames = decode_gray_stream(
+        path,
+        width=settings.width,
+        height=height,
+        fps=settings.fps,
+        start=start,
+        duration=(end - offset) if end is not None else None,
+    )
+    window = find_swing_window(motion_energy(frames), settings.fps, settings)
+    if window is None:
+        return None
+    return SwingWindow(
+        start=window.start + offset,
+        end=window.end + offset,
+        peak=window.peak + offset,
+        prominence=window.prominence,
+    )
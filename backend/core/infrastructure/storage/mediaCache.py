@@ -0,0 +1,187 @@
+"""Bounded local-disk LRU cache of R2 objects.
+
+Retrying a failed analysis, re-analysing a video and the backfill scripts all
+download the same video keys again. MediaCache keeps the objects it fetched on
+local disk, keyed by object key + ETag (so an object overwritten in R2 under the
+same key is a miss, never stale), and evicts least recently used files once the
+directory grows past `max_bytes`. Objects that are never overwritten (original
+uploads) can be filed under a fixed version instead, which saves the HEAD
+request for the ETag.
+
+It is shared by every process on the machine (API workers, job workers,
+scripts) through the filesystem alone:
+
+- an entry is downloaded to a unique temp file in the cache directory and
+  renamed into place (atomic), so readers never see a partial file; two
+  processes missing on the same key at once both download and one rename wins;
+- a reader opens the entry before using it, so an eviction by another process
+  (unlink) cannot pull the file out from under it;
+- recency is the file's mtime, bumped on every hit;
+- copy_to hard-links the entry to the destination when both are on the same
+  filesystem, so a hit costs no second copy of the video (callers replace or
+  remove the file they get, never write into it).
+
+Counters (hits, misses, evictions) are per process.
+"""
+
+import hashlib
+import os
+import re
+import shutil
+import tempfile
+import threading
+import time
+from typing import BinaryIO, Callable
+
+_PARTIAL_SUFFIX = ".part"
+_STALE_PARTIAL_SECONDS = 3600      # Left behind by a process that died mid-download
+
+
+class MediaCache:
+    def __init__(self, directory: str, max_bytes: int):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "evictions": 0, "evicted_bytes": 0}
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_bytes > 0
+
+    def copy_to(self, key: str, etag: str, path: str, download: Callable[[str], None]) -> bool:
+        """Put the object at `path`, from the cache if it holds this key + ETag,
+        else via `download(tmp_path)` (which fills the cache). True on a hit."""
+        with self._open(key, etag, download) as (src, hit):
+            if not _link(self.entry_path(key, etag), path):
+                with open(path, "wb") as dst:
+                    shutil.copyfileobj(src, dst, 1024 * 1024)
+        return hit
+
+    def read(self, key: str, etag: str, download: Callable[[str], None]) -> bytes:
+        with self._open(key, etag, download) as (src, _):
+            return src.read()
+
+    def stats(self) -> dict:
+        """Hits, misses, evictions and hit rate for this process."""
+        with self._lock:
+            stats = dict(self._stats)
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = stats["hits"] / lookups if lookups else 0.0
+        return stats
+
+    def evict(self, keys: list[str]) -> int:
+        """Drop every cached version of `keys` (their objects were deleted);
+        returns the number of entries removed."""
+        prefixes = {_key_digest(key) + "-" for key in keys}
+        removed = 0
+        try:
+            entries = list(os.scandir(self.directory))
+        except FileNotFoundError:
+            return 0
+        for entry in entries:
+            if entry.name[:65] in prefixes and not entry.name.endswith(_PARTIAL_SUFFIX) and _remove_quietly(entry.path):
+                removed += 1
+        return removed
+
+    def entry_path(self, key: str, etag: str) -> str:
+        safe_etag = re.sub(r"[^A-Za-z0-9-]", "", etag)
+        return os.path.join(self.directory, f"{_key_digest(key)}-{safe_etag}")
+
+    # ------------------------------ Internals ------------------------------
+
+    def _open(self, key: str, etag: str, download: Callable[[str], None]) -> "_OpenEntry":
+        path = self.entry_path(key, etag)
+        try:
+            f = open(path, "rb")
+        except FileNotFoundError:
+            pass
+        else:
+            try:
+                os.utime(path)       # Most recently used
+            except FileNotFoundError:
+                pass                 # Evicted since we opened it; our handle still reads it
+            self._count("hits")
+            return _OpenEntry(f, hit=True)
+
+        self._count("misses")
+        os.makedirs(self.directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=_PARTIAL_SUFFIX)
+        os.close(fd)
+        try:
+            download(tmp_path)
+            f = open(tmp_path, "rb")
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        self._evict()
+        return _OpenEntry(f, hit=False)
+
+    def _evict(self) -> None:
+        """Delete least recently used entries until the directory fits in max_bytes."""
+        entries = []
+        total = 0
+        now = time.time()
+        for entry in os.scandir(self.directory):
+            try:
+                st = entry.stat()
+            except FileNotFoundError:
+                continue
+            if entry.name.endswith(_PARTIAL_SUFFIX):
+                if now - st.st_mtime > _STALE_PARTIAL_SECONDS:
+                    _remove_quietly(entry.path)
+                continue
+            entries.append((st.st_mtime, st.st_size, entry.path))
+            total += st.st_size
+
+        entries.sort()
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            if _remove_quietly(path):
+                self._count("evictions")
+                self._count("evicted_bytes", size)
+            total -= size
+
+    def _count(self, name: str, amount: int = 1) -> None:
+        with self._lock:
+            self._stats[name] += amount
+
+
+class _OpenEntry:
+    """`with` yields (file, hit) and closes the file."""
+
+    def __init__(self, f: BinaryIO, hit: bool):
+        self.f = f
+        self.hit = hit
+
+    def __enter__(self) -> tuple[BinaryIO, bool]:
+        return self.f, self.hit
+
+    def __exit__(self, *exc) -> None:
+        self.f.close()
+
+
+def _key_digest(key: str) -> str:
+    return hashlib.sha256(key.encode("utf-8")).hexdigest()
+
+
+def _link(entry: str, path: str) -> bool:
+    """Hard-link `entry` over `path`; False when that isn't possible (other
+    filesystem, or the entry was evicted since it was opened)."""
+    tmp_path = f"{path}.{os.getpid()}.link"
+    try:
+        os.link(entry, tmp_path)
+    except OSError:
+        return False
+    os.replace(tmp_path, path)
+    return True
+
+
+def _remove_quietly(path: str) -> bool:
+    try:
+        os.remove(path)
+        return True
+    except FileNotFoundError:
+        return False       # Another process evicted it first
@@ -1,30 +1,179 @@
+import asyncio
+
+from .mediaCache import MediaCache
+from .r2AsyncClient import async_r2_client
 from .r2Client import r2_client
-from ...config import R2_BUCKET
+from .urlSigner import ReadUrlSigner, PresignedUrlCache
+from ...config import (
+    R2_BUCKET,
+    R2_ENDPOINT,
+    R2_ACCESS_KEY,
+    R2_SECRET_KEY,
+    R2_READ_URL_EXPIRY_SECONDS,
+    R2_READ_URL_CACHE_TTL_SECONDS,
+    R2_READ_URL_CACHE_MAX_ENTRIES,
+    THUMBNAIL_URL_EXPIRY_SECONDS,
+    THUMBNAIL_URL_WINDOW_SECONDS,
+    MEDIA_CACHE_DIR,
+    MEDIA_CACHE_MAX_MB,
+)
+
+_read_url_signer = ReadUrlSigner(R2_ENDPOINT, R2_BUCKET, R2_ACCESS_KEY, R2_SECRET_KEY)
+read_url_cache = PresignedUrlCache(
+    _read_url_signer,
+    expires_in=R2_READ_URL_EXPIRY_SECONDS,
+    ttl_seconds=R2_READ_URL_CACHE_TTL_SECONDS,
+    max_entries=R2_READ_URL_CACHE_MAX_ENTRIES,
+)
+# Immutable objects: one URL per key per window, identical in every process
+immutable_url_cache = PresignedUrlCache(
+    _read_url_signer,
+    expires_in=THUMBNAIL_URL_EXPIRY_SECONDS,
+    ttl_seconds=THUMBNAIL_URL_WINDOW_SECONDS,
+    max_entries=R2_READ_URL_CACHE_MAX_ENTRIES,
+    aligned=True,
+)
+media_cache = MediaCache(MEDIA_CACHE_DIR, max_bytes=MEDIA_CACHE_MAX_MB * 1024 * 1024)
+# Cache version of objects written once and never replaced (no ETag lookup)
+_IMMUTABLE = "immutable"
 
 
 def generate_upload_url(key: str) -> str:
     return r2_client.generate_signed_url(method="put_object", key=key, expires_in=300)
 
 
+def generate_upload_part_url(key: str, upload_id: str, part_number: int, expires_in: int) -> str:
+    return r2_client.generate_signed_url(
+        method="upload_part",
+        key=key,
+        expires_in=expires_in,
+        params={"UploadId": upload_id, "PartNumber": part_number},
+    )
+
+
 def generate_read_url(key: str) -> str:
-    return r2_client.generate_signed_url(method="get_object", key=key, expires_in=3600)
+    return read_url_cache.get_many([key])[key]
+
+
+def generate_read_urls(keys: list[str]) -> dict[str, str]:
+    """Read URLs for many keys at once (cached, misses signed in one batch)."""
+    return read_url_cache.get_many(keys)
+
+
+def generate_immutable_read_urls(keys: list[str]) -> dict[str, str]:
+    """Read URLs for content-addressed objects (thumbnails): stable for a whole
+    window so clients can cache the object under its URL."""
+    return immutable_url_cache.get_many(keys)
+
+
+def get_read_url_stats() -> dict:
+    """Both read-URL caches of this process, combined."""
+    caches = [read_url_cache.stats(), immutable_url_cache.stats()]
+    calls = sum(c["calls"] for c in caches)
+    hits = sum(c["hits"] for c in caches)
+    lookups = hits + sum(c["misses"] for c in caches)
+    return {
+        "calls": calls,
+        "hits": hits,
+        "hit_rate": hits / lookups if lookups else 0.0,
+        "signing_ms_per_call": sum(c["signing_seconds"] for c in caches) * 1000 / calls if calls else 0.0,
+    }
 
 
 def get_object(key: str) -> bytes:
-    return r2_client.get_object(key)
+    etag = _cacheable_etag(key)
+    if etag is None:
+        return r2_client.get_object(key)
+    return media_cache.read(key, etag, lambda tmp_path: r2_client.download_to_path(key, tmp_path))
+
+
+def download_to_path(key: str, path: str, immutable: bool = False) -> None:
+    """Stream an object to `path`; served from the local media cache when it
+    holds the object's current version. `immutable` objects (original uploads)
+    are never replaced, so the cache needs no HEAD request for their ETag."""
+    if immutable and media_cache.enabled:
+        etag = _IMMUTABLE
+    else:
+        etag = _cacheable_etag(key)
+    if etag is None:
+        r2_client.download_to_path(key, path)
+        return
+    media_cache.copy_to(key, etag, path, lambda tmp_path: r2_client.download_to_path(key, tmp_path))
+
+
+def get_objects(keys: list[str], concurrency: int | None = None) -> dict[str, bytes]:
+    """Fetch several objects concurrently (for sync callers; async code awaits
+    async_r2_client.get_many directly). Not callable from a running event loop."""
+    return asyncio.run(async_r2_client.get_many(keys, concurrency=concurrency))
+
+
+def delete_many(keys: list[str], concurrency: int | None = None) -> list[str]:
+    """Delete several objects concurrently; returns the keys that failed.
+    Not callable from a running event loop (await async_r2_client.delete_many)."""
+    return asyncio.run(async_r2_client.delete_many(keys, concurrency=concurrency))
+
+
+def get_media_cache_stats() -> dict:
+    return media_cache.stats()
+
+
+def evict_cached_media(keys: list[str]) -> int:
+    """Drop deleted objects from this host's media cache."""
+    return media_cache.evict(keys)
+
+
+def _cacheable_etag(key: str) -> str | None:
+    """The object's ETag when the media cache is on; None to go straight to R2
+    (cache off, or the object is missing and R2 should raise its usual error).
+    An object replaced between this HEAD and the download is filed under the old
+    ETag, which no later lookup asks for, so it can never be served stale."""
+    if not media_cache.enabled:
+        return None
+    metadata = r2_client.object_metadata(key)
+    return metadata["etag"] if metadata else None
 
 
 def object_exists(key: str) -> bool:
     return r2_client.head_object(key)
 
 
+def object_metadata(key: str) -> dict | None:
+    return r2_client.object_metadata(key)
+
+
+def create_multipart_upload(key: str, content_type: str = "application/octet-stream") -> str:
+    return r2_client.create_multipart_upload(key, content_type=content_type)
+
+
+def complete_multipart_upload(key: str, upload_id: str, parts: list[tuple[int, str]]) -> str:
+    return r2_client.complete_multipart_upload(key, upload_id, parts)
+
+
+def abort_multipart_upload(key: str, upload_id: str) -> None:
+    r2_client.abort_multipart_upload(key, upload_id)
+
+
 def delete(key: str) -> None:
     r2_client.delete_object(key)
     
     
-def put_object(key: str, data: bytes, content_type: str = "application/octet-stream") -> None:
+def put_object(
+    key: str, data: bytes, content_type: str = "application/octet-stream", cache_control: str | None = None
+) -> None:
     r2_client.put_object(
         key=key,
         data=data,
-        content_type=content_type
+        content_type=content_type,
+        cache_control=cache_control,
+    )
+
+
+def upload_from_path(
+    key: str, path: str, content_type: str = "application/octet-stream", cache_control: str | None = None
+) -> None:
+    r2_client.upload_from_path(
+        key=key,
+        path=path,
+        content_type=content_type,
+        cache_control=cache_control,
     )
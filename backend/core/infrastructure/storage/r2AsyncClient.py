@@ -0,0 +1,99 @@
+"""asyncio interface to R2.
+
+R2Client is a synchronous boto3 client: every call blocks the calling thread,
+so an async endpoint that touches R2 stalls its event loop, and code that needs
+many objects (deleting a user's media, fetching several objects) pays for them
+one round trip at a time.
+
+AsyncR2Client runs the same boto3 client (thread-safe, one shared connection
+pool) on its own bounded thread pool and exposes awaitables, so calls overlap
+without blocking the loop. Bulk operations take a `concurrency` bound on top of
+the pool size:
+
+    await async_r2_client.delete_many(keys, concurrency=8)
+
+There is no asyncio-native S3 client among our dependencies (aiobotocore is
+not one), so the pool of threads is the concurrency mechanism; the synchronous
+r2Adaptor functions for bulk work are thin wrappers that run these coroutines.
+"""
+
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Iterable
+
+from .r2Client import R2Client, r2_client
+from ...config import R2_ASYNC_WORKERS
+
+
+class AsyncR2Client:
+    def __init__(self, client: R2Client, max_workers: int):
+        self.client = client
+        self.max_workers = max_workers
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="r2-async")
+
+    async def get_object(self, key: str) -> bytes:
+        return await self._run(self.client.get_object, key)
+
+    async def put_object(
+        self,
+        key: str,
+        data: bytes,
+        content_type: str = "application/octet-stream",
+        cache_control: str | None = None,
+    ) -> None:
+        await self._run(self.client.put_object, key, data, content_type=content_type, cache_control=cache_control)
+
+    async def object_metadata(self, key: str) -> dict | None:
+        return await self._run(self.client.object_metadata, key)
+
+    async def head_object(self, key: str) -> bool:
+        return await self._run(self.client.head_object, key)
+
+    async def delete_object(self, key: str) -> None:
+        await self._run(self.client.delete_object, key)
+
+    async def generate_signed_url(self, method: str, key: str, expires_in: int, params: dict | None = None) -> str:
+        # Local computation (no request), but boto3's presigner is slow enough not to run on the loop
+        return await self._run(self.client.generate_signed_url, method, key, expires_in, params)
+
+    async def get_many(self, keys: Iterable[str], concurrency: int | None = None) -> dict[str, bytes]:
+        """Fetch several objects at once, at most `concurrency` in flight."""
+        keys = list(dict.fromkeys(keys))
+        results = await self._gather(self.get_object, keys, concurrency)
+        return dict(zip(keys, results))
+
+    async def delete_many(self, keys: Iterable[str], concurrency: int | None = None) -> list[str]:
+        """Delete several objects at once, at most `concurrency` in flight.
+        Every delete is attempted; returns the keys that failed."""
+        keys = list(dict.fromkeys(keys))
+        results = await self._gather(self.delete_object, keys, concurrency, return_exceptions=True)
+        failed = []
+        for key, result in zip(keys, results):
+            if isinstance(result, Exception):
+                print(f"Warning: Failed to delete {key} from R2: {str(result)}")
+                failed.append(key)
+        return failed
+
+    async def _gather(
+        self,
+        call: Callable[[str], Any],
+        keys: list[str],
+        concurrency: int | None,
+        return_exceptions: bool = False,
+    ) -> list:
+        semaphore = asyncio.Semaphore(min(concurrency or self.max_workers, self.max_workers))
+
+        async def bounded(key: str):
+            async with semaphore:
+                return await call(key)
+
+        return await asyncio.gather(*(bounded(key) for key in keys), return_exceptions=return_exceptions)
+
+    async def _run(self, fn: Callable, *args, **kwargs):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, functools.partial(fn, *args, **kwargs))
+
+
+# Shares the global client (and so its connection pool)
+async_r2_client = AsyncR2Client(r2_client, max_workers=R2_ASYNC_WORKERS)
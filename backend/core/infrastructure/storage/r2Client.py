@@ -1,7 +1,20 @@
+from typing import BinaryIO
 import boto3
+from boto3.s3.transfer import TransferConfig
 from botocore.client import Config
 from botocore.exceptions import ClientError
-from ...config import R2_BUCKET, R2_ENDPOINT, R2_ACCESS_KEY, R2_SECRET_KEY
+from ...config import (
+    R2_BUCKET,
+    R2_ENDPOINT,
+    R2_ACCESS_KEY,
+    R2_SECRET_KEY,
+    R2_TRANSFER_MULTIPART_THRESHOLD_MB,
+    R2_TRANSFER_CHUNK_MB,
+    R2_TRANSFER_CONCURRENCY,
+    R2_MAX_POOL_CONNECTIONS,
+)
+
+MB = 1024 * 1024
 
 class R2Client:
     
@@ -13,13 +26,19 @@ class R2Client:
             aws_access_key_id=R2_ACCESS_KEY,
             aws_secret_access_key=R2_SECRET_KEY,
             region_name="auto",
-            config=Config(signature_version="s3v4"),
+            config=Config(signature_version="s3v4", max_pool_connections=R2_MAX_POOL_CONNECTIONS),
+        )
+        self.transfer_config = TransferConfig(
+            multipart_threshold=R2_TRANSFER_MULTIPART_THRESHOLD_MB * MB,
+            multipart_chunksize=R2_TRANSFER_CHUNK_MB * MB,
+            max_concurrency=R2_TRANSFER_CONCURRENCY,
         )
 
-    def generate_signed_url(self, method: str, key: str, expires_in: int) -> str:
+    def generate_signed_url(self, method: str, key: str, expires_in: int, params: dict | None = None) -> str:
+        """`params` adds to Bucket/Key, e.g. UploadId/PartNumber for upload_part."""
         return self.s3.generate_presigned_url(
             ClientMethod=method,
-            Params={"Bucket": self.bucket, "Key": key},
+            Params={"Bucket": self.bucket, "Key": key, **(params or {})},
             ExpiresIn=expires_in,
         )
 
@@ -35,6 +54,19 @@ class R2Client:
                 return False
             raise
 
+    def object_metadata(self, key: str) -> dict | None:
+        """Size and ETag (quotes stripped) of an object, or None if it doesn't exist."""
+        try:
+            response = self.s3.head_object(
+                Bucket=self.bucket,
+                Key=key,
+            )
+        except ClientError as e:
+            if e.response["Error"]["Code"] == "404":
+                return None
+            raise
+        return {"size": response["ContentLength"], "etag": response["ETag"].strip('"')}
+
     def get_object(self, key: str) -> bytes:
         response = self.s3.get_object(
             Bucket=self.bucket,
@@ -42,19 +74,93 @@ class R2Client:
         )
         return response["Body"].read()
     
+    def download_to_path(self, key: str, path: str) -> None:
+        """Stream an object to a local file, chunk by chunk (never whole in memory)."""
+        self.s3.download_file(
+            Bucket=self.bucket,
+            Key=key,
+            Filename=path,
+            Config=self.transfer_config,
+        )
+
     def delete_object(self, key: str) -> None:
         self.s3.delete_object(
             Bucket=self.bucket,
             Key=key,
         )
         
-    def put_object(self, key: str, data: bytes, content_type: str = "application/octet-stream") -> None:
+    def put_object(
+        self,
+        key: str,
+        data: bytes,
+        content_type: str = "application/octet-stream",
+        cache_control: str | None = None,
+    ) -> None:
         self.s3.put_object(
             Bucket=self.bucket,
             Key=key,
             Body=data,
             ContentType=content_type,
+            **({"CacheControl": cache_control} if cache_control else {}),
         )
-    
+
+    def upload_from_path(
+        self,
+        key: str,
+        path: str,
+        content_type: str = "application/octet-stream",
+        cache_control: str | None = None,
+    ) -> None:
+        """Stream a local file to R2; large files go up as a multipart upload."""
+        extra_args = {"ContentType": content_type}
+        if cache_control:
+            extra_args["CacheControl"] = cache_control
+        self.s3.upload_file(
+            Filename=path,
+            Bucket=self.bucket,
+            Key=key,
+            ExtraArgs=extra_args,
+            Config=self.transfer_config,
+        )
+
+    def upload_fileobj(self, key: str, fileobj: BinaryIO, content_type: str = "application/octet-stream") -> None:
+        """Stream a readable (it need not be seekable) to R2 as it produces data;
+        multipart above the threshold, so only a few chunks are buffered."""
+        self.s3.upload_fileobj(
+            Fileobj=fileobj,
+            Bucket=self.bucket,
+            Key=key,
+            ExtraArgs={"ContentType": content_type},
+            Config=self.transfer_config,
+        )
+
+    # ------------ Multipart upload (the client uploads the parts to presigned URLs) ------------
+
+    def create_multipart_upload(self, key: str, content_type: str = "application/octet-stream") -> str:
+        response = self.s3.create_multipart_upload(
+            Bucket=self.bucket,
+            Key=key,
+            ContentType=content_type,
+        )
+        return response["UploadId"]
+
+    def complete_multipart_upload(self, key: str, upload_id: str, parts: list[tuple[int, str]]) -> str:
+        """Assemble the uploaded parts, given as (part_number, etag). Returns the object's ETag."""
+        part_list = [{"PartNumber": number, "ETag": '"' + etag.strip('"') + '"'} for number, etag in sorted(parts)]
+        response = self.s3.complete_multipart_upload(
+            Bucket=self.bucket,
+            Key=key,
+            UploadId=upload_id,
+            MultipartUpload={"Parts": part_list},
+        )
+        return response["ETag"].strip('"')
+
+    def abort_multipart_upload(self, key: str, upload_id: str) -> None:
+        self.s3.abort_multipart_upload(
+            Bucket=self.bucket,
+            Key=key,
+            UploadId=upload_id,
+        )
+
 # Instantiate a single global R2 client
 r2_client = R2Client()
@@ -0,0 +1,114 @@
+"""Write an incoming byte stream to a local file and to R2 at the same time.
+
+Used by the direct upload endpoint: the client streams the video to the API,
+which keeps a scratch copy to start processing from and forwards the same bytes
+to R2 (the durable copy any worker can fall back to). The R2 side runs on its
+own thread, fed through a small bounded queue, so a slow R2 slows the client
+down (back-pressure) instead of piling chunks up in memory.
+"""
+
+import queue
+import threading
+from typing import BinaryIO
+
+from .r2Client import r2_client
+
+_END = object()
+
+
+class UploadAborted(Exception):
+    """The incoming stream was abandoned; the R2 upload must not complete."""
+
+
+class _QueueReader:
+    """File-like view of the queue for boto3: read() blocks until data arrives."""
+
+    def __init__(self, chunks: queue.Queue):
+        self._chunks = chunks
+        self._buffer = bytearray()
+        self._ended = False
+
+    def read(self, size: int = -1) -> bytes:
+        while not self._ended and (size < 0 or len(self._buffer) < size):
+            chunk = self._chunks.get()
+            if chunk is _END:
+                self._ended = True
+            elif isinstance(chunk, UploadAborted):
+                raise chunk
+            else:
+                self._buffer += chunk
+        if size < 0:
+            size = len(self._buffer)
+        data = bytes(self._buffer[:size])
+        del self._buffer[:size]
+        return data
+
+
+class TeeUpload:
+    """
+    upload = TeeUpload(key, scratch_path, max_bytes=...)
+    for chunk in body:
+        upload.write(chunk)
+    upload.finish()        # raises if R2 failed; the scratch file is complete
+
+    abort() instead of finish() drops the R2 upload (a multipart upload is
+    aborted, nothing is stored) and leaves the caller to delete the scratch file.
+    """
+
+    def __init__(
+        self,
+        key: str,
+        scratch_path: str,
+        content_type: str = "application/octet-stream",
+        max_bytes: int | None = None,
+        queue_chunks: int = 16,
+    ):
+        self.key = key
+        self.scratch_path = scratch_path
+        self.max_bytes = max_bytes
+        self.bytes_written = 0
+        self._file: BinaryIO = open(scratch_path, "wb")
+        self._chunks: queue.Queue = queue.Queue(maxsize=queue_chunks)
+        self._error: BaseException | None = None
+        self._thread = threading.Thread(
+            target=self._upload, args=(content_type,), name=f"tee-upload-{key}", daemon=True
+        )
+        self._thread.start()
+
+    def write(self, chunk: bytes) -> None:
+        if not chunk:
+            return
+        if self._error is not None:
+            raise self._error
+        self.bytes_written += len(chunk)
+        if self.max_bytes is not None and self.bytes_written > self.max_bytes:
+            raise ValueError(f"Upload exceeds the {self.max_bytes} byte limit")
+        self._file.write(chunk)
+        self._chunks.put(chunk)
+
+    def finish(self) -> None:
+        """The stream is complete: wait for R2 to have all of it."""
+        self._file.close()
+        self._chunks.put(_END)
+        self._thread.join()
+        if self._error is not None:
+            raise self._error
+
+    def abort(self) -> None:
+        self._file.close()
+        if self._thread.is_alive():
+            self._chunks.put(UploadAborted(f"Upload of {self.key} aborted"))
+            self._thread.join()
+
+    def _upload(self, content_type: str) -> None:
+        try:
+            r2_client.upload_fileobj(self.key, _QueueReader(self._chunks), content_type=content_type)
+        except BaseException as e:
+            self._error = e
+            if isinstance(e, UploadAborted):
+                return
+            # Keep draining so a writer blocked on the full queue is released
+            while True:
+                chunk = self._chunks.get()
+                if chunk is _END or isinstance(chunk, UploadAborted):
+                    return
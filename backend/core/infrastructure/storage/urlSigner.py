@@ -0,0 +1,180 @@
+"""Presigned R2 read URLs, signed in batches and cached.
+
+List endpoints hand out a read URL for every thumbnail in a user's history on
+every call. boto3's generate_presigned_url builds a full request model and
+re-derives the SigV4 signing key for each URL, which dominated CPU for users
+with long histories. Here:
+
+- ReadUrlSigner signs a batch of GET URLs (SigV4 query auth, UNSIGNED-PAYLOAD,
+  path-style) with one timestamp and one derived signing key, so each URL costs
+  a SHA-256 and one HMAC;
+- PresignedUrlCache hands back the same URL for a key until it is
+  `ttl_seconds` old (well inside its expiry), so repeated list calls don't sign
+  at all, and records the signing time per call.
+
+With `aligned=True` the cache signs every URL as of the start of the current
+`ttl_seconds` window instead of "now". Every process then produces the very
+same URL for a key for the whole window, so client HTTP caches (which key on
+the full URL) hit across list renders, sessions and API replicas. That is what
+immutable, content-addressed objects such as thumbnails want.
+"""
+
+import hashlib
+import hmac
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import Callable, Iterable
+from urllib.parse import quote, urlparse
+
+ALGORITHM = "AWS4-HMAC-SHA256"
+UNSIGNED_PAYLOAD = "UNSIGNED-PAYLOAD"
+
+
+def _hmac(key: bytes, msg: str) -> bytes:
+    return hmac.new(key, msg.encode("utf-8"), hashlib.sha256).digest()
+
+
+def signing_key(secret_key: str, date_stamp: str, region: str, service: str = "s3") -> bytes:
+    """SigV4 key for one credential scope (date/region/service)."""
+    k_date = _hmac(f"AWS4{secret_key}".encode("utf-8"), date_stamp)
+    return _hmac(_hmac(_hmac(k_date, region), service), "aws4_request")
+
+
+def presign_get(
+    host: str,
+    path: str,
+    access_key: str,
+    key: bytes,
+    scope: str,
+    amz_date: str,
+    expires_in: int,
+) -> str:
+    """Query string that authorizes GET `path` on `host` (the SigV4 presign)."""
+    query = (
+        f"X-Amz-Algorithm={ALGORITHM}"
+        f"&X-Amz-Credential={quote(f'{access_key}/{scope}', safe='-_.~')}"
+        f"&X-Amz-Date={amz_date}"
+        f"&X-Amz-Expires={expires_in}"
+        f"&X-Amz-SignedHeaders=host"
+    )
+    canonical_request = f"GET\n{path}\n{query}\nhost:{host}\n\nhost\n{UNSIGNED_PAYLOAD}"
+    string_to_sign = f"{ALGORITHM}\n{amz_date}\n{scope}\n{hashlib.sha256(canonical_request.encode('utf-8')).hexdigest()}"
+    signature = hmac.new(key, string_to_sign.encode("utf-8"), hashlib.sha256).hexdigest()
+    return f"{query}&X-Amz-Signature={signature}"
+
+
+class ReadUrlSigner:
+    def __init__(
+        self,
+        endpoint: str,
+        bucket: str,
+        access_key: str,
+        secret_key: str,
+        region: str = "auto",
+        clock: Callable[[], float] = time.time,
+    ):
+        parsed = urlparse(endpoint)
+        self.base = f"{parsed.scheme}://{parsed.netloc}"
+        self.host = parsed.netloc
+        self.bucket = bucket
+        self.access_key = access_key
+        self.secret_key = secret_key
+        self.region = region
+        self.clock = clock
+        self._key_for_date: tuple[str, bytes] | None = None
+
+    def sign(self, keys: Iterable[str], expires_in: int, signed_at: float | None = None) -> dict[str, str]:
+        """GET URLs for `keys`, all signed at the same instant (`signed_at`,
+        default now) with one signing key."""
+        now = datetime.fromtimestamp(self.clock() if signed_at is None else signed_at, tz=timezone.utc)
+        amz_date = now.strftime("%Y%m%dT%H%M%SZ")
+        date_stamp = amz_date[:8]
+        if self._key_for_date is None or self._key_for_date[0] != date_stamp:
+            self._key_for_date = (date_stamp, signing_key(self.secret_key, date_stamp, self.region))
+        key = self._key_for_date[1]
+        scope = f"{date_stamp}/{self.region}/s3/aws4_request"
+
+        urls = {}
+        for object_key in keys:
+            path = f"/{quote(self.bucket, safe='-_.~')}/{quote(object_key, safe='/-_.~')}"
+            query = presign_get(self.host, path, self.access_key, key, scope, amz_date, expires_in)
+            urls[object_key] = f"{self.base}{path}?{query}"
+        return urls
+
+
+class PresignedUrlCache:
+    def __init__(
+        self,
+        signer: ReadUrlSigner,
+        expires_in: int,
+        ttl_seconds: int,
+        max_entries: int,
+        aligned: bool = False,
+        clock: Callable[[], float] = time.time,
+    ):
+        if ttl_seconds >= expires_in:
+            raise ValueError("ttl_seconds must be below expires_in, or cached URLs could be handed out expired")
+        self.signer = signer
+        self.expires_in = expires_in
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.aligned = aligned
+        self.clock = clock
+        self._entries: OrderedDict[str, tuple[str, float]] = OrderedDict()   # key -> (url, signed_at)
+        self._lock = threading.Lock()
+        self._stats = {"calls": 0, "hits": 0, "misses": 0, "signing_seconds": 0.0}
+
+    def get_many(self, keys: Iterable[str]) -> dict[str, str]:
+        """URLs for `keys`: cached ones while fresh, the rest signed in one batch."""
+        started = time.perf_counter()
+        now = self.clock()
+        signed_at = self._window_start(now) if self.aligned else now
+        urls: dict[str, str] = {}
+        missing: list[str] = []
+        with self._lock:
+            for key in keys:
+                entry = self._entries.get(key)
+                if entry is not None and self._fresh(entry[1], now):
+                    self._entries.move_to_end(key)
+                    urls[key] = entry[0]
+                elif key not in urls:
+                    missing.append(key)
+
+        signed = self.signer.sign(missing, self.expires_in, signed_at=signed_at) if missing else {}
+        urls.update(signed)
+
+        with self._lock:
+            for key, url in signed.items():
+                self._entries[key] = (url, signed_at)
+                self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            self._stats["calls"] += 1
+            self._stats["hits"] += len(urls) - len(signed)
+            self._stats["misses"] += len(signed)
+            self._stats["signing_seconds"] += time.perf_counter() - started
+        return urls
+
+    def stats(self) -> dict:
+        """Calls, hits/misses, hit rate and mean signing time (ms) per call, for this process."""
+        with self._lock:
+            stats = dict(self._stats)
+            stats["entries"] = len(self._entries)
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = stats["hits"] / lookups if lookups else 0.0
+        stats["signing_ms_per_call"] = stats["signing_seconds"] * 1000 / stats["calls"] if stats["calls"] else 0.0
+        return stats
+
+    def _fresh(self, signed_at: float, now: float) -> bool:
+        if self.aligned:
+            return signed_at == self._window_start(now)   # Signed in the current window
+        return now - signed_at < self.ttl_seconds
+
+    def _window_start(self, now: float) -> int:
+        return int(now) - int(now) % self.ttl_seconds
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
@@ -0,0 +1,89 @@
+"""Per-analysis stage timings and counters.
+
+The analysis pipeline runs across the service, storage, ffmpeg and provider
+layers; rather than thread a timer through all of their signatures, the worker
+opens a collector with `collect()` and every layer reports into whichever
+collector is current:
+
+    with telemetry.collect() as timings:
+        with telemetry.stage("r2_download"):
+            ...
+        telemetry.record("input_tokens", usage.prompt_token_count)
+
+Outside a collector `stage()` and `record()` do nothing, so code that is also
+used elsewhere (scripts, tests) needs no special casing. The collector lives in
+a context variable, so concurrent analyses on different threads never mix.
+"""
+
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+# Stages in pipeline order, as stored in Analysis.stage_timings (milliseconds)
+STAGES = (
+    "db_load",
+    "r2_download",
+    "swing_localize",
+    "trim",
+    "preflight",
+    "archive_upload",
+    "thumbnail",
+    "result_cache",
+    "anonymize",
+    "provider_upload",
+    "provider_processing_wait",
+    "generate_content",
+    "response_parse",
+    "db_save",
+)
+
+
+class StageTimings:
+    def __init__(self):
+        self.stages: dict[str, float] = {}      # stage -> seconds (summed if entered again)
+        self.counters: dict[str, float] = {}
+
+    def add(self, name: str, seconds: float) -> None:
+        self.stages[name] = self.stages.get(name, 0.0) + seconds
+
+    def stage_ms(self) -> dict[str, int]:
+        return {name: round(seconds * 1000) for name, seconds in self.stages.items()}
+
+
+_current: ContextVar[StageTimings | None] = ContextVar("analysis_stage_timings", default=None)
+
+
+@contextmanager
+def collect():
+    """Collect stages and counters reported inside the block."""
+    timings = StageTimings()
+    token = _current.set(timings)
+    try:
+        yield timings
+    finally:
+        _current.reset(token)
+
+
+def current() -> StageTimings | None:
+    return _current.get()
+
+
+@contextmanager
+def stage(name: str):
+    """Time the block as `name` in the current collector, if any."""
+    timings = _current.get()
+    if timings is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings.add(name, time.perf_counter() - started)
+
+
+def record(name: str, value: float | None) -> None:
+    """Set counter `name` in the current collector, if any (None is ignored)."""
+    timings = _current.get()
+    if timings is not None and value is not None:
+        timings.counters[name] = value
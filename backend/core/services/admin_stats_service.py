@@ -1,4 +1,7 @@
+from datetime import date, datetime, time, timedelta, timezone
 from sqlalchemy.orm import Session
+from core.infrastructure.db.repositories.analysis import get_stage_percentiles
+from core.infrastructure.telemetry import STAGES
 from core.infrastructure.db.repositories.drills import (
     get_drill_count,
     get_unmapped_drills_count,
@@ -12,7 +15,11 @@ from core.infrastructure.db.repositories.profiles import (
     get_profile_count,
     get_new_profiles_count,
 )
-from .dtos.admin_stats_dto import AdminStatsDTO
+from core.infrastructure.storage.r2Adaptor import get_read_url_stats
+from .analysis_result_cache import get_result_cache_stats
+from .preflight import get_preflight_stats
+from .dtos.admin_stats_dto import AdminStatsDTO, AnalysisStagePercentilesDTO
+from .exceptions import ValidationException
 
 
 def get_admin_stats(db_session: Session) -> AdminStatsDTO:
@@ -21,6 +28,9 @@ def get_admin_stats(db_session: Session) -> AdminStatsDTO:
     
     Uses efficient COUNT queries rather than fetching all records.
     """
+    result_cache = get_result_cache_stats(db_session)
+    read_urls = get_read_url_stats()
+    preflight = get_preflight_stats(days=30, db_session=db_session)
     return AdminStatsDTO(
         total_drills=get_drill_count(db_session),
         total_issues=get_issue_count(db_session),
@@ -30,4 +40,38 @@ def get_admin_stats(db_session: Session) -> AdminStatsDTO:
         issues_with_no_drills=get_issues_with_no_drills_count(db_session),
         new_users_last_7_days=get_new_profiles_count(db_session, days=7),
         new_users_last_30_days=get_new_profiles_count(db_session, days=30),
+        result_cache_entries=result_cache["entries"],
+        result_cache_hits=result_cache["hits"],
+        result_cache_hit_rate=result_cache["hit_rate"],
+        read_url_cache_hit_rate=read_urls["hit_rate"],
+        read_url_signing_ms_per_call=read_urls["signing_ms_per_call"],
+        preflight_rejected_last_30_days=preflight["rejected"],
+        preflight_reject_rate_last_30_days=preflight["reject_rate"],
     )
+
+
+def get_analysis_stage_percentiles(start: date, end: date, db_session: Session) -> list[AnalysisStagePercentilesDTO]:
+    """
+    p50/p95/p99 per pipeline stage and model_version for analyses completed
+    between `start` and `end` (inclusive UTC days), stages in pipeline order.
+    """
+    if end < start:
+        raise ValidationException("end must not be before start")
+
+    start_utc = datetime.combine(start, time.min, tzinfo=timezone.utc)
+    end_utc = datetime.combine(end + timedelta(days=1), time.min, tzinfo=timezone.utc)
+    rows = get_stage_percentiles(start_utc, end_utc, db_session)
+
+    order = {stage: i for i, stage in enumerate(STAGES)}
+    rows = sorted(rows, key=lambda r: (r.model_version, order.get(r.stage, len(order)), r.stage))
+    return [
+        AnalysisStagePercentilesDTO(
+            model_version=row.model_version,
+            stage=row.stage,
+            count=row.count,
+            p50_ms=row.p50,
+            p95_ms=row.p95,
+            p99_ms=row.p99,
+        )
+        for row in rows
+    ]
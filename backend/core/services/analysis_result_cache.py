@@ -0,0 +1,128 @@
+"""Content-addressed cache of analysis results.
+
+The model call is the slow, paid part of an analysis, and its answer depends
+only on what it is shown: the clip, the user's prompt fields, the model and the
+issue catalog it picks from. result_cache_key() hashes exactly those, so a
+re-submitted swing (same clip, same answers) reuses the stored issues instead of
+calling the model again. Entries live in the analysis_result_cache table for
+ANALYSIS_RESULT_CACHE_TTL_SECONDS and are shared by the API and every worker.
+
+Hit / miss / bypass counts are kept per process for the worker log; the
+persistent hit count per entry backs the admin stats.
+"""
+
+import hashlib
+import json
+import threading
+from uuid import UUID
+
+from sqlalchemy.orm import Session
+
+from core.config import ANALYSIS_RESULT_CACHE_TTL_SECONDS
+from core.infrastructure.db.repositories import analysis_result_cache as cache_repo
+from .dtos.analysis_service_dto import AnalysisInputsDTO, AnalysisResponseDTO
+
+_CHUNK_SIZE = 1024 * 1024
+
+_counters = {"hits": 0, "misses": 0, "bypassed": 0}
+_counters_lock = threading.Lock()
+
+
+def result_cache_enabled() -> bool:
+    return ANALYSIS_RESULT_CACHE_TTL_SECONDS > 0
+
+
+def file_digest(path: str) -> str:
+    """sha256 of a file, read in chunks."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def result_cache_key(content_digest: str, inputs: AnalysisInputsDTO) -> str:
+    """Key for everything the model's answer depends on.
+
+    The catalog enters as a digest of the block actually sent, which changes
+    whenever the catalog version does (and when the candidate narrowing picks a
+    different subset), but not for edits to issues this analysis never sees.
+    """
+    parts = {
+        "content": content_digest,
+        "model": inputs.model_version,
+        "catalog": hashlib.sha256(inputs.issue_catalog_block.encode("utf-8")).hexdigest(),
+        "shape": inputs.prompt_shape,
+        "height": inputs.prompt_height,
+        "misses": inputs.prompt_misses,
+        "extra": inputs.prompt_extra,
+    }
+    return hashlib.sha256(json.dumps(parts, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+def lookup_cached_result(cache_key: str, db_session: Session) -> dict | None:
+    """The stored model result for `cache_key` ({"issues", "club_type",
+    "camera_view"}), or None on a miss or an expired entry."""
+    entry = cache_repo.get_live_entry(cache_key, session=db_session)
+    _count("hits" if entry is not None else "misses")
+    if entry is None:
+        return None
+    return {
+        "issues": list(entry.issues),
+        "club_type": entry.club_type,
+        "camera_view": entry.camera_view,
+    }
+
+
+def record_result(analysis_id: UUID, results: AnalysisResponseDTO, db_session: Session) -> None:
+    """Store a fresh model result, or count the reuse of a cached one. Runs in
+    the transaction that saves the analysis."""
+    if not results.result_cache_key:
+        return
+    if results.result_cache_hit:
+        cache_repo.record_hit(results.result_cache_key, session=db_session)
+        return
+
+    cache_repo.delete_expired_entries(session=db_session)
+    cache_repo.store_entry(
+        cache_key=results.result_cache_key,
+        issues=[
+            {"issue_id": str(issue["issue_id"]), "confidence": issue["confidence"]}
+            for issue in results.issues
+        ],
+        club_type=results.club_type,
+        camera_view=results.camera_view,
+        source_analysis_id=analysis_id,
+        ttl_seconds=ANALYSIS_RESULT_CACHE_TTL_SECONDS,
+        session=db_session,
+    )
+
+
+def record_bypass() -> None:
+    _count("bypassed")
+
+
+def get_result_cache_counters() -> dict:
+    """This process's hits / misses / bypassed and the hit rate over lookups."""
+    with _counters_lock:
+        counters = dict(_counters)
+    lookups = counters["hits"] + counters["misses"]
+    counters["hit_rate"] = counters["hits"] / lookups if lookups else 0.0
+    return counters
+
+
+def get_result_cache_stats(db_session: Session) -> dict:
+    """Stored entries and hits across all processes. Every entry was one miss
+    that reached the model, so hits / (hits + entries) approximates the hit rate."""
+    entries = cache_repo.get_entry_count(session=db_session)
+    hits = cache_repo.get_total_hits(session=db_session)
+    return {
+        "entries": entries,
+        "hits": hits,
+        "hit_rate": hits / (hits + entries) if hits + entries else 0.0,
+    }
+
+
+def _count(name: str) -> None:
+    with _counters_lock:
+        _counters[name] += 1
@@ -2,15 +2,21 @@ from .dtos.analysis_service_dto import (
     CreateAnalysisDTO,
     GetAnalaysisIssueDTO,
     RunAnalysisDTO,
+    AnalysisInputsDTO,
     AnalysisResponseDTO,
     GetAnalaysisDTO,
     IssueSwingTimelineItemDTO,
 )
-from .exceptions import NotFoundException, InvalidStateException, InvalidVideoException
+from .exceptions import (
+    NotFoundException,
+    InvalidStateException,
+    InvalidVideoException,
+    ValidationException,
+    ForbiddenException,
+)
 
 # Infrastructure imports
-from ..infrastructure.storage.r2Adaptor import generate_upload_url, put_object
-from core.infrastructure.db.repositories import issues as issues_repo
+from ..infrastructure.storage.r2Adaptor import generate_upload_url
 from core.infrastructure.db.repositories import programs as programs_repo
 from core.infrastructure.db import models
 from ..infrastructure.db.repositories.analysis import (
@@ -24,6 +30,9 @@ from ..infrastructure.db.repositories.videos import (
     create_video,
     update_video,
     get_video_by_id,
+    update_video_thumbnail_key,
+    update_video_archive_key,
+    update_video_metadata,
 )
 from ..infrastructure.db.models.Analysis import Analysis
 from ..infrastructure.db.models.Video import Video
@@ -37,14 +46,62 @@ from ..infrastructure.db.repositories.analysis_issues import (
 
 )
 from ..infrastructure.db.models.AnalysisIssue import AnalysisIssue
-from ..infrastructure.storage.r2Adaptor import get_object
+from ..infrastructure.db.repositories.analysis_jobs import enqueue_job
+from ..infrastructure.storage.r2Adaptor import download_to_path, upload_from_path, delete as delete_r2_object
 from ..infrastructure.storage.r2Client import r2_client
 from ..infrastructure.local_files.file_types.Video_file import Video_file
+from ..infrastructure.local_files.media_pipeline.MediaPipeline import (
+    MediaPipelineResult,
+    MediaProbe,
+    ProxySettings,
+    probe_media,
+)
+from ..infrastructure.local_files.anonymizer.FaceAnonymizer import AnonymizerSettings, anonymize_video
+from ..infrastructure.local_files.swing_localizer.SwingLocalizer import (
+    LocalizerSettings,
+    SwingWindow,
+    localize_swing,
+)
 
-from ..infrastructure.AI.google.client import GoogleAnalysisClient
-from ..infrastructure.AI.google.videoAnalyzer import analyze_video
+from ..infrastructure.AI.resilience import analyze_video
+from ..infrastructure import telemetry
+from .issue_catalog import get_issue_catalog
+from .issue_candidates import select_candidate_issues, estimate_tokens
+from .analysis_result_cache import (
+    result_cache_enabled,
+    file_digest,
+    result_cache_key,
+    lookup_cached_result,
+    record_result as record_cached_result,
+    record_bypass as record_result_cache_bypass,
+    get_result_cache_counters,
+)
+from .preflight import preflight_enabled, check_video as preflight_check_video
 from ..infrastructure.AI.model_selection import get_active_analysis_model
+from ..config import (
+    ANALYSIS_JOB_MAX_ATTEMPTS,
+    ANALYSIS_PROXY_MAX_SIDE,
+    ANALYSIS_PROXY_MAX_FPS,
+    ANALYSIS_PROXY_CRF,
+    FFMPEG_DEFAULT_TIMESTAMP,
+    THUMBNAIL_UPLOAD_WORKERS,
+    IMMUTABLE_CACHE_CONTROL,
+    VIDEO_TRIM_MODE,
+    VIDEO_ENCODER_PROFILE,
+    VIDEO_TRIM_KEYFRAME_TOLERANCE_SECONDS,
+    SWING_LOCALIZER_ENABLED,
+    SWING_LOCALIZER_MAX_SECONDS,
+    SWING_LOCALIZER_MIN_SAVING_SECONDS,
+    SWING_LOCALIZER_PAD_BEFORE_SECONDS,
+    SWING_LOCALIZER_PAD_AFTER_SECONDS,
+    FACE_ANONYMIZE_ENABLED,
+    FACE_ANONYMIZE_DETECT_EVERY_N_FRAMES,
+    FACE_ANONYMIZE_DETECT_WIDTH,
+    FACE_ANONYMIZE_PIXEL_SIZE,
+)
 from uuid import UUID
+from concurrent.futures import Future, ThreadPoolExecutor
+import contextvars
 import os
 import tempfile
 from ..infrastructure.db.repositories.prompts import (
@@ -52,10 +109,21 @@ from ..infrastructure.db.repositories.prompts import (
     get_prompt_by_analysis_id,
 )
 from ..infrastructure.db.models.Prompt import Prompt
+from ..infrastructure.db.session import SessionLocal, session_scope
+from sqlalchemy.orm import Session
+from typing import Callable
 from datetime import datetime, timezone
 
 
+# How the client gets the video to us: PUT to a presigned R2 URL, or streamed to
+# the API itself (see direct_upload_service)
+UPLOAD_MODES = ("presigned", "direct")
+
+
 def create_analysis(dto: CreateAnalysisDTO, db_session) -> dict:
+    if dto.upload_mode not in UPLOAD_MODES:
+        raise ValidationException(f"upload_mode must be one of {UPLOAD_MODES}")
+
     analysis = None
     try:
         video: Video = Video(
@@ -68,6 +136,7 @@ def create_analysis(dto: CreateAnalysisDTO, db_session) -> dict:
             model_version=get_active_analysis_model(),
             video_id=video.id,
             status="awaiting_upload",
+            auto_trim=dto.auto_trim,
         )
         analysis: Analysis = create_analysis_in_db(
             analysis=analysis, session=db_session
@@ -89,9 +158,10 @@ def create_analysis(dto: CreateAnalysisDTO, db_session) -> dict:
         video.thumbnail_key = thumbnail_key
         update_video(video=video, session=db_session)
 
-        upload_url = generate_upload_url(key=video_key)
+        # Direct uploads go to the API (the endpoint knows its own URL)
+        upload_url = generate_upload_url(key=video_key) if dto.upload_mode == "presigned" else None
 
-        return {"analysis_id": analysis.id, "upload_url": upload_url}
+        return {"analysis_id": analysis.id, "upload_url": upload_url, "upload_mode": dto.upload_mode}
     except Exception as e:
         if analysis:
             try:
@@ -105,104 +175,478 @@ def create_analysis(dto: CreateAnalysisDTO, db_session) -> dict:
         raise
 
 
-def run_analysis(dto: RunAnalysisDTO, db_session) -> GetAnalaysisDTO:
-    # Check that analysis exists and is in correct state by getting that analysis object from the database with the analysis_id
+def get_own_analysis_awaiting_upload(analysis_id: UUID, user_id: UUID, db_session) -> Analysis:
+    """The analysis, if it is `user_id`'s and still waiting for its video (used
+    by the upload flows before they touch R2)."""
+    analysis_object = _get_analysis_awaiting_upload(analysis_id, db_session)
+    if str(analysis_object.user_id) != str(user_id):
+        raise ForbiddenException("Analysis belongs to another user")
+    return analysis_object
+
+
+def enqueue_analysis(dto: RunAnalysisDTO, db_session) -> GetAnalaysisDTO:
+    """Confirm the upload and queue the analysis for a worker (see app/worker.py).
+
+    Returns immediately with the analysis in 'processing'; clients poll
+    GET /analyses/{id}/ for the outcome exactly as before.
+    """
+    analysis_object: Analysis = _get_analysis_awaiting_upload(dto.analysis_id, db_session)
+
+    video = get_video_by_id(analysis_object.video_id, session=db_session)
+    if video is not None and video.multipart_upload_id is not None:
+        raise InvalidStateException("Video multipart upload has not been completed")
+
+    analysis_object.status = "processing"
+    analysis_object.started_at = datetime.now(timezone.utc)
+    analysis_object = update_analysis(analysis=analysis_object, session=db_session)
+
+    enqueue_job(
+        analysis_id=analysis_object.id,
+        max_attempts=ANALYSIS_JOB_MAX_ATTEMPTS,
+        session=db_session,
+        bypass_result_cache=dto.bypass_result_cache,
+    )
+
+    return from_analysis_object_to_dto(analysis_object)
+
+
+def run_analysis(dto: RunAnalysisDTO, session_factory: Callable[[], Session] = SessionLocal) -> GetAnalaysisDTO:
+    """Run an analysis synchronously, start to finish.
+
+    Same phases as process_analysis: one short transaction marks the analysis
+    processing and reads its inputs, the slow work runs with no connection held,
+    and a final short transaction writes the result.
+    """
+    with telemetry.collect():
+        with telemetry.stage("db_load"), session_scope(session_factory) as db_session:
+            analysis_object: Analysis = _get_analysis_awaiting_upload(dto.analysis_id, db_session)
+
+            # Set processing state on analysis object
+            analysis_object.status = "processing"
+            analysis_object.started_at = datetime.now(timezone.utc)
+            update_analysis(analysis=analysis_object, session=db_session)
+
+            inputs = load_analysis_inputs(dto.analysis_id, db_session=db_session)
+
+        try:
+            results = execute_analysis(
+                inputs,
+                cached_result=None if dto.bypass_result_cache else _result_cache_lookup(session_factory),
+            )
+            with session_scope(session_factory) as db_session:
+                saved = save_analysis_results(dto.analysis_id, results, db_session=db_session)
+            _delete_replaced_thumbnail(inputs.thumbnail_key, results.thumbnail_key)
+            return saved
+        except Exception as e:
+            try:
+                with session_scope(session_factory) as db_session:
+                    record_analysis_failure(dto.analysis_id, str(e), db_session=db_session)
+            except Exception:
+                pass  # If we can't save error state, continue with original exception
+            raise
+
+
+def process_analysis(
+    analysis_id: UUID,
+    session_factory: Callable[[], Session] = SessionLocal,
+    on_save: Callable[[Session], None] | None = None,
+    bypass_result_cache: bool = False,
+    local_video_path: str | None = None,
+) -> GetAnalaysisDTO:
+    """Do the actual work for an analysis that is already 'processing'.
+
+    Each DB phase is its own short transaction, so the pooled connection is only
+    checked out to read the inputs and to write the result — never while waiting
+    on R2, ffmpeg or the model. `on_save` runs inside the final transaction,
+    before the result is committed (the worker uses it to check its lease and
+    finish the job atomically with the result). `bypass_result_cache` skips the
+    result cache lookup, so the model is always called (its result still
+    replaces the cached one).
+
+    Raises on failure without recording it, so the caller decides whether the
+    failure is final (record_analysis_failure) or worth another attempt.
+    """
+    with telemetry.collect():
+        with telemetry.stage("db_load"), session_scope(session_factory) as db_session:
+            inputs = load_analysis_inputs(analysis_id, db_session=db_session)
+
+        results = execute_analysis(
+            inputs,
+            cached_result=None if bypass_result_cache else _result_cache_lookup(session_factory),
+            local_video_path=local_video_path,
+        )
+
+        with session_scope(session_factory) as db_session:
+            if on_save is not None:
+                with telemetry.stage("db_save"):
+                    on_save(db_session)
+            saved = save_analysis_results(analysis_id, results, db_session=db_session)
+        _delete_replaced_thumbnail(inputs.thumbnail_key, results.thumbnail_key)
+        return saved
+
+
+def load_analysis_inputs(analysis_id: UUID, db_session) -> AnalysisInputsDTO:
+    """Read everything the slow part of an analysis needs into plain values."""
     analysis_object: Analysis = get_analysis_by_id_in_db(
-        analysis_id=dto.analysis_id, session=db_session
+        analysis_id=analysis_id, session=db_session
     )
     if analysis_object is None:
-        raise NotFoundException("Analysis", str(dto.analysis_id))
-    
-    if analysis_object.status != "awaiting_upload":
-        raise InvalidStateException(f"Analysis is in '{analysis_object.status}' state, expected 'awaiting_upload'")
+        raise NotFoundException("Analysis", str(analysis_id))
+
+    if analysis_object.status != "processing":
+        raise InvalidStateException(f"Analysis is in '{analysis_object.status}' state, expected 'processing'")
+
+    # Fetch prompts for this analysis
+    prompt_object = get_prompt_by_analysis_id(analysis_id=analysis_object.id, session=db_session)
 
+    video_object: Video = get_video_by_id(
+        analysis_object.video_id, session=db_session
+    )
+    if video_object is None or not video_object.video_key:
+        raise InvalidVideoException("Analysis has no uploaded video")
+
+    trim_window = (video_object.end_time and video_object.start_time) and (video_object.end_time > video_object.start_time)
+
+    # Served from the per-process snapshot unless an issue changed since it was built,
+    # then narrowed to the issues that match what the user reported
+    issue_catalog = get_issue_catalog(db_session)
+    candidates = select_candidate_issues(
+        issue_catalog,
+        misses_text=prompt_object.prompt_misses if prompt_object else None,
+        shape=prompt_object.prompt_shape if prompt_object else None,
+        height=prompt_object.prompt_height if prompt_object else None,
+    )
+    print(
+        f"Analysis {analysis_id}: {len(candidates.issues)}/{len(issue_catalog.issues)} candidate issues, "
+        f"catalog ~{estimate_tokens(issue_catalog.block)} -> ~{estimate_tokens(candidates.block)} tokens ({candidates.reason})"
+    )
+
+    return AnalysisInputsDTO(
+        analysis_id=analysis_object.id,
+        user_id=analysis_object.user_id,
+        model_version=analysis_object.model_version,
+        video_key=video_object.video_key,
+        thumbnail_key=video_object.thumbnail_key,
+        start_seconds=video_object.start_time.total_seconds() if trim_window else None,
+        end_seconds=video_object.end_time.total_seconds() if trim_window else None,
+        prompt_shape=prompt_object.prompt_shape if prompt_object else None,
+        prompt_height=prompt_object.prompt_height if prompt_object else None,
+        prompt_misses=prompt_object.prompt_misses if prompt_object else None,
+        prompt_extra=prompt_object.prompt_extra if prompt_object else None,
+        issue_catalog=candidates.issues,
+        issue_catalog_block=candidates.block,
+        # Only the full catalog is shared between analyses, so only it goes in the context cache
+        issue_catalog_version=None if candidates.narrowed else issue_catalog.version,
+        auto_trim=bool(analysis_object.auto_trim),
+    )
+
+
+def execute_analysis(
+    inputs: AnalysisInputsDTO,
+    cached_result: Callable[[str], dict | None] | None = None,
+    local_video_path: str | None = None,
+) -> AnalysisResponseDTO:
+    """The slow part: storage, ffmpeg and the model. Touches no database itself;
+    `cached_result` looks a result cache key up (in its own short transaction)
+    and, on a hit, its issues are used instead of calling the model.
+    `local_video_path` is a copy of the upload already on this host (direct
+    upload); it is taken over (and deleted) instead of downloading from R2."""
+    if local_video_path is not None and os.path.exists(local_video_path):
+        video_file = _adopt_local_video(local_video_path)
+    else:
+        # Stream the video from R2 straight to disk; it is never held whole in memory
+        with telemetry.stage("r2_download"):
+            video_file = _download_video(inputs.video_key)
+    proxy = _model_proxy_settings()
+    media = None
+    thumbnail_upload = None
+    thumbnail_key = None
+    anonymized_path = None
     try:
-        # Set processing state on analysis object
-        analysis_object.status = "processing"
-        analysis_object.started_at = datetime.now(timezone.utc)
-        analysis_object = update_analysis(analysis=analysis_object, session=db_session)
+        # Tighten the trim to the swing itself (setup and walk-away cut off)
+        start_seconds, end_seconds = inputs.start_seconds, inputs.end_seconds
+        swing = None
+        if inputs.auto_trim and SWING_LOCALIZER_ENABLED:
+            with telemetry.stage("swing_localize"):
+                swing = _localize_swing(video_file, inputs)
+            if swing is not None:
+                start_seconds, end_seconds = swing.start, swing.end
+
+        # One ffmpeg decode: trimmed archive copy, thumbnail and (optional) model proxy
+        with telemetry.stage("trim"):
+            media = video_file.process(
+                start_seconds=start_seconds,
+                end_seconds=end_seconds,
+                thumbnail_timestamp=FFMPEG_DEFAULT_TIMESTAMP,
+                proxy=proxy,
+                trim_mode=VIDEO_TRIM_MODE,
+                encoder_profile=VIDEO_ENCODER_PROFILE,
+                keyframe_tolerance=VIDEO_TRIM_KEYFRAME_TOLERANCE_SECONDS,
+            )
+        # Fail fast on clips the model can't use (too short, tiny, blurry, dark), before any upload or model call
+        if preflight_enabled():
+            with telemetry.stage("preflight"):
+                preflight_check_video(video_file, frames_path=media.proxy_path)
+
+        # Upload the thumbnail to R2 in the background while the model works on the clip
+        thumbnail_upload = _start_thumbnail_upload(inputs.video_key, media.thumbnail_path)
+
+        # The trimmed copy goes next to the original, never over it: the video row
+        # keeps describing the original (window included), so a retry trims it again
+        archive_key = None
+        if media.trimmed:
+            archive_key = archive_object_key(inputs.video_key)
+            with telemetry.stage("archive_upload"):
+                upload_from_path(key=archive_key, path=video_file.path(), content_type="video/mp4")
+
+        # The model gets the proxy rendition when there is one
+        model_input_path = media.proxy_path or video_file.path()
+        archive_bytes = os.path.getsize(video_file.path())
+        model_input_bytes = os.path.getsize(model_input_path)
+        telemetry.record("video_bytes", model_input_bytes)
+        telemetry.record("video_duration_seconds", media.probe.duration)
+
+        # Same clip, prompt, model and catalog as an earlier analysis: reuse its result
+        cache_key = None
+        cached = None
+        if result_cache_enabled():
+            with telemetry.stage("result_cache"):
+                cache_key = result_cache_key(file_digest(model_input_path), inputs)
+                if cached_result is None:
+                    record_result_cache_bypass()
+                else:
+                    cached = cached_result(cache_key)
+            counters = get_result_cache_counters()
+            print(
+                f"Analysis {inputs.analysis_id}: result cache {'hit' if cached is not None else 'miss'} "
+                f"(process hit rate {counters['hit_rate']:.0%}, {counters['bypassed']} bypassed)"
+            )
+
+        if cached is not None:
+            analysis_results = {**cached, "success": True}
+        else:
+            # Faces are blurred before the clip leaves for the provider; the cache key stays on the raw clip
+            if FACE_ANONYMIZE_ENABLED:
+                with telemetry.stage("anonymize"):
+                    anonymized_path = _anonymize_clip(inputs, model_input_path, media)
+                model_input_path = anonymized_path
+                model_input_bytes = os.path.getsize(model_input_path)
+                telemetry.record("video_bytes", model_input_bytes)
+
+            print(f"Analysis {inputs.analysis_id}: sending {model_input_bytes} bytes to the model (archive copy {archive_bytes} bytes)")
+
+            # Start analysis process with prompts from database
+            analysis_results = (
+                analyze_video(
+                    video_path=model_input_path,
+                    user_id=inputs.user_id,
+                    shape=inputs.prompt_shape,
+                    height=inputs.prompt_height,
+                    misses=inputs.prompt_misses,
+                    extra=inputs.prompt_extra,
+                    model=inputs.model_version,
+                    issue_list=inputs.issue_catalog,
+                    issues_block=inputs.issue_catalog_block,
+                    catalog_version=inputs.issue_catalog_version,
+                )
+            )
+    finally:
+        # The thumbnail must be in R2 (or have failed) before we report completion,
+        # and its file must outlive the upload
+        thumbnail_key = _join_thumbnail_upload(thumbnail_upload)
+
+        # Delete the video file (and anything derived from it) from the temporary location
+        video_file.remove()
+        if media is not None:
+            for derived_path in (media.thumbnail_path, media.proxy_path, anonymized_path):
+                if derived_path and os.path.exists(derived_path):
+                    os.remove(derived_path)
+
+    if not analysis_results.get("success", False):
+        raise InvalidVideoException(analysis_results.get("error_message", "Video analysis failed"))
+
+    # A fallback model may have answered; its result isn't what the cache key (requested model) promises
+    answered_by = analysis_results.get("model") or inputs.model_version
+    if answered_by != inputs.model_version:
+        print(f"Analysis {inputs.analysis_id}: analysed by fallback model {answered_by} (requested {inputs.model_version})")
+        cache_key = None
+
+    # Remake into analysis results object, that contains the analysis issues and drills, and the ids of those issues and drills once they are inserted into the database
+    return AnalysisResponseDTO(
+        issues=analysis_results.get("issues", []),
+        club_type=analysis_results.get("club_type"),
+        camera_view=analysis_results.get("camera_view"),
+        model_input_params=proxy.as_dict() if media.proxy_path else None,
+        model_input_bytes=model_input_bytes,
+        archive_bytes=archive_bytes,
+        result_cache_key=cache_key,
+        result_cache_hit=cached is not None,
+        model_version=answered_by,
+        thumbnail_key=thumbnail_key,
+        archive_key=archive_key,
+        video_metadata=video_metadata(media.probe),
+        swing_window=swing.as_dict() if swing is not None else None,
+    )
+
+
+SWING_LOCALIZER_SETTINGS = LocalizerSettings(
+    pad_before=SWING_LOCALIZER_PAD_BEFORE_SECONDS,
+    pad_after=SWING_LOCALIZER_PAD_AFTER_SECONDS,
+)
 
-        # Fetch prompts for this analysis
-        prompt_object = get_prompt_by_analysis_id(analysis_id=analysis_object.id, session=db_session)
 
-        # Download the video from R2 using the video_key in analysis, and save it to a temporary location
-        video_object: Video = get_video_by_id(
-            analysis_object.video_id, session=db_session
+def _localize_swing(video_file: Video_file, inputs: AnalysisInputsDTO) -> SwingWindow | None:
+    """The swing window to trim to, or None to keep the requested window: no
+    clear swing, not worth tightening, or the localizer failed (never fatal)."""
+    try:
+        probe = video_file.probe()
+        start = inputs.start_seconds or 0.0
+        end = inputs.end_seconds if inputs.end_seconds is not None else probe.duration
+        if end - start > SWING_LOCALIZER_MAX_SECONDS:
+            print(f"Analysis {inputs.analysis_id}: {end - start:.1f}s clip too long to localize the swing")
+            return None
+        swing = localize_swing(
+            video_file.path(),
+            source_width=probe.width,
+            source_height=probe.height,
+            rotation=probe.rotation,
+            start=inputs.start_seconds,
+            end=inputs.end_seconds,
+            settings=SWING_LOCALIZER_SETTINGS,
         )
-        try:
-            video_data: bytes = get_object(video_object.video_key)
-        except Exception as e:
-            raise InvalidVideoException(f"Failed to download video from storage: {str(e)}")
-        video_file = Video_file(f=video_data)
-        if (video_object.end_time and video_object.start_time) and (video_object.end_time > video_object.start_time):
-            video_file = video_file.trim(start_seconds=video_object.start_time.total_seconds(), end_seconds=video_object.end_time.total_seconds())
-        put_object(key=video_object.video_key, data=video_file.read(), content_type="video/mp4")    # Update the video in R2 to be trimmed
-
-        # Start analysis process with prompts from database
-        analysis_results: dict = (
-            analyze_video(
-                client=GoogleAnalysisClient().client,
-                video_path=video_file.path(),
-                user_id=analysis_object.user_id,
-                shape=prompt_object.prompt_shape if prompt_object else None,
-                height=prompt_object.prompt_height if prompt_object else None,
-                misses=prompt_object.prompt_misses if prompt_object else None,
-                extra=prompt_object.prompt_extra if prompt_object else None,
-                model=analysis_object.model_version,
-                db_session=db_session,
+    except Exception as e:
+        print(f"Warning: Swing localization failed for analysis {inputs.analysis_id}: {str(e)}")
+        return None
+
+    if swing is None:
+        print(f"Analysis {inputs.analysis_id}: no clear swing found, keeping {start:.2f}-{end:.2f}s")
+        return None
+    if (end - start) - (swing.end - swing.start) < SWING_LOCALIZER_MIN_SAVING_SECONDS:
+        return None
+    print(f"Analysis {inputs.analysis_id}: swing at {swing.start:.2f}-{swing.end:.2f}s (was {start:.2f}-{end:.2f}s)")
+    return swing
+
+
+ANONYMIZER_SETTINGS = AnonymizerSettings(
+    detect_every=FACE_ANONYMIZE_DETECT_EVERY_N_FRAMES,
+    detect_width=FACE_ANONYMIZE_DETECT_WIDTH,
+    pixel_size=FACE_ANONYMIZE_PIXEL_SIZE,
+)
+
+
+def _anonymize_clip(inputs: AnalysisInputsDTO, path: str, media: MediaPipelineResult) -> str:
+    """A copy of the model input with every face pixelated. Failures propagate:
+    a clip that could not be anonymized is not sent."""
+    # The proxy is its own rendition; the archive copy was probed by the pipeline
+    probe = probe_media(path) if path == media.proxy_path else media.probe
+    out_path = os.path.splitext(path)[0] + "_anonymized.mp4"
+    stats = anonymize_video(
+        path,
+        out_path,
+        width=probe.width,
+        height=probe.height,
+        fps=probe.fps,
+        rotation=probe.rotation,
+        settings=ANONYMIZER_SETTINGS,
+    )
+    print(
+        f"Analysis {inputs.analysis_id}: anonymized {stats.frames} frames in {stats.seconds:.2f}s "
+        f"({stats.fps:.0f} fps, {stats.detections} detections, {stats.boxes} face boxes)"
+    )
+    return out_path
+
+
+def video_metadata(probe: MediaProbe) -> dict:
+    """The Video columns a probe fills in."""
+    return {
+        "duration_seconds": probe.duration,
+        "fps": probe.fps,
+        "width": probe.width,
+        "height": probe.height,
+        "rotation": probe.rotation,
+        "video_codec": probe.video_codec,
+        "size_bytes": probe.file_size,
+    }
+
+
+_thumbnail_executor = ThreadPoolExecutor(max_workers=THUMBNAIL_UPLOAD_WORKERS, thread_name_prefix="thumbnail-upload")
+
+
+def archive_object_key(video_key: str) -> str:
+    """Key of a video's trimmed archive copy, archives/{video_id}.mp4. Only
+    referenced from the video row once an analysis on it has succeeded."""
+    return f"archives/{video_key.rsplit('/', 1)[-1]}.mp4"
+
+
+def thumbnail_object_key(video_key: str, digest: str) -> str:
+    """Content-addressed thumbnail key, thumbnails/{video_id}/{sha256}.jpg. A new
+    thumbnail gets a new key, so each object can be cached as immutable."""
+    return f"thumbnails/{video_key.rsplit('/', 1)[-1]}/{digest}.jpg"
+
+
+def _start_thumbnail_upload(video_key: str, thumbnail_path: str | None) -> Future | None:
+    """Upload the thumbnail on the shared thumbnail executor; the future's result
+    is the key it was stored under. None if there is nothing to upload."""
+    if thumbnail_path is None:
+        print("Warning: Failed to generate thumbnail: no frame at the thumbnail timestamp")
+        return None
+
+    def upload() -> str:
+        with telemetry.stage("thumbnail"):
+            key = thumbnail_object_key(video_key, file_digest(thumbnail_path))
+            upload_from_path(
+                key=key,
+                path=thumbnail_path,
+                content_type="image/jpeg",
+                cache_control=IMMUTABLE_CACHE_CONTROL,
             )
-        )
-        
-        # Extract thumbnail from video and upload to R2
-        try:
-            # Create temporary file for thumbnail
-            tmp_dir = tempfile.mkdtemp()
-            local_thumb = os.path.join(tmp_dir, "thumbnail.jpg")
+        return key
+
+    # Run in a copy of this context so the upload reports into this analysis' telemetry
+    return _thumbnail_executor.submit(contextvars.copy_context().run, upload)
 
-            try:
-                # Extract thumbnail from video file
-                _extract_thumbnail_jpeg(
-                    video_file.path(),
-                    local_thumb,
-                    timestamp=1.5,
-                )
 
-                # Upload thumbnail to R2
-                with open(local_thumb, "rb") as f:
-                    put_object(
-                        key=video_object.thumbnail_key,
-                        data=f.read(),
-                        content_type="image/jpeg"
-                    )
-            finally:
-                # Cleanup thumbnail temp files
-                if os.path.exists(local_thumb):
-                    os.remove(local_thumb)
-                if os.path.exists(tmp_dir):
-                    os.rmdir(tmp_dir)
+def _delete_replaced_thumbnail(previous_key: str | None, new_key: str | None) -> Future | None:
+    """Delete the thumbnail a committed result repointed the video away from.
+    Content-addressed keys are never reused, so nothing references it any more;
+    runs on the thumbnail executor, and a failure only leaves an orphan (logged).
+    Returns the delete's Future, or None when nothing was replaced."""
+    if not previous_key or not new_key or previous_key == new_key:
+        return None
+
+    def delete_previous() -> None:
+        try:
+            delete_r2_object(previous_key)
         except Exception as e:
-            # A thumbnail failure must NOT fail an otherwise-successful analysis.
-            # Log and continue; the missing object just shows a placeholder.
-            print(f"Warning: Failed to generate thumbnail: {str(e)}")
-        finally:
-            analysis_object.completed_at = datetime.now(timezone.utc)
-            update_analysis(analysis=analysis_object, session=db_session)
-        
-        # Delete the video file from the temporary location
-        video_file.remove()
-        
-        if not analysis_results.get("success", False):
-            raise InvalidVideoException(analysis_results.get("error_message", "Video analysis failed"))
-
-        # Remake into analysis results object, that contains the analysis issues and drills, and the ids of those issues and drills once they are inserted into the database
-        analysis_results_object = AnalysisResponseDTO(
-            issues=analysis_results.get("issues", []),
-            club_type=analysis_results.get("club_type"),
-            camera_view=analysis_results.get("camera_view"),
+            print(f"Warning: Failed to delete replaced thumbnail {previous_key}: {str(e)}")
+
+    return _thumbnail_executor.submit(delete_previous)
+
+
+def _join_thumbnail_upload(thumbnail_upload: Future | None) -> str | None:
+    """The uploaded thumbnail's key, or None if there is none."""
+    if thumbnail_upload is None:
+        return None
+    try:
+        return thumbnail_upload.result()
+    except Exception as e:
+        # A thumbnail failure must NOT fail an otherwise-successful analysis.
+        # Log and continue; the missing object just shows a placeholder.
+        print(f"Warning: Failed to generate thumbnail: {str(e)}")
+        return None
+
+
+def save_analysis_results(analysis_id: UUID, results: AnalysisResponseDTO, db_session) -> GetAnalaysisDTO:
+    """Write the outcome of execute_analysis and mark the analysis completed."""
+    with telemetry.stage("db_save"):
+        analysis_object: Analysis = get_analysis_by_id_in_db(
+            analysis_id=analysis_id, session=db_session
         )
+        if analysis_object is None:
+            raise NotFoundException("Analysis", str(analysis_id))  # Deleted while we were working
 
         # Insert analysis_issues that are found in the analysis_results_object
-        for issue in analysis_results_object.issues:
+        for issue in results.issues:
             analysis_issue_object = AnalysisIssue(
                 analysis_id=analysis_object.id,
                 issue_id=issue["issue_id"],
@@ -212,26 +656,52 @@ def run_analysis(dto: RunAnalysisDTO, db_session) -> GetAnalaysisDTO:
                 analysis_issue=analysis_issue_object, session=db_session
             )
 
-        # Set completed state on analysis object
-        analysis_object.status = "completed"
-        analysis_object.success = True
-        analysis_object = update_analysis(analysis=analysis_object, session=db_session)
-        
-        return from_analysis_object_to_dto(analysis_object)
-    except Exception as e:
-        try:
-            # Discard any AnalysisIssue rows flushed before the failure so a
-            # failed analysis never persists issues (they'd otherwise leak onto
-            # the home screen while the analysis itself is filtered out).
-            delete_analysis_issues_by_analysis_id(analysis_object.id, session=db_session)
-            analysis_object.error_message = str(e)
-            analysis_object.success = False
-            analysis_object.status = "failed"
-            update_analysis(analysis=analysis_object, session=db_session)
-            db_session.commit()  # Commit error state before re-raising
-        except Exception:
-            pass  # If we can't save error state, continue with original exception
-        raise
+        # Point the video at its new (content-addressed) thumbnail; the caller
+        # deletes the one it replaces once this has committed
+        if results.thumbnail_key:
+            update_video_thumbnail_key(analysis_object.video_id, results.thumbnail_key, session=db_session)
+
+        if results.archive_key:
+            update_video_archive_key(analysis_object.video_id, results.archive_key, session=db_session)
+
+        if results.video_metadata:
+            update_video_metadata(analysis_object.video_id, results.video_metadata, session=db_session)
+
+        # Store a fresh result for reuse, or count the reuse of a cached one
+        record_cached_result(analysis_object.id, results, db_session=db_session)
+
+    # Set completed state on analysis object
+    analysis_object.status = "completed"
+    analysis_object.success = True
+    analysis_object.completed_at = datetime.now(timezone.utc)
+    analysis_object.model_input_params = results.model_input_params
+    analysis_object.model_input_bytes = results.model_input_bytes
+    analysis_object.archive_bytes = results.archive_bytes
+    if results.model_version:
+        analysis_object.model_version = results.model_version   # The model that actually answered
+    analysis_object.swing_window = results.swing_window
+    _apply_telemetry(analysis_object, telemetry.current())
+    analysis_object = update_analysis(analysis=analysis_object, session=db_session)
+
+    return from_analysis_object_to_dto(analysis_object)
+
+
+def record_analysis_failure(analysis_id: UUID, error_message: str, db_session) -> None:
+    """Mark an analysis as failed for good."""
+    analysis_object: Analysis = get_analysis_by_id_in_db(
+        analysis_id=analysis_id, session=db_session
+    )
+    if analysis_object is None:
+        return
+
+    # Discard any AnalysisIssue rows flushed before the failure so a
+    # failed analysis never persists issues (they'd otherwise leak onto
+    # the home screen while the analysis itself is filtered out).
+    delete_analysis_issues_by_analysis_id(analysis_object.id, session=db_session)
+    analysis_object.error_message = error_message
+    analysis_object.success = False
+    analysis_object.status = "failed"
+    update_analysis(analysis=analysis_object, session=db_session)
 
 
 def get_analysis_by_id(analysis_id: UUID, db_session) -> GetAnalaysisDTO:
@@ -353,6 +823,73 @@ def delete_analysis_issue(analysis_issue_id: UUID, db_session, user_id: UUID) ->
 # ------------------------------ Helper functions ------------------------------
 
 
+def _get_analysis_awaiting_upload(analysis_id: UUID, db_session) -> Analysis:
+    # Check that analysis exists and is in correct state by getting that analysis object from the database with the analysis_id
+    analysis_object: Analysis = get_analysis_by_id_in_db(
+        analysis_id=analysis_id, session=db_session
+    )
+    if analysis_object is None:
+        raise NotFoundException("Analysis", str(analysis_id))
+
+    if analysis_object.status != "awaiting_upload":
+        raise InvalidStateException(f"Analysis is in '{analysis_object.status}' state, expected 'awaiting_upload'")
+
+    return analysis_object
+
+
+def _model_proxy_settings() -> ProxySettings | None:
+    if not ANALYSIS_PROXY_MAX_SIDE:
+        return None
+    return ProxySettings(
+        max_side=ANALYSIS_PROXY_MAX_SIDE,
+        max_fps=ANALYSIS_PROXY_MAX_FPS,
+        crf=ANALYSIS_PROXY_CRF,
+    )
+
+
+def _apply_telemetry(analysis_object: Analysis, timings: telemetry.StageTimings | None) -> None:
+    # Written with the result, so db_save covers everything up to this point but not the commit
+    if timings is None:
+        return
+    analysis_object.stage_timings = timings.stage_ms()
+    analysis_object.input_tokens = timings.counters.get("input_tokens")
+    analysis_object.output_tokens = timings.counters.get("output_tokens")
+    analysis_object.cached_tokens = timings.counters.get("cached_tokens")
+    analysis_object.video_duration_seconds = timings.counters.get("video_duration_seconds")
+
+
+def _result_cache_lookup(session_factory: Callable[[], Session]) -> Callable[[str], dict | None]:
+    def lookup(cache_key: str) -> dict | None:
+        with session_scope(session_factory) as db_session:
+            return lookup_cached_result(cache_key, db_session=db_session)
+    return lookup
+
+
+def _download_video(video_key: str) -> Video_file:
+    # Stream into a temp file first; Video_file then moves it into its folder under the right extension
+    fd, download_path = tempfile.mkstemp(suffix=".download")
+    os.close(fd)
+    try:
+        download_to_path(video_key, download_path, immutable=True)    # The original upload is never overwritten
+    except Exception as e:
+        os.remove(download_path)
+        raise InvalidVideoException(f"Failed to download video from storage: {str(e)}")
+
+    try:
+        return Video_file(f=download_path)
+    except ValueError as e:
+        os.remove(download_path)
+        raise InvalidVideoException(str(e))
+
+
+def _adopt_local_video(path: str) -> Video_file:
+    try:
+        return Video_file(f=path)
+    except ValueError as e:
+        os.remove(path)
+        raise InvalidVideoException(str(e))
+
+
 def from_analysis_object_to_dto(analysis_object: Analysis) -> GetAnalaysisDTO:
     return GetAnalaysisDTO(
         analysis_id=analysis_object.id,
@@ -378,26 +915,3 @@ def from_analysis_issue_object_to_dto(
         confidence=analysis_issue_object.confidence,
         created_at=analysis_issue_object.created_at,
     )
-    
-    
-import subprocess
-
-
-def _extract_thumbnail_jpeg(
-    input_path: str,
-    output_path: str,
-    timestamp: float,
-) -> None:
-    # JPEG (mjpeg) thumbnail — decoded natively on every client, no WebP coder
-    # needed. -q:v 3 is high-quality but tiny for a single frame.
-    cmd = [
-        "ffmpeg",
-        "-y",
-        "-ss", str(timestamp),
-        "-i", input_path,
-        "-frames:v", "1",
-        "-q:v", "3",
-        output_path,
-    ]
-
-    subprocess.run(cmd, check=True)
\ No newline at end of file
@@ -0,0 +1,215 @@
+"""Drains the analysis_jobs queue: claim, run, heartbeat, retry.
+
+Any number of workers, on any number of hosts, can run this loop against the
+same database. Claiming goes through FOR UPDATE SKIP LOCKED so two workers never
+take the same job, and every claimed job carries a lease that a background
+heartbeat keeps renewing. If a worker dies mid-job its lease runs out and the
+next poll from any worker reclaims it (that counts as an attempt).
+
+Failures are retried with exponential backoff until max_attempts; failures that
+another attempt cannot fix (bad video, analysis gone / in the wrong state) are
+final on the first try. Only a final failure marks the analysis 'failed' —
+between attempts it stays 'processing', which is all the client ever polls for.
+"""
+
+import os
+import socket
+import threading
+import traceback
+import uuid
+from typing import Callable
+
+from sqlalchemy.orm import Session
+
+from core.config import (
+    ANALYSIS_JOB_LEASE_SECONDS,
+    ANALYSIS_JOB_HEARTBEAT_SECONDS,
+    ANALYSIS_JOB_POLL_SECONDS,
+    ANALYSIS_JOB_RETRY_BASE_SECONDS,
+)
+from core.infrastructure.db.session import SessionLocal, session_scope
+from core.infrastructure.db.models.AnalysisJob import AnalysisJob
+from core.infrastructure.db.repositories import analysis_jobs as jobs_repo
+from .analysis_service import process_analysis, record_analysis_failure
+from .exceptions import InvalidVideoException, InvalidStateException, NotFoundException
+
+
+# Failures a retry cannot fix.
+_TERMINAL_ERRORS = (InvalidVideoException, InvalidStateException, NotFoundException)
+
+
+class _LeaseLost(Exception):
+    """Our lease on the job expired and another worker has claimed it."""
+
+
+class AnalysisWorker:
+    def __init__(
+        self,
+        worker_id: str | None = None,
+        session_factory: Callable[[], Session] = SessionLocal,
+        lease_seconds: int = ANALYSIS_JOB_LEASE_SECONDS,
+        heartbeat_seconds: int = ANALYSIS_JOB_HEARTBEAT_SECONDS,
+        poll_seconds: float = ANALYSIS_JOB_POLL_SECONDS,
+        retry_base_seconds: int = ANALYSIS_JOB_RETRY_BASE_SECONDS,
+    ):
+        self.worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+        self.session_factory = session_factory
+        self.lease_seconds = lease_seconds
+        self.heartbeat_seconds = heartbeat_seconds
+        self.poll_seconds = poll_seconds
+        self.retry_base_seconds = retry_base_seconds
+        self._stop = threading.Event()
+
+    def stop(self) -> None:
+        """Ask the loop to exit after the job in hand (if any) is finished."""
+        self._stop.set()
+
+    def run_forever(self) -> None:
+        while not self._stop.is_set():
+            try:
+                worked = self.run_once()
+            except Exception:
+                traceback.print_exc()
+                worked = False
+            if not worked:
+                self._stop.wait(self.poll_seconds)
+
+    def run_once(self) -> bool:
+        """Claim and run at most one job. Returns False when the queue was empty."""
+        claimed = self._claim()
+        if claimed is None:
+            return False
+        self.run_job(*claimed)
+        return True
+
+    def run_job(
+        self,
+        job_id,
+        analysis_id,
+        attempts: int,
+        max_attempts: int,
+        bypass_result_cache: bool = False,
+        local_video_path: str | None = None,
+    ) -> None:
+        """Run a job this worker holds the lease on, to success, retry or failure.
+
+        `local_video_path` is the scratch copy of a direct upload; it is taken
+        over when it exists on this host, otherwise the video is downloaded
+        from R2.
+        """
+        if attempts > max_attempts:
+            # Reclaimed from a dead worker on what was already its last attempt.
+            self._finish_failed(job_id, analysis_id, "Analysis worker was lost on the final attempt")
+            return
+
+        print(f"[{self.worker_id}] running analysis {analysis_id} (attempt {attempts}/{max_attempts})")
+        heartbeat = _LeaseHeartbeat(
+            job_id=job_id,
+            worker_id=self.worker_id,
+            lease_seconds=self.lease_seconds,
+            interval_seconds=self.heartbeat_seconds,
+            session_factory=self.session_factory,
+        )
+        heartbeat.start()
+        error: Exception | None = None
+        try:
+            process_analysis(
+                analysis_id,
+                session_factory=self.session_factory,
+                on_save=lambda session: self._fence_and_finish(job_id, session),
+                bypass_result_cache=bypass_result_cache,
+                local_video_path=local_video_path,
+            )
+        except _LeaseLost:
+            # We were too slow and another worker reclaimed the job; its run wins.
+            print(f"[{self.worker_id}] lost lease on analysis {analysis_id}; discarding result")
+            return
+        except Exception as e:
+            error = e
+        finally:
+            heartbeat.stop()
+
+        if error is None:
+            return  # The job was marked succeeded in the same commit as the result
+
+        if isinstance(error, _TERMINAL_ERRORS) or attempts >= max_attempts:
+            print(f"[{self.worker_id}] analysis {analysis_id} failed: {error}")
+            self._finish_failed(job_id, analysis_id, str(error))
+        else:
+            delay = self.retry_base_seconds * (2 ** (attempts - 1))
+            print(f"[{self.worker_id}] analysis {analysis_id} attempt {attempts} failed, retrying in {delay}s: {error}")
+            self._schedule_retry(job_id, str(error), delay)
+
+    # ------------------------------ Helper functions ------------------------------
+
+    def _claim(self) -> tuple | None:
+        session = self.session_factory()
+        try:
+            job = jobs_repo.claim_next_job(self.worker_id, self.lease_seconds, session)
+            if job is None:
+                session.rollback()
+                return None
+            claimed = (
+                job.id, job.analysis_id, job.attempts, job.max_attempts, job.bypass_result_cache, job.local_video_path,
+            )
+            session.commit()  # Release the row lock; the lease now guards the job
+            return claimed
+        except Exception:
+            session.rollback()
+            raise
+        finally:
+            session.close()
+
+    def _fence_and_finish(self, job_id, session: Session) -> None:
+        """Runs inside the transaction that saves the result: only commit it if
+        we still own the job, and mark the job succeeded in the same commit."""
+        if not jobs_repo.extend_lease(job_id, self.worker_id, self.lease_seconds, session):
+            raise _LeaseLost()
+        jobs_repo.mark_job_succeeded(session.get(AnalysisJob, job_id), session)
+
+    def _schedule_retry(self, job_id, error: str, delay_seconds: float) -> None:
+        with session_scope(self.session_factory) as session:
+            if not jobs_repo.schedule_job_retry(job_id, self.worker_id, error, delay_seconds, session):
+                print(f"[{self.worker_id}] lost lease on job {job_id}; not scheduling a retry")
+
+    def _finish_failed(self, job_id, analysis_id, error: str) -> None:
+        """Fail the job and its analysis, only while this worker still owns the
+        job: after a reclaim the analysis belongs to the new owner's run (and a
+        deleted analysis takes its job with it)."""
+        with session_scope(self.session_factory) as session:
+            if not jobs_repo.mark_job_failed(job_id, self.worker_id, error, session):
+                print(f"[{self.worker_id}] lost lease on job {job_id}; not recording the failure")
+                return
+            record_analysis_failure(analysis_id, error, db_session=session)
+
+
+class _LeaseHeartbeat(threading.Thread):
+    """Renews a job's lease every `interval_seconds` until stopped."""
+
+    def __init__(self, job_id, worker_id: str, lease_seconds: int, interval_seconds: int, session_factory):
+        super().__init__(daemon=True)
+        self.job_id = job_id
+        self.worker_id = worker_id
+        self.lease_seconds = lease_seconds
+        self.interval_seconds = interval_seconds
+        self.session_factory = session_factory
+        self._stopped = threading.Event()
+
+    def stop(self) -> None:
+        self._stopped.set()
+        self.join(timeout=self.interval_seconds)
+
+    def run(self) -> None:
+        while not self._stopped.wait(self.interval_seconds):
+            session = self.session_factory()
+            try:
+                still_owned = jobs_repo.extend_lease(self.job_id, self.worker_id, self.lease_seconds, session)
+                session.commit()
+                if not still_owned:
+                    print(f"[{self.worker_id}] lease on job {self.job_id} was reclaimed")
+                    return
+            except Exception as e:
+                session.rollback()
+                print(f"Warning: Failed to renew lease on job {self.job_id}: {str(e)}")
+            finally:
+                session.close()
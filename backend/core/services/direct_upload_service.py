@@ -0,0 +1,130 @@
+"""Direct upload: the client streams the video to the API instead of to R2.
+
+The presigned flow costs a full R2 round trip before any work starts: the
+client PUTs to R2, then a worker downloads the same bytes back. Here the API
+tees the request body to a scratch file and to R2 at once (TeeUpload), and as
+soon as the body ends queues the analysis with the scratch path as a hint.
+
+The analysis itself always runs on the queue workers, never in the API
+process. A worker sharing the scratch directory takes the scratch copy over
+and skips the R2 download; any other worker downloads the R2 copy, exactly as
+for a presigned upload. Scratch copies nobody took over are swept after
+DIRECT_UPLOAD_SCRATCH_TTL_SECONDS.
+"""
+
+import os
+import time
+import uuid
+from datetime import datetime, timezone
+from typing import Callable
+from uuid import UUID
+
+from sqlalchemy.orm import Session
+
+from ..config import (
+    ANALYSIS_JOB_MAX_ATTEMPTS,
+    DIRECT_UPLOAD_MAX_MB,
+    DIRECT_UPLOAD_SCRATCH_DIR,
+    DIRECT_UPLOAD_SCRATCH_TTL_SECONDS,
+)
+from ..infrastructure.db.repositories.analysis import update_analysis
+from ..infrastructure.db.repositories.analysis_jobs import enqueue_job
+from ..infrastructure.db.repositories.videos import get_video_by_id
+from ..infrastructure.db.session import SessionLocal, session_scope
+from ..infrastructure.storage.teeUpload import TeeUpload
+from .analysis_service import from_analysis_object_to_dto, get_own_analysis_awaiting_upload
+from .dtos.analysis_service_dto import GetAnalaysisDTO, RunAnalysisDTO
+from .exceptions import ValidationException
+
+MB = 1024 * 1024
+
+
+def begin_direct_upload(
+    analysis_id: UUID, user_id: UUID, session_factory: Callable[[], Session] = SessionLocal
+) -> TeeUpload:
+    """Check the analysis is the caller's and awaiting its video, and open the
+    tee to scratch + R2. Feed it with write(), then complete_direct_upload()
+    (or abort_direct_upload() if the body did not arrive)."""
+    with session_scope(session_factory) as db_session:
+        analysis_object = get_own_analysis_awaiting_upload(analysis_id, user_id, db_session)
+        video = get_video_by_id(analysis_object.video_id, session=db_session)
+        video_key = video.video_key
+
+    os.makedirs(DIRECT_UPLOAD_SCRATCH_DIR, exist_ok=True)
+    sweep_direct_upload_scratch()
+    scratch_path = os.path.join(DIRECT_UPLOAD_SCRATCH_DIR, f"{analysis_id}-{uuid.uuid4().hex[:8]}.upload")
+    return TeeUpload(
+        key=video_key,
+        scratch_path=scratch_path,
+        content_type="video/mp4",
+        max_bytes=DIRECT_UPLOAD_MAX_MB * MB,
+    )
+
+
+def write_direct_upload(upload: TeeUpload, chunk: bytes) -> None:
+    try:
+        upload.write(chunk)
+    except ValueError as e:
+        raise ValidationException(str(e))
+
+
+def abort_direct_upload(upload: TeeUpload) -> None:
+    upload.abort()
+    if os.path.exists(upload.scratch_path):
+        os.remove(upload.scratch_path)
+
+
+def complete_direct_upload(
+    dto: RunAnalysisDTO, upload: TeeUpload, session_factory: Callable[[], Session] = SessionLocal
+) -> GetAnalaysisDTO:
+    """
+    Wait for R2 to hold the whole video, then mark the analysis processing and
+    queue it for the workers, with the scratch copy as the job's local video.
+
+    Returns the analysis (in 'processing').
+    """
+    try:
+        upload.finish()
+    except Exception:
+        abort_direct_upload(upload)
+        raise
+    if upload.bytes_written == 0:
+        abort_direct_upload(upload)
+        raise ValidationException("Empty upload")
+
+    try:
+        with session_scope(session_factory) as db_session:
+            analysis_object = get_own_analysis_awaiting_upload(dto.analysis_id, dto.user_id, db_session)
+            analysis_object.status = "processing"
+            analysis_object.started_at = datetime.now(timezone.utc)
+            analysis_object = update_analysis(analysis=analysis_object, session=db_session)
+
+            enqueue_job(
+                analysis_id=analysis_object.id,
+                max_attempts=ANALYSIS_JOB_MAX_ATTEMPTS,
+                session=db_session,
+                bypass_result_cache=dto.bypass_result_cache,
+                local_video_path=os.path.abspath(upload.scratch_path),
+            )
+            return from_analysis_object_to_dto(analysis_object)
+    except Exception:
+        os.remove(upload.scratch_path)
+        raise
+
+
+def sweep_direct_upload_scratch(max_age_seconds: int = DIRECT_UPLOAD_SCRATCH_TTL_SECONDS) -> int:
+    """Remove scratch copies older than `max_age_seconds`: their job was taken by
+    a worker that could not see them (it downloaded from R2) or never ran.
+    Returns how many were removed."""
+    if not os.path.isdir(DIRECT_UPLOAD_SCRATCH_DIR):
+        return 0
+    cutoff = time.time() - max_age_seconds
+    removed = 0
+    for entry in os.scandir(DIRECT_UPLOAD_SCRATCH_DIR):
+        try:
+            if entry.is_file() and entry.stat().st_mtime < cutoff:
+                os.remove(entry.path)
+                removed += 1
+        except FileNotFoundError:
+            pass        # Taken over by a worker meanwhile
+    return removed
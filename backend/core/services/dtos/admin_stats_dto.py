@@ -13,3 +13,22 @@ class AdminStatsDTO:
     issues_with_no_drills: int
     new_users_last_7_days: int
     new_users_last_30_days: int
+    result_cache_entries: int = 0
+    result_cache_hits: int = 0
+    result_cache_hit_rate: float = 0.0
+    read_url_cache_hit_rate: float = 0.0        # This API process only
+    read_url_signing_ms_per_call: float = 0.0   # This API process only
+    preflight_rejected_last_30_days: int = 0
+    preflight_reject_rate_last_30_days: float = 0.0     # Of finished analyses
+
+
+@dataclass(frozen=True)
+class AnalysisStagePercentilesDTO:
+    """Duration percentiles (ms) of one analysis pipeline stage for one model."""
+
+    model_version: str
+    stage: str
+    count: int
+    p50_ms: float
+    p95_ms: float
+    p99_ms: float
@@ -7,6 +7,7 @@ from datetime import datetime
 class RunAnalysisDTO:
     user_id : UUID
     analysis_id : int
+    bypass_result_cache: bool = False       # Admin re-run: always call the model
     
     
 @dataclass(frozen=True)
@@ -20,13 +21,53 @@ class CreateAnalysisDTO:
     prompt_height: str | None = None
     prompt_misses: str | None = None
     prompt_extra: str | None = None
+
+    upload_mode: str = "presigned"          # "presigned" (PUT to R2) or "direct" (stream to the API)
+    auto_trim: bool = True                  # Tighten the clip to the detected swing
     
     
+@dataclass(frozen=True)
+class AnalysisInputsDTO:
+    """Everything the slow part of an analysis needs, read up front so the
+    storage/ffmpeg/AI work runs without a database connection checked out."""
+    analysis_id: UUID
+    user_id: UUID
+    model_version: str
+
+    video_key: str
+    thumbnail_key: str | None
+    start_seconds: float | None
+    end_seconds: float | None
+
+    prompt_shape: str | None
+    prompt_height: str | None
+    prompt_misses: str | None
+    prompt_extra: str | None
+
+    issue_catalog: list[dict]
+    issue_catalog_block: str
+    issue_catalog_version: int | None       # None when narrowed to candidates (not cacheable)
+
+    auto_trim: bool = False                 # Localize the swing and tighten the trim to it
+
+
 @dataclass(frozen=True)
 class AnalysisResponseDTO:
     issues: list[dict]
     club_type: str
     camera_view: str
+
+    model_input_params: dict | None = None
+    model_input_bytes: int | None = None
+    archive_bytes: int | None = None
+
+    result_cache_key: str | None = None     # None when the result cache is off
+    result_cache_hit: bool = False          # Issues were copied from a cached result
+    model_version: str | None = None        # Model that answered (differs on fallback)
+    thumbnail_key: str | None = None        # Content-addressed key the thumbnail was stored under
+    archive_key: str | None = None          # Where the trimmed copy was stored; None if not trimmed
+    video_metadata: dict | None = None      # Probed Video columns of the archive copy (duration_seconds, fps, ...)
+    swing_window: dict | None = None        # Detected swing (start, end, peak, prominence), if localized
     
 @dataclass(frozen=True)    
 class GetAnalaysisDTO:
@@ -64,3 +105,26 @@ class GetAnalaysisIssueDTO:
     confidence: float
 
     created_at: datetime
+
+
+@dataclass(frozen=True)
+class UploadPartUrlDTO:
+    part_number: int
+    url: str
+
+
+@dataclass(frozen=True)
+class MultipartUploadDTO:
+    analysis_id: UUID
+    upload_id: str
+    part_size: int                          # Bytes; every part but the last is exactly this size
+    part_urls: list[UploadPartUrlDTO]
+    expires_in: int                         # Seconds the part URLs stay valid
+
+
+@dataclass(frozen=True)
+class CompleteMultipartUploadDTO:
+    user_id: UUID
+    analysis_id: UUID
+    parts: list[tuple[int, str]]            # (part_number, etag) of every part, as R2 returned them
+
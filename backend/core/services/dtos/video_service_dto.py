@@ -16,6 +16,14 @@ class VideoResponseDTO:
     club_type: Optional[str]
     created_at: datetime
     updated_at: datetime
+    duration_seconds: Optional[float] = None
+    fps: Optional[float] = None
+    width: Optional[int] = None
+    height: Optional[int] = None
+    rotation: Optional[int] = None
+    video_codec: Optional[str] = None
+    size_bytes: Optional[int] = None
+    archive_key: Optional[str] = None
 
 
 @dataclass
@@ -26,6 +26,7 @@ from core.services.dtos.issue_authoring_service_dto import (
     FeedbackDraftDTO,
 )
 from core.services.taxonomy import normalize_miss, normalize_goals
+from core.services.issue_catalog import bump_issue_catalog_version
 
 # Tokens too generic to be useful for dedup matching.
 _STOPWORDS = {
@@ -44,11 +45,11 @@ def _significant_tokens(text: str) -> list[str]:
 
 
 def _default_structurer(text: str, image_bytes: bytes | None, image_mime: str | None) -> dict:
-    """Lazily build the Google client so importing this module never needs an API
-    key (tests inject a fake structurer instead)."""
-    from core.infrastructure.AI.google.client import GoogleAnalysisClient
+    """Use the shared Google client, built on first use so importing this module
+    never needs an API key (tests inject a fake structurer instead)."""
+    from core.infrastructure.AI.selector import get_provider
 
-    return GoogleAnalysisClient().structure_coach_feedback(
+    return get_provider("google").structure_coach_feedback(
         text=text,
         model=get_active_analysis_model(),
         image_bytes=image_bytes,
@@ -157,6 +158,7 @@ def create_custom_issue(
     for goal in normalize_goals(issue.goals):
         new_issue.goals.append(models.IssueGoal(goal=goal))
     issue_repo.create_issue(new_issue, db_session)
+    bump_issue_catalog_version(db_session)
 
     for d in drills:
         new_drill = models.Drill(
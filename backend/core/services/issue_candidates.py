@@ -0,0 +1,83 @@
+"""Narrow the issue catalog to the candidates worth showing the model.
+
+Every issue in the prompt costs tokens (and latency) on every analysis, and most
+of them have nothing to do with what the golfer reported. The upload prompt's
+miss / wanted-shape text is mapped onto the taxonomy vocabularies and matched
+against each issue's miss / goal tags. Untagged issues are always kept (nothing
+says they are irrelevant). The wanted height has no miss or goal of its own; it
+only tells, like the shape, that the shot has a ball flight, so issues from an
+area the clip cannot be from (putting) are dropped. When the prompt gives too
+little to go on — nothing recognisable, "Inconsistent", or too few matches —
+the full catalog is used.
+"""
+
+from dataclasses import dataclass
+
+from core.config import ANALYSIS_CANDIDATE_PREFILTER, ANALYSIS_CANDIDATE_MIN
+from core.infrastructure.AI.google.prompts import serialize_issue_catalog
+from .issue_catalog import IssueCatalogSnapshot
+from .taxonomy import misses_from_prompt, goals_from_prompt, areas_from_prompt
+
+# Narrowing that keeps nearly everything isn't worth losing the cached full catalog for.
+_MAX_KEPT_FRACTION = 0.9
+
+
+@dataclass(frozen=True)
+class CandidateIssues:
+    issues: list[dict]
+    block: str
+    narrowed: bool          # False = the full catalog (and its cache) is used
+    reason: str
+
+
+def select_candidate_issues(
+    catalog: IssueCatalogSnapshot,
+    misses_text: str | None,
+    shape: str | None = None,
+    height: str | None = None,
+    min_candidates: int = ANALYSIS_CANDIDATE_MIN,
+    enabled: bool = ANALYSIS_CANDIDATE_PREFILTER,
+) -> CandidateIssues:
+    def _full(reason: str) -> CandidateIssues:
+        return CandidateIssues(issues=catalog.issues, block=catalog.block, narrowed=False, reason=reason)
+
+    if not enabled:
+        return _full("prefilter disabled")
+    if misses_text and "inconsistent" in misses_text.lower():
+        return _full("inconsistent miss reported")
+
+    misses = set(misses_from_prompt(misses_text))
+    goals = set(goals_from_prompt(sorted(misses), shape=shape, misses_text=misses_text))
+    areas = set(areas_from_prompt(sorted(misses), shape=shape, height=height, misses_text=misses_text))
+    if not misses and not goals and not areas:
+        return _full("no recognisable miss or goal in prompt")
+
+    matched, untagged = [], []
+    for issue in catalog.issues:
+        tags = catalog.tags.get(issue["issue_id"])
+        if tags is not None and areas and tags.area not in areas:
+            continue        # From an area the clip can't be from
+        if tags is None or (not tags.misses and not tags.goals):
+            untagged.append(issue)
+        elif not (misses or goals) or tags.misses & misses or tags.goals & goals:
+            matched.append(issue)
+
+    if (misses or goals) and len(matched) < min_candidates:
+        return _full(f"only {len(matched)} tagged matches (< {min_candidates})")
+
+    kept_ids = {i["issue_id"] for i in matched + untagged}
+    candidates = [i for i in catalog.issues if i["issue_id"] in kept_ids]    # Keep catalog order
+    if len(candidates) > len(catalog.issues) * _MAX_KEPT_FRACTION:
+        return _full("narrowing would keep almost every issue")
+
+    return CandidateIssues(
+        issues=candidates,
+        block=serialize_issue_catalog(candidates),
+        narrowed=True,
+        reason=f"misses={sorted(misses)} goals={sorted(goals)} areas={sorted(areas)}",
+    )
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough prompt-token estimate (~4 chars per token) for logging only."""
+    return len(text) // 4
@@ -0,0 +1,76 @@
+"""The issue catalog as the analysis model sees it, cached per process.
+
+Building it means loading every issue, shaping it for the prompt and
+serializing it — on every analysis, for a list that only changes when an issue
+is edited. Instead each process keeps one snapshot tagged with the catalog
+version (issue_catalog_version table) and rebuilds only when the stored version
+has moved on. Anything that creates, edits or deletes an issue must call
+bump_issue_catalog_version() in the same transaction.
+"""
+
+import threading
+from dataclasses import dataclass
+
+from sqlalchemy.orm import Session
+
+from core.infrastructure.db.repositories import issues as issues_repo
+from core.infrastructure.db.repositories.issue_catalog_version import (
+    get_catalog_version,
+    bump_catalog_version,
+)
+from core.infrastructure.AI.google.videoAnalyzer import build_issue_catalog
+from core.infrastructure.AI.google.prompts import serialize_issue_catalog
+
+
+@dataclass(frozen=True)
+class IssueTags:
+    area: str
+    misses: frozenset[str]
+    goals: frozenset[str]
+
+
+@dataclass(frozen=True)
+class IssueCatalogSnapshot:
+    version: int
+    issues: list[dict]              # One dict per issue, see build_issue_catalog
+    block: str                      # `issues` pre-serialized (compact JSON) for the prompt
+    tags: dict[str, IssueTags]      # issue_id -> taxonomy tags; never sent to the model
+
+
+_snapshot: IssueCatalogSnapshot | None = None
+_lock = threading.Lock()
+
+
+def get_issue_catalog(db_session: Session) -> IssueCatalogSnapshot:
+    """Current catalog snapshot; one version read when the cached copy is current."""
+    global _snapshot
+    version = get_catalog_version(db_session)
+
+    snapshot = _snapshot
+    if snapshot is not None and snapshot.version == version:
+        return snapshot
+
+    with _lock:
+        if _snapshot is None or _snapshot.version != version:
+            db_issues = issues_repo.get_all_issues(session=db_session)
+            issues = build_issue_catalog(db_issues)
+            _snapshot = IssueCatalogSnapshot(
+                version=version,
+                issues=issues,
+                block=serialize_issue_catalog(issues),
+                tags={
+                    str(issue.id): IssueTags(
+                        area=issue.area,
+                        misses=frozenset(m.miss for m in issue.misses),
+                        goals=frozenset(g.goal for g in issue.goals),
+                    )
+                    for issue in db_issues
+                },
+            )
+            print(f"Issue catalog v{version} cached ({len(issues)} issues, {len(_snapshot.block)} chars)")
+        return _snapshot
+
+
+def bump_issue_catalog_version(db_session: Session) -> int:
+    """Mark the catalog changed. Every process rebuilds its snapshot on next use."""
+    return bump_catalog_version(db_session)
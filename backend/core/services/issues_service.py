@@ -22,6 +22,7 @@ from core.infrastructure.db.models.Issue import Issue
 from core.infrastructure.db import models
 from .dtos.issues_service_dto import CreateIssueDTO, UpdateIssueDTO, IssueResponseDTO, SimplifiedIssueProgressDTO
 from core.services.exceptions import NotFoundException
+from core.services.issue_catalog import bump_issue_catalog_version
 
 from core.services.progress.analysis_issue_progress import Analysis_progress_service
 from core.services.taxonomy import normalize_miss, normalize_goals
@@ -50,6 +51,7 @@ def create_issue(dto: CreateIssueDTO, db_session: Session) -> IssueResponseDTO:
         new_issue.goals.append(models.IssueGoal(goal=goal))
 
     created_issue = repo_create_issue(new_issue, db_session)
+    bump_issue_catalog_version(db_session)
     return from_issue_to_response_dto(created_issue)
 
 
@@ -186,6 +188,7 @@ def update_issue(issue_id: UUID, dto: UpdateIssueDTO, db_session: Session) -> Is
     if dto.layman_desc is not None:
         issue.layman_desc = dto.layman_desc
     updated_issue = repo_update_issue(issue, db_session)
+    bump_issue_catalog_version(db_session)
     
     # Note: update_issue doesn't have user_id context, so progress won't be included
     return from_issue_to_response_dto(updated_issue)
@@ -197,6 +200,7 @@ def delete_issue(issue_id: UUID, db_session: Session) -> None:
     if not issue:
         raise NotFoundException(f"Issue ID not found", str(issue_id))
     repo_delete_issue(issue, db_session)
+    bump_issue_catalog_version(db_session)
 
 
 def delete_issues_bulk(issue_ids: list[UUID], db_session: Session) -> None:
@@ -205,6 +209,7 @@ def delete_issues_bulk(issue_ids: list[UUID], db_session: Session) -> None:
     if len(issues) != len(issue_ids):
         raise NotFoundException(f"One or more issues not found", str(issue_ids))
     repo_delete_issues(issues, db_session)
+    bump_issue_catalog_version(db_session)
 
 # ------------ Helper Methods ------------
 
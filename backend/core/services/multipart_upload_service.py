@@ -0,0 +1,166 @@
+"""Multipart upload: the client PUTs the video to R2 in parts, in parallel.
+
+A single presigned PUT has to succeed in one go within its expiry, which long
+clips on slow mobile connections often don't. Here the client gets one
+presigned URL per part (initiate), uploads the parts concurrently, retries only
+the parts that failed (asking for fresh URLs if they expired), then completes
+with the ETag R2 returned for each part.
+
+Completion is verified before the analysis is queued: the assembled object
+must have the declared size. Only the size is checked; the part ETags come
+from the client, so an ETag derived from them would prove nothing more.
+"""
+
+import math
+from uuid import UUID
+
+from ..config import (
+    MULTIPART_UPLOAD_PART_MB,
+    MULTIPART_UPLOAD_URL_EXPIRY_SECONDS,
+    MULTIPART_UPLOAD_MAX_MB,
+)
+from ..infrastructure.db.models.Video import Video
+from ..infrastructure.db.repositories.videos import get_video_by_id, update_video
+from ..infrastructure.storage.r2Adaptor import (
+    generate_upload_part_url,
+    create_multipart_upload,
+    complete_multipart_upload as complete_multipart_upload_in_r2,
+    abort_multipart_upload as abort_multipart_upload_in_r2,
+    object_metadata,
+    delete,
+)
+from .analysis_service import enqueue_analysis, get_own_analysis_awaiting_upload
+from .dtos.analysis_service_dto import (
+    MultipartUploadDTO,
+    UploadPartUrlDTO,
+    CompleteMultipartUploadDTO,
+    RunAnalysisDTO,
+    GetAnalaysisDTO,
+)
+from .exceptions import InvalidStateException, ValidationException
+
+MB = 1024 * 1024
+MIN_PART_BYTES = 5 * MB         # R2 / S3 minimum for every part but the last
+MAX_PARTS = 10_000
+
+
+def plan_parts(size_bytes: int, part_bytes: int = MULTIPART_UPLOAD_PART_MB * MB) -> tuple[int, int]:
+    """(part_size, part_count) for a file of `size_bytes`."""
+    part_bytes = max(part_bytes, MIN_PART_BYTES, math.ceil(size_bytes / MAX_PARTS))
+    return part_bytes, max(1, math.ceil(size_bytes / part_bytes))
+
+
+def initiate_multipart_upload(analysis_id: UUID, user_id: UUID, size_bytes: int, db_session) -> MultipartUploadDTO:
+    """Open an R2 multipart upload for the analysis' video and sign a URL per part.
+    Starting again replaces (aborts) an upload that was already open."""
+    if size_bytes <= 0:
+        raise ValidationException("size_bytes must be positive")
+    if size_bytes > MULTIPART_UPLOAD_MAX_MB * MB:
+        raise ValidationException(f"Video exceeds the {MULTIPART_UPLOAD_MAX_MB} MB limit")
+
+    video = _get_video_awaiting_upload(analysis_id, user_id, db_session)
+    if video.multipart_upload_id is not None:
+        _abort_quietly(video)
+
+    part_size, part_count = plan_parts(size_bytes)
+    upload_id = create_multipart_upload(video.video_key, content_type="video/mp4")
+    video.multipart_upload_id = upload_id
+    video.upload_size_bytes = size_bytes
+    update_video(video=video, session=db_session)
+
+    return MultipartUploadDTO(
+        analysis_id=analysis_id,
+        upload_id=upload_id,
+        part_size=part_size,
+        part_urls=_sign_parts(video, range(1, part_count + 1)),
+        expires_in=MULTIPART_UPLOAD_URL_EXPIRY_SECONDS,
+    )
+
+
+def sign_upload_parts(analysis_id: UUID, user_id: UUID, part_numbers: list[int], db_session) -> list[UploadPartUrlDTO]:
+    """Fresh URLs for the given parts of the open upload (to retry parts whose URLs expired)."""
+    video = _get_video_with_open_upload(analysis_id, user_id, db_session)
+    _, part_count = plan_parts(video.upload_size_bytes)
+    invalid = [n for n in part_numbers if not 1 <= n <= part_count]
+    if invalid:
+        raise ValidationException(f"Part numbers out of range 1..{part_count}: {invalid}")
+    return _sign_parts(video, sorted(set(part_numbers)))
+
+
+def complete_multipart_upload(dto: CompleteMultipartUploadDTO, db_session) -> GetAnalaysisDTO:
+    """
+    Assemble the parts, verify the result, and queue the analysis.
+
+    A verification failure deletes the object and leaves the analysis awaiting
+    its upload, so the client can start again. The upload is closed on R2's
+    side by then, so the cleared state is committed before the error goes out;
+    rolled back, the stale UploadId would block confirming and starting over.
+    """
+    video = _get_video_with_open_upload(dto.analysis_id, dto.user_id, db_session)
+    _, part_count = plan_parts(video.upload_size_bytes)
+    parts = sorted(dto.parts)
+    if [number for number, _ in parts] != list(range(1, part_count + 1)):
+        raise ValidationException(f"Expected ETags for parts 1..{part_count}")
+
+    complete_multipart_upload_in_r2(video.video_key, video.multipart_upload_id, parts)
+    video.multipart_upload_id = None
+    update_video(video=video, session=db_session)
+
+    stored = object_metadata(video.video_key)
+    if stored is None or stored["size"] != video.upload_size_bytes:
+        expected_size = video.upload_size_bytes
+        delete(video.video_key)
+        video.upload_size_bytes = None
+        update_video(video=video, session=db_session)
+        db_session.commit()  # Commit the closed upload before raising
+        raise ValidationException(
+            f"Uploaded video failed verification (size {stored and stored['size']} of {expected_size} bytes)"
+        )
+
+    return enqueue_analysis(RunAnalysisDTO(user_id=dto.user_id, analysis_id=dto.analysis_id), db_session=db_session)
+
+
+def abort_multipart_upload(analysis_id: UUID, user_id: UUID, db_session) -> None:
+    """Drop the open upload and the parts stored so far. No-op if none is open."""
+    video = _get_video_awaiting_upload(analysis_id, user_id, db_session)
+    if video.multipart_upload_id is None:
+        return
+    abort_multipart_upload_in_r2(video.video_key, video.multipart_upload_id)
+    video.multipart_upload_id = None
+    video.upload_size_bytes = None
+    update_video(video=video, session=db_session)
+
+
+# ------------------------------ Helper functions ------------------------------
+
+
+def _get_video_awaiting_upload(analysis_id: UUID, user_id: UUID, db_session) -> Video:
+    analysis_object = get_own_analysis_awaiting_upload(analysis_id, user_id, db_session)
+    return get_video_by_id(analysis_object.video_id, session=db_session)
+
+
+def _get_video_with_open_upload(analysis_id: UUID, user_id: UUID, db_session) -> Video:
+    video = _get_video_awaiting_upload(analysis_id, user_id, db_session)
+    if video.multipart_upload_id is None:
+        raise InvalidStateException("No multipart upload in progress for this analysis")
+    return video
+
+
+def _sign_parts(video: Video, part_numbers) -> list[UploadPartUrlDTO]:
+    return [
+        UploadPartUrlDTO(
+            part_number=number,
+            url=generate_upload_part_url(
+                video.video_key, video.multipart_upload_id, number, expires_in=MULTIPART_UPLOAD_URL_EXPIRY_SECONDS
+            ),
+        )
+        for number in part_numbers
+    ]
+
+
+def _abort_quietly(video: Video) -> None:
+    try:
+        abort_multipart_upload_in_r2(video.video_key, video.multipart_upload_id)
+    except Exception as e:
+        # Already completed/expired on R2's side; the new upload replaces it either way
+        print(f"Warning: Failed to abort multipart upload {video.multipart_upload_id}: {str(e)}")
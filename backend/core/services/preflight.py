@@ -0,0 +1,97 @@
+"""Pre-flight quality gate: reject unusable clips before paying for inference.
+
+Runs on the processed (trimmed) clip, after the media pipeline and before the
+result cache and the model. Duration and resolution come from the probe the
+pipeline already made; blur and exposure from a few frames sampled once (from
+the model proxy when there is one, so the decode is small). A clip that fails
+is rejected with an InvalidVideoException whose message starts with
+REJECT_PREFIX, which is also how rejections are counted across processes.
+"""
+
+import threading
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy.orm import Session
+
+from ..config import (
+    PREFLIGHT_ENABLED,
+    PREFLIGHT_MIN_DURATION_SECONDS,
+    PREFLIGHT_MAX_DURATION_SECONDS,
+    PREFLIGHT_MIN_SIDE,
+    PREFLIGHT_MIN_SHARPNESS,
+    PREFLIGHT_MIN_BRIGHTNESS,
+    PREFLIGHT_MAX_BRIGHTNESS,
+    PREFLIGHT_SAMPLE_FRAMES,
+    PREFLIGHT_SAMPLE_WIDTH,
+    FRAME_BUFFER_MAX_MB,
+)
+from ..infrastructure.db.repositories.analysis import get_rejection_counts
+from ..infrastructure.local_files.file_types.Video_file import Video_file
+from ..infrastructure.local_files.quality_check.VideoQuality import VideoQuality, VideoQualityThresholds
+from .exceptions import InvalidVideoException
+
+REJECT_PREFIX = "Video rejected: "
+
+THRESHOLDS = VideoQualityThresholds(
+    min_duration=PREFLIGHT_MIN_DURATION_SECONDS,
+    max_duration=PREFLIGHT_MAX_DURATION_SECONDS,
+    min_side=PREFLIGHT_MIN_SIDE,
+    min_sharpness=PREFLIGHT_MIN_SHARPNESS,
+    min_brightness=PREFLIGHT_MIN_BRIGHTNESS,
+    max_brightness=PREFLIGHT_MAX_BRIGHTNESS,
+    sample_frames=PREFLIGHT_SAMPLE_FRAMES,
+    sample_width=PREFLIGHT_SAMPLE_WIDTH,
+)
+
+_counters = {"checked": 0, "rejected": 0}
+_counters_lock = threading.Lock()
+
+
+def preflight_enabled() -> bool:
+    return PREFLIGHT_ENABLED
+
+
+def check_video(video_file: Video_file, frames_path: str | None = None) -> None:
+    """Raise InvalidVideoException (REJECT_PREFIX + reasons) if the clip fails."""
+    quality = VideoQuality(
+        video_file,
+        thresholds=THRESHOLDS,
+        frames_path=frames_path,
+        max_bytes=FRAME_BUFFER_MAX_MB * 1024 * 1024,
+    )
+    issues = quality.issues()
+    _count("checked")
+    if issues:
+        _count("rejected")
+    counters = get_preflight_counters()
+    print(
+        f"Pre-flight {'rejected' if issues else 'passed'} {quality.scores()} "
+        f"(process reject rate {counters['reject_rate']:.0%} of {counters['checked']})"
+    )
+    if issues:
+        raise InvalidVideoException(REJECT_PREFIX + "; ".join(issues))
+
+
+def get_preflight_counters() -> dict:
+    """This process's checked / rejected clips and the reject rate."""
+    with _counters_lock:
+        counters = dict(_counters)
+    counters["reject_rate"] = counters["rejected"] / counters["checked"] if counters["checked"] else 0.0
+    return counters
+
+
+def get_preflight_stats(days: int, db_session: Session) -> dict:
+    """Rejected and finished (completed or failed) analyses over the last `days`
+    days, across all workers, and the share rejected by the gate."""
+    since_utc = datetime.now(timezone.utc) - timedelta(days=days)
+    rejected, finished = get_rejection_counts(REJECT_PREFIX, since_utc=since_utc, session=db_session)
+    return {
+        "rejected": rejected,
+        "finished": finished,
+        "reject_rate": rejected / finished if finished else 0.0,
+    }
+
+
+def _count(name: str) -> None:
+    with _counters_lock:
+        _counters[name] += 1
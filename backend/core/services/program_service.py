@@ -4,6 +4,7 @@ from core.infrastructure.db.repositories import drills as drill_repo
 from core.infrastructure.db.repositories import analysis_issues as analysis_issue_repo
 from core.infrastructure.db.repositories import issues as issue_repo
 from core.services import exceptions
+from core.services.issue_catalog import bump_issue_catalog_version
 from core.services.dtos.program_service_dto import (
     ProgramDTO,
     ProgramStepDTO,
@@ -118,6 +119,7 @@ def remove_focus_for_issue(user_id: UUID, issue_id: UUID, session: Session) -> N
         if str(issue.user_id) != str(user_id):
             raise exceptions.ForbiddenException("You do not have access to this issue.")
         issue_repo.delete_issue(issue, session)
+        bump_issue_catalog_version(session)
         return
 
     for program in repo.get_programs_for_issue(user_id, issue_id, session):
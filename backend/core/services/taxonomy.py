@@ -11,6 +11,8 @@ These MUST stay in sync with the CHECK constraints on `issues.area`, `issues.kin
 (features/library/constants) mirrors the same values for display.
 """
 
+import re
+
 ALLOWED_AREAS = ("FULL_SWING", "CHIPPING", "PUTTING", "BUNKER", "PITCHING")
 
 ALLOWED_MISSES = ("SLICE", "HOOK", "PULL", "PUSH", "TOP", "THIN", "FAT", "LOW_WEAK")
@@ -43,3 +45,86 @@ def normalize_goals(values) -> list[str]:
         if v in ALLOWED_GOALS and v not in seen:
             seen.append(v)
     return seen
+
+
+# Free-text upload prompt -> vocabulary. The apps send labels like "Slice/Fade",
+# "Thin/Top", "Too Low" (prompt_misses) and "Straight, High" (prompt_shape /
+# prompt_height); matching is on lower-cased words so both apps' labels map.
+_PROMPT_MISS_WORDS = {
+    "slice": "SLICE",
+    "hook": "HOOK",
+    "pull": "PULL",
+    "push": "PUSH",
+    "top": "TOP",
+    "topped": "TOP",
+    "thin": "THIN",
+    "fat": "FAT",
+    "thick": "FAT",
+    "duff": "FAT",
+    "chunk": "FAT",
+}
+_PROMPT_LOW_WORDS = ("too low", "low and weak", "weak")
+_PROMPT_CONTACT_WORDS = ("shank", "toe", "heel")
+# Wanted shape / height ("Straight", "High"; the Expo app sends both in
+# prompt_shape, the web app height in prompt_height) and "Too High" misses
+_PROMPT_FLIGHT_WORDS = {"straight", "fade", "draw", "low", "mid", "high"}
+_FLIGHT_MISSES = {"SLICE", "HOOK", "PULL", "PUSH", "LOW_WEAK"}
+
+# Misses each goal is about, for deriving goals from a reported miss.
+_GOALS_BY_MISS = {
+    "SLICE": "STRAIGHTER",
+    "HOOK": "STRAIGHTER",
+    "PULL": "STRAIGHTER",
+    "PUSH": "STRAIGHTER",
+    "TOP": "CONTACT",
+    "THIN": "CONTACT",
+    "FAT": "CONTACT",
+    "LOW_WEAK": "DISTANCE",
+}
+
+
+def misses_from_prompt(text: str | None) -> list[str]:
+    """Known misses mentioned in a free-text prompt, order preserved."""
+    if not text:
+        return []
+    lowered = text.lower()
+    found: list[str] = []
+    for word in re.findall(r"[a-z]+", lowered):
+        miss = _PROMPT_MISS_WORDS.get(word)
+        if miss and miss not in found:
+            found.append(miss)
+    if any(w in lowered for w in _PROMPT_LOW_WORDS) and "LOW_WEAK" not in found:
+        found.append("LOW_WEAK")
+    return found
+
+
+def goals_from_prompt(misses: list[str], shape: str | None = None, misses_text: str | None = None) -> list[str]:
+    """Goals implied by the reported misses and the wanted ball flight."""
+    goals: list[str] = []
+    for miss in misses:
+        goal = _GOALS_BY_MISS.get(miss)
+        if goal and goal not in goals:
+            goals.append(goal)
+    if misses_text and any(w in misses_text.lower() for w in _PROMPT_CONTACT_WORDS) and "CONTACT" not in goals:
+        goals.append("CONTACT")
+    if shape and "straight" in shape.lower() and "STRAIGHTER" not in goals:
+        goals.append("STRAIGHTER")
+    return goals
+
+
+def areas_from_prompt(
+    misses: list[str],
+    shape: str | None = None,
+    height: str | None = None,
+    misses_text: str | None = None,
+) -> list[str]:
+    """Areas the clip can be from, or [] when the prompt doesn't say.
+
+    A wanted shape or height, or a ball-flight miss, describes a shot that
+    leaves the ground, which rules out putting. Chips, pitches and bunker shots
+    have a flight too, so nothing narrower follows from the prompt.
+    """
+    words = set(re.findall(r"[a-z]+", " ".join(t for t in (shape, height, misses_text) if t).lower()))
+    if words & _PROMPT_FLIGHT_WORDS or _FLIGHT_MISSES.intersection(misses):
+        return [area for area in ALLOWED_AREAS if area != "PUTTING"]
+    return []
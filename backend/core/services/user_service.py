@@ -12,6 +12,8 @@ from core.infrastructure.db.repositories.profiles import (
 )
 from core.infrastructure.db.repositories import user_roles as user_roles_repo
 from core.infrastructure.db.repositories.analysis import get_analysis_counts_by_user_ids
+from core.infrastructure.db.repositories.videos import get_videos_by_user_id
+from core.infrastructure.storage.r2Adaptor import delete_many as delete_r2_objects, evict_cached_media
 from core.infrastructure.db import models
 from sqlalchemy.orm import Session
 from uuid import UUID
@@ -102,11 +104,26 @@ def delete_user_by_user_id(user_id: str, user_id_to_delete: str, db_session: Ses
     if not user_to_delete:
         raise exceptions.NotFoundException("Profile not found", str(user_id_to_delete))
     
+    # Collected first: the videos rows go with the user
+    media_keys = [
+        key
+        for video in get_videos_by_user_id(UUID(str(user_to_delete.id)), db_session)
+        for key in (video.video_key, video.archive_key, video.thumbnail_key)
+        if key
+    ]
+
     admin_client: Client = create_client(SUPABASE_URL, SUPABASE_SERVICE_ROLL_KEY)
     admin_client.auth.admin.delete_user(str(user_to_delete.id))
     
     delete_profile(user_to_delete, db_session)
 
+    # Remove the user's media from R2 concurrently. A failure only leaves an
+    # orphaned object behind (logged), so it does not fail the deletion.
+    if media_keys:
+        failed = delete_r2_objects(media_keys)
+        print(f"Deleted {len(media_keys) - len(failed)}/{len(media_keys)} media objects of user {user_to_delete.id}")
+        evict_cached_media(media_keys)
+
 
 # -------- Helper functions --------
 
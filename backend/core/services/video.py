@@ -1,3 +1,5 @@
+import re
+
 from sqlalchemy.orm import Session
 from uuid import UUID
 
@@ -9,10 +11,18 @@ from core.infrastructure.db.repositories.videos import (
 )
 from core.infrastructure.db.models.Video import Video
 from core.infrastructure.db.session import SessionLocal
-from core.infrastructure.storage.r2Adaptor import generate_read_url
+from core.infrastructure.storage.r2Adaptor import (
+    generate_read_url,
+    generate_read_urls,
+    generate_immutable_read_urls,
+)
 from .exceptions import NotFoundException
 from .dtos.video_service_dto import VideoResponseDTO, VideoUrlResponseDTO, VideoThumbnailListResponseDTO
 
+# thumbnails/{video_id}/{sha256}.jpg (analysis_service.thumbnail_object_key); the
+# legacy thumbnails/{video_id}.jpg is overwritten in place, so it isn't immutable
+_CONTENT_ADDRESSED_THUMBNAIL = re.compile(r"^thumbnails/[^/]+/[0-9a-f]{64}\.jpg$")
+
 
 def get_video_by_id(video_id: UUID, db_session: Session) -> VideoResponseDTO:
     """Get a video by its ID."""
@@ -33,20 +43,27 @@ def get_video_read_url_by_analysis(analysis_id: UUID, db_session: Session) -> Vi
     if not video.video_key:
         raise NotFoundException("Video key", f"for analysis {analysis_id}")
     
-    video_url = generate_read_url(video.video_key)
+    # The trimmed copy once there is one, else the original upload
+    video_url = generate_read_url(video.archive_key or video.video_key)
     return VideoUrlResponseDTO(video_url=video_url)
 
 
 def get_video_thumbnail_urls_from_analyses(analysis_ids: list[UUID], db_session: Session) -> VideoThumbnailListResponseDTO:
     videos: list[Video] = repo_get_videos_by_analysis_ids(analysis_ids, db_session)
-    thumbnail_urls = {}
-    for video in videos:
-        if video.thumbnail_key:
-            url: str = generate_read_url(video.thumbnail_key)
-            thumbnail_urls[video.id] = url
+    keys = [video.thumbnail_key for video in videos if video.thumbnail_key]
+    immutable_keys = [key for key in keys if is_content_addressed_thumbnail(key)]
+    urls = generate_immutable_read_urls(immutable_keys)
+    urls.update(generate_read_urls([key for key in keys if key not in urls]))
+    thumbnail_urls = {video.id: urls[video.thumbnail_key] for video in videos if video.thumbnail_key}
     return VideoThumbnailListResponseDTO(thumbnail_urls=thumbnail_urls)
 
 
+def is_content_addressed_thumbnail(key: str) -> bool:
+    """True for keys whose object never changes, which may be signed (and
+    cached by clients) as immutable."""
+    return bool(_CONTENT_ADDRESSED_THUMBNAIL.match(key))
+
+
 def delete_video(video_id: UUID, db_session: Session) -> None:
     """Delete a video by its ID."""
     video = repo_get_video_by_id(video_id, db_session)
@@ -69,4 +86,12 @@ def from_video_to_response_dto(video: Video) -> VideoResponseDTO:
         club_type=video.club_type,
         created_at=video.created_at,
         updated_at=video.updated_at,
+        duration_seconds=video.duration_seconds,
+        fps=video.fps,
+        width=video.width,
+        height=video.height,
+        rotation=video.rotation,
+        video_codec=video.video_codec,
+        size_bytes=video.size_bytes,
+        archive_key=video.archive_key,
     )
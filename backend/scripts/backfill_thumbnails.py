@@ -2,11 +2,14 @@
 One-off backfill: regenerate analysis thumbnails as JPEG.
 
 The app generates JPEG thumbnails now (clients couldn't decode the old WebP).
-This regenerates a JPEG for every video that has a thumbnail_key, from the
-video still stored in R2, and repoints thumbnail_key at the new `.jpg` object.
+This regenerates a JPEG for every video whose thumbnail_key is still a legacy
+key, from the video still stored in R2, stores it content-addressed
+(thumbnails/{video_id}/{sha256}.jpg, immutable Cache-Control) as the analysis
+pipeline does, repoints thumbnail_key at it and deletes the legacy object.
 
-Idempotent — safe to re-run. Videos whose source object is gone are skipped
-(their thumbnail stays absent and the app shows a placeholder).
+Idempotent — safe to re-run; videos already on a content-addressed thumbnail
+are left alone. Videos whose source object is gone are skipped (their
+thumbnail stays absent and the app shows a placeholder).
 
 Run from the backend/ directory:
 
@@ -27,43 +30,63 @@ from sqlalchemy import select  # noqa: E402
 
 from core.infrastructure.db.session import SessionLocal  # noqa: E402
 from core.infrastructure.db.models.Video import Video  # noqa: E402
-from core.infrastructure.storage.r2Adaptor import get_object, put_object  # noqa: E402
+from core.config import IMMUTABLE_CACHE_CONTROL, FFMPEG_DEFAULT_TIMESTAMP  # noqa: E402
+from core.infrastructure.storage.r2Adaptor import (  # noqa: E402
+    download_to_path,
+    upload_from_path,
+    delete_many,
+    get_media_cache_stats,
+)
 from core.infrastructure.local_files.file_types.Video_file import Video_file  # noqa: E402
-from core.services.analysis_service import _extract_thumbnail_jpeg  # noqa: E402
+from core.services.analysis_result_cache import file_digest  # noqa: E402
+from core.services.analysis_service import thumbnail_object_key  # noqa: E402
+from core.services.video import is_content_addressed_thumbnail  # noqa: E402
 
 
 def main() -> None:
     db = SessionLocal()
     regenerated = 0
     skipped = 0
+    replaced_keys = []
     try:
         videos = db.execute(
             select(Video).where(Video.thumbnail_key.isnot(None))
         ).scalars().all()
-        print(f"Videos with a thumbnail_key: {len(videos)}")
+        videos = [video for video in videos if not is_content_addressed_thumbnail(video.thumbnail_key)]
+        print(f"Videos with a legacy thumbnail_key: {len(videos)}")
 
         for video in videos:
-            new_key = f"thumbnails/{video.id}.jpg"
-
             if not video.video_key:
                 print(f"  skip {video.id}: no video_key")
                 skipped += 1
                 continue
 
+            fd, download_path = tempfile.mkstemp(suffix=".download")
+            os.close(fd)
             try:
-                video_data = get_object(video.video_key)
+                download_to_path(video.video_key, download_path, immutable=True)
+                video_file = Video_file(f=download_path)
             except Exception as e:
                 print(f"  skip {video.id}: source video missing ({e})")
+                if os.path.exists(download_path):
+                    os.remove(download_path)
                 skipped += 1
                 continue
 
-            video_file = Video_file(f=video_data)
-            tmp_dir = tempfile.mkdtemp()
-            local_thumb = os.path.join(tmp_dir, "thumbnail.jpg")
+            thumbnail_path = None
             try:
-                _extract_thumbnail_jpeg(video_file.path(), local_thumb, timestamp=1.5)
-                with open(local_thumb, "rb") as f:
-                    put_object(key=new_key, data=f.read(), content_type="image/jpeg")
+                # The analysis pipeline's own thumbnail encoder (no trim, no proxy)
+                thumbnail_path = video_file.process(thumbnail_timestamp=FFMPEG_DEFAULT_TIMESTAMP).thumbnail_path
+                if thumbnail_path is None:
+                    raise RuntimeError("no frame at the thumbnail timestamp")
+                new_key = thumbnail_object_key(video.video_key, file_digest(thumbnail_path))
+                upload_from_path(
+                    key=new_key,
+                    path=thumbnail_path,
+                    content_type="image/jpeg",
+                    cache_control=IMMUTABLE_CACHE_CONTROL,
+                )
+                replaced_keys.append(video.thumbnail_key)
                 video.thumbnail_key = new_key
                 db.add(video)
                 regenerated += 1
@@ -72,14 +95,17 @@ def main() -> None:
                 print(f"  skip {video.id}: extract/upload failed ({e})")
                 skipped += 1
             finally:
-                if os.path.exists(local_thumb):
-                    os.remove(local_thumb)
-                if os.path.exists(tmp_dir):
-                    os.rmdir(tmp_dir)
+                if thumbnail_path and os.path.exists(thumbnail_path):
+                    os.remove(thumbnail_path)
                 video_file.remove()
 
         db.commit()
-        print(f"Done. regenerated={regenerated} skipped={skipped}")
+        # Only once nothing points at them any more
+        failed = delete_many(replaced_keys) if replaced_keys else []
+        if failed:
+            print(f"  could not delete {len(failed)} legacy thumbnails: {failed}")
+        cache = get_media_cache_stats()
+        print(f"Done. regenerated={regenerated} skipped={skipped} media_cache_hits={cache['hits']} misses={cache['misses']}")
     finally:
         db.close()
 
@@ -0,0 +1,162 @@
+"""
+Benchmark: per-consumer frame decoding vs. the shared frame buffer.
+
+Writes a synthetic clip with OpenCV, then serves the same consumers both ways:
+
+  per-consumer  how keyframes, face blur and the quality checks used to read
+                frames: every consumer reopens the clip and seeks to each frame
+                (cap.set(CAP_PROP_POS_FRAMES)), and every keyframe round-trips
+                through a JPEG on disk (write, imread for the face blur, write,
+                imread again for the blur check).
+  shared        one forward decode of the union of the frame indices into a
+                FrameBuffer; consumers read views of the in-memory array and
+                each keyframe is written to disk once.
+
+Prints wall time, decode passes and buffer memory. Needs OpenCV only; touches
+no ffmpeg, database or storage.
+
+Run from the backend/ directory:
+
+    python -m scripts.benchmark_frames
+    python -m scripts.benchmark_frames --duration 20 --size 1920x1080 --keyframes 8 --repeat 5
+    python -m scripts.benchmark_frames --no-faces
+"""
+
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+import cv2
+import numpy as np
+
+# Make `core` importable when run as a plain script from backend/.
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.infrastructure.local_files.file_types.Image_file import pixelate_faces  # noqa: E402
+from core.infrastructure.local_files.frames.FrameBuffer import DEFAULT_MAX_BYTES, decode_frames  # noqa: E402
+from core.infrastructure.local_files.quality_check.VideoQuality import (  # noqa: E402
+    sample_positions,
+    to_gray,
+)
+
+
+def make_clip(path: str, duration: float, width: int, height: int, fps: int) -> None:
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"mp4v"), fps, (width, height))
+    rng = np.random.default_rng(0)
+    background = rng.integers(0, 255, (height, width, 3), dtype=np.uint8)
+    for i in range(int(duration * fps)):
+        frame = np.roll(background, i * 4, axis=1)
+        cv2.putText(frame, str(i), (20, height // 2), cv2.FONT_HERSHEY_SIMPLEX, 3, (255, 255, 255), 6)
+        writer.write(frame)
+    writer.release()
+
+
+def keyframe_positions(total: int, count: int) -> list[int]:
+    start, end = int(total * 0.25), int(total * 0.75)
+    return [start + i * ((end - start) // count) for i in range(count)]
+
+
+def per_consumer(path: str, keyframes: list[int], samples: list[int], out_dir: str, width: int, blur) -> dict:
+    passes = 0
+
+    # Keyframes: seek per frame, write a JPEG, re-read it for the face blur, write again
+    cap = cv2.VideoCapture(path)
+    passes += 1
+    paths = []
+    for i, index in enumerate(keyframes):
+        cap.set(cv2.CAP_PROP_POS_FRAMES, index)
+        ok, frame = cap.read()
+        if not ok:
+            continue
+        jpeg = os.path.join(out_dir, f"legacy_{i}.jpg")
+        cv2.imwrite(jpeg, frame)
+        img = blur(cv2.imread(jpeg))
+        cv2.imwrite(jpeg, img)
+        paths.append(jpeg)
+    cap.release()
+
+    # Image blur check: read every keyframe back from disk
+    for jpeg in paths:
+        cv2.Laplacian(cv2.cvtColor(cv2.imread(jpeg), cv2.COLOR_BGR2GRAY), cv2.CV_64F).var()
+
+    # Video quality sample: its own capture and seeks
+    cap = cv2.VideoCapture(path)
+    passes += 1
+    frames = []
+    for index in samples:
+        cap.set(cv2.CAP_PROP_POS_FRAMES, index)
+        ok, frame = cap.read()
+        if ok:
+            frames.append(frame)
+    cap.release()
+    to_gray(np.stack(frames), width)
+
+    return {"passes": passes, "buffer_mb": 0.0}
+
+
+def shared(path: str, keyframes: list[int], samples: list[int], out_dir: str, width: int, max_bytes: int, blur) -> dict:
+    buffer = decode_frames(path, keyframes + samples, max_bytes=max_bytes)
+
+    for i, index in enumerate(keyframes):
+        if index not in buffer:
+            continue
+        img = blur(buffer.get(index).copy())
+        cv2.Laplacian(cv2.cvtColor(img, cv2.COLOR_BGR2GRAY), cv2.CV_64F).var()
+        cv2.imwrite(os.path.join(out_dir, f"shared_{i}.jpg"), img)
+
+    to_gray(buffer.stack(samples), width)
+
+    return {"passes": 1, "buffer_mb": buffer.nbytes / 1024 / 1024}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--duration", type=float, default=10.0, help="Clip length in seconds")
+    parser.add_argument("--size", default="1280x720", help="WIDTHxHEIGHT")
+    parser.add_argument("--fps", type=int, default=30)
+    parser.add_argument("--keyframes", type=int, default=6)
+    parser.add_argument("--samples", type=int, default=8, help="Quality-check frames")
+    parser.add_argument("--sample-width", type=int, default=320)
+    parser.add_argument("--max-mb", type=int, default=DEFAULT_MAX_BYTES // 1024 // 1024, help="Frame buffer cap")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--no-faces", action="store_true", help="Skip face detection to time frame access alone")
+    args = parser.parse_args()
+
+    width, height = (int(v) for v in args.size.split("x"))
+    work_dir = tempfile.mkdtemp(prefix="benchmark_frames_")
+    try:
+        clip = os.path.join(work_dir, "clip.mp4")
+        print(f"Writing {args.duration:g}s {args.size} @ {args.fps} fps test clip ...")
+        make_clip(clip, args.duration, width, height, args.fps)
+
+        total = int(args.duration * args.fps)
+        keyframes = keyframe_positions(total, args.keyframes)
+        samples = sample_positions(total, args.samples)
+
+        blur = (lambda img: img) if args.no_faces else pixelate_faces
+        max_bytes = args.max_mb * 1024 * 1024
+        cases = [
+            ("per-consumer", lambda: per_consumer(clip, keyframes, samples, work_dir, args.sample_width, blur)),
+            ("shared", lambda: shared(clip, keyframes, samples, work_dir, args.sample_width, max_bytes, blur)),
+        ]
+
+        print(f"\n{'mode':<14} {'best s':>8} {'mean s':>8} {'passes':>7} {'buffer MB':>10}")
+        for label, run in cases:
+            times = []
+            for _ in range(args.repeat):
+                started = time.perf_counter()
+                result = run()
+                times.append(time.perf_counter() - started)
+            print(
+                f"{label:<14} {min(times):>8.3f} {sum(times) / len(times):>8.3f} "
+                f"{result['passes']:>7} {result['buffer_mb']:>10.1f}"
+            )
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""
+Benchmark: trim modes and encoder profiles of the media pipeline.
+
+Generates synthetic clips with ffmpeg's lavfi `testsrc2` + `sine` sources — one
+with a phone-like GOP (a keyframe every 2 s) and one with dense keyframes (as if
+already rekeyframed) — then runs the analysis media pipeline (trim + thumbnail)
+over each clip in every mode and prints wall time and archive size.
+
+Needs ffmpeg/ffprobe on PATH only; touches no database or storage.
+
+Run from the backend/ directory:
+
+    python -m scripts.benchmark_trim
+    python -m scripts.benchmark_trim --duration 20 --size 1920x1080 --repeat 5
+"""
+
+import argparse
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+# Make `core` importable when run as a plain script from backend/.
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.infrastructure.local_files.media_pipeline.MediaPipeline import (  # noqa: E402
+    ENCODER_PROFILES,
+    MediaPipeline,
+)
+
+# (label, trim_mode, encoder_profile)
+CASES = [("auto", "auto", "balanced"), ("copy", "copy", "balanced")] + [
+    (f"reencode/{profile}", "reencode", profile) for profile in ENCODER_PROFILES
+]
+
+# (label, start, end): one cut on a keyframe of the sparse-GOP clip, one between keyframes
+WINDOWS = [("on-keyframe", 2.0, 5.0), ("mid-gop", 1.3, 4.3)]
+
+
+def _make_clip(path: str, duration: int, size: str, fps: int, gop_frames: int) -> None:
+    cmd = [
+        "ffmpeg", "-hide_banner", "-loglevel", "error", "-y",
+        "-f", "lavfi", "-i", f"testsrc2=size={size}:rate={fps}:duration={duration}",
+        "-f", "lavfi", "-i", f"sine=frequency=440:duration={duration}",
+        "-c:v", "libx264", "-preset", "veryfast", "-g", str(gop_frames), "-keyint_min", str(gop_frames),
+        "-pix_fmt", "yuv420p",
+        "-c:a", "aac", "-shortest",
+        path,
+    ]
+    subprocess.run(cmd, check=True)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--duration", type=int, default=10, help="clip length in seconds")
+    parser.add_argument("--size", default="1280x720", help="clip resolution, WxH")
+    parser.add_argument("--fps", type=int, default=30)
+    parser.add_argument("--repeat", type=int, default=3, help="runs per case; the best is reported")
+    args = parser.parse_args()
+
+    if shutil.which("ffmpeg") is None or shutil.which("ffprobe") is None:
+        sys.exit("ffmpeg and ffprobe must be on PATH")
+
+    work_dir = tempfile.mkdtemp(prefix="trim-bench-")
+    try:
+        clips = {
+            "gop-2s": os.path.join(work_dir, "gop_2s.mp4"),
+            "dense-keyframes": os.path.join(work_dir, "dense.mp4"),
+        }
+        _make_clip(clips["gop-2s"], args.duration, args.size, args.fps, gop_frames=args.fps * 2)
+        _make_clip(clips["dense-keyframes"], args.duration, args.size, args.fps, gop_frames=2)
+
+        print(f"{'clip':<16} {'window':<12} {'mode':<20} {'chosen':<9} {'wall s':>8} {'size KB':>9}")
+        for clip_label, clip_path in clips.items():
+            for window_label, start, end in WINDOWS:
+                for case_label, trim_mode, profile in CASES:
+                    best = None
+                    for _ in range(args.repeat):
+                        out_dir = tempfile.mkdtemp(dir=work_dir)
+                        began = time.perf_counter()
+                        result = MediaPipeline(clip_path, out_dir).run(
+                            start_seconds=start,
+                            end_seconds=end,
+                            trim_mode=trim_mode,
+                            encoder_profile=profile,
+                        )
+                        elapsed = time.perf_counter() - began
+                        size_kb = os.path.getsize(result.archive_path) / 1024
+                        shutil.rmtree(out_dir)
+                        if best is None or elapsed < best[0]:
+                            best = (elapsed, size_kb, result.trim_mode)
+                    print(
+                        f"{clip_label:<16} {window_label:<12} {case_label:<20} {best[2]:<9} "
+                        f"{best[0]:>8.3f} {best[1]:>9.0f}"
+                    )
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,40 @@
+-- Durable job queue for analysis processing.
+--
+-- PATCH /analyses/{id}/ no longer runs the analysis inline: it enqueues one row
+-- here and returns 202. Workers (`python -m app.worker`, any number of hosts)
+-- claim rows with SELECT ... FOR UPDATE SKIP LOCKED, hold a renewable lease while
+-- running, and retry failed attempts with backoff up to max_attempts. A running
+-- row whose lease has expired belonged to a crashed worker and is reclaimed.
+
+CREATE TABLE IF NOT EXISTS "public"."analysis_jobs" (
+    "id" "uuid" DEFAULT "gen_random_uuid"() NOT NULL,
+    "analysis_id" "uuid" NOT NULL,
+    "status" "text" DEFAULT 'queued'::"text" NOT NULL,
+    "attempts" integer DEFAULT 0 NOT NULL,
+    "max_attempts" integer DEFAULT 3 NOT NULL,
+    "run_after" timestamp with time zone DEFAULT "now"() NOT NULL,
+    "locked_by" "text",
+    "lease_expires_at" timestamp with time zone,
+    "heartbeat_at" timestamp with time zone,
+    "last_error" "text",
+    "created_at" timestamp with time zone DEFAULT "now"() NOT NULL,
+    "finished_at" timestamp with time zone,
+    CONSTRAINT "analysis_jobs_pkey" PRIMARY KEY ("id"),
+    CONSTRAINT "analysis_jobs_analysis_id_key" UNIQUE ("analysis_id"),
+    CONSTRAINT "analysis_jobs_analysis_id_fkey"
+        FOREIGN KEY ("analysis_id") REFERENCES "public"."analysis"("id") ON DELETE CASCADE,
+    CONSTRAINT "analysis_jobs_status_check"
+        CHECK (("status" = ANY (ARRAY[
+            'queued'::"text",
+            'running'::"text",
+            'succeeded'::"text",
+            'failed'::"text"
+        ])))
+);
+
+CREATE INDEX IF NOT EXISTS "idx_analysis_jobs_status_run_after"
+    ON "public"."analysis_jobs" ("status", "run_after");
+
+-- Backend-only table: the API and workers connect as the table owner, clients
+-- never read it through PostgREST.
+ALTER TABLE "public"."analysis_jobs" ENABLE ROW LEVEL SECURITY;
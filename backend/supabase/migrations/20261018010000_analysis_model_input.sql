@@ -0,0 +1,11 @@
+-- Record what each analysis actually sent to the model.
+--
+-- The worker uploads a model-input proxy (downscaled, fps-capped, no audio)
+-- instead of the archive copy. model_input_params holds the proxy settings used
+-- (NULL when the archive copy itself was sent); the two byte counts give the
+-- per-analysis upload saving.
+
+ALTER TABLE "public"."analysis"
+    ADD COLUMN IF NOT EXISTS "model_input_params" "jsonb",
+    ADD COLUMN IF NOT EXISTS "model_input_bytes" bigint,
+    ADD COLUMN IF NOT EXISTS "archive_bytes" bigint;
@@ -0,0 +1,20 @@
+-- Version stamp for the issue catalog the analysis model is prompted with.
+--
+-- Issue create / update / delete bump "version" in the same transaction, so API
+-- processes and analysis workers can keep a serialized copy of the catalog (and
+-- a Gemini cached-content handle for it) and only rebuild when it changes.
+
+CREATE TABLE IF NOT EXISTS "public"."issue_catalog_version" (
+    "id" integer DEFAULT 1 NOT NULL,
+    "version" bigint DEFAULT 1 NOT NULL,
+    "updated_at" timestamp with time zone DEFAULT "now"() NOT NULL,
+    CONSTRAINT "issue_catalog_version_pkey" PRIMARY KEY ("id"),
+    CONSTRAINT "issue_catalog_version_id_check" CHECK (("id" = 1))
+);
+
+INSERT INTO "public"."issue_catalog_version" ("id", "version")
+VALUES (1, 1)
+ON CONFLICT ("id") DO NOTHING;
+
+-- Backend-only table.
+ALTER TABLE "public"."issue_catalog_version" ENABLE ROW LEVEL SECURITY;
@@ -0,0 +1,36 @@
+-- Content-addressed cache of analysis results.
+--
+-- cache_key is a sha256 over the clip the model is shown (hash of the trimmed /
+-- proxy file), the user's prompt fields, the model version and the issue
+-- catalog (version + the candidate block actually sent). A re-submitted swing
+-- with the same inputs copies these issues onto its analysis instead of calling
+-- the model again. Rows past expires_at are ignored and overwritten on the next
+-- store. hit_count backs the admin hit-rate figure.
+--
+-- analysis_jobs.bypass_result_cache: admins can re-run an analysis past the
+-- cache (PATCH /analyses/{id}/?bypass_cache=true); the flag rides on the job so
+-- the worker sees it.
+
+CREATE TABLE IF NOT EXISTS "public"."analysis_result_cache" (
+    "cache_key" "text" NOT NULL,
+    "issues" "jsonb" DEFAULT '[]'::"jsonb" NOT NULL,
+    "club_type" "text",
+    "camera_view" "text",
+    "source_analysis_id" "uuid",
+    "hit_count" integer DEFAULT 0 NOT NULL,
+    "last_hit_at" timestamp with time zone,
+    "created_at" timestamp with time zone DEFAULT "now"() NOT NULL,
+    "expires_at" timestamp with time zone NOT NULL,
+    CONSTRAINT "analysis_result_cache_pkey" PRIMARY KEY ("cache_key"),
+    CONSTRAINT "analysis_result_cache_source_analysis_id_fkey"
+        FOREIGN KEY ("source_analysis_id") REFERENCES "public"."analysis"("id") ON DELETE SET NULL
+);
+
+CREATE INDEX IF NOT EXISTS "idx_analysis_result_cache_expires_at"
+    ON "public"."analysis_result_cache" ("expires_at");
+
+-- Backend-only table.
+ALTER TABLE "public"."analysis_result_cache" ENABLE ROW LEVEL SECURITY;
+
+ALTER TABLE "public"."analysis_jobs"
+    ADD COLUMN IF NOT EXISTS "bypass_result_cache" boolean DEFAULT false NOT NULL;
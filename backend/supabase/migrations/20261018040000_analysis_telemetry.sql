@@ -0,0 +1,19 @@
+-- Per-analysis telemetry: where the time went and what the model consumed.
+--
+-- stage_timings maps pipeline stage -> milliseconds (db_load, r2_download, trim,
+-- archive_upload, thumbnail, result_cache, provider_upload,
+-- provider_processing_wait, generate_content, response_parse, db_save).
+-- Stages that did not run are absent. Token counts come from the model
+-- response's usage metadata; video_duration_seconds is the clip the model saw.
+-- GET /admin/analysis-timings/ aggregates p50/p95/p99 per stage and model.
+
+ALTER TABLE "public"."analysis"
+    ADD COLUMN IF NOT EXISTS "stage_timings" "jsonb",
+    ADD COLUMN IF NOT EXISTS "input_tokens" integer,
+    ADD COLUMN IF NOT EXISTS "output_tokens" integer,
+    ADD COLUMN IF NOT EXISTS "cached_tokens" integer,
+    ADD COLUMN IF NOT EXISTS "video_duration_seconds" double precision;
+
+CREATE INDEX IF NOT EXISTS "idx_analysis_completed_at"
+    ON "public"."analysis" ("completed_at")
+    WHERE "stage_timings" IS NOT NULL;
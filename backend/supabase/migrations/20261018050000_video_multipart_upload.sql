@@ -0,0 +1,12 @@
+-- Multipart uploads of analysis videos straight to R2.
+--
+-- POST /analyses/{id}/multipart/ starts an R2 multipart upload and returns one
+-- presigned URL per part; the client uploads parts in parallel (retrying only
+-- the ones that fail) and then completes or aborts. While one is open,
+-- multipart_upload_id holds its R2 UploadId and upload_size_bytes the size the
+-- client declared; on completion the assembled object is checked against that
+-- size and the part ETags before the analysis is queued.
+
+ALTER TABLE "public"."videos"
+    ADD COLUMN IF NOT EXISTS "multipart_upload_id" text,
+    ADD COLUMN IF NOT EXISTS "upload_size_bytes" bigint;
@@ -0,0 +1,16 @@
+-- Probed metadata of each analysed video.
+--
+-- Written from the single ffprobe the media pipeline already runs on the
+-- archived (trimmed) copy, so endpoints and batch jobs that need a video's
+-- duration, frame rate, resolution, rotation, codec or size read the row
+-- instead of downloading and opening the file. NULL until the video has been
+-- processed.
+
+ALTER TABLE "public"."videos"
+    ADD COLUMN IF NOT EXISTS "duration_seconds" double precision,
+    ADD COLUMN IF NOT EXISTS "fps" double precision,
+    ADD COLUMN IF NOT EXISTS "width" integer,
+    ADD COLUMN IF NOT EXISTS "height" integer,
+    ADD COLUMN IF NOT EXISTS "rotation" integer,
+    ADD COLUMN IF NOT EXISTS "video_codec" text,
+    ADD COLUMN IF NOT EXISTS "size_bytes" bigint;
@@ -0,0 +1,13 @@
+-- Swing localization.
+--
+-- Before trimming, the worker scans a low-resolution decode of the requested
+-- window for the swing (the burst of frame-to-frame motion) and tightens the
+-- trim to it, padded, so setup and walk-away never reach the model.
+-- auto_trim is the per-analysis opt-out (set at creation); swing_window records
+-- what was detected, for audit: {"start", "end", "peak"} in seconds of the
+-- uploaded file and "prominence" (peak motion over the clip's median). NULL when
+-- localization was off, found no clear swing, or would not have shortened the clip.
+
+ALTER TABLE "public"."analysis"
+    ADD COLUMN IF NOT EXISTS "auto_trim" boolean NOT NULL DEFAULT true,
+    ADD COLUMN IF NOT EXISTS "swing_window" "jsonb";
@@ -0,0 +1,10 @@
+-- Trimmed archive copy of each video, stored next to the original upload.
+--
+-- video_key used to be overwritten with the trimmed copy before the model was
+-- called, so a retried analysis trimmed the already-trimmed object again with
+-- the original window. The original now stays at video_key and the trimmed
+-- copy is written to archives/{video_id}.mp4; archive_key points at it once an
+-- analysis has succeeded. NULL while the original is the only copy.
+
+ALTER TABLE "public"."videos"
+    ADD COLUMN IF NOT EXISTS "archive_key" text;
@@ -0,0 +1,10 @@
+-- Direct uploads are processed by the queue workers, not the API process.
+--
+-- The API used to create the job already leased to itself and run the whole
+-- analysis (ffmpeg, model call) in a background task on a web worker. It now
+-- queues the job like any other, with the path of its scratch copy of the
+-- upload; a worker that can see that file (same host, shared volume) takes it
+-- over instead of downloading the video from R2.
+
+ALTER TABLE "public"."analysis_jobs"
+    ADD COLUMN IF NOT EXISTS "local_video_path" text;
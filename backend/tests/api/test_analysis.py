@@ -14,8 +14,14 @@ from pathlib import Path
 from core.infrastructure.storage.r2Adaptor import generate_upload_url
 from core.infrastructure.AI.model_selection import get_active_analysis_model
 from core.infrastructure.db.repositories.issues import get_all_issues
+from core.infrastructure.db.session import SessionLocal
+from core.services.analysis_worker import AnalysisWorker
 from unittest.mock import patch
 import requests
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.dependencies.db import get_db
 
 
 @pytest.fixture()
@@ -61,15 +67,28 @@ def run_analysis_and_set_completed(client, db_session, analysis_with_id, auth_he
         "success": True,
     }
 
+    response = client.patch(
+        f"/api/v1/analyses/{analysis_id}/",
+        headers=auth_headers,
+    )
+    # PATCH only queues the analysis; a worker picks it up.
+    assert response.status_code == 202
+    assert response.json()["status"] == "processing"
+
+    # Drain the queue with a worker on the test's connection, so its short
+    # transactions stay inside the test transaction and are rolled back with it.
+    worker = AnalysisWorker(session_factory=lambda: SessionLocal(bind=db_session.get_bind()))
     with patch(
         "core.services.analysis_service.analyze_video",
         return_value=canned_result,
-    ), patch("core.services.analysis_service.GoogleAnalysisClient"):
-        response = client.patch(
-            f"/api/v1/analyses/{analysis_id}/",
-            headers=auth_headers,
-        )
+    ):
+        assert worker.run_once() is True
+    db_session.expire_all()
 
+    response = client.get(
+        f"/api/v1/analyses/{analysis_id}/",
+        headers=auth_headers,
+    )
     data = response.json()
     return data, analysis_id, user_id
     
@@ -251,4 +270,55 @@ def test_run_analysis(client, run_analysis_and_set_completed, db_session, auth_h
         ai: AnalysisIssue = get_analysis_issue_by_id(analysis_issue_id=issue.id, session=db_session) 
         assert ai is not None
         # Verify its inactive
-        assert ai.active == False
\ No newline at end of file
+        assert ai.active == False
+
+@pytest.fixture()
+def transactional_client(client, db_session):
+    """A client that runs the real get_db (commit on success, rollback on an
+    error) on savepoints of the test's connection, so what the endpoint leaves
+    behind after an error is what production would keep."""
+    def savepoint_session():
+        return SessionLocal(bind=db_session.get_bind(), join_transaction_mode="create_savepoint")
+
+    override = app.dependency_overrides.pop(get_db)
+    with patch("app.dependencies.db.SessionLocal", savepoint_session), TestClient(app) as c:
+        yield c
+    app.dependency_overrides[get_db] = override
+
+
+def test_rejected_multipart_upload_can_be_started_again(transactional_client, analysis_with_id, db_session, auth_headers):
+    """A completion that fails verification must not leave the closed UploadId
+    behind (get_db rolls the request back on the error)."""
+    analysis_id, _ = analysis_with_id
+    service = "core.services.multipart_upload_service"
+    with patch(f"{service}.create_multipart_upload", return_value="upload-1"), \
+         patch(f"{service}.generate_upload_part_url", return_value="https://r2.example.com/part"), \
+         patch(f"{service}.complete_multipart_upload_in_r2", return_value="assembled-1"), \
+         patch(f"{service}.object_metadata", return_value={"size": 1024, "etag": "assembled-1"}), \
+         patch(f"{service}.delete") as delete, \
+         patch(f"{service}.abort_multipart_upload_in_r2") as abort:
+        response = transactional_client.post(
+            f"/api/v1/analyses/{analysis_id}/multipart/", json={"size_bytes": 6 * 1024 * 1024}, headers=auth_headers,
+        )
+        assert response.status_code == 201
+
+        response = transactional_client.post(
+            f"/api/v1/analyses/{analysis_id}/multipart/complete/",
+            json={"parts": [{"part_number": 1, "etag": "part-1"}]},
+            headers=auth_headers,
+        )
+        assert response.status_code == 422
+        delete.assert_called_once()
+
+        db_session.expire_all()
+        video = get_video_by_analysis_id(analysis_id=analysis_id, session=db_session)
+        assert video.multipart_upload_id is None
+        assert get_analysis_by_id(analysis_id=analysis_id, session=db_session).status == "awaiting_upload"
+
+        # Aborting is a no-op and a fresh upload starts without touching the closed one
+        assert transactional_client.delete(f"/api/v1/analyses/{analysis_id}/multipart/", headers=auth_headers).status_code == 204
+        response = transactional_client.post(
+            f"/api/v1/analyses/{analysis_id}/multipart/", json={"size_bytes": 6 * 1024 * 1024}, headers=auth_headers,
+        )
+        assert response.status_code == 201
+        abort.assert_not_called()
@@ -0,0 +1,80 @@
+import threading
+import time
+
+import pytest
+
+from core.infrastructure.AI.selector import AIProviderSelector
+
+
+class FakeProvider:
+    def __init__(self):
+        self.closed = False
+
+    def analyze_video(self, video_path: str, **kwargs) -> dict:
+        return {"success": True}
+
+    def pool_stats(self) -> dict:
+        return {"requests": 0}
+
+    def close(self) -> None:
+        self.closed = True
+
+
+@pytest.fixture()
+def built():
+    return []
+
+
+@pytest.fixture()
+def registry(built):
+    def factory():
+        time.sleep(0.01)  # Widen the window for racing first callers
+        provider = FakeProvider()
+        built.append(provider)
+        return provider
+
+    return AIProviderSelector(factories={"fake": factory})
+
+
+class TestAIProviderSelector:
+    def test_nothing_built_until_asked_for(self, registry, built):
+        assert built == []
+        assert registry.stats() == {}
+
+    def test_same_client_reused(self, registry, built):
+        first = registry.get("fake")
+        second = registry.get("fake")
+
+        assert first is second
+        assert len(built) == 1
+        assert registry.stats()["fake"]["gets"] == 2
+
+    def test_concurrent_first_calls_build_once(self, registry, built):
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(registry.get("fake"))) for _ in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        assert len(built) == 1
+        assert all(r is built[0] for r in results)
+
+    def test_unknown_provider(self, registry):
+        with pytest.raises(ValueError):
+            registry.get("nope")
+
+    def test_stats_include_pool(self, registry):
+        registry.get("fake")
+
+        stats = registry.stats()["fake"]
+        assert stats["pool"] == {"requests": 0}
+        assert stats["init_seconds"] >= 0
+
+    def test_reset_closes_and_rebuilds(self, registry, built):
+        first = registry.get("fake")
+        registry.reset("fake")
+
+        assert first.closed is True
+        assert registry.get("fake") is not first
+        assert len(built) == 2
@@ -0,0 +1,176 @@
+import threading
+import time
+
+import pytest
+
+from core.infrastructure.AI.exceptions import TransientProviderError, ProviderUnavailableError
+from core.infrastructure.AI.resilience import CircuitBreaker, ResilientAnalysisAI, TokenBucket
+
+
+class FakeProvider:
+    """Local stand-in for a model provider, with injected latency and failures.
+
+    `failures` maps a model to how many of its next calls fail (-1: all of them).
+    """
+
+    def __init__(self, latency: float = 0.0, failures: dict[str, int] | None = None, error=TransientProviderError):
+        self.latency = latency
+        self.failures = dict(failures or {})
+        self.error = error
+        self.calls: list[str] = []
+        self.timeouts: list[float] = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._lock = threading.Lock()
+
+    def analyze_video(self, video_path: str, model: str = None, timeout_seconds: float = None, **kwargs) -> dict:
+        with self._lock:
+            self.calls.append(model)
+            self.timeouts.append(timeout_seconds)
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            time.sleep(self.latency)
+            remaining = self.failures.get(model, 0)
+            if remaining:
+                self.failures[model] = remaining - 1 if remaining > 0 else remaining
+                raise self.error(f"{model} is browning out")
+            return {"success": True, "issues": []}
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _guarded(provider, chain=("primary", "fallback"), **kwargs) -> ResilientAnalysisAI:
+    kwargs.setdefault("rate_limiter", TokenBucket(rate=1000, burst=1000))
+    kwargs.setdefault("breaker_factory", lambda: CircuitBreaker(window=4, min_calls=2, error_rate=0.5, cooldown_seconds=30))
+    return ResilientAnalysisAI(
+        provider,
+        model_chain=lambda model: [model] + [m for m in chain if m != model] if model else list(chain),
+        **kwargs,
+    )
+
+
+class TestFallbackChain:
+    def test_primary_answers(self):
+        provider = FakeProvider()
+
+        result = _guarded(provider).analyze_video(video_path="v.mp4", model="primary")
+
+        assert result["model"] == "primary"
+        assert provider.calls == ["primary"]
+
+    def test_falls_back_on_transient_error(self):
+        provider = FakeProvider(failures={"primary": 1})
+
+        result = _guarded(provider).analyze_video(video_path="v.mp4", model="primary")
+
+        assert result["model"] == "fallback"
+        assert provider.calls == ["primary", "fallback"]
+
+    def test_all_models_failing_is_unavailable(self):
+        provider = FakeProvider(failures={"primary": -1, "fallback": -1})
+
+        with pytest.raises(ProviderUnavailableError):
+            _guarded(provider).analyze_video(video_path="v.mp4", model="primary")
+
+    def test_non_transient_error_is_not_retried(self):
+        provider = FakeProvider(failures={"primary": 1}, error=ValueError)
+
+        with pytest.raises(ValueError):
+            _guarded(provider).analyze_video(video_path="v.mp4", model="primary")
+        assert provider.calls == ["primary"]
+
+
+class TestCircuitBreaker:
+    def test_open_circuit_skips_model(self):
+        provider = FakeProvider(failures={"primary": -1})
+        guarded = _guarded(provider)
+
+        for _ in range(2):
+            guarded.analyze_video(video_path="v.mp4", model="primary")
+        provider.calls.clear()
+
+        result = guarded.analyze_video(video_path="v.mp4", model="primary")
+
+        assert guarded.breaker_states()["primary"] == CircuitBreaker.OPEN
+        assert provider.calls == ["fallback"]  # Failed fast, no call to the broken model
+        assert result["model"] == "fallback"
+
+    def test_half_open_probe_closes_on_success(self):
+        clock = FakeClock()
+        breaker = CircuitBreaker(window=4, min_calls=2, error_rate=0.5, cooldown_seconds=30, clock=clock)
+        breaker.record(failed=True)
+        breaker.record(failed=True)
+        assert breaker.allow() is False
+
+        clock.now += 30
+        assert breaker.allow() is True     # The probe
+        assert breaker.allow() is False    # Only one at a time
+        breaker.record(failed=False)
+
+        assert breaker.state == CircuitBreaker.CLOSED
+
+    def test_half_open_probe_reopens_on_failure(self):
+        clock = FakeClock()
+        breaker = CircuitBreaker(window=4, min_calls=2, error_rate=0.5, cooldown_seconds=30, clock=clock)
+        breaker.record(failed=True)
+        breaker.record(failed=True)
+
+        clock.now += 30
+        assert breaker.allow() is True
+        breaker.record(failed=True)
+
+        assert breaker.state == CircuitBreaker.OPEN
+        assert breaker.allow() is False
+
+
+class TestLimits:
+    def test_in_flight_cap(self):
+        provider = FakeProvider(latency=0.05)
+        guarded = _guarded(provider, max_in_flight=2)
+
+        threads = [
+            threading.Thread(target=guarded.analyze_video, kwargs={"video_path": "v.mp4", "model": "primary"})
+            for _ in range(6)
+        ]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        assert len(provider.calls) == 6
+        assert provider.max_in_flight == 2
+
+    def test_rate_limit_past_deadline_is_unavailable(self):
+        provider = FakeProvider()
+        guarded = _guarded(provider, rate_limiter=TokenBucket(rate=0.01, burst=1), deadline_seconds=0.05)
+
+        guarded.analyze_video(video_path="v.mp4", model="primary")
+        with pytest.raises(ProviderUnavailableError):
+            guarded.analyze_video(video_path="v.mp4", model="primary")
+        assert provider.calls == ["primary"]
+
+    def test_provider_gets_remaining_deadline(self):
+        provider = FakeProvider()
+
+        _guarded(provider, deadline_seconds=10).analyze_video(video_path="v.mp4", model="primary")
+
+        assert 0 < provider.timeouts[0] <= 10
+
+    def test_token_bucket_refills(self):
+        clock = FakeClock()
+        bucket = TokenBucket(rate=2, burst=1, clock=clock)
+
+        assert bucket.acquire(timeout=0) is True
+        assert bucket.acquire(timeout=0) is False
+        clock.now += 0.5
+        assert bucket.acquire(timeout=0) is True
@@ -0,0 +1,96 @@
+import pytest
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+from core.infrastructure.AI.google import videoAnalyzer
+from core.infrastructure.AI.google.videoAnalyzer import (
+    analyze_video,
+    choose_video_transfer,
+    get_video_transfer_stats,
+    _upload_and_wait,
+)
+
+
+# ============================ FIXTURES ============================
+
+@pytest.fixture()
+def small_clip(tmp_path):
+    path = tmp_path / "swing.mp4"
+    path.write_bytes(b"\x00" * 1024)
+    return str(path)
+
+
+@pytest.fixture()
+def client():
+    client = MagicMock()
+    client.models.generate_content.return_value = SimpleNamespace(
+        text='{"metadata": {"camera_view": "face_on", "club_type": "iron"}, "issues": [], "success": true}',
+        usage_metadata=None,
+    )
+    client.files.upload.return_value = SimpleNamespace(name="files/abc", uri="https://example/files/abc")
+    return client
+
+
+def _analyze(client, video_path):
+    return analyze_video(
+        client=client,
+        video_path=video_path,
+        user_id=None,
+        model="test-model",
+        issue_list=[],
+    )
+
+
+def _sent_video_part(client) -> dict:
+    contents = client.models.generate_content.call_args.kwargs["contents"]
+    return contents[0]["parts"][1]
+
+
+# ============================ TESTS ============================
+
+class TestChooseVideoTransfer:
+    def test_threshold(self):
+        assert choose_video_transfer(10, inline_max_bytes=10) == "inline"
+        assert choose_video_transfer(11, inline_max_bytes=10) == "files_api"
+
+
+class TestInlinePath:
+    def test_small_clip_is_sent_inline(self, client, small_clip):
+        before = get_video_transfer_stats()["inline"]["count"]
+
+        result = _analyze(client, small_clip)
+
+        assert result["success"] is True
+        client.files.upload.assert_not_called()
+        client.files.delete.assert_not_called()
+        part = _sent_video_part(client)
+        assert part["inlineData"]["mimeType"] == "video/mp4"
+        assert part["inlineData"]["data"] == b"\x00" * 1024
+        assert get_video_transfer_stats()["inline"]["count"] == before + 1
+
+
+class TestFilesApiPath:
+    def test_large_clip_is_uploaded_and_deleted(self, client, small_clip):
+        client.files.get.return_value = SimpleNamespace(state="ACTIVE")
+
+        with patch.object(videoAnalyzer, "choose_video_transfer", return_value="files_api"):
+            _analyze(client, small_clip)
+
+        client.files.upload.assert_called_once()
+        assert _sent_video_part(client) == {"fileData": {"fileUri": "https://example/files/abc"}}
+        client.files.delete.assert_called_once_with(name="files/abc")
+
+    def test_polling_backs_off_exponentially(self, client, small_clip):
+        client.files.get.side_effect = [SimpleNamespace(state="PROCESSING")] * 5 + [SimpleNamespace(state="ACTIVE")]
+
+        with patch.object(videoAnalyzer.time, "sleep") as sleep:
+            _upload_and_wait(client, small_clip, poll_initial_seconds=0.1, poll_max_seconds=0.5, timeout_seconds=60)
+
+        delays = [call.args[0] for call in sleep.call_args_list]
+        assert delays == pytest.approx([0.1, 0.2, 0.4, 0.5, 0.5])
+
+    def test_polling_gives_up_at_timeout(self, client, small_clip):
+        client.files.get.return_value = SimpleNamespace(state="PROCESSING")
+
+        with patch.object(videoAnalyzer.time, "sleep"), pytest.raises(TimeoutError):
+            _upload_and_wait(client, small_clip, poll_initial_seconds=1, poll_max_seconds=1, timeout_seconds=0)
@@ -0,0 +1,136 @@
+import io
+import threading
+from unittest.mock import patch
+
+import numpy as np
+
+from core.infrastructure.local_files.anonymizer.FaceAnonymizer import (
+    AnonymizerSettings,
+    anonymize_frames,
+    clamp_boxes,
+    face_detector,
+    interpolate_boxes,
+    pixelate_boxes,
+    read_raw_frames,
+)
+
+DETECT = "core.infrastructure.local_files.anonymizer.FaceAnonymizer.detect_faces"
+
+
+def _noise(h=64, w=96):
+    return np.random.default_rng(0).integers(0, 255, (h, w, 3), dtype=np.uint8)
+
+
+def _box(x, y, w=10, h=10):
+    return np.array([[x, y, w, h]], dtype=np.int32)
+
+
+class TestPixelateBoxes:
+    def test_box_becomes_uniform_blocks_and_the_rest_is_untouched(self):
+        frame = _noise()
+        original = frame.copy()
+
+        pixelate_boxes(frame, _box(16, 8, 16, 16), pixel_size=8)
+
+        region = frame[8:24, 16:32]
+        for by in (0, 8):
+            for bx in (0, 8):
+                block = region[by:by + 8, bx:bx + 8]
+                assert (block == block[0, 0]).all()
+        assert (frame[:8] == original[:8]).all()
+        assert (frame[:, 32:] == original[:, 32:]).all()
+
+    def test_box_snaps_outward_to_whole_blocks(self):
+        frame = _noise()
+
+        pixelate_boxes(frame, _box(10, 10, 5, 5), pixel_size=8)
+
+        # One 8x8 block starting at the box corner covers it
+        assert (frame[10:18, 10:18] == frame[10, 10]).all()
+
+    def test_box_at_the_frame_edge_stays_inside(self):
+        frame = _noise(h=20, w=30)
+
+        pixelate_boxes(frame, _box(25, 15, 5, 5), pixel_size=8)
+
+        assert (frame[12:20, 22:30] == frame[19, 29]).all()
+
+    def test_empty_boxes(self):
+        frame = _noise()
+        original = frame.copy()
+
+        pixelate_boxes(frame, np.zeros((0, 4), np.int32))
+
+        assert (frame == original).all()
+
+
+class TestBoxes:
+    def test_clamp_to_frame(self):
+        assert clamp_boxes([[-5, 90, 20, 20]], 100, 100).tolist() == [[0, 90, 15, 10]]
+
+    def test_paired_boxes_move_linearly(self):
+        boxes = interpolate_boxes(_box(0, 0), _box(8, 4), 0.5)
+
+        assert boxes.tolist() == [[4, 2, 10, 10]]
+
+    def test_unpaired_boxes_are_kept_from_both_sides(self):
+        boxes = interpolate_boxes(_box(0, 0), _box(80, 80), 0.5)
+
+        assert sorted(boxes.tolist()) == [[0, 0, 10, 10], [80, 80, 10, 10]]
+
+    def test_no_faces_on_either_side(self):
+        none = np.zeros((0, 4), np.int32)
+
+        assert interpolate_boxes(none, none, 0.5).shape == (0, 4)
+
+
+class TestAnonymizeFrames:
+    def test_detects_every_nth_and_last_frame_and_interpolates_between(self):
+        frames = [_noise() for _ in range(8)]
+        detected = {0: _box(0, 0, 16, 16), 4: _box(12, 0, 16, 16), 7: _box(24, 0, 16, 16)}
+        calls = []
+
+        def detect(frame, settings):
+            index = next(i for i, f in enumerate(frames) if f is frame)
+            calls.append(index)
+            return detected[index]
+
+        counts = {}
+        with patch(DETECT, side_effect=detect):
+            out = list(anonymize_frames(frames, AnonymizerSettings(detect_every=4, pixel_size=8), counts))
+
+        assert calls == [0, 4, 7]
+        assert [id(f) for f in out] == [id(f) for f in frames]
+        assert counts == {"frames": 8, "detections": 3, "boxes": 8}
+        # Frame 2 sits halfway between the boxes at x=0 and x=12
+        assert (out[2][0:8, 6:14] == out[2][0, 6]).all()
+        assert not (out[2][0:8, 2:10] == out[2][0, 2]).all()
+
+    def test_single_frame(self):
+        with patch(DETECT, return_value=np.zeros((0, 4), np.int32)) as detect:
+            out = list(anonymize_frames([_noise()], AnonymizerSettings(detect_every=5)))
+
+        assert len(out) == 1
+        assert detect.call_count == 1
+
+
+class TestFaceDetector:
+    def test_loaded_once_per_thread(self):
+        first = face_detector()
+        other = []
+        thread = threading.Thread(target=lambda: other.append(face_detector()))
+        thread.start()
+        thread.join()
+
+        assert face_detector() is first
+        assert not first.empty()
+        assert other[0] is not first
+
+
+def test_read_raw_frames_stops_at_a_partial_frame():
+    data = np.arange(2 * 2 * 3 * 2, dtype=np.uint8).tobytes() + b"\x00"
+
+    frames = list(read_raw_frames(io.BytesIO(data), width=2, height=2))
+
+    assert len(frames) == 2
+    assert frames[1][0, 0].tolist() == [12, 13, 14]
@@ -0,0 +1,84 @@
+import cv2
+import numpy as np
+import pytest
+
+from core.infrastructure.local_files.frames.FrameBuffer import FrameBuffer, decode_frames
+
+
+@pytest.fixture
+def numbered_clip(tmp_path):
+    """30 frames of 64x48 whose brightness encodes the frame index (x8)."""
+    path = str(tmp_path / "clip.avi")
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"MJPG"), 30, (64, 48))
+    for i in range(30):
+        writer.write(np.full((48, 64, 3), i * 8, dtype=np.uint8))
+    writer.release()
+    return path
+
+
+def _index_of(frame):
+    return int(round(float(frame.mean()) / 8))
+
+
+class TestFrameBuffer:
+    def test_capacity_is_bounded_by_max_bytes(self):
+        buffer = FrameBuffer.for_frames((10, 10, 3), count=100, max_bytes=3000)
+
+        assert buffer.capacity == 10
+        assert buffer.nbytes == 3000
+
+    def test_always_room_for_one_frame(self):
+        assert FrameBuffer.for_frames((10, 10, 3), count=5, max_bytes=1).capacity == 1
+
+    def test_ring_evicts_oldest(self):
+        buffer = FrameBuffer((2, 2), capacity=2)
+        for index in (3, 7, 9):
+            buffer.put(index, np.full((2, 2), index, np.uint8))
+
+        assert buffer.indices == [7, 9]
+        assert 3 not in buffer
+        assert buffer.evicted == 1
+        assert buffer.get(9).max() == 9
+        with pytest.raises(KeyError):
+            buffer.get(3)
+
+    def test_views_are_read_only_and_stack_is_in_index_order(self):
+        buffer = FrameBuffer((2, 2), capacity=3)
+        for index in (5, 1):
+            buffer.put(index, np.full((2, 2), index, np.uint8))
+
+        with pytest.raises(ValueError):
+            buffer.get(5)[0, 0] = 0
+        assert buffer.stack()[:, 0, 0].tolist() == [1, 5]
+        assert buffer.stack([5, 4]).shape == (1, 2, 2)
+
+
+class TestDecodeFrames:
+    def test_decodes_requested_frames_in_one_pass(self, numbered_clip):
+        buffer = decode_frames(numbered_clip, [20, 3, 11, 3])
+
+        assert buffer.indices == [3, 11, 20]
+        assert buffer.capacity == 3
+        assert [_index_of(buffer.get(i)) for i in buffer.indices] == [3, 11, 20]
+
+    def test_gray_and_downscaled(self, numbered_clip):
+        buffer = decode_frames(numbered_clip, [0, 1], width=32, gray=True)
+
+        assert buffer.stack().shape == (2, 24, 32)
+
+    def test_streams_past_the_cap(self, numbered_clip):
+        seen = []
+
+        buffer = decode_frames(
+            numbered_clip, range(0, 30, 3), max_bytes=2 * 48 * 64 * 3,
+            on_frame=lambda index, frame: seen.append((index, _index_of(frame))),
+        )
+
+        assert seen == [(i, i) for i in range(0, 30, 3)]
+        assert buffer.indices == [24, 27]
+
+    def test_indices_past_the_end_are_skipped(self, numbered_clip):
+        assert decode_frames(numbered_clip, [28, 40]).indices == [28]
+
+    def test_unreadable_file_is_empty(self, tmp_path):
+        assert len(decode_frames(str(tmp_path / "missing.mp4"), [0])) == 0
@@ -0,0 +1,220 @@
+import json
+import pytest
+from unittest.mock import patch, MagicMock
+from core.infrastructure.local_files.media_pipeline.MediaPipeline import (
+    MediaPipeline,
+    MediaProbe,
+    ProxySettings,
+    probe_media,
+    plan_trim,
+)
+
+
+PROBE_OUTPUT = json.dumps({
+    "format": {"duration": "6.0", "size": "1000", "format_name": "mov,mp4"},
+    "streams": [
+        {"codec_type": "video", "codec_name": "h264", "width": 1920, "height": 1080, "avg_frame_rate": "30000/1001"},
+        {"codec_type": "audio", "codec_name": "aac"},
+    ],
+}).encode()
+
+# Keyframes every 2 s, as `ffprobe -show_entries packet=pts_time,flags -of csv=p=0` prints them
+KEYFRAME_OUTPUT = b"0.000000,K__\n0.033367,___\n2.000000,K__\n2.033367,___\n4.000000,K__\n"
+
+
+@pytest.fixture
+def mock_ffmpeg():
+    """Stand-in for ffmpeg/ffprobe: ffprobe answers with PROBE_OUTPUT, ffmpeg succeeds."""
+    def _run(cmd, **kwargs):
+        if cmd[0] == "ffprobe":
+            stdout = KEYFRAME_OUTPUT if "packet=pts_time,flags" in cmd else PROBE_OUTPUT
+        else:
+            stdout = b""
+        return MagicMock(returncode=0, stdout=stdout, stderr=b"")
+
+    with patch("core.infrastructure.local_files.media_pipeline.MediaPipeline.shutil.which", return_value="/usr/bin/ffmpeg"), \
+         patch("core.infrastructure.local_files.media_pipeline.MediaPipeline.subprocess.run", side_effect=_run) as run:
+        yield run
+
+
+def _ffmpeg_calls(run):
+    return [c.args[0] for c in run.call_args_list if c.args[0][0] == "ffmpeg"]
+
+
+class TestVideoFileTrim:
+    @pytest.mark.parametrize("tolerance, copied", [(0.1, False), (0.5, True)])
+    def test_keyframe_tolerance_decides_the_mode(self, mock_ffmpeg, tmp_path, monkeypatch, tolerance, copied):
+        from core.infrastructure.local_files.file_types.Video_file import Video_file
+
+        monkeypatch.chdir(tmp_path)
+        video = Video_file(b"\x00\x00\x00\x18ftypmp42" + b"\x00" * 64)
+
+        video.trim(2.3, 5.0, keyframe_tolerance=tolerance)
+
+        cmd = _ffmpeg_calls(mock_ffmpeg)[0]
+        assert ("copy" in cmd) is copied
+        assert cmd[cmd.index("-ss") + 1] == ("2.0" if copied else "2.3")
+
+
+class TestProbeMedia:
+    def test_parses_ffprobe_output(self, mock_ffmpeg):
+        probe = probe_media("video.mp4")
+
+        assert probe.duration == 6.0
+        assert (probe.width, probe.height) == (1920, 1080)
+        assert probe.fps == 29.97
+        assert probe.video_codec == "h264"
+        assert probe.audio_codec == "aac"
+        assert probe.rotation == 0
+
+    @pytest.mark.parametrize("stream_extra, rotation", [
+        ({"side_data_list": [{"side_data_type": "Display Matrix", "rotation": -90}]}, 90),
+        ({"side_data_list": [{"side_data_type": "Display Matrix", "rotation": 180}]}, 180),
+        ({"tags": {"rotate": "270"}}, 270),
+    ])
+    def test_reads_rotation(self, stream_extra, rotation):
+        output = json.loads(PROBE_OUTPUT)
+        output["streams"][0].update(stream_extra)
+        with patch("core.infrastructure.local_files.media_pipeline.MediaPipeline.shutil.which", return_value="/usr/bin/ffprobe"), \
+             patch("core.infrastructure.local_files.media_pipeline.MediaPipeline.subprocess.run",
+                   return_value=MagicMock(returncode=0, stdout=json.dumps(output).encode(), stderr=b"")):
+            assert probe_media("video.mp4").rotation == rotation
+
+
+class TestVideoFileProbe:
+    def test_probed_once_for_all_consumers(self, mock_ffmpeg, tmp_path, monkeypatch):
+        from core.infrastructure.local_files.file_types.Video_file import Video_file
+        from core.infrastructure.local_files.quality_check.VideoQuality import VideoQuality
+
+        monkeypatch.chdir(tmp_path)
+        video = Video_file(b"\x00\x00\x00\x18ftypmp42" + b"\x00" * 64)
+
+        VideoQuality(video).validate()
+        video.metrics()
+
+        probes = [c for c in mock_ffmpeg.call_args_list if c.args[0][0] == "ffprobe"]
+        assert len(probes) == 1
+        assert video.metrics()["resolution"] == "1920x1080"
+
+
+class TestPlanTrim:
+    def test_start_on_keyframe_is_stream_copied(self, mock_ffmpeg):
+        plan = plan_trim("video.mp4", start=2.05, end=5.0)
+
+        assert plan.mode == "copy"
+        assert plan.start == 2.0
+        assert plan.duration == 3.0
+
+    def test_start_between_keyframes_is_reencoded(self, mock_ffmpeg):
+        plan = plan_trim("video.mp4", start=1.0, end=4.0)
+
+        assert plan.mode == "reencode"
+        assert plan.start == 1.0
+
+    def test_forced_reencode_skips_keyframe_probe(self, mock_ffmpeg):
+        plan = plan_trim("video.mp4", start=2.0, end=4.0, mode="reencode")
+
+        assert plan.mode == "reencode"
+        mock_ffmpeg.assert_not_called()
+
+    def test_forced_copy_snaps_to_previous_keyframe(self, mock_ffmpeg):
+        plan = plan_trim("video.mp4", start=3.0, end=4.0, mode="copy")
+
+        assert plan.mode == "copy"
+        assert plan.start == 2.0
+
+    def test_unknown_mode_rejected(self, mock_ffmpeg):
+        with pytest.raises(ValueError):
+            plan_trim("video.mp4", start=1.0, end=2.0, mode="fastest")
+
+
+class TestMediaPipeline:
+    def test_all_outputs_come_from_one_ffmpeg_run(self, mock_ffmpeg, tmp_path):
+        result = MediaPipeline(str(tmp_path / "video.mp4"), str(tmp_path)).run(
+            start_seconds=1, end_seconds=4, proxy=ProxySettings(max_side=480)
+        )
+
+        calls = _ffmpeg_calls(mock_ffmpeg)
+        assert len(calls) == 1
+        cmd = calls[0]
+        assert cmd.count("-i") == 1
+        assert "split=3" in cmd[cmd.index("-filter_complex") + 1]
+        assert result.archive_path in cmd
+        assert result.proxy_path in cmd
+        assert result.trimmed is True
+        assert result.trim_mode == "reencode"
+
+    def test_proxy_is_downscaled_and_silent(self, mock_ffmpeg, tmp_path):
+        result = MediaPipeline(str(tmp_path / "video.mp4"), str(tmp_path)).run(
+            proxy=ProxySettings(max_side=720, max_fps=15, crf=30)
+        )
+
+        cmd = _ffmpeg_calls(mock_ffmpeg)[0]
+        assert "[proxy_in]scale=720:-2,fps=15[proxy]" in cmd[cmd.index("-filter_complex") + 1]
+        proxy_args = cmd[cmd.index("[proxy]", cmd.index("-filter_complex") + 2):]
+        assert "-an" in proxy_args
+        assert proxy_args[proxy_args.index("-crf") + 1] == "30"
+        assert proxy_args[-1] == result.proxy_path
+
+    def test_proxy_of_rotated_clip_caps_the_displayed_long_edge(self, mock_ffmpeg, tmp_path):
+        portrait = MediaProbe(
+            duration=6.0, width=1920, height=1080, fps=30.0, video_codec="h264",
+            audio_codec="aac", file_size=1000, format="mov,mp4", rotation=90,
+        )
+        with patch("core.infrastructure.local_files.media_pipeline.MediaPipeline.probe_media", return_value=portrait):
+            MediaPipeline(str(tmp_path / "video.mp4"), str(tmp_path)).run(
+                proxy=ProxySettings(max_side=720, max_fps=30)
+            )
+
+        cmd = _ffmpeg_calls(mock_ffmpeg)[0]
+        assert "[proxy_in]scale=-2:720[proxy]" in cmd[cmd.index("-filter_complex") + 1]
+
+    def test_proxy_never_upscales_or_raises_fps(self, mock_ffmpeg, tmp_path):
+        MediaPipeline(str(tmp_path / "video.mp4"), str(tmp_path)).run(
+            proxy=ProxySettings(max_side=3840, max_fps=60)
+        )
+
+        cmd = _ffmpeg_calls(mock_ffmpeg)[0]
+        assert "[proxy_in]null[proxy]" in cmd[cmd.index("-filter_complex") + 1]
+
+    def test_copy_trim_maps_packets_instead_of_encoding(self, mock_ffmpeg, tmp_path):
+        result = MediaPipeline(str(tmp_path / "video.mp4"), str(tmp_path)).run(
+            start_seconds=2, end_seconds=4
+        )
+
+        cmd = _ffmpeg_calls(mock_ffmpeg)[0]
+        assert result.trim_mode == "copy"
+        assert "split=1" in cmd[cmd.index("-filter_complex") + 1]
+        assert "0:v:0" in cmd
+        assert "libx264" not in cmd
+
+    def test_reencode_uses_selected_profile(self, mock_ffmpeg, tmp_path):
+        MediaPipeline(str(tmp_path / "video.mp4"), str(tmp_path)).run(
+            start_seconds=1, end_seconds=4, trim_mode="reencode", encoder_profile="fast"
+        )
+
+        cmd = _ffmpeg_calls(mock_ffmpeg)[0]
+        assert cmd[cmd.index("-preset") + 1] == "ultrafast"
+
+    def test_without_trim_the_source_is_the_archive(self, mock_ffmpeg, tmp_path):
+        source = str(tmp_path / "video.mp4")
+        result = MediaPipeline(source, str(tmp_path)).run()
+
+        cmd = _ffmpeg_calls(mock_ffmpeg)[0]
+        assert "-ss" not in cmd
+        assert "split=1" in cmd[cmd.index("-filter_complex") + 1]
+        assert result.archive_path == source
+        assert result.trimmed is False
+        assert result.proxy_path is None
+
+    def test_thumbnail_timestamp_clamped_into_short_clip(self, mock_ffmpeg, tmp_path):
+        MediaPipeline(str(tmp_path / "video.mp4"), str(tmp_path)).run(
+            start_seconds=0, end_seconds=1, thumbnail_timestamp=1.5, trim_mode="reencode"
+        )
+
+        cmd = _ffmpeg_calls(mock_ffmpeg)[0]
+        assert "gte(t,0.5)" in cmd[cmd.index("-filter_complex") + 1]
+
+    def test_rejects_inverted_trim_window(self, mock_ffmpeg, tmp_path):
+        with pytest.raises(ValueError):
+            MediaPipeline(str(tmp_path / "video.mp4"), str(tmp_path)).run(start_seconds=4, end_seconds=1)
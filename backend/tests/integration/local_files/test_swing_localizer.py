@@ -0,0 +1,90 @@
+from unittest.mock import patch, MagicMock
+
+import numpy as np
+import pytest
+
+from core.infrastructure.local_files.swing_localizer.SwingLocalizer import (
+    LocalizerSettings,
+    find_swing_window,
+    localize_swing,
+    motion_energy,
+)
+
+FPS = 30
+
+
+def _energy(seconds: float = 10.0, bursts: list[tuple[float, float]] = ((4.0, 5.0),), quiet: float = 1.0, loud: float = 20.0):
+    energy = np.full(int(seconds * FPS), quiet, dtype=np.float32)
+    for start, end in bursts:
+        energy[int(start * FPS):int(end * FPS)] = loud
+    return energy
+
+
+class TestMotionEnergy:
+    def test_mean_absolute_difference_between_consecutive_frames(self):
+        frames = np.stack([
+            np.zeros((4, 4), np.uint8),
+            np.zeros((4, 4), np.uint8),
+            np.full((4, 4), 10, np.uint8),
+        ])
+
+        assert motion_energy(frames).tolist() == [0.0, 10.0]
+
+    def test_no_overflow_on_bright_to_dark(self):
+        frames = np.stack([np.full((2, 2), 255, np.uint8), np.zeros((2, 2), np.uint8)])
+
+        assert motion_energy(frames).tolist() == [255.0]
+
+
+class TestFindSwingWindow:
+    def test_window_is_the_burst_plus_padding(self):
+        window = find_swing_window(_energy(), FPS)
+
+        assert window.start == pytest.approx(3.0, abs=0.1)
+        assert window.end == pytest.approx(5.75, abs=0.1)
+        assert 4.0 <= window.peak <= 5.0
+        assert window.prominence > 3
+
+    def test_short_quiet_gap_stays_inside_the_swing(self):
+        # Transition at the top of the backswing
+        window = find_swing_window(_energy(bursts=[(4.0, 4.5), (4.7, 5.0)]), FPS)
+
+        assert window.end == pytest.approx(5.75, abs=0.1)
+
+    def test_separate_motion_far_from_the_swing_is_excluded(self):
+        window = find_swing_window(_energy(bursts=[(1.0, 1.2), (6.0, 7.0)]), FPS)
+
+        assert window.start == pytest.approx(5.0, abs=0.1)
+
+    def test_no_clear_swing(self):
+        assert find_swing_window(_energy(bursts=[]), FPS) is None
+
+    def test_window_never_shorter_than_minimum(self):
+        settings = LocalizerSettings(pad_before=0, pad_after=0, min_seconds=1.5)
+
+        window = find_swing_window(_energy(bursts=[(5.0, 5.2)]), FPS, settings)
+
+        assert window.end - window.start == pytest.approx(1.5)
+
+
+class TestLocalizeSwing:
+    def test_decodes_once_and_reports_file_times(self):
+        # Portrait phone clip: stored 1920x1080, rotated 90 degrees
+        height, width = 284, 160
+        rng = np.random.default_rng(0)
+        frames = np.repeat(rng.integers(0, 255, (1, height, width), dtype=np.uint8), 6 * FPS, axis=0)
+        frames[3 * FPS:4 * FPS] = rng.integers(0, 255, (FPS, height, width), dtype=np.uint8)
+        frames = frames.copy()
+        frames[:, 0, 0] = np.arange(len(frames)) % 2      # A little baseline motion
+
+        with patch("core.infrastructure.local_files.swing_localizer.SwingLocalizer.shutil.which", return_value="/usr/bin/ffmpeg"), \
+             patch("core.infrastructure.local_files.swing_localizer.SwingLocalizer.subprocess.run",
+                   return_value=MagicMock(returncode=0, stdout=frames.tobytes(), stderr=b"")) as run:
+            window = localize_swing("clip.mp4", 1920, 1080, rotation=90, start=10.0, end=16.0)
+
+        assert run.call_count == 1
+        cmd = run.call_args.args[0]
+        assert cmd[cmd.index("-ss") + 1] == "10.0"
+        assert f"scale={width}:{height}" in cmd[cmd.index("-vf") + 1]
+        assert window.start == pytest.approx(12.0, abs=0.1)
+        assert window.end == pytest.approx(14.75, abs=0.1)
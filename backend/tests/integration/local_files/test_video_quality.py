@@ -0,0 +1,106 @@
+from unittest.mock import patch
+
+import numpy as np
+
+from core.infrastructure.local_files.frames.FrameBuffer import FrameBuffer
+from core.infrastructure.local_files.media_pipeline.MediaPipeline import MediaProbe
+from core.infrastructure.local_files.quality_check.VideoQuality import (
+    VideoQuality,
+    VideoQualityThresholds,
+    laplacian_variance,
+    mean_brightness,
+)
+
+SAMPLER = "core.infrastructure.local_files.quality_check.VideoQuality.sample_gray_frames"
+
+
+class _FakeVideo:
+    def __init__(self, duration=3.0, width=1280, height=720):
+        self._probe = MediaProbe(
+            duration=duration, width=width, height=height, fps=30.0,
+            video_codec="h264", audio_codec=None, file_size=1000, format="mp4",
+        )
+        self.requested = []
+
+    def probe(self):
+        return self._probe
+
+    def path(self):
+        return "clip.mp4"
+
+    def frames(self, indices, max_bytes):
+        # Shared frame buffer of full-size BGR frames
+        self.requested.append(list(indices))
+        buffer = FrameBuffer.for_frames((360, 640, 3), len(indices), max_bytes)
+        for index, gray in zip(indices, _textured(len(indices))):
+            buffer.put(index, np.repeat(np.kron(gray, np.ones((4, 4), np.uint8))[..., None], 3, axis=2))
+        return buffer
+
+
+def _textured(n=4, level=128):
+    rng = np.random.default_rng(0)
+    return np.clip(level + rng.normal(0, 40, size=(n, 90, 160)), 0, 255).astype(np.uint8)
+
+
+def _flat(n=4, level=128):
+    return np.full((n, 90, 160), level, dtype=np.uint8)
+
+
+class TestFrameScores:
+    def test_laplacian_variance_is_per_frame(self):
+        frames = np.concatenate([_textured(2), _flat(1)])
+
+        scores = laplacian_variance(frames)
+
+        assert scores.shape == (3,)
+        assert scores[0] > 1000 and scores[1] > 1000
+        assert scores[2] == 0
+
+    def test_mean_brightness_is_per_frame(self):
+        frames = np.stack([np.full((4, 4), 10, np.uint8), np.full((4, 4), 200, np.uint8)])
+
+        assert mean_brightness(frames).tolist() == [10.0, 200.0]
+
+
+class TestVideoQuality:
+    def test_good_clip_passes_and_is_sampled_once(self):
+        with patch(SAMPLER, return_value=_textured()) as sampler:
+            quality = VideoQuality(_FakeVideo(), frames_path="proxy.mp4")
+            assert quality.validate()
+            assert quality.issues() == []
+
+        assert sampler.call_count == 1
+
+    def test_reports_each_failure(self):
+        with patch(SAMPLER, return_value=_flat(level=5)):
+            issues = VideoQuality(_FakeVideo(duration=0.5, width=320, height=240), frames_path="proxy.mp4").issues()
+
+        assert issues == [
+            "Video resolution is too low",
+            "Video is too short or too long",
+            "Video is too blurry",
+            "Video is too dark or too bright",
+        ]
+
+    def test_undecodable_clip_skips_frame_checks(self):
+        with patch(SAMPLER, return_value=np.zeros((0, 0, 0), np.uint8)):
+            issues = VideoQuality(_FakeVideo(), frames_path="proxy.mp4").issues()
+
+        assert issues == ["Video frames could not be decoded"]
+
+    def test_frames_come_from_frames_path(self):
+        with patch(SAMPLER, return_value=_textured()) as sampler:
+            VideoQuality(_FakeVideo(), VideoQualityThresholds(sample_frames=5), frames_path="proxy.mp4").validate()
+
+        assert sampler.call_args.args[0] == "proxy.mp4"
+        assert sampler.call_args.kwargs["count"] == 5
+
+    def test_frames_come_from_the_shared_buffer_without_frames_path(self):
+        video = _FakeVideo()
+        with patch(SAMPLER) as sampler:
+            quality = VideoQuality(video, VideoQualityThresholds(sample_frames=4, sample_width=160))
+            assert quality.validate()
+
+        sampler.assert_not_called()
+        assert video.requested == [[9, 33, 57, 81]]
+        assert quality.frames().shape == (4, 90, 160)
@@ -0,0 +1,130 @@
+import os
+from unittest.mock import patch
+
+import pytest
+
+from core.infrastructure.storage.mediaCache import MediaCache
+from core.infrastructure.storage import r2Adaptor
+
+
+def _downloader(content: bytes, calls: list):
+    def download(path):
+        calls.append(path)
+        with open(path, "wb") as f:
+            f.write(content)
+    return download
+
+
+class TestMediaCache:
+    def test_second_fetch_is_served_from_disk(self, tmp_path):
+        cache = MediaCache(str(tmp_path / "cache"), max_bytes=1024)
+        calls = []
+
+        first = cache.copy_to("videos/a", "etag1", str(tmp_path / "a1"), _downloader(b"video-a", calls))
+        second = cache.copy_to("videos/a", "etag1", str(tmp_path / "a2"), _downloader(b"video-a", calls))
+
+        assert (first, second) == (False, True)
+        assert len(calls) == 1
+        assert (tmp_path / "a2").read_bytes() == b"video-a"
+        assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 1
+
+    def test_new_etag_is_a_miss(self, tmp_path):
+        cache = MediaCache(str(tmp_path / "cache"), max_bytes=1024)
+        calls = []
+        cache.read("videos/a", "etag1", _downloader(b"original", calls))
+
+        assert cache.read("videos/a", "etag2", _downloader(b"trimmed", calls)) == b"trimmed"
+        assert len(calls) == 2
+
+    def test_evicts_least_recently_used(self, tmp_path):
+        cache = MediaCache(str(tmp_path / "cache"), max_bytes=20)
+        calls = []
+        cache.read("a", "1", _downloader(b"x" * 8, calls))
+        cache.read("b", "1", _downloader(b"y" * 8, calls))
+        os.utime(cache.entry_path("a", "1"), (1, 1))    # a is the least recently used
+        os.utime(cache.entry_path("b", "1"), (2, 2))
+
+        cache.read("c", "1", _downloader(b"z" * 8, calls))
+
+        assert not os.path.exists(cache.entry_path("a", "1"))
+        assert os.path.exists(cache.entry_path("b", "1"))
+        assert os.path.exists(cache.entry_path("c", "1"))
+        assert cache.stats()["evictions"] == 1
+
+    def test_failed_download_leaves_nothing_behind(self, tmp_path):
+        cache = MediaCache(str(tmp_path / "cache"), max_bytes=1024)
+
+        def download(path):
+            with open(path, "wb") as f:
+                f.write(b"partial")
+            raise RuntimeError("connection reset")
+
+        with pytest.raises(RuntimeError):
+            cache.read("videos/a", "etag1", download)
+
+        assert os.listdir(tmp_path / "cache") == []
+
+
+class TestAdaptorUsesMediaCache:
+    def test_download_to_path_hits_cache_on_repeat(self, tmp_path):
+        cache = MediaCache(str(tmp_path / "cache"), max_bytes=1024)
+        with patch.object(r2Adaptor, "r2_client") as client, patch.object(r2Adaptor, "media_cache", cache):
+            client.object_metadata.return_value = {"size": 5, "etag": "abc"}
+            client.download_to_path.side_effect = lambda key, path: open(path, "wb").write(b"video")
+
+            r2Adaptor.download_to_path("videos/a", str(tmp_path / "first"))
+            r2Adaptor.download_to_path("videos/a", str(tmp_path / "second"))
+            data = r2Adaptor.get_object("videos/a")
+
+        assert client.download_to_path.call_count == 1
+        assert (tmp_path / "second").read_bytes() == b"video"
+        assert data == b"video"
+
+    def test_missing_object_goes_straight_to_r2(self, tmp_path):
+        cache = MediaCache(str(tmp_path / "cache"), max_bytes=1024)
+        with patch.object(r2Adaptor, "r2_client") as client, patch.object(r2Adaptor, "media_cache", cache):
+            client.object_metadata.return_value = None
+            client.get_object.side_effect = KeyError("NoSuchKey")
+
+            with pytest.raises(KeyError):
+                r2Adaptor.get_object("videos/missing")
+
+
+class TestImmutableAndEviction:
+    def test_hit_is_a_hard_link_not_a_copy(self, tmp_path):
+        cache = MediaCache(str(tmp_path / "cache"), max_bytes=1024)
+        calls = []
+        cache.copy_to("videos/a", "1", str(tmp_path / "first"), _downloader(b"video-a", calls))
+
+        (tmp_path / "second").write_bytes(b"")      # mkstemp leaves the destination behind
+        assert cache.copy_to("videos/a", "1", str(tmp_path / "second"), _downloader(b"video-a", calls)) is True
+
+        assert os.path.samefile(tmp_path / "second", cache.entry_path("videos/a", "1"))
+        assert (tmp_path / "second").read_bytes() == b"video-a"
+
+    def test_immutable_download_skips_the_etag_lookup(self, tmp_path):
+        cache = MediaCache(str(tmp_path / "cache"), max_bytes=1024)
+        with patch.object(r2Adaptor, "r2_client") as client, patch.object(r2Adaptor, "media_cache", cache):
+            client.download_to_path.side_effect = lambda key, path: open(path, "wb").write(b"video")
+
+            r2Adaptor.download_to_path("videos/a", str(tmp_path / "first"), immutable=True)
+            r2Adaptor.download_to_path("videos/a", str(tmp_path / "second"), immutable=True)
+
+        client.object_metadata.assert_not_called()
+        assert client.download_to_path.call_count == 1
+        assert (tmp_path / "second").read_bytes() == b"video"
+
+    def test_evict_drops_every_version_of_the_keys(self, tmp_path):
+        cache = MediaCache(str(tmp_path / "cache"), max_bytes=1024)
+        calls = []
+        for key, etag in (("videos/a", "1"), ("videos/a", "2"), ("videos/b", "1")):
+            cache.read(key, etag, _downloader(b"x", calls))
+
+        assert cache.evict(["videos/a", "thumbnails/a.jpg"]) == 2
+
+        assert not os.path.exists(cache.entry_path("videos/a", "1"))
+        assert not os.path.exists(cache.entry_path("videos/a", "2"))
+        assert os.path.exists(cache.entry_path("videos/b", "1"))
+
+    def test_evict_without_a_cache_directory(self, tmp_path):
+        assert MediaCache(str(tmp_path / "never-created"), max_bytes=1024).evict(["videos/a"]) == 0
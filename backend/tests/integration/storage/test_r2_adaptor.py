@@ -1,9 +1,13 @@
 import pytest
 from unittest.mock import Mock, patch, MagicMock
+from core.infrastructure.storage.mediaCache import MediaCache
 from core.infrastructure.storage.r2Adaptor import (
     generate_upload_url,
     generate_read_url,
+    generate_read_urls,
     get_object,
+    download_to_path,
+    upload_from_path,
     object_exists,
     delete,
 )
@@ -11,8 +15,9 @@ from core.infrastructure.storage.r2Adaptor import (
 
 @pytest.fixture
 def mock_r2_client():
-    """Mock the r2_client module"""
-    with patch("core.infrastructure.storage.r2Adaptor.r2_client") as mock:
+    """Mock the r2_client module (with the media cache off, so calls go straight through)"""
+    with patch("core.infrastructure.storage.r2Adaptor.r2_client") as mock, \
+         patch("core.infrastructure.storage.r2Adaptor.media_cache", MediaCache("unused", max_bytes=0)):
         yield mock
 
 
@@ -52,33 +57,36 @@ class TestGenerateReadUrl:
     def test_generate_read_url_returns_signed_url(self, mock_r2_client):
         # Arrange
         test_key = "test/video.mp4"
-        expected_url = "https://r2.example.com/signed-read-url"
-        mock_r2_client.generate_signed_url.return_value = expected_url
 
         # Act
         result = generate_read_url(test_key)
 
-        # Assert
-        assert result == expected_url
-        mock_r2_client.generate_signed_url.assert_called_once_with(
-            method="get_object", key=test_key, expires_in=3600
-        )
+        # Assert: SigV4 query auth for the object, signed locally (no boto3 call)
+        assert f"/{test_key}?" in result
+        assert "X-Amz-Signature=" in result
+        mock_r2_client.generate_signed_url.assert_not_called()
 
     def test_generate_read_url_with_longer_expiry(self, mock_r2_client):
         # Arrange
         test_key = "test/public/thumbnail.jpg"
-        expected_url = "https://r2.example.com/read-url-2"
-        mock_r2_client.generate_signed_url.return_value = expected_url
 
         # Act
         result = generate_read_url(test_key)
 
-        # Assert
-        assert result == expected_url
-        # Verify it uses 3600 seconds (1 hour) expiry
-        mock_r2_client.generate_signed_url.assert_called_once_with(
-            method="get_object", key=test_key, expires_in=3600
-        )
+        # Assert: 3600 seconds (1 hour) expiry
+        assert "X-Amz-Expires=3600" in result
+
+    def test_generate_read_url_is_reused(self, mock_r2_client):
+        test_key = "test/cached/thumbnail.jpg"
+        assert generate_read_url(test_key) == generate_read_url(test_key)
+
+    def test_generate_read_urls_batch(self, mock_r2_client):
+        keys = ["test/batch/a.jpg", "test/batch/b.jpg"]
+
+        result = generate_read_urls(keys)
+
+        assert set(result) == set(keys)
+        assert all(f"/{key}?" in url for key, url in result.items())
 
 
 class TestGetObject:
@@ -123,6 +131,42 @@ class TestGetObject:
         assert len(result) == 0
 
 
+class TestStreamingTransfers:
+    def test_download_to_path_delegates_to_client(self, mock_r2_client):
+        # Act
+        download_to_path("test/video.mp4", "/tmp/video.download")
+
+        # Assert
+        mock_r2_client.download_to_path.assert_called_once_with("test/video.mp4", "/tmp/video.download")
+
+    def test_upload_from_path_passes_content_type(self, mock_r2_client):
+        # Act
+        upload_from_path("test/video.mp4", "/tmp/video.mp4", content_type="video/mp4")
+
+        # Assert
+        mock_r2_client.upload_from_path.assert_called_once_with(
+            key="test/video.mp4", path="/tmp/video.mp4", content_type="video/mp4", cache_control=None
+        )
+
+    def test_upload_from_path_passes_cache_control(self, mock_r2_client):
+        # Act
+        upload_from_path("thumbnails/v/abc.jpg", "/tmp/t.jpg", content_type="image/jpeg", cache_control="immutable")
+
+        # Assert
+        mock_r2_client.upload_from_path.assert_called_once_with(
+            key="thumbnails/v/abc.jpg", path="/tmp/t.jpg", content_type="image/jpeg", cache_control="immutable"
+        )
+
+    def test_upload_from_path_default_content_type(self, mock_r2_client):
+        # Act
+        upload_from_path("test/blob", "/tmp/blob")
+
+        # Assert
+        mock_r2_client.upload_from_path.assert_called_once_with(
+            key="test/blob", path="/tmp/blob", content_type="application/octet-stream", cache_control=None
+        )
+
+
 class TestObjectExists:
     def test_object_exists_returns_true(self, mock_r2_client):
         # Arrange
@@ -0,0 +1,63 @@
+import asyncio
+import threading
+import time
+
+from core.infrastructure.storage.r2AsyncClient import AsyncR2Client
+
+
+class _SlowClient:
+    """Sync stand-in for R2Client that records how many calls overlap."""
+
+    def __init__(self, fail: set[str] = frozenset()):
+        self.fail = fail
+        self.in_flight = 0
+        self.peak = 0
+        self.deleted = []
+        self._lock = threading.Lock()
+
+    def _call(self, key):
+        with self._lock:
+            self.in_flight += 1
+            self.peak = max(self.peak, self.in_flight)
+        time.sleep(0.02)
+        with self._lock:
+            self.in_flight -= 1
+        if key in self.fail:
+            raise RuntimeError("R2 500")
+
+    def get_object(self, key):
+        self._call(key)
+        return f"data:{key}".encode()
+
+    def delete_object(self, key):
+        self._call(key)
+        self.deleted.append(key)
+
+
+class TestAsyncR2Client:
+    def test_get_many_runs_concurrently_within_bound(self):
+        client = _SlowClient()
+        async_client = AsyncR2Client(client, max_workers=8)
+        keys = [f"videos/{i}" for i in range(12)]
+
+        result = asyncio.run(async_client.get_many(keys, concurrency=3))
+
+        assert result == {key: f"data:{key}".encode() for key in keys}
+        assert 1 < client.peak <= 3
+
+    def test_concurrency_never_exceeds_pool(self):
+        client = _SlowClient()
+        async_client = AsyncR2Client(client, max_workers=2)
+
+        asyncio.run(async_client.get_many([str(i) for i in range(6)], concurrency=50))
+
+        assert client.peak <= 2
+
+    def test_delete_many_attempts_every_key_and_reports_failures(self):
+        client = _SlowClient(fail={"videos/b"})
+        async_client = AsyncR2Client(client, max_workers=4)
+
+        failed = asyncio.run(async_client.delete_many(["videos/a", "videos/b", "thumbnails/a.jpg", "videos/a"]))
+
+        assert failed == ["videos/b"]
+        assert sorted(client.deleted) == ["thumbnails/a.jpg", "videos/a"]
@@ -0,0 +1,57 @@
+import pytest
+from unittest.mock import patch
+
+from core.infrastructure.storage.teeUpload import TeeUpload
+
+
+def _reading_upload(received: list, fail: bool = False):
+    """Stand-in for r2_client.upload_fileobj that reads the stream in small parts."""
+    def upload_fileobj(key, fileobj, content_type="application/octet-stream"):
+        while True:
+            part = fileobj.read(4)
+            if fail:
+                raise RuntimeError("R2 unavailable")
+            if not part:
+                return
+            received.append(part)
+    return upload_fileobj
+
+
+@pytest.fixture
+def mock_r2_client():
+    with patch("core.infrastructure.storage.teeUpload.r2_client") as mock:
+        yield mock
+
+
+class TestTeeUpload:
+    def test_scratch_and_r2_get_the_same_bytes(self, mock_r2_client, tmp_path):
+        received = []
+        mock_r2_client.upload_fileobj.side_effect = _reading_upload(received)
+        scratch = tmp_path / "video.upload"
+
+        upload = TeeUpload("videos/tee", str(scratch), queue_chunks=2)
+        for chunk in (b"first chunk ", b"second ", b"x" * 50):
+            upload.write(chunk)
+        upload.finish()
+
+        assert b"".join(received) == scratch.read_bytes() == b"first chunk second " + b"x" * 50
+        assert upload.bytes_written == len(scratch.read_bytes())
+
+    def test_size_limit(self, mock_r2_client, tmp_path):
+        mock_r2_client.upload_fileobj.side_effect = _reading_upload([])
+        upload = TeeUpload("videos/tee", str(tmp_path / "video.upload"), max_bytes=10)
+
+        upload.write(b"12345")
+        with pytest.raises(ValueError):
+            upload.write(b"678901")
+        upload.abort()
+
+    def test_r2_failure_surfaces_and_does_not_block_writer(self, mock_r2_client, tmp_path):
+        mock_r2_client.upload_fileobj.side_effect = _reading_upload([], fail=True)
+        upload = TeeUpload("videos/tee", str(tmp_path / "video.upload"), queue_chunks=1)
+
+        with pytest.raises(RuntimeError):
+            for _ in range(100):
+                upload.write(b"chunk")
+            upload.finish()
+        upload.abort()
@@ -0,0 +1,200 @@
+import pytest
+from dataclasses import replace
+from datetime import datetime, timedelta, timezone
+from unittest.mock import patch
+from uuid import uuid4
+
+from core.services import analysis_result_cache
+from core.services.analysis_result_cache import (
+    file_digest,
+    result_cache_key,
+    lookup_cached_result,
+    record_result,
+    get_result_cache_stats,
+)
+from core.services.analysis_service import execute_analysis
+from core.services.dtos.analysis_service_dto import AnalysisInputsDTO, AnalysisResponseDTO
+from core.infrastructure.db.models.AnalysisResultCache import AnalysisResultCache
+from core.infrastructure.db.repositories.issues import get_all_issues
+from core.infrastructure.local_files.media_pipeline.MediaPipeline import MediaPipelineResult, MediaProbe
+
+
+# ============================ FIXTURES ============================
+
+# Probe of the mocked pipeline's clip (pre-flight and anonymization are patched off)
+PROBE = MediaProbe(
+    duration=3.0, width=1280, height=720, fps=30.0, video_codec="h264",
+    audio_codec="aac", file_size=14, format="mov,mp4",
+)
+
+def _inputs(**overrides) -> AnalysisInputsDTO:
+    fields = dict(
+        analysis_id=uuid4(),
+        user_id=uuid4(),
+        model_version="test-model",
+        video_key="videos/cache-test",
+        thumbnail_key="thumbnails/cache-test.jpg",
+        start_seconds=None,
+        end_seconds=None,
+        prompt_shape="Draw",
+        prompt_height="Mid",
+        prompt_misses="Slice/Fade",
+        prompt_extra=None,
+        issue_catalog=[],
+        issue_catalog_block='[{"issue_id":"a"}]',
+        issue_catalog_version=1,
+    )
+    fields.update(overrides)
+    return AnalysisInputsDTO(**fields)
+
+
+@pytest.fixture()
+def issue_id(db_session):
+    return get_all_issues(db_session)[0].id
+
+
+@pytest.fixture()
+def local_video(tmp_path):
+    path = tmp_path / "video.mp4"
+    path.write_bytes(b"the same swing")
+    return path
+
+
+def _execute(local_video, cached_result, analyze_result):
+    """execute_analysis with storage and ffmpeg mocked out."""
+    service_module = execute_analysis.__module__
+    with patch(f"{service_module}._download_video") as download_video, \
+         patch(f"{service_module}.preflight_enabled", return_value=False), \
+         patch(f"{service_module}.FACE_ANONYMIZE_ENABLED", False), \
+         patch(f"{service_module}.upload_from_path"), \
+         patch(f"{service_module}.analyze_video", return_value=analyze_result) as analyze_video:
+        download_video.return_value.path.return_value = str(local_video)
+        download_video.return_value.process.return_value = MediaPipelineResult(
+            archive_path=str(local_video),
+            trimmed=False,
+            thumbnail_path=None,
+            proxy_path=None,
+            probe=PROBE,
+        )
+        return execute_analysis(_inputs(), cached_result=cached_result), analyze_video
+
+
+# ============================ TESTS ============================
+
+class TestResultCacheKey:
+    def test_same_inputs_same_key(self):
+        assert result_cache_key("abc", _inputs()) == result_cache_key("abc", _inputs())
+
+    def test_key_ignores_analysis_and_user(self):
+        # A re-submission is a new analysis, possibly by someone else
+        assert result_cache_key("abc", _inputs()) == result_cache_key("abc", _inputs(user_id=uuid4()))
+
+    @pytest.mark.parametrize(
+        "overrides",
+        [
+            {"model_version": "other-model"},
+            {"prompt_shape": "Fade"},
+            {"prompt_misses": "Hook/Draw"},
+            {"prompt_extra": "Windy day"},
+            {"issue_catalog_block": '[{"issue_id":"b"}]'},
+        ],
+    )
+    def test_any_model_input_changes_key(self, overrides):
+        assert result_cache_key("abc", _inputs()) != result_cache_key("abc", _inputs(**overrides))
+
+    def test_content_changes_key(self, tmp_path):
+        a, b = tmp_path / "a.mp4", tmp_path / "b.mp4"
+        a.write_bytes(b"swing one")
+        b.write_bytes(b"swing two")
+
+        assert file_digest(str(a)) != file_digest(str(b))
+        assert result_cache_key(file_digest(str(a)), _inputs()) != result_cache_key(file_digest(str(b)), _inputs())
+
+
+class TestResultCacheStore:
+    def test_stored_result_is_returned(self, db_session, issue_id):
+        results = AnalysisResponseDTO(
+            issues=[{"issue_id": issue_id, "confidence": 0.8}],
+            club_type="driver",
+            camera_view="face_on",
+            result_cache_key="key-stored",
+        )
+        record_result(None, results, db_session=db_session)
+
+        cached = lookup_cached_result("key-stored", db_session=db_session)
+
+        assert cached == {
+            "issues": [{"issue_id": str(issue_id), "confidence": 0.8}],
+            "club_type": "driver",
+            "camera_view": "face_on",
+        }
+
+    def test_expired_entry_is_a_miss(self, db_session):
+        db_session.add(
+            AnalysisResultCache(
+                cache_key="key-expired",
+                issues=[],
+                expires_at=datetime.now(timezone.utc) - timedelta(seconds=1),
+            )
+        )
+        db_session.flush()
+
+        assert lookup_cached_result("key-expired", db_session=db_session) is None
+
+    def test_hit_is_counted(self, db_session, issue_id):
+        fresh = AnalysisResponseDTO(
+            issues=[{"issue_id": issue_id, "confidence": 0.8}],
+            club_type=None,
+            camera_view=None,
+            result_cache_key="key-hit",
+        )
+        record_result(None, fresh, db_session=db_session)
+        before = get_result_cache_stats(db_session)
+
+        record_result(None, replace(fresh, result_cache_hit=True), db_session=db_session)
+        db_session.expire_all()
+
+        assert db_session.get(AnalysisResultCache, "key-hit").hit_count == 1
+        assert get_result_cache_stats(db_session)["hits"] == before["hits"] + 1
+
+    def test_no_key_stores_nothing(self, db_session):
+        before = get_result_cache_stats(db_session)["entries"]
+        record_result(None, AnalysisResponseDTO(issues=[], club_type=None, camera_view=None), db_session=db_session)
+
+        assert get_result_cache_stats(db_session)["entries"] == before
+
+
+class TestExecuteAnalysisResultCache:
+    @pytest.fixture(autouse=True)
+    def _cache_on(self):
+        with patch.object(analysis_result_cache, "ANALYSIS_RESULT_CACHE_TTL_SECONDS", 3600):
+            yield
+
+    def test_hit_skips_model(self, local_video):
+        cached = {"issues": [{"issue_id": "x", "confidence": 0.7}], "club_type": "iron", "camera_view": None}
+
+        results, analyze_video = _execute(local_video, lambda key: cached, analyze_result=None)
+
+        analyze_video.assert_not_called()
+        assert results.result_cache_hit is True
+        assert results.issues == cached["issues"]
+        assert results.result_cache_key == result_cache_key(file_digest(str(local_video)), _inputs())
+
+    def test_miss_calls_model_and_keys_result(self, local_video):
+        fresh = {"issues": [{"issue_id": "y", "confidence": 0.9}], "success": True}
+
+        results, analyze_video = _execute(local_video, lambda key: None, analyze_result=fresh)
+
+        analyze_video.assert_called_once()
+        assert results.result_cache_hit is False
+        assert results.result_cache_key is not None
+        assert results.issues == fresh["issues"]
+
+    def test_bypass_calls_model_but_still_keys_result(self, local_video):
+        fresh = {"issues": [], "success": True}
+
+        results, analyze_video = _execute(local_video, None, analyze_result=fresh)
+
+        analyze_video.assert_called_once()
+        assert results.result_cache_hit is False
+        assert results.result_cache_key is not None  # The fresh result replaces the cached one
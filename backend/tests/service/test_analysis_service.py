@@ -11,21 +11,43 @@ from ...core.services.analysis_service import (
     run_analysis,
     get_analysis_by_id_in_db
 )
-from ...core.services.dtos.analysis_service_dto import CreateAnalysisDTO, RunAnalysisDTO
+from ...core.services.dtos.analysis_service_dto import CreateAnalysisDTO, RunAnalysisDTO, AnalysisInputsDTO
+from core.services.analysis_service import execute_analysis
 from ...core.infrastructure.AI.model_selection import get_active_analysis_model
 from ...core.infrastructure.db.repositories.analysis import get_analysis_by_id
 from ...core.infrastructure.db.repositories.videos import get_video_by_id
 
 from ...core.infrastructure.db.repositories.analysis_issues import get_analysis_issues_by_analysis_id
 
-from core.infrastructure.db.session import SessionLocal
+from core.infrastructure.db.session import SessionLocal, session_scope
 from core.infrastructure.db.engine import engine
+from core.infrastructure.db.models.Analysis import Analysis
+from core.infrastructure.db.models.Video import Video
+from core.infrastructure.db.models.AnalysisResultCache import AnalysisResultCache
+from core.infrastructure.db.repositories.analysis import create_analysis as create_analysis_in_db
+from core.infrastructure.db.repositories.videos import create_video as create_video_in_db
+from core.infrastructure.db.repositories.issues import get_all_issues as get_all_issues_in_db
+from core.infrastructure.local_files.media_pipeline.MediaPipeline import MediaPipelineResult, MediaProbe
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+import hashlib
+import os
+import threading
+from uuid import uuid4
 from core.infrastructure.storage.r2Adaptor import delete
+from core.config import IMMUTABLE_CACHE_CONTROL
 import requests
 
 
 # ============================ FIXTURES ============================
 
+# What the mocked media pipeline probed. The bytes behind it are not a real
+# clip, so tests using it switch pre-flight and face anonymization off.
+PROBE = MediaProbe(
+    duration=3.0, width=1280, height=720, fps=30.0, video_codec="h264",
+    audio_codec="aac", file_size=5, format="mov,mp4",
+)
+
 @pytest.fixture(scope="session")
 def shared_connection():
     conn = engine.connect()
@@ -47,7 +69,7 @@ def shared_db_session(shared_connection):
 
 
 @pytest.fixture(scope="class")
-def completed_analysis_shared(test_user, shared_db_session):
+def completed_analysis_shared(test_user, shared_connection, shared_db_session):
     """
     Run analysis exactly once per TestRunAnalysis class.
 
@@ -73,11 +95,11 @@ def completed_analysis_shared(test_user, shared_db_session):
     with patch(
         f"{service_module}.analyze_video",
         return_value=canned_result,
-    ), patch(f"{service_module}.GoogleAnalysisClient"):
-        return _run_completed_analysis(test_user, shared_db_session)
+    ):
+        return _run_completed_analysis(test_user, shared_connection, shared_db_session)
 
 
-def _run_completed_analysis(test_user, shared_db_session):
+def _run_completed_analysis(test_user, shared_connection, shared_db_session):
     create_result = create_analysis(
         CreateAnalysisDTO(
             user_id=test_user["user_id"],
@@ -94,13 +116,16 @@ def _run_completed_analysis(test_user, shared_db_session):
         video_data = f.read()
     requests.put(url, data=video_data)
 
+    # run_analysis opens its own short transactions; bind them to the shared
+    # connection so they stay inside the session-wide rolled-back transaction.
     run_analysis(
         RunAnalysisDTO(
             analysis_id=analysis_id,
             user_id=test_user["user_id"],
         ),
-        db_session=shared_db_session
+        session_factory=lambda: SessionLocal(bind=shared_connection),
     )
+    shared_db_session.expire_all()
     
     # Get video key from db and delete the uploaded video from R2 to clean up after test
     analysis = get_analysis_by_id_in_db(analysis_id=analysis_id, session=shared_db_session)
@@ -288,3 +313,231 @@ class TestRunAnalysis:
         delete_analysis(completed_analysis_shared, db_session=shared_db_session)
         analysis_in_db = get_analysis_by_id(completed_analysis_shared, session=shared_db_session)
         assert analysis_in_db is None
+
+
+class TestRunAnalysisConnectionUse:
+    """run_analysis must not hold a pooled DB connection while it waits on
+    storage, ffmpeg or the AI provider — only its short read/write phases may."""
+
+    @pytest.fixture()
+    def isolated_engine(self):
+        # A private pool, so connections held by other fixtures don't count.
+        test_engine = create_engine(os.environ["DATABASE_URL"], pool_size=2, max_overflow=0)
+        try:
+            yield test_engine
+        finally:
+            test_engine.dispose()
+
+    def test_no_connection_checked_out_during_provider_call(self, isolated_engine, test_user, tmp_path):
+        factory = sessionmaker(bind=isolated_engine)
+        with session_scope(factory) as session:
+            issue_id = get_all_issues_in_db(session)[0].id
+            video = create_video_in_db(
+                Video(
+                    user_id=test_user["user_id"],
+                    video_key="videos/connection-test",
+                    thumbnail_key="thumbnails/connection-test.jpg",
+                ),
+                session=session,
+            )
+            analysis = create_analysis_in_db(
+                Analysis(user_id=test_user["user_id"], model_version="test-model", video_id=video.id),
+                session=session,
+            )
+            analysis_id, video_id = analysis.id, video.id
+
+        checked_out_during_call = []
+
+        def fake_analyze_video(**kwargs):
+            checked_out_during_call.append(isolated_engine.pool.checkedout())
+            return {
+                "issues": [{"issue_id": str(issue_id), "confidence": 0.9}],
+                "success": True,
+            }
+
+        service_module = run_analysis.__module__
+        try:
+            with patch(f"{service_module}._download_video") as download_video, \
+                 patch(f"{service_module}.preflight_enabled", return_value=False), \
+                 patch(f"{service_module}.FACE_ANONYMIZE_ENABLED", False), \
+                 patch(f"{service_module}.upload_from_path"), \
+                 patch(f"{service_module}.analyze_video", side_effect=fake_analyze_video):
+                local_video = tmp_path / "video.mp4"
+                local_video.write_bytes(b"video")
+                download_video.return_value.path.return_value = str(local_video)
+                download_video.return_value.process.return_value = MediaPipelineResult(
+                    archive_path="unused.mp4",
+                    trimmed=False,
+                    thumbnail_path=None,
+                    proxy_path=None,
+                    probe=PROBE,
+                )
+                result = run_analysis(
+                    RunAnalysisDTO(analysis_id=analysis_id, user_id=test_user["user_id"]),
+                    session_factory=factory,
+                )
+
+            assert checked_out_during_call == [0]
+            assert isolated_engine.pool.checkedout() == 0
+            assert result.status == "completed"
+            with session_scope(factory) as session:
+                assert len(get_analysis_issues_by_analysis_id(analysis_id, session=session)) == 1
+                analysis = session.get(Analysis, analysis_id)
+                assert analysis.archive_bytes == len(b"video")
+                assert analysis.model_input_bytes == len(b"video")  # No proxy: the archive copy was sent
+                assert analysis.model_input_params is None
+        finally:
+            with session_scope(factory) as session:
+                session.query(AnalysisResultCache).filter_by(source_analysis_id=analysis_id).delete()
+                session.delete(session.get(Analysis, analysis_id))
+                session.delete(session.get(Video, video_id))
+
+
+class TestThumbnailUpload:
+    """The thumbnail goes to R2 while the model call is in flight, and is done
+    (or has failed, harmlessly) by the time execute_analysis returns."""
+
+    def _execute(self, tmp_path, upload, analyze):
+        local_video = tmp_path / "video.mp4"
+        local_video.write_bytes(b"video")
+        thumbnail = tmp_path / "thumbnail.jpg"
+        thumbnail.write_bytes(b"jpeg")
+        inputs = AnalysisInputsDTO(
+            analysis_id=uuid4(),
+            user_id=uuid4(),
+            model_version="test-model",
+            video_key="videos/thumbnail-test",
+            thumbnail_key="thumbnails/thumbnail-test.jpg",
+            start_seconds=None,
+            end_seconds=None,
+            prompt_shape="Draw",
+            prompt_height="Mid",
+            prompt_misses="Slice/Fade",
+            prompt_extra=None,
+            issue_catalog=[],
+            issue_catalog_block="[]",
+            issue_catalog_version=1,
+        )
+        service_module = execute_analysis.__module__
+        with patch(f"{service_module}._download_video") as download_video, \
+             patch(f"{service_module}.result_cache_enabled", return_value=False), \
+             patch(f"{service_module}.preflight_enabled", return_value=False), \
+             patch(f"{service_module}.FACE_ANONYMIZE_ENABLED", False), \
+             patch(f"{service_module}.upload_from_path", side_effect=upload), \
+             patch(f"{service_module}.analyze_video", side_effect=analyze):
+            download_video.return_value.path.return_value = str(local_video)
+            download_video.return_value.process.return_value = MediaPipelineResult(
+                archive_path=str(local_video),
+                trimmed=False,
+                thumbnail_path=str(thumbnail),
+                proxy_path=None,
+                probe=PROBE,
+            )
+            return execute_analysis(inputs), thumbnail
+
+    def test_upload_overlaps_model_call(self, tmp_path):
+        model_started = threading.Event()
+        uploaded = threading.Event()
+
+        def upload(key, path, content_type, cache_control=None):
+            # Only returns if the model call is running at the same time
+            assert model_started.wait(timeout=5)
+            uploaded.set()
+
+        def analyze(**kwargs):
+            model_started.set()
+            return {"issues": [], "success": True}
+
+        result, thumbnail = self._execute(tmp_path, upload, analyze)
+
+        assert uploaded.is_set()        # Joined before returning
+        assert not thumbnail.exists()   # Removed only after the upload finished
+        assert result.issues == []
+
+    def test_upload_failure_is_not_fatal(self, tmp_path):
+        def upload(key, path, content_type, cache_control=None):
+            raise RuntimeError("R2 down")
+
+        result, _ = self._execute(tmp_path, upload, lambda **kwargs: {"issues": [], "success": True})
+
+        assert result.issues == []
+        assert result.thumbnail_key is None     # The video keeps its previous thumbnail
+
+    def test_upload_is_content_addressed_and_immutable(self, tmp_path):
+        uploads = []
+
+        def upload(key, path, content_type, cache_control=None):
+            uploads.append((key, cache_control))
+
+        result, _ = self._execute(tmp_path, upload, lambda **kwargs: {"issues": [], "success": True})
+
+        digest = hashlib.sha256(b"jpeg").hexdigest()
+        assert uploads == [(f"thumbnails/thumbnail-test/{digest}.jpg", IMMUTABLE_CACHE_CONTROL)]
+        assert result.thumbnail_key == f"thumbnails/thumbnail-test/{digest}.jpg"
+
+
+
+class TestFaceAnonymization:
+    """A clip that could not be anonymized is never sent to the model."""
+
+    def test_anonymization_failure_fails_the_analysis(self, tmp_path):
+        local_video = tmp_path / "video.mp4"
+        local_video.write_bytes(b"video")
+        inputs = AnalysisInputsDTO(
+            analysis_id=uuid4(),
+            user_id=uuid4(),
+            model_version="test-model",
+            video_key="videos/anonymize-test",
+            thumbnail_key=None,
+            start_seconds=None,
+            end_seconds=None,
+            prompt_shape="Draw",
+            prompt_height="Mid",
+            prompt_misses="Slice/Fade",
+            prompt_extra=None,
+            issue_catalog=[],
+            issue_catalog_block="[]",
+            issue_catalog_version=1,
+        )
+        service_module = execute_analysis.__module__
+        with patch(f"{service_module}._download_video") as download_video, \
+             patch(f"{service_module}.result_cache_enabled", return_value=False), \
+             patch(f"{service_module}.preflight_enabled", return_value=False), \
+             patch(f"{service_module}.FACE_ANONYMIZE_ENABLED", True), \
+             patch(f"{service_module}.anonymize_video", side_effect=RuntimeError("face detector unavailable")) as anonymize, \
+             patch(f"{service_module}.analyze_video") as analyze:
+            download_video.return_value.path.return_value = str(local_video)
+            download_video.return_value.process.return_value = MediaPipelineResult(
+                archive_path=str(local_video),
+                trimmed=False,
+                thumbnail_path=None,
+                proxy_path=None,
+                probe=PROBE,
+            )
+            with pytest.raises(RuntimeError, match="face detector unavailable"):
+                execute_analysis(inputs)
+
+        assert anonymize.call_args.kwargs["width"] == PROBE.width
+        analyze.assert_not_called()
+
+
+class TestReplacedThumbnail:
+    """Repointing a video at a new content-addressed thumbnail deletes the old one."""
+
+    def _delete(self, previous_key, new_key):
+        from core.services import analysis_service
+        with patch.object(analysis_service, "delete_r2_object") as delete_object:
+            deletion = analysis_service._delete_replaced_thumbnail(previous_key, new_key)
+            if deletion is not None:
+                deletion.result()
+        return delete_object
+
+    def test_previous_thumbnail_is_deleted(self):
+        delete_object = self._delete("thumbnails/v/" + "a" * 64 + ".jpg", "thumbnails/v/" + "b" * 64 + ".jpg")
+
+        delete_object.assert_called_once_with("thumbnails/v/" + "a" * 64 + ".jpg")
+
+    def test_same_or_missing_key_is_kept(self):
+        key = "thumbnails/v/" + "a" * 64 + ".jpg"
+        for previous_key, new_key in ((key, key), (None, key), (key, None)):
+            self._delete(previous_key, new_key).assert_not_called()
@@ -0,0 +1,81 @@
+import pytest
+from datetime import date, datetime, timezone
+
+from core.infrastructure import telemetry
+from core.infrastructure.db.models.Analysis import Analysis
+from core.infrastructure.db.models.Video import Video
+from core.infrastructure.db.repositories.analysis import create_analysis
+from core.infrastructure.db.repositories.videos import create_video
+from core.services.admin_stats_service import get_analysis_stage_percentiles
+from core.services.exceptions import ValidationException
+
+
+# ============================ FIXTURES ============================
+
+def _completed_analysis(db_session, user_id, model_version, stage_timings, completed_at):
+    video = create_video(Video(user_id=user_id), session=db_session)
+    return create_analysis(
+        Analysis(
+            user_id=user_id,
+            video_id=video.id,
+            model_version=model_version,
+            status="completed",
+            success=True,
+            completed_at=completed_at,
+            stage_timings=stage_timings,
+        ),
+        session=db_session,
+    )
+
+
+# ============================ TESTS ============================
+
+class TestTelemetryCollector:
+    def test_nothing_is_recorded_outside_a_collector(self):
+        with telemetry.stage("trim"):
+            pass
+        telemetry.record("input_tokens", 10)
+        assert telemetry.current() is None
+
+    def test_stages_accumulate_and_counters_are_kept(self):
+        with telemetry.collect() as timings:
+            with telemetry.stage("provider_processing_wait"):
+                pass
+            with telemetry.stage("provider_processing_wait"):
+                pass
+            telemetry.record("input_tokens", 1200)
+            telemetry.record("cached_tokens", None)
+
+        assert set(timings.stage_ms()) == {"provider_processing_wait"}
+        assert timings.counters == {"input_tokens": 1200}
+        assert telemetry.current() is None
+
+
+class TestStagePercentiles:
+    def test_percentiles_per_stage_and_model(self, db_session, test_user):
+        day = datetime(2026, 10, 1, 12, tzinfo=timezone.utc)
+        for ms in (100, 200, 300, 400, 500):
+            _completed_analysis(
+                db_session, test_user["user_id"], "model-a", {"trim": ms, "generate_content": ms * 10}, day
+            )
+        _completed_analysis(db_session, test_user["user_id"], "model-b", {"trim": 50}, day)
+        # Outside the range: ignored
+        _completed_analysis(
+            db_session, test_user["user_id"], "model-a", {"trim": 99999}, datetime(2026, 9, 1, tzinfo=timezone.utc)
+        )
+
+        rows = get_analysis_stage_percentiles(date(2026, 10, 1), date(2026, 10, 1), db_session)
+
+        by_key = {(r.model_version, r.stage): r for r in rows}
+        trim = by_key[("model-a", "trim")]
+        assert trim.count == 5
+        assert trim.p50_ms == pytest.approx(300)
+        assert trim.p99_ms <= 500
+        assert by_key[("model-a", "generate_content")].p50_ms == pytest.approx(3000)
+        assert by_key[("model-b", "trim")].count == 1
+        # Pipeline order within a model
+        assert [r.stage for r in rows if r.model_version == "model-a"] == ["trim", "generate_content"]
+
+    def test_rejects_inverted_range(self, db_session):
+        with pytest.raises(ValidationException):
+            get_analysis_stage_percentiles(date(2026, 10, 2), date(2026, 10, 1), db_session)
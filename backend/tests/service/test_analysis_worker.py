@@ -0,0 +1,308 @@
+import pytest
+from datetime import datetime, timedelta, timezone
+from unittest.mock import patch, MagicMock
+
+from core.services.analysis_service import enqueue_analysis
+from core.services.analysis_worker import AnalysisWorker
+from core.services.dtos.analysis_service_dto import RunAnalysisDTO
+from core.services.exceptions import InvalidVideoException
+from core.infrastructure.db.models.Analysis import Analysis
+from core.infrastructure.db.models.Video import Video
+from core.infrastructure.db.repositories.analysis import create_analysis, get_analysis_by_id
+from core.infrastructure.db.repositories.videos import create_video
+from core.infrastructure.db.repositories.analysis_jobs import (
+    get_job_by_analysis_id,
+    claim_next_job,
+    enqueue_job,
+)
+from core.infrastructure.db.models.AnalysisJob import AnalysisJob
+from core.infrastructure.db.session import SessionLocal, session_scope
+from core.infrastructure.db.repositories.issues import get_all_issues
+from core.infrastructure.local_files.media_pipeline.MediaPipeline import MediaPipelineResult, MediaProbe
+
+
+# ============================ FIXTURES ============================
+
+PROBE = MediaProbe(
+    duration=2.0, width=1280, height=720, fps=30.0, video_codec="h264",
+    audio_codec="aac", file_size=13, format="mov,mp4",
+)
+
+@pytest.fixture()
+def queued_analysis(db_session, test_user):
+    """An uploaded analysis that has been confirmed, i.e. has a queued job."""
+    video = create_video(Video(user_id=test_user["user_id"]), session=db_session)
+    analysis = create_analysis(
+        Analysis(user_id=test_user["user_id"], model_version="test-model", video_id=video.id),
+        session=db_session,
+    )
+    enqueue_analysis(
+        RunAnalysisDTO(user_id=test_user["user_id"], analysis_id=analysis.id),
+        db_session=db_session,
+    )
+    return analysis.id
+
+
+@pytest.fixture()
+def worker(db_session):
+    """A worker whose short transactions run on the test's connection (rolled back
+    with it). Zero retry delay so a retried job is immediately claimable again."""
+    return AnalysisWorker(
+        worker_id="test-worker",
+        session_factory=lambda: SessionLocal(bind=db_session.get_bind()),
+        heartbeat_seconds=60,
+        retry_base_seconds=0,
+    )
+
+
+def _save_result(analysis_id, session_factory, on_save, **kwargs):
+    """Stand-in for process_analysis: skip the work, run the final transaction."""
+    with session_scope(session_factory) as session:
+        on_save(session)
+
+
+def _job(db_session, analysis_id):
+    db_session.expire_all()
+    return get_job_by_analysis_id(analysis_id, session=db_session)
+
+
+# ============================ TESTS ============================
+
+class TestEnqueueAnalysis:
+    def test_enqueue_marks_processing_and_queues_job(self, db_session, queued_analysis):
+        analysis = get_analysis_by_id(queued_analysis, session=db_session)
+        assert analysis.status == "processing"
+        assert analysis.started_at is not None
+
+        job = _job(db_session, queued_analysis)
+        assert job is not None
+        assert job.status == "queued"
+        assert job.attempts == 0
+
+    def test_enqueue_rejects_analysis_not_awaiting_upload(self, db_session, test_user, queued_analysis):
+        from core.services.exceptions import InvalidStateException
+
+        with pytest.raises(InvalidStateException):
+            enqueue_analysis(
+                RunAnalysisDTO(user_id=test_user["user_id"], analysis_id=queued_analysis),
+                db_session=db_session,
+            )
+
+
+class TestAnalysisWorker:
+    def test_successful_run_marks_job_succeeded(self, db_session, queued_analysis, worker):
+        with patch(
+            "core.services.analysis_worker.process_analysis",
+            side_effect=_save_result,
+        ) as process:
+            assert worker.run_once() is True
+
+        process.assert_called_once()
+        job = _job(db_session, queued_analysis)
+        assert job.status == "succeeded"
+        assert job.attempts == 1
+        assert job.locked_by is None
+        assert job.finished_at is not None
+
+    def test_transient_failure_is_retried(self, db_session, queued_analysis, worker):
+        with patch(
+            "core.services.analysis_worker.process_analysis",
+            side_effect=RuntimeError("provider timeout"),
+        ):
+            worker.run_once()
+
+        job = _job(db_session, queued_analysis)
+        assert job.status == "queued"
+        assert job.attempts == 1
+        assert job.last_error == "provider timeout"
+        # Between attempts the analysis is still in flight, not failed.
+        assert get_analysis_by_id(queued_analysis, session=db_session).status == "processing"
+
+    def test_failure_on_last_attempt_fails_analysis(self, db_session, queued_analysis, worker):
+        with patch(
+            "core.services.analysis_worker.process_analysis",
+            side_effect=RuntimeError("provider timeout"),
+        ):
+            for _ in range(_job(db_session, queued_analysis).max_attempts):
+                worker.run_once()
+
+        job = _job(db_session, queued_analysis)
+        assert job.status == "failed"
+        analysis = get_analysis_by_id(queued_analysis, session=db_session)
+        assert analysis.status == "failed"
+        assert analysis.success is False
+        assert analysis.error_message == "provider timeout"
+
+    def test_invalid_video_is_not_retried(self, db_session, queued_analysis, worker):
+        with patch(
+            "core.services.analysis_worker.process_analysis",
+            side_effect=InvalidVideoException("not a golf swing"),
+        ):
+            worker.run_once()
+
+        job = _job(db_session, queued_analysis)
+        assert job.status == "failed"
+        assert job.attempts == 1
+        assert get_analysis_by_id(queued_analysis, session=db_session).status == "failed"
+
+    def test_result_discarded_when_lease_lost(self, db_session, queued_analysis, worker):
+        def _reclaimed_then_save(analysis_id, session_factory, on_save, **kwargs):
+            # Another worker takes the job over while this one is still working.
+            with session_scope(session_factory) as session:
+                session.get(AnalysisJob, _job(db_session, analysis_id).id).locked_by = "other-worker"
+            _save_result(analysis_id, session_factory, on_save)
+
+        with patch(
+            "core.services.analysis_worker.process_analysis",
+            side_effect=_reclaimed_then_save,
+        ):
+            assert worker.run_once() is True
+
+        job = _job(db_session, queued_analysis)
+        assert job.status == "running"
+        assert job.locked_by == "other-worker"
+
+    @pytest.mark.parametrize(
+        "error",
+        [RuntimeError("provider timeout"), InvalidVideoException("not a golf swing")],
+        ids=["retry", "terminal"],
+    )
+    def test_failure_ignored_when_lease_lost(self, db_session, queued_analysis, worker, error):
+        def _reclaimed_then_fail(analysis_id, session_factory, on_save, **kwargs):
+            with session_scope(session_factory) as session:
+                session.get(AnalysisJob, _job(db_session, analysis_id).id).locked_by = "other-worker"
+            raise error
+
+        with patch(
+            "core.services.analysis_worker.process_analysis",
+            side_effect=_reclaimed_then_fail,
+        ):
+            assert worker.run_once() is True
+
+        # The new owner's run decides the outcome; this worker's failure is dropped.
+        job = _job(db_session, queued_analysis)
+        assert job.status == "running"
+        assert job.locked_by == "other-worker"
+        assert job.last_error is None
+        analysis = get_analysis_by_id(queued_analysis, session=db_session)
+        assert analysis.status == "processing"
+        assert analysis.error_message is None
+
+
+    def test_bypass_flag_reaches_process_analysis(self, db_session, test_user, worker):
+        video = create_video(Video(user_id=test_user["user_id"]), session=db_session)
+        analysis = create_analysis(
+            Analysis(user_id=test_user["user_id"], model_version="test-model", video_id=video.id),
+            session=db_session,
+        )
+        enqueue_analysis(
+            RunAnalysisDTO(user_id=test_user["user_id"], analysis_id=analysis.id, bypass_result_cache=True),
+            db_session=db_session,
+        )
+
+        with patch(
+            "core.services.analysis_worker.process_analysis",
+            side_effect=_save_result,
+        ) as process:
+            worker.run_once()
+
+        assert process.call_args.kwargs["bypass_result_cache"] is True
+
+
+    def test_retry_after_archive_upload_trims_the_original_again(self, db_session, test_user, worker, tmp_path):
+        video = create_video(
+            Video(
+                user_id=test_user["user_id"],
+                video_key="videos/retry-test",
+                start_time=timedelta(seconds=1),
+                end_time=timedelta(seconds=3),
+            ),
+            session=db_session,
+        )
+        analysis = create_analysis(
+            Analysis(user_id=test_user["user_id"], model_version="test-model", video_id=video.id, auto_trim=False),
+            session=db_session,
+        )
+        enqueue_analysis(RunAnalysisDTO(user_id=test_user["user_id"], analysis_id=analysis.id), db_session=db_session)
+        issue_id = get_all_issues(db_session)[0].id
+        local_video = tmp_path / "video.mp4"
+        local_video.write_bytes(b"trimmed swing")
+
+        downloaded = MagicMock()
+        downloaded.path.return_value = str(local_video)
+        downloaded.process.return_value = MediaPipelineResult(
+            archive_path=str(local_video), trimmed=True, thumbnail_path=None, proxy_path=None, probe=PROBE,
+        )
+        analyze = MagicMock(side_effect=[
+            RuntimeError("provider timeout"),      # After the archive was uploaded
+            {"issues": [{"issue_id": str(issue_id), "confidence": 0.9}], "success": True},
+        ])
+        service_module = "core.services.analysis_service"
+        with patch(f"{service_module}._download_video", return_value=downloaded) as download_video, \
+             patch(f"{service_module}.preflight_enabled", return_value=False), \
+             patch(f"{service_module}.FACE_ANONYMIZE_ENABLED", False), \
+             patch(f"{service_module}.upload_from_path") as upload, \
+             patch(f"{service_module}.analyze_video", analyze):
+            worker.run_once()
+            assert _job(db_session, analysis.id).status == "queued"
+            worker.run_once()
+
+        job = _job(db_session, analysis.id)
+        assert job.status == "succeeded"
+        assert job.attempts == 2
+        # Both attempts read the untouched original and cut the same window from it
+        assert [c.args[0] for c in download_video.call_args_list] == ["videos/retry-test"] * 2
+        assert [(c.kwargs["start_seconds"], c.kwargs["end_seconds"]) for c in downloaded.process.call_args_list] == [(1.0, 3.0)] * 2
+        assert {c.kwargs["key"] for c in upload.call_args_list} == {"archives/retry-test.mp4"}
+        db_session.expire_all()
+        stored = db_session.get(Video, video.id)
+        assert stored.video_key == "videos/retry-test"
+        assert stored.archive_key == "archives/retry-test.mp4"
+
+
+class TestLeaseReclaim:
+    def test_expired_lease_is_reclaimed(self, db_session, queued_analysis):
+        job = _job(db_session, queued_analysis)
+        job.status = "running"
+        job.attempts = 1
+        job.locked_by = "dead-worker"
+        job.lease_expires_at = datetime.now(timezone.utc) - timedelta(seconds=5)
+        db_session.flush()
+
+        claimed = claim_next_job("live-worker", lease_seconds=60, session=db_session)
+
+        assert claimed is not None
+        assert claimed.id == job.id
+        assert claimed.locked_by == "live-worker"
+        assert claimed.attempts == 2
+        assert claimed.lease_expires_at > datetime.now(timezone.utc)
+
+    def test_live_lease_is_not_reclaimed(self, db_session, queued_analysis):
+        job = _job(db_session, queued_analysis)
+        job.status = "running"
+        job.attempts = 1
+        job.locked_by = "busy-worker"
+        job.lease_expires_at = datetime.now(timezone.utc) + timedelta(seconds=60)
+        db_session.flush()
+
+        claimed = claim_next_job("other-worker", lease_seconds=60, session=db_session)
+
+        assert claimed is None or claimed.id != job.id
+
+    def test_direct_upload_scratch_path_reaches_process_analysis(self, db_session, test_user, worker):
+        # A direct upload's job: queued like any other, with the API's scratch copy as a hint
+        video = create_video(Video(user_id=test_user["user_id"]), session=db_session)
+        analysis = create_analysis(
+            Analysis(user_id=test_user["user_id"], model_version="test-model", video_id=video.id, status="processing"),
+            session=db_session,
+        )
+        enqueue_job(analysis.id, max_attempts=3, session=db_session, local_video_path="/scratch/upload.mp4")
+
+        with patch(
+            "core.services.analysis_worker.process_analysis",
+            side_effect=_save_result,
+        ) as process:
+            assert worker.run_once() is True
+
+        assert process.call_args.kwargs["local_video_path"] == "/scratch/upload.mp4"
+        assert _job(db_session, analysis.id).status == "succeeded"
@@ -0,0 +1,27 @@
+import os
+import time
+from unittest.mock import patch
+
+from core.services import direct_upload_service
+from core.services.direct_upload_service import sweep_direct_upload_scratch
+
+
+def test_sweep_removes_only_stale_scratch_copies(tmp_path):
+    stale = tmp_path / "stale.upload"
+    fresh = tmp_path / "fresh.upload"
+    stale.write_bytes(b"old")
+    fresh.write_bytes(b"new")
+    two_hours_ago = time.time() - 7200
+    os.utime(stale, (two_hours_ago, two_hours_ago))
+
+    with patch.object(direct_upload_service, "DIRECT_UPLOAD_SCRATCH_DIR", str(tmp_path)):
+        removed = sweep_direct_upload_scratch(max_age_seconds=3600)
+
+    assert removed == 1
+    assert not stale.exists()
+    assert fresh.exists()
+
+
+def test_sweep_without_scratch_dir(tmp_path):
+    with patch.object(direct_upload_service, "DIRECT_UPLOAD_SCRATCH_DIR", str(tmp_path / "missing")):
+        assert sweep_direct_upload_scratch() == 0
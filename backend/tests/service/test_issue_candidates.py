@@ -0,0 +1,114 @@
+import pytest
+
+from core.services.issue_catalog import IssueCatalogSnapshot, IssueTags
+from core.services.issue_candidates import select_candidate_issues
+from core.services.taxonomy import misses_from_prompt, goals_from_prompt, areas_from_prompt
+from core.infrastructure.AI.google.prompts import serialize_issue_catalog
+
+
+# ============================ FIXTURES ============================
+
+def _catalog(tag_list: list[tuple], untagged: int = 0) -> IssueCatalogSnapshot:
+    """(misses, goals) or (misses, goals, area) per tagged issue."""
+    issues, tags = [], {}
+    for n, (misses, goals, *area) in enumerate(tag_list):
+        issue_id = f"issue-{n}"
+        issues.append({"issue_id": issue_id, "name": f"Issue {n}"})
+        tags[issue_id] = IssueTags(area=area[0] if area else "FULL_SWING", misses=frozenset(misses), goals=frozenset(goals))
+    for n in range(untagged):
+        issue_id = f"untagged-{n}"
+        issues.append({"issue_id": issue_id, "name": f"Untagged {n}"})
+        tags[issue_id] = IssueTags(area="FULL_SWING", misses=frozenset(), goals=frozenset())
+    return IssueCatalogSnapshot(version=7, issues=issues, block=serialize_issue_catalog(issues), tags=tags)
+
+
+@pytest.fixture
+def catalog():
+    """10 slice issues, 10 contact issues, 20 distance issues, 2 untagged."""
+    return _catalog(
+        [({"SLICE"}, {"STRAIGHTER"})] * 10
+        + [({"FAT", "THIN"}, {"CONTACT"})] * 10
+        + [(set(), {"DISTANCE"})] * 20,
+        untagged=2,
+    )
+
+
+# ============================ TESTS ============================
+
+class TestPromptMapping:
+    def test_app_miss_labels_map_to_vocabulary(self):
+        assert misses_from_prompt("Slice/Fade, Thin/Top") == ["SLICE", "THIN", "TOP"]
+        assert misses_from_prompt("Draw/Hook, Thick/Duff") == ["HOOK", "FAT"]
+        assert misses_from_prompt("Too Low") == ["LOW_WEAK"]
+        assert misses_from_prompt(None) == []
+
+    def test_goals_follow_misses_and_shape(self):
+        assert goals_from_prompt(["SLICE"]) == ["STRAIGHTER"]
+        assert goals_from_prompt([], misses_text="Shank") == ["CONTACT"]
+        assert goals_from_prompt([], shape="Straight, High") == ["STRAIGHTER"]
+
+    def test_ball_flight_rules_out_putting(self):
+        assert "PUTTING" not in areas_from_prompt([], height="high")
+        assert "PUTTING" not in areas_from_prompt([], shape="Draw")
+        assert "PUTTING" not in areas_from_prompt(["SLICE"])
+        assert "CHIPPING" in areas_from_prompt([], height="Low")
+        assert areas_from_prompt([], height="unsure") == []
+        assert areas_from_prompt(["FAT"], misses_text="Thick/Duff") == []
+
+
+class TestSelectCandidateIssues:
+    def test_narrows_to_matching_and_untagged_issues(self, catalog):
+        result = select_candidate_issues(catalog, misses_text="Slice/Fade", min_candidates=5)
+
+        assert result.narrowed is True
+        ids = [i["issue_id"] for i in result.issues]
+        assert len(ids) == 12
+        assert {"untagged-0", "untagged-1"} <= set(ids)
+        assert len(result.block) < len(catalog.block)
+
+    def test_keeps_catalog_order(self, catalog):
+        result = select_candidate_issues(catalog, misses_text="Thick/Duff, Slice", min_candidates=5)
+
+        positions = [catalog.issues.index(i) for i in result.issues]
+        assert positions == sorted(positions)
+
+    def test_full_catalog_without_usable_prompt(self, catalog):
+        result = select_candidate_issues(catalog, misses_text=None, min_candidates=5)
+
+        assert result.narrowed is False
+        assert result.issues is catalog.issues
+        assert result.block is catalog.block
+
+    def test_full_catalog_when_inconsistent(self, catalog):
+        assert select_candidate_issues(catalog, misses_text="Inconsistent", min_candidates=5).narrowed is False
+
+    def test_full_catalog_when_too_few_matches(self, catalog):
+        assert select_candidate_issues(catalog, misses_text="Slice", min_candidates=11).narrowed is False
+
+    def test_full_catalog_when_narrowing_keeps_almost_everything(self):
+        catalog = _catalog([({"SLICE"}, {"STRAIGHTER"})] * 10 + [({"FAT"}, {"CONTACT"})])
+
+        assert select_candidate_issues(catalog, misses_text="Slice", min_candidates=5).narrowed is False
+
+    def test_disabled(self, catalog):
+        assert select_candidate_issues(catalog, misses_text="Slice", min_candidates=5, enabled=False).narrowed is False
+
+    def test_height_alone_drops_putting_issues(self):
+        catalog = _catalog([(set(), {"PUTTING"}, "PUTTING")] * 5 + [(set(), {"DISTANCE"})] * 5, untagged=1)
+
+        result = select_candidate_issues(catalog, misses_text=None, height="high", min_candidates=5)
+
+        assert result.narrowed is True
+        assert [i["issue_id"] for i in result.issues] == [f"issue-{n}" for n in range(5, 10)] + ["untagged-0"]
+
+    def test_matching_is_limited_to_the_possible_areas(self):
+        catalog = _catalog(
+            [({"PULL"}, {"STRAIGHTER"})] * 6 + [({"PULL"}, {"PUTTING"}, "PUTTING")] * 4 + [(set(), {"DISTANCE"})] * 10
+        )
+
+        result = select_candidate_issues(catalog, misses_text="Pull", min_candidates=5)
+
+        assert [i["issue_id"] for i in result.issues] == [f"issue-{n}" for n in range(6)]
+
+    def test_height_without_a_flight_word_is_ignored(self, catalog):
+        assert select_candidate_issues(catalog, misses_text=None, height="unsure", min_candidates=5).narrowed is False
@@ -0,0 +1,145 @@
+import threading
+
+import pytest
+from unittest.mock import MagicMock, patch
+
+from core.services import issue_catalog
+from core.services.issue_catalog import get_issue_catalog, bump_issue_catalog_version
+from core.services.issues_service import create_issue, update_issue, delete_issue
+from core.services.dtos.issues_service_dto import CreateIssueDTO, UpdateIssueDTO
+from core.infrastructure.db.repositories.issue_catalog_version import get_catalog_version
+from core.infrastructure.AI.google import contextCache
+
+
+# ============================ FIXTURES ============================
+
+@pytest.fixture(autouse=True)
+def _fresh_snapshot():
+    """Each test's bumps are rolled back with its transaction, so the version can
+    repeat across tests with different content; never carry a snapshot over."""
+    issue_catalog._snapshot = None
+    yield
+    issue_catalog._snapshot = None
+
+
+# ============================ TESTS ============================
+
+class TestIssueCatalogSnapshot:
+    def test_snapshot_reused_while_version_unchanged(self, db_session):
+        first = get_issue_catalog(db_session)
+        second = get_issue_catalog(db_session)
+
+        assert second is first
+        assert first.version == get_catalog_version(db_session)
+        assert len(first.issues) > 0
+        assert '"issue_id"' in first.block
+        assert "\n" not in first.block  # Compact serialization
+
+    def test_bump_invalidates_snapshot(self, db_session):
+        before = get_issue_catalog(db_session)
+
+        new_version = bump_issue_catalog_version(db_session)
+        after = get_issue_catalog(db_session)
+
+        assert new_version == before.version + 1
+        assert after is not before
+        assert after.version == new_version
+
+
+class TestIssueWritesBumpVersion:
+    def test_create_update_delete_each_bump(self, db_session):
+        version = get_catalog_version(db_session)
+
+        created = create_issue(CreateIssueDTO(title="Catalog cache test", description="desc"), db_session)
+        assert get_catalog_version(db_session) == version + 1
+        assert any(i["issue_id"] == str(created.id) for i in get_issue_catalog(db_session).issues)
+
+        update_issue(created.id, UpdateIssueDTO(title="Catalog cache test (renamed)"), db_session)
+        assert get_catalog_version(db_session) == version + 2
+        assert any(i["name"] == "Catalog cache test (renamed)" for i in get_issue_catalog(db_session).issues)
+
+        delete_issue(created.id, db_session)
+        assert get_catalog_version(db_session) == version + 3
+        assert all(i["issue_id"] != str(created.id) for i in get_issue_catalog(db_session).issues)
+
+
+class TestGeminiCatalogCache:
+    @pytest.fixture(autouse=True)
+    def _empty_cache(self):
+        contextCache._caches.clear()
+        contextCache._failed_until.clear()
+        yield
+        contextCache._caches.clear()
+        contextCache._failed_until.clear()
+
+    def test_one_cache_per_model_and_version(self):
+        client = MagicMock()
+        client.caches.create.return_value.name = "cachedContents/abc"
+
+        first = contextCache.get_catalog_cache(client, "model-a", 3, "[]", ttl_seconds=3600)
+        second = contextCache.get_catalog_cache(client, "model-a", 3, "[]", ttl_seconds=3600)
+
+        assert first == second == "cachedContents/abc"
+        client.caches.create.assert_called_once()
+
+    def test_new_version_replaces_old_cache(self):
+        client = MagicMock()
+        client.caches.create.return_value.name = "cachedContents/v3"
+        contextCache.get_catalog_cache(client, "model-a", 3, "[]", ttl_seconds=3600)
+
+        client.caches.create.return_value.name = "cachedContents/v4"
+        name = contextCache.get_catalog_cache(client, "model-a", 4, "[]", ttl_seconds=3600)
+
+        assert name == "cachedContents/v4"
+        client.caches.delete.assert_called_once_with(name="cachedContents/v3")
+
+    def test_creation_failure_falls_back_to_inline(self):
+        client = MagicMock()
+        client.caches.create.side_effect = RuntimeError("content too small to cache")
+
+        assert contextCache.get_catalog_cache(client, "model-a", 3, "[]", ttl_seconds=3600) is None
+
+    def test_failure_is_not_retried_until_the_backoff_passes(self):
+        client = MagicMock()
+        client.caches.create.side_effect = RuntimeError("quota")
+        clock = [1000.0]
+
+        with patch.object(contextCache.time, "monotonic", side_effect=lambda: clock[0]):
+            contextCache.get_catalog_cache(client, "model-a", 3, "[]", ttl_seconds=3600)
+            assert contextCache.get_catalog_cache(client, "model-a", 3, "[]", ttl_seconds=3600) is None
+            assert client.caches.create.call_count == 1
+
+            clock[0] += contextCache._FAILURE_BACKOFF_SECONDS + 1
+            client.caches.create.side_effect = None
+            client.caches.create.return_value.name = "cachedContents/abc"
+            assert contextCache.get_catalog_cache(client, "model-a", 3, "[]", ttl_seconds=3600) == "cachedContents/abc"
+
+    def test_create_does_not_hold_the_lock(self):
+        started, release = threading.Event(), threading.Event()
+        slow = MagicMock()
+
+        def create(model, config):
+            started.set()
+            assert release.wait(timeout=5)
+            cache = MagicMock()
+            cache.name = f"cachedContents/{model}"
+            return cache
+
+        slow.caches.create.side_effect = create
+        results = []
+        creator = threading.Thread(target=lambda: results.append(contextCache.get_catalog_cache(slow, "model-a", 3, "[]", 3600)))
+        waiter = threading.Thread(target=lambda: results.append(contextCache.get_catalog_cache(slow, "model-a", 3, "[]", 3600)))
+        creator.start()
+        assert started.wait(timeout=5)
+        waiter.start()
+
+        # Another model's cache is served while model-a's create is in flight
+        other = MagicMock()
+        other.caches.create.return_value.name = "cachedContents/model-b"
+        assert contextCache.get_catalog_cache(other, "model-b", 3, "[]", 3600) == "cachedContents/model-b"
+
+        release.set()
+        creator.join(timeout=5)
+        waiter.join(timeout=5)
+        assert results == ["cachedContents/model-a", "cachedContents/model-a"]
+        assert slow.caches.create.call_count == 1
@@ -0,0 +1,131 @@
+import hashlib
+import pytest
+from unittest.mock import patch
+
+from core.services import multipart_upload_service
+from core.services.multipart_upload_service import (
+    MB,
+    plan_parts,
+    initiate_multipart_upload,
+    complete_multipart_upload,
+    abort_multipart_upload,
+)
+from core.services.analysis_service import create_analysis, enqueue_analysis
+from core.services.dtos.analysis_service_dto import (
+    CreateAnalysisDTO,
+    CompleteMultipartUploadDTO,
+    RunAnalysisDTO,
+)
+from core.services.exceptions import ValidationException, InvalidStateException
+from core.infrastructure.db.repositories.analysis import get_analysis_by_id
+
+
+# ============================ FIXTURES ============================
+
+@pytest.fixture()
+def analysis_id(db_session, test_user):
+    with patch("core.services.analysis_service.generate_upload_url", return_value="https://r2.example.com/put"):
+        result = create_analysis(
+            CreateAnalysisDTO(user_id=test_user["user_id"], start_time=0, end_time=3),
+            db_session=db_session,
+        )
+    return result["analysis_id"]
+
+
+@pytest.fixture()
+def r2():
+    """The R2 calls the service makes, with the object store behind them faked."""
+    with patch.object(multipart_upload_service, "create_multipart_upload", return_value="upload-1") as create, \
+         patch.object(multipart_upload_service, "generate_upload_part_url", side_effect=lambda key, upload_id, n, expires_in: f"https://r2.example.com/{n}"), \
+         patch.object(multipart_upload_service, "complete_multipart_upload_in_r2") as complete, \
+         patch.object(multipart_upload_service, "abort_multipart_upload_in_r2") as abort, \
+         patch.object(multipart_upload_service, "object_metadata") as metadata, \
+         patch.object(multipart_upload_service, "delete") as delete:
+        yield {
+            "create": create,
+            "complete": complete,
+            "abort": abort,
+            "metadata": metadata,
+            "delete": delete,
+        }
+
+
+def _part_etags(count: int) -> list[tuple[int, str]]:
+    return [(n, hashlib.md5(f"part {n}".encode()).hexdigest()) for n in range(1, count + 1)]
+
+
+# ============================ TESTS ============================
+
+class TestPlanParts:
+    def test_parts_cover_the_file(self):
+        part_size, count = plan_parts(20 * MB + 1, part_bytes=8 * MB)
+        assert (part_size, count) == (8 * MB, 3)
+
+    def test_part_size_never_below_r2_minimum(self):
+        assert plan_parts(12 * MB, part_bytes=1 * MB) == (5 * MB, 3)
+
+    def test_part_size_grows_to_stay_within_part_limit(self):
+        part_size, count = plan_parts(100_000 * MB, part_bytes=8 * MB)
+        assert count <= 10_000
+        assert part_size * count >= 100_000 * MB
+
+
+class TestMultipartUpload:
+    def test_initiate_signs_every_part(self, db_session, test_user, analysis_id, r2):
+        result = initiate_multipart_upload(analysis_id, test_user["user_id"], 20 * MB, db_session=db_session)
+
+        assert result.upload_id == "upload-1"
+        assert [p.part_number for p in result.part_urls] == list(range(1, len(result.part_urls) + 1))
+        assert result.part_size * len(result.part_urls) >= 20 * MB
+
+    def test_analysis_cannot_be_confirmed_while_upload_is_open(self, db_session, test_user, analysis_id, r2):
+        initiate_multipart_upload(analysis_id, test_user["user_id"], 20 * MB, db_session=db_session)
+
+        with pytest.raises(InvalidStateException):
+            enqueue_analysis(RunAnalysisDTO(user_id=test_user["user_id"], analysis_id=analysis_id), db_session=db_session)
+
+    def test_verified_completion_queues_the_analysis(self, db_session, test_user, analysis_id, r2):
+        started = initiate_multipart_upload(analysis_id, test_user["user_id"], 20 * MB, db_session=db_session)
+        parts = _part_etags(len(started.part_urls))
+        r2["metadata"].return_value = {"size": 20 * MB, "etag": "assembled-3"}
+
+        result = complete_multipart_upload(
+            CompleteMultipartUploadDTO(user_id=test_user["user_id"], analysis_id=analysis_id, parts=parts),
+            db_session=db_session,
+        )
+
+        assert result.status == "processing"
+        r2["delete"].assert_not_called()
+
+    def test_size_mismatch_is_rejected(self, db_session, test_user, analysis_id, r2):
+        started = initiate_multipart_upload(analysis_id, test_user["user_id"], 20 * MB, db_session=db_session)
+        parts = _part_etags(len(started.part_urls))
+        r2["metadata"].return_value = {"size": 19 * MB, "etag": "assembled-3"}
+
+        with pytest.raises(ValidationException):
+            complete_multipart_upload(
+                CompleteMultipartUploadDTO(user_id=test_user["user_id"], analysis_id=analysis_id, parts=parts),
+                db_session=db_session,
+            )
+
+        r2["delete"].assert_called_once()
+        assert get_analysis_by_id(analysis_id, session=db_session).status == "awaiting_upload"
+
+    def test_missing_part_is_rejected(self, db_session, test_user, analysis_id, r2):
+        started = initiate_multipart_upload(analysis_id, test_user["user_id"], 20 * MB, db_session=db_session)
+        parts = _part_etags(len(started.part_urls))[:-1]
+
+        with pytest.raises(ValidationException):
+            complete_multipart_upload(
+                CompleteMultipartUploadDTO(user_id=test_user["user_id"], analysis_id=analysis_id, parts=parts),
+                db_session=db_session,
+            )
+        r2["complete"].assert_not_called()
+
+    def test_abort_releases_the_upload(self, db_session, test_user, analysis_id, r2):
+        initiate_multipart_upload(analysis_id, test_user["user_id"], 20 * MB, db_session=db_session)
+
+        abort_multipart_upload(analysis_id, test_user["user_id"], db_session=db_session)
+
+        r2["abort"].assert_called_once()
+        enqueue_analysis(RunAnalysisDTO(user_id=test_user["user_id"], analysis_id=analysis_id), db_session=db_session)
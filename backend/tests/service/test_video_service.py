@@ -0,0 +1,34 @@
+from types import SimpleNamespace
+from unittest.mock import patch
+from uuid import uuid4
+
+from core.services import video as video_service
+from core.services.video import get_video_thumbnail_urls_from_analyses, is_content_addressed_thumbnail
+
+CONTENT_ADDRESSED = "thumbnails/1f0c/" + "ab12" * 16 + ".jpg"
+LEGACY = "thumbnails/1f0c.jpg"
+
+
+def test_content_addressed_thumbnail_keys():
+    assert is_content_addressed_thumbnail(CONTENT_ADDRESSED)
+    assert not is_content_addressed_thumbnail(LEGACY)
+    assert not is_content_addressed_thumbnail("thumbnails/1f0c/not-a-digest.jpg")
+
+
+def test_only_content_addressed_thumbnails_get_immutable_urls():
+    videos = [
+        SimpleNamespace(id=uuid4(), thumbnail_key=CONTENT_ADDRESSED),
+        SimpleNamespace(id=uuid4(), thumbnail_key=LEGACY),
+        SimpleNamespace(id=uuid4(), thumbnail_key=None),
+    ]
+    with patch.object(video_service, "repo_get_videos_by_analysis_ids", return_value=videos), \
+         patch.object(video_service, "generate_immutable_read_urls", side_effect=lambda keys: {k: f"immutable:{k}" for k in keys}) as immutable, \
+         patch.object(video_service, "generate_read_urls", side_effect=lambda keys: {k: f"read:{k}" for k in keys}) as read:
+        result = get_video_thumbnail_urls_from_analyses([uuid4()], db_session=None)
+
+    immutable.assert_called_once_with([CONTENT_ADDRESSED])
+    read.assert_called_once_with([LEGACY])
+    assert result.thumbnail_urls == {
+        videos[0].id: f"immutable:{CONTENT_ADDRESSED}",
+        videos[1].id: f"read:{LEGACY}",
+    }